@@ -0,0 +1,94 @@
+"""
+Benchmark dos backends de correção (pandas x polars) em vendas.
+
+Gera uma tabela de vendas sintética em texto (como a carga raw), com ~1% de
+FKs inválidas, quantidades não positivas e valor_total divergente, e mede
+`corrigir_vendas` em cada backend. Com `--lazy`, o backend polars também é
+medido a partir de um CSV via `pl.scan_csv` (plano lazy completo, sem
+materializar a entrada em pandas).
+
+Execução:
+    python benchmarks/bench_backends_correcao.py --linhas 10000000
+    python benchmarks/bench_backends_correcao.py --linhas 100000000 --backends polars --lazy
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import polars as pl
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import correcao_automatica as ca
+from correcao_polars import CorrecaoPolars
+
+N_CLIENTES = 100_000
+N_PRODUTOS = 5_000
+STATUS = ['Concluída', 'Pendente', 'Cancelada', 'Processando']
+
+
+def _reais(centavos: np.ndarray) -> pd.Series:
+    texto = pd.Series(centavos).astype(str).str.zfill(3)
+    return texto.str[:-2] + '.' + texto.str[-2:]
+
+
+def gerar_vendas(n: int, seed: int = 42) -> pd.DataFrame:
+    """Gera n vendas sintéticas em texto com problemas de qualidade injetados."""
+    rng = np.random.default_rng(seed)
+    quantidade = rng.integers(1, 10, n)
+    quantidade[rng.random(n) < 0.01] = 0
+    unitario = rng.integers(100, 500_000, n)
+    total = quantidade * unitario
+    total[rng.random(n) < 0.01] += 1
+    datas = pd.to_datetime('2023-01-01') + pd.to_timedelta(rng.integers(0, 900, n), unit='D')
+    return pd.DataFrame({
+        'id_venda': pd.Series(np.arange(1, n + 1)).astype(str),
+        'id_cliente': pd.Series(rng.integers(1, int(N_CLIENTES * 1.01), n)).astype(str),
+        'id_produto': pd.Series(rng.integers(1, N_PRODUTOS + 1, n)).astype(str),
+        'quantidade': pd.Series(quantidade).astype(str),
+        'valor_unitario': _reais(unitario),
+        'valor_total': _reais(total),
+        'data_venda': pd.Series(datas).dt.strftime('%Y-%m-%d'),
+        'status': np.array(STATUS)[rng.integers(0, len(STATUS), n)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=10_000_000, help='Linhas de vendas')
+    parser.add_argument('--backends', default='pandas,polars', help='Backends separados por vírgula')
+    parser.add_argument('--lazy', action='store_true', help='Mede também polars com pl.scan_csv')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    clientes = pd.DataFrame({'id_cliente': np.arange(1, N_CLIENTES + 1)})
+    produtos = pd.DataFrame({'id_produto': np.arange(1, N_PRODUTOS + 1)})
+    vendas = gerar_vendas(args.linhas)
+
+    print(f"{'backend':>14} {'segundos':>10} {'linhas/s':>14} {'saída':>12}")
+    for backend in args.backends.split(','):
+        corretor = ca.CorrecaoAutomatica(backend=backend)
+        entrada = ca.converter_colunas_monetarias(vendas.copy())
+        inicio = time.perf_counter()
+        resultado = corretor.corrigir_vendas(entrada, clientes, produtos)
+        duracao = time.perf_counter() - inicio
+        print(f"{backend:>14} {duracao:>10.2f} {args.linhas / duracao:>14,.0f} {len(resultado):>12,}")
+
+    if args.lazy:
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / 'vendas.csv'
+            vendas.to_csv(caminho, sep='\t', index=False)
+            inicio = time.perf_counter()
+            lf = pl.scan_csv(caminho, separator='\t', infer_schema=False)
+            resultado = CorrecaoPolars().corrigir_vendas(lf, clientes, produtos).collect(engine='streaming')
+            duracao = time.perf_counter() - inicio
+            print(f"{'polars (scan)':>14} {duracao:>10.2f} {args.linhas / duracao:>14,.0f} {len(resultado):>12,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark do cache de correções por linha em snapshots completos.
+
+Gera clientes e produtos sintéticos (os do benchmark do governador de
+memória), corrige o snapshot do dia 1 para popular o cache e mede o dia 2,
+com uma fração das linhas alteradas, contra a correção completa.
+
+Execução:
+    python benchmarks/bench_cache_correcoes.py --linhas 1000000 --alteradas 0.01
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import correcao_automatica as ca
+from bench_governador_memoria import gerar_clientes, gerar_produtos
+from cache_correcoes import CacheCorrecoes
+
+CHAVES = {'clientes': 'id_cliente', 'produtos': 'id_produto'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='Linhas por snapshot')
+    parser.add_argument('--alteradas', type=float, default=0.01, help='Fração de linhas alteradas no dia 2')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(7)
+    print(f"{'dataset':>10} {'completa (s)':>13} {'dia 1 (s)':>10} {'dia 2 (s)':>10} {'ganho':>7}")
+    for dataset, gerar, coluna in (('clientes', gerar_clientes, 'nome'), ('produtos', gerar_produtos, 'nome_produto')):
+        dia1 = gerar(args.linhas)
+        if dataset == 'produtos':
+            dia1 = ca.converter_colunas_monetarias(dia1)
+        dia2 = dia1.copy()
+        alteradas = rng.choice(len(dia2), int(len(dia2) * args.alteradas), replace=False)
+        dia2.iloc[alteradas, dia2.columns.get_loc(coluna)] = dia2[coluna].iloc[alteradas] + ' (alterado)'
+
+        corrigir = getattr(ca.CorrecaoAutomatica(), f"corrigir_{dataset}")
+        inicio = time.perf_counter()
+        completa = corrigir(dia2)
+        t_completa = time.perf_counter() - inicio
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CacheCorrecoes(tmp, CHAVES)
+            inicio = time.perf_counter()
+            cache.corrigir(dataset, dia1, corrigir)
+            t_dia1 = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            resultado = cache.corrigir(dataset, dia2, corrigir)
+            t_dia2 = time.perf_counter() - inicio
+        assert resultado.equals(completa)
+        print(f"{dataset:>10} {t_completa:>13.2f} {t_dia1:>10.2f} {t_dia2:>10.2f} {t_completa / t_dia2:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark da deduplicação aproximada de clientes.
+
+Gera uma base sintética (com ~2% de duplicatas por email em caixa diferente
+e ~1% por telefone com variação de nome) e mede o tempo de
+`DeduplicacaoClientes.atribuir_clusters` em tamanhos crescentes, para
+verificar o crescimento próximo de linear.
+
+Execução:
+    python benchmarks/bench_deduplicacao_clientes.py --linhas 10000000
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from deduplicacao_clientes import DeduplicacaoClientes
+
+NOMES = ['João', 'Maria', 'José', 'Ana', 'Pedro', 'Paula', 'Carlos', 'Juliana', 'Lucas', 'Fernanda',
+         'Rafael', 'Beatriz', 'Gabriel', 'Camila', 'Mateus', 'Larissa', 'Thiago', 'Aline', 'Bruno', 'Letícia']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes']
+UFS = ['SP', 'RJ', 'MG', 'BA', 'PR', 'RS', 'PE', 'CE', 'PA', 'SC', 'GO', 'DF']
+
+
+def gerar_clientes(n: int, seed: int = 42) -> pd.DataFrame:
+    """Gera n clientes sintéticos com duplicatas aproximadas injetadas."""
+    rng = np.random.default_rng(seed)
+    nomes = pd.Series(np.array(NOMES)[rng.integers(0, len(NOMES), n)]) + ' ' + \
+            pd.Series(np.array(SOBRENOMES)[rng.integers(0, len(SOBRENOMES), n)]) + ' ' + \
+            pd.Series(np.array(SOBRENOMES)[rng.integers(0, len(SOBRENOMES), n)])
+    ids = np.arange(1, n + 1)
+    df = pd.DataFrame({
+        'id_cliente': ids,
+        'nome': nomes,
+        'email': pd.Series(ids).astype(str).radd('cliente').add('@email.com'),
+        'telefone': pd.Series(rng.integers(11_900_000_000, 99_999_999_999, n)).astype(str),
+        'data_nascimento': pd.Series(pd.to_datetime('1950-01-01') +
+                                     pd.to_timedelta(rng.integers(0, 20000, n), unit='D')).dt.strftime('%Y-%m-%d'),
+        'estado': np.array(UFS)[rng.integers(0, len(UFS), n)],
+    })
+
+    # Duplicatas: mesmo email em caixa alta
+    dup_email = rng.choice(n, size=n // 50, replace=False)
+    origem = rng.choice(n, size=len(dup_email))
+    df.loc[dup_email, 'email'] = df.loc[origem, 'email'].str.upper().to_numpy()
+
+    # Duplicatas: mesmo telefone com nome abreviado
+    dup_tel = rng.choice(n, size=n // 100, replace=False)
+    origem = rng.choice(n, size=len(dup_tel))
+    df.loc[dup_tel, 'telefone'] = df.loc[origem, 'telefone'].to_numpy()
+    df.loc[dup_tel, 'nome'] = df.loc[origem, 'nome'].str.replace(r' \S+$', '', regex=True).to_numpy()
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=10_000_000, help='Tamanho máximo da base')
+    parser.add_argument('--passos', type=int, default=3, help='Quantidade de tamanhos (dobrando até --linhas)')
+    args = parser.parse_args()
+
+    dedup = DeduplicacaoClientes()
+    tamanhos = [args.linhas // (2 ** i) for i in reversed(range(args.passos))]
+    print(f"{'linhas':>12} {'segundos':>10} {'linhas/s':>12} {'clusters':>12}")
+    for n in tamanhos:
+        df = gerar_clientes(n)
+        inicio = time.perf_counter()
+        resultado = dedup.atribuir_clusters(df)
+        duracao = time.perf_counter() - inicio
+        print(f"{n:>12,} {duracao:>10.2f} {n / duracao:>12,.0f} {resultado['id_cluster'].nunique():>12,}")
+
+
+if __name__ == '__main__':
+    main()
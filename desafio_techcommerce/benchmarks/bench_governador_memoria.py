@@ -0,0 +1,133 @@
+"""
+Benchmark do governador de memória: carga + correção das 4 tabelas por modo.
+
+Gera (uma vez) um data/raw sintético no formato da carga raw (vendas do
+bench_backends_correcao, logística com uma entrega por venda) e executa
+as etapas 1 e 2 do pipeline em um processo novo para cada modo: tempo,
+pico de memória residente (ru_maxrss) e o modo escolhido para cada tabela.
+
+Execução:
+    python benchmarks/bench_governador_memoria.py --linhas 5000000
+    python benchmarks/bench_governador_memoria.py --linhas 5000000 --orcamento-mb 1500 --modos auto
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+LINHAS_POR_TRECHO = 1_000_000
+TRANSPORTADORAS = ['Correios', 'Jadlog', 'Loggi', 'Total Express']
+
+
+def gerar_clientes(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = pd.Series(np.arange(1, n + 1)).astype(str)
+    return pd.DataFrame({
+        'id_cliente': ids,
+        'nome': 'Cliente ' + ids,
+        'email': 'cliente' + ids + '@email.com',
+        'telefone': pd.Series(rng.integers(11_900_000_000, 99_999_999_999, n)).astype(str),
+        'data_nascimento': pd.Series(pd.to_datetime('1960-01-01') +
+                                     pd.to_timedelta(rng.integers(0, 15_000, n), unit='D')).dt.strftime('%Y-%m-%d'),
+        'cidade': 'São Paulo',
+    })
+
+
+def gerar_produtos(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = pd.Series(np.arange(1, n + 1)).astype(str)
+    from bench_backends_correcao import _reais
+    return pd.DataFrame({'id_produto': ids, 'nome_produto': 'Produto ' + ids, 'categoria': 'Eletrônicos',
+                         'preco': _reais(rng.integers(100, 500_000, n)),
+                         'estoque': pd.Series(rng.integers(0, 1000, n)).astype(str),
+                         'data_criacao': '2022-01-01', 'ativo': 'True'})
+
+
+def gerar_logistica(n: int, inicio: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    envio = pd.to_datetime('2023-01-02') + pd.to_timedelta(rng.integers(0, 900, n), unit='D')
+    entrega = envio + pd.to_timedelta(rng.integers(1, 15, n), unit='D')
+    ids = pd.Series(np.arange(inicio + 1, inicio + n + 1)).astype(str)
+    return pd.DataFrame({
+        'id_entrega': ids, 'id_venda': ids,
+        'transportadora': np.array(TRANSPORTADORAS)[rng.integers(0, len(TRANSPORTADORAS), n)],
+        'data_envio': pd.Series(envio).dt.strftime('%Y-%m-%d'),
+        'data_entrega_prevista': pd.Series(entrega).dt.strftime('%Y-%m-%d'),
+        'data_entrega_real': pd.Series(entrega).dt.strftime('%Y-%m-%d'),
+        'status_entrega': 'Entregue',
+    })
+
+
+def gerar_raw(diretorio: Path, linhas: int) -> None:
+    """Escreve os 4 CSVs em trechos, sem montar as tabelas grandes em memória."""
+    from bench_backends_correcao import gerar_vendas, N_CLIENTES, N_PRODUTOS
+    gerar_clientes(N_CLIENTES).to_csv(diretorio / 'clientes.csv', sep='\t', index=False)
+    gerar_produtos(N_PRODUTOS).to_csv(diretorio / 'produtos.csv', sep='\t', index=False)
+    for inicio in range(0, linhas, LINHAS_POR_TRECHO):
+        n = min(LINHAS_POR_TRECHO, linhas - inicio)
+        vendas = gerar_vendas(n, seed=inicio)
+        vendas['id_venda'] = pd.Series(np.arange(inicio + 1, inicio + n + 1)).astype(str)
+        for nome, trecho in (('vendas', vendas), ('logistica', gerar_logistica(n, inicio, seed=inicio))):
+            trecho.to_csv(diretorio / f'{nome}.csv', sep='\t', index=False,
+                          mode='a' if inicio else 'w', header=not inicio)
+
+
+def medir(raw: str, modo: str, orcamento_mb) -> tuple:
+    """Executado em um processo novo: (segundos, pico de RSS em MB, modos escolhidos, linhas)."""
+    import logging
+    logging.disable(logging.WARNING)
+    import pipeline_ingestao as pipeline
+    from governador_memoria import GovernadorMemoria
+    pipeline.RAW_DATA_PATH = Path(raw)
+    config = {'datasets': {}, 'lineage': {'enabled': False},
+              'execution': {'memoria': {'enabled': modo != 'desligado', 'modo': modo if modo != 'desligado' else 'auto',
+                                        'orcamento_mb': orcamento_mb}}}
+    inicio = time.perf_counter()
+    governador = GovernadorMemoria.do_config(config)
+    with tempfile.TemporaryDirectory() as spill:
+        pipeline.PROCESSED_DATA_PATH = Path(spill)   # clientes_clusters.csv
+        brutos = pipeline.carregar_dados_raw('arrow', governador, config, Path(spill))
+        planos = governador.planejar(brutos, config) if governador else {}
+        processados = pipeline.aplicar_correcoes(brutos, config, governador=governador)
+    segundos = time.perf_counter() - inicio
+    modos = {nome: f"{plano.modo}/{plano.lotes}" for nome, plano in planos.items()}
+    return (segundos, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, modos,
+            sum(len(df) for df in processados.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=5_000_000, help='Vendas (e entregas) geradas')
+    parser.add_argument('--raw', type=Path, help='data/raw existente (dispensa a geração)')
+    parser.add_argument('--modos', default='desligado,memoria,lotes,disco', help='Modos separados por vírgula')
+    parser.add_argument('--orcamento-mb', type=int, help='Orçamento do governador (padrão: automático)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = args.raw
+        if raw is None:
+            raw = Path(tmp)
+            gerar_raw(raw, args.linhas)
+        tamanho_mb = sum(f.stat().st_size for f in raw.glob('*.csv')) / 2 ** 20
+        print(f"raw: {raw} ({tamanho_mb:,.0f} MB)")
+        print(f"{'modo':>10} {'tempo (s)':>10} {'pico RSS (MB)':>14} {'linhas':>12}  modos escolhidos")
+        contexto = multiprocessing.get_context('spawn')
+        for modo in args.modos.split(','):
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+                segundos, pico, modos, linhas = pool.submit(medir, str(raw), modo, args.orcamento_mb).result()
+            print(f"{modo:>10} {segundos:>10.1f} {pico:>14,.0f} {linhas:>12,}  "
+                  f"{' '.join(f'{n}={m}' for n, m in sorted(modos.items()))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark da carga raw: pd.read_csv x leitor Arrow (mmap + multi-thread).
+
+Gera (uma vez) um vendas.csv sintético separado por tabulação, no formato
+da carga raw, e mede cada leitor em um processo novo: tempo, MB/s e pico
+de memória residente (ru_maxrss). A conversão monetária para centavos é
+incluída, como na etapa 1 do pipeline.
+
+Execução:
+    python benchmarks/bench_leitura_raw.py --linhas 50000000            # ~2,7 GB
+    python benchmarks/bench_leitura_raw.py --arquivo /dados/vendas.csv
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+LINHAS_POR_TRECHO = 1_000_000
+
+
+def gerar_arquivo(caminho: Path, linhas: int) -> None:
+    """Escreve o CSV em trechos, sem montar a base inteira em memória."""
+    from bench_backends_correcao import gerar_vendas
+    for inicio in range(0, linhas, LINHAS_POR_TRECHO):
+        trecho = gerar_vendas(min(LINHAS_POR_TRECHO, linhas - inicio), seed=inicio)
+        trecho.to_csv(caminho, sep='\t', index=False, mode='a' if inicio else 'w', header=not inicio)
+
+
+def medir(caminho: str, leitor: str):
+    """Executado em um processo novo: (segundos da leitura, da conversão, linhas, pico de RSS em MB)."""
+    import logging
+    logging.disable(logging.WARNING)
+    import correcao_automatica as ca
+    from leitura_raw import ler_csv_raw
+    inicio = time.perf_counter()
+    df = ler_csv_raw(caminho, sep='\t', leitor=leitor)
+    leitura = time.perf_counter() - inicio
+    ca.converter_colunas_monetarias(df)
+    conversao = time.perf_counter() - inicio - leitura
+    return leitura, conversao, len(df), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=50_000_000, help='Linhas do arquivo gerado')
+    parser.add_argument('--arquivo', type=Path, help='CSV raw existente (dispensa a geração)')
+    parser.add_argument('--leitores', default='pandas,arrow', help='Leitores separados por vírgula')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = args.arquivo
+        if caminho is None:
+            caminho = Path(tmp) / 'vendas.csv'
+            gerar_arquivo(caminho, args.linhas)
+        tamanho_mb = caminho.stat().st_size / 2 ** 20
+        print(f"arquivo: {caminho} ({tamanho_mb:,.0f} MB)")
+        print(f"{'leitor':>8} {'leitura (s)':>12} {'MB/s':>10} {'centavos (s)':>13} {'linhas':>14} {'pico RSS (MB)':>15}")
+        contexto = multiprocessing.get_context('spawn')
+        for leitor in args.leitores.split(','):
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+                leitura, conversao, linhas, pico = pool.submit(medir, str(caminho), leitor).result()
+            print(f"{leitor:>8} {leitura:>12.2f} {tamanho_mb / leitura:>10.1f} {conversao:>13.2f} "
+                  f"{linhas:>14,} {pico:>15,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark da pseudonimização de PII de clientes.
+
+Usa a base sintética do benchmark de deduplicação (emails, telefones e
+nomes com repetições) e mede `Pseudonimizador.pseudonimizar` em tamanhos
+crescentes, em linhas por minuto.
+
+Execução:
+    python benchmarks/bench_pseudonimizacao.py --linhas 10000000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_deduplicacao_clientes import gerar_clientes
+from pseudonimizacao import Pseudonimizador
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=10_000_000, help='Tamanho máximo da base')
+    parser.add_argument('--passos', type=int, default=3, help='Quantidade de tamanhos (dobrando até --linhas)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Threads')
+    parser.add_argument('--tamanho-lote', type=int, default=1_000_000, help='Valores distintos por lote')
+    args = parser.parse_args()
+
+    pseudonimizador = Pseudonimizador(b'chave-de-benchmark', workers=args.workers, tamanho_lote=args.tamanho_lote)
+    tamanhos = [args.linhas // (2 ** i) for i in reversed(range(args.passos))]
+    print(f"{'linhas':>12} {'segundos':>10} {'linhas/min':>14} {'emails distintos':>18}")
+    for n in tamanhos:
+        df = gerar_clientes(n)
+        inicio = time.perf_counter()
+        resultado = pseudonimizador.pseudonimizar(df)
+        duracao = time.perf_counter() - inicio
+        print(f"{n:>12,} {duracao:>10.2f} {n / duracao * 60:>14,.0f} {resultado['email'].nunique():>18,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+Actions de Checkpoint do Projeto TechCommerce
+=============================================
+
+O GX adiciona o `plugins_directory` (gx/plugins/) ao sys.path, por isso os
+checkpoints referenciam este módulo em `module_name`. As actions ficam em
+src/; importá-las aqui também as registra pelo `type` no GX 1.x.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from armazem_resultados import ArmazenarResultadoSQLiteAction  # noqa: E402
+from docs_incrementais import AtualizarDocsIncrementalAction  # noqa: E402
+
+__all__ = ['ArmazenarResultadoSQLiteAction', 'AtualizarDocsIncrementalAction']
@@ -0,0 +1,313 @@
+"""
+Armazém Analítico Embutido (DuckDB/SQLite)
+==========================================
+
+Sink opcional da ETAPA 3: além dos *_clean.csv, os dados processados são
+carregados em um banco analítico embutido em data/processed/. Assim,
+notebooks, dashboard e validação consultam tabelas indexadas em vez de
+reinterpretar os CSVs a cada leitura.
+
+- DuckDB (padrão, se instalado) ou SQLite (biblioteca padrão)
+- Carga em massa, em uma transação, substituindo a versão anterior de cada tabela
+- Índices em todas as colunas `id_*` (chave primária e FKs)
+- Validação por pushdown: as expectativas das suites compiladas viram
+  consultas SQL agregadas (uma por regra), e as FKs são checadas por
+  anti-join com a tabela pai do próprio armazém
+
+Configuração (config.yaml):
+    analytical_store:
+      enabled: true
+      engine: duckdb        # duckdb | sqlite
+      path: data/processed/techcommerce.duckdb
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import re
+import sqlite3
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import correcao_automatica as ca
+import configuracao
+from suites_compiladas import (BLOQUEANTE, Expectativa, ResultadoRegra, SuiteCompilada, nao_avaliada,
+                                regex_ancorada)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - depende do ambiente
+    duckdb = None
+
+# Colunas FK -> (tabela pai, coluna pai), checadas por anti-join
+CHAVES_ESTRANGEIRAS = {
+    'vendas': {'id_cliente': ('clientes', 'id_cliente'), 'id_produto': ('produtos', 'id_produto')},
+    'logistica': {'id_venda': ('vendas', 'id_venda')},
+}
+LIMITE_LISTA_IN = 100   # conjuntos maiores vão para uma tabela temporária
+
+
+def _identificador(nome: str) -> str:
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', nome):
+        raise ValueError(f"Identificador SQL inválido: {nome!r}")
+    return f'"{nome}"'
+
+
+def _literal(valor) -> str:
+    if isinstance(valor, bool):
+        return 'TRUE' if valor else 'FALSE'
+    if isinstance(valor, (int, float)):
+        return repr(valor)
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+class ArmazemAnalitico:
+    """Banco analítico embutido com os dados processados."""
+
+    MOTORES = ('duckdb', 'sqlite')
+
+    def __init__(self, caminho: Path, motor: str = 'duckdb'):
+        """
+        Args:
+            caminho: Arquivo do banco (ex.: data/processed/techcommerce.duckdb)
+            motor: 'duckdb' ou 'sqlite'
+        """
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor desconhecido: {motor} (use {', '.join(self.MOTORES)})")
+        if motor == 'duckdb' and duckdb is None:
+            logger.warning("duckdb não instalado; usando SQLite")
+            motor = 'sqlite'
+        self.caminho = Path(caminho)
+        self.motor = motor
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        if motor == 'duckdb':
+            self.con = duckdb.connect(str(self.caminho))
+        else:
+            self.con = sqlite3.connect(str(self.caminho))
+            self.con.create_function('regexp_matches', 2, _regexp_sqlite, deterministic=True)
+
+    @classmethod
+    def do_config(cls, config: dict, project_root: Path) -> Optional['ArmazemAnalitico']:
+        """Cria o armazém conforme `analytical_store` do config (None se desabilitado)."""
+        secao = config.get('analytical_store') or {}
+        if not secao.get('enabled', False):
+            return None
+        motor = secao.get('engine', 'duckdb')
+        extensao = 'duckdb' if motor == 'duckdb' else 'sqlite'
+        caminho = Path(project_root) / secao.get('path', f"data/processed/techcommerce.{extensao}")
+        return cls(caminho, motor)
+
+    def fechar(self) -> None:
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # =====================================================================
+    # CARGA
+    # =====================================================================
+
+    def _tabela_saida(self, df: pd.DataFrame, colunas_data: List[str]) -> pd.DataFrame:
+        """Representação gravada: valores em reais (como nos CSVs) e datas ISO no SQLite."""
+        saida = ca.restaurar_colunas_monetarias(df)
+        if self.motor == 'sqlite':
+            for col in colunas_data:
+                if col in saida.columns and pd.api.types.is_datetime64_any_dtype(saida[col].dtype):
+                    saida[col] = saida[col].dt.strftime('%Y-%m-%d')
+        return saida
+
+    def carregar_tabela(self, nome: str, df: pd.DataFrame, colunas_data: Optional[List[str]] = None) -> None:
+        """
+        Substitui a tabela `nome` pelo DataFrame, com índices nas colunas id_*.
+
+        A troca acontece em uma única transação: leitores veem a versão
+        anterior ou a nova, nunca uma carga parcial.
+        """
+        tabela = _identificador(nome)
+        saida = self._tabela_saida(df, colunas_data or [])
+        indices = [c for c in saida.columns if c.startswith('id_')]
+
+        if self.motor == 'duckdb':
+            self.con.begin()
+            try:
+                self.con.register('_carga', saida)
+                self.con.execute(f"CREATE OR REPLACE TABLE {tabela} AS SELECT * FROM _carga")
+                self.con.unregister('_carga')
+                for col in indices:
+                    self.con.execute(f"CREATE INDEX {_identificador(f'idx_{nome}_{col}')} "
+                                     f"ON {tabela} ({_identificador(col)})")
+                self.con.commit()
+            except Exception:
+                self.con.rollback()
+                raise
+        else:
+            with self.con:
+                self.con.execute(f"DROP TABLE IF EXISTS {tabela}")
+                saida.to_sql(nome, self.con, index=False, chunksize=50_000)
+                for col in indices:
+                    self.con.execute(f"CREATE INDEX {_identificador(f'idx_{nome}_{col}')} "
+                                     f"ON {tabela} ({_identificador(col)})")
+        logger.info(f"✓ {nome} carregada no armazém {self.motor} ({len(saida)} linhas, "
+                    f"índices: {', '.join(indices) or 'nenhum'})")
+
+    def carregar(self, dados_processados: Dict[str, pd.DataFrame], config: Optional[dict] = None) -> None:
+        """Carrega todas as tabelas processadas."""
+        for nome, df in dados_processados.items():
+            colunas_data = configuracao.colunas_por_tipo(config, nome, 'date') if config else []
+            self.carregar_tabela(nome, df, colunas_data)
+
+    def consultar(self, sql: str) -> pd.DataFrame:
+        """Executa uma consulta e retorna um DataFrame."""
+        if self.motor == 'duckdb':
+            return self.con.execute(sql).df()
+        return pd.read_sql_query(sql, self.con)
+
+    def referencias_fk(self) -> Dict[str, pd.DataFrame]:
+        """Colunas-chave das tabelas pai, para compilar as regras de FK das suites."""
+        referencias = {}
+        tabelas = set(self.tabelas())
+        for pai, coluna in {alvo for fks in CHAVES_ESTRANGEIRAS.values() for alvo in fks.values()}:
+            if pai in tabelas:
+                referencias[pai] = self.consultar(f"SELECT DISTINCT {_identificador(coluna)} FROM {_identificador(pai)}")
+        return referencias
+
+    def tabelas(self) -> List[str]:
+        if self.motor == 'duckdb':
+            return [linha[0] for linha in self.con.execute("SHOW TABLES").fetchall()]
+        return [linha[0] for linha in
+                self.con.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()]
+
+    def colunas(self, nome: str) -> List[str]:
+        if self.motor == 'duckdb':
+            return [linha[0] for linha in self.con.execute(f"DESCRIBE {_identificador(nome)}").fetchall()]
+        return [linha[1] for linha in self.con.execute(f"PRAGMA table_info({_identificador(nome)})").fetchall()]
+
+    # =====================================================================
+    # VALIDAÇÃO POR PUSHDOWN
+    # =====================================================================
+
+    def _numero(self, expr: str) -> str:
+        return f"TRY_CAST({expr} AS DOUBLE)" if self.motor == 'duckdb' else f"CAST({expr} AS REAL)"
+
+    def _condicao_conjunto(self, col: str, valores: list, numerico: bool) -> Tuple[str, Optional[str]]:
+        """Condição `col IN conjunto`; conjuntos grandes viram tabela temporária."""
+        expr = self._numero(col) if numerico else f"CAST({col} AS VARCHAR)" if self.motor == 'duckdb' \
+            else f"CAST({col} AS TEXT)"
+        if len(valores) <= LIMITE_LISTA_IN:
+            lista = ', '.join(_literal(float(v) if numerico else str(v)) for v in valores) or 'NULL'
+            return f"{expr} IN ({lista})", None
+
+        temporaria = '_conjunto_validacao'
+        self.con.execute(f"DROP TABLE IF EXISTS {temporaria}")
+        tipo = 'DOUBLE' if numerico else 'VARCHAR'
+        self.con.execute(f"CREATE TEMP TABLE {temporaria} (v {tipo})")
+        self.con.executemany(f"INSERT INTO {temporaria} VALUES (?)",
+                             [(float(v) if numerico else str(v),) for v in valores])
+        return f"EXISTS (SELECT 1 FROM {temporaria} s WHERE s.v = {expr})", temporaria
+
+    def _sql_expectativa(self, tabela: str, exp: Expectativa) -> Tuple[str, Optional[str]]:
+        """SQL que retorna (avaliados, falhas) para uma expectativa."""
+        t, col = _identificador(tabela), _identificador(exp.coluna)
+        kw = exp.kwargs
+        nao_nulos = f"FROM {t} WHERE {col} IS NOT NULL"
+
+        if exp.tipo == 'expect_column_values_to_not_be_null':
+            return f"SELECT COUNT(*), COUNT(*) - COUNT({col}) FROM {t}", None
+
+        if exp.tipo == 'expect_column_values_to_be_unique':
+            return (f"SELECT (SELECT COUNT({col}) FROM {t}), "
+                    f"(SELECT COALESCE(SUM(n), 0) FROM (SELECT COUNT(*) AS n {nao_nulos} "
+                    f"GROUP BY {col} HAVING COUNT(*) > 1) d)"), None
+
+        if exp.tipo == 'expect_column_values_to_match_regex':
+            condicao = f"regexp_matches(CAST({col} AS {'VARCHAR' if self.motor == 'duckdb' else 'TEXT'}), " \
+                       f"{_literal(regex_ancorada(kw['regex']))})"
+            return f"SELECT COUNT(*), SUM(CASE WHEN {condicao} THEN 0 ELSE 1 END) {nao_nulos}", None
+
+        if exp.tipo in ('expect_column_values_to_be_in_set', 'expect_column_values_to_not_be_in_set'):
+            fk = CHAVES_ESTRANGEIRAS.get(tabela, {}).get(exp.coluna)
+            if exp.tipo.endswith('_be_in_set') and fk and fk[0] in self.tabelas():
+                # FK: anti-join com a tabela pai (sem materializar o conjunto)
+                pai, col_pai = _identificador(fk[0]), _identificador(fk[1])
+                condicao = f"EXISTS (SELECT 1 FROM {pai} p WHERE {self._numero(f'p.{col_pai}')} = " \
+                           f"{self._numero(f'{t}.{col}')})"
+                temporaria = None
+            else:
+                valores = list(kw['value_set'])
+                numerico = bool(valores) and all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                                                 for v in valores)
+                condicao, temporaria = self._condicao_conjunto(col, valores, numerico)
+            if exp.tipo == 'expect_column_values_to_not_be_in_set':
+                condicao = f"NOT ({condicao})"
+            return (f"SELECT COUNT(*), SUM(CASE WHEN COALESCE({condicao}, FALSE) THEN 0 ELSE 1 END) "
+                    f"{nao_nulos}"), temporaria
+
+        if exp.tipo == 'expect_column_values_to_be_between':
+            partes = []
+            for op, limite in (('>=', kw.get('min_value')), ('<=', kw.get('max_value'))):
+                if limite is None:
+                    continue
+                numerico = isinstance(limite, (int, float)) and not isinstance(limite, bool)
+                expr = self._numero(col) if numerico else col
+                partes.append(f"{expr} {op} {_literal(limite)}")
+            condicao = ' AND '.join(partes) or 'TRUE'
+            return (f"SELECT COUNT(*), SUM(CASE WHEN COALESCE({condicao}, FALSE) THEN 0 ELSE 1 END) "
+                    f"{nao_nulos}"), None
+
+        raise ValueError(f"Expectativa sem pushdown: {exp.tipo}")
+
+    def contar(self, tabela: str, exp: Expectativa) -> Tuple[int, int]:
+        """(avaliados, falhas) de uma expectativa, em uma consulta agregada."""
+        sql, temporaria = self._sql_expectativa(tabela, exp)
+        avaliados, falhas = self.con.execute(sql).fetchone()
+        if temporaria:
+            self.con.execute(f"DROP TABLE IF EXISTS {temporaria}")
+        return int(avaliados or 0), int(falhas or 0)
+
+    def validar(self, tabela: str, suite: SuiteCompilada, fail_fast: bool = False) -> List[ResultadoRegra]:
+        """
+        Executa a suite sobre a tabela do armazém (uma consulta agregada por regra).
+
+        Args:
+            fail_fast: Regras bloqueantes primeiro e nenhuma consulta após a
+                primeira falha bloqueante
+
+        Returns:
+            Resultados no mesmo formato de SuiteCompilada.validar
+        """
+        colunas = set(self.colunas(tabela))
+        resultados: List[Optional[ResultadoRegra]] = [None] * len(suite.expectativas)
+        ordem = suite.ordem_fail_fast if fail_fast else range(len(suite.expectativas))
+        bloqueio = None
+        for i in ordem:
+            exp = suite.expectativas[i]
+            if bloqueio is not None:
+                resultados[i] = nao_avaliada(exp, bloqueio)
+                continue
+            if exp.coluna not in colunas:
+                resultados[i] = ResultadoRegra(exp.tipo, exp.coluna, False, 0, 0, exp.mostly,
+                                               erro=f"coluna '{exp.coluna}' ausente", severidade=exp.severidade)
+            else:
+                avaliados, falhas = self.contar(tabela, exp)
+                sucesso = avaliados == 0 or (avaliados - falhas) / avaliados >= exp.mostly
+                resultados[i] = ResultadoRegra(exp.tipo, exp.coluna, bool(sucesso), avaliados, falhas, exp.mostly,
+                                               severidade=exp.severidade)
+            if fail_fast and not resultados[i].sucesso and exp.severidade == BLOQUEANTE:
+                bloqueio = f"{exp.tipo}({exp.coluna})"
+        return resultados
+
+
+def _regexp_sqlite(valor, padrao) -> bool:
+    """regexp_matches do DuckDB no SQLite: busca RE2 (Arrow), não o `re` do Python."""
+    if valor is None:
+        return None
+    return pc.match_substring_regex(pa.array([valor], pa.string()), padrao)[0].as_py()
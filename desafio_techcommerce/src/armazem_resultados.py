@@ -0,0 +1,341 @@
+"""
+Armazém Indexado de Resultados de Validação
+===========================================
+
+O store padrão do GX grava um JSON por suite/execução/batch em
+gx/uncommitted/validations/. Consultar tendências ("como evoluiu a
+completude de vendas neste trimestre?") exige percorrer e interpretar
+milhares de arquivos. Este módulo mantém os resultados em um SQLite com
+índices por suite, horário de execução e tipo de expectativa:
+
+- ArmazemResultados: registro e consulta de histórico
+- ArmazenarResultadoSQLiteAction: action de checkpoint que substitui o
+  StoreValidationResultAction (importada pelo GX via gx/plugins/acoes_techcommerce.py)
+- compactar(): incorpora os JSON antigos ao SQLite e remove os arquivos
+
+Uso (compactação):
+    python src/armazem_resultados.py compactar --dias 30
+    python src/armazem_resultados.py historico techcommerce.vendas.warning \\
+        --tipo expect_column_values_to_not_be_null --desde 2025-07-01
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import pandas as pd
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CAMINHO_PADRAO = PROJECT_ROOT / "gx" / "uncommitted" / "validation_results.sqlite"
+VALIDACOES_PADRAO = PROJECT_ROOT / "gx" / "uncommitted" / "validations"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL UNIQUE,
+    suite TEXT NOT NULL,
+    run_name TEXT,
+    run_time TEXT NOT NULL,
+    batch TEXT,
+    sucesso INTEGER NOT NULL,
+    avaliadas INTEGER,
+    bem_sucedidas INTEGER,
+    origem TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_suite_tempo ON execucoes (suite, run_time);
+CREATE INDEX IF NOT EXISTS idx_execucoes_tempo ON execucoes (run_time);
+
+CREATE TABLE IF NOT EXISTS resultados (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes (id) ON DELETE CASCADE,
+    tipo_expectativa TEXT NOT NULL,
+    coluna TEXT,
+    sucesso INTEGER NOT NULL,
+    elementos INTEGER,
+    inesperados INTEGER,
+    percentual_inesperado REAL
+);
+CREATE INDEX IF NOT EXISTS idx_resultados_tipo ON resultados (tipo_expectativa, coluna);
+CREATE INDEX IF NOT EXISTS idx_resultados_execucao ON resultados (execucao_id);
+
+CREATE TABLE IF NOT EXISTS parametros (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes (id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    valor TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_parametros_execucao ON parametros (execucao_id);
+"""
+
+
+def _tempo_iso(valor: Any) -> str:
+    """Normaliza run_time (datetime, ISO ou formato GX 0.x) para ISO 8601 UTC."""
+    if isinstance(valor, datetime):
+        data = valor
+    else:
+        texto = str(valor or '')
+        try:
+            data = datetime.fromisoformat(texto.replace('Z', '+00:00'))
+        except ValueError:
+            try:
+                data = datetime.strptime(texto, '%Y%m%dT%H%M%S.%fZ').replace(tzinfo=timezone.utc)
+            except ValueError:
+                data = datetime.now(timezone.utc)
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data.astimezone(timezone.utc).isoformat(timespec='seconds')
+
+
+def _expectativa(resultado: Dict[str, Any]) -> tuple:
+    config = resultado.get('expectation_config') or {}
+    tipo = config.get('type') or config.get('expectation_type') or 'desconhecida'
+    coluna = (config.get('kwargs') or {}).get('column')
+    return tipo, coluna
+
+
+class ArmazemResultados:
+    """Store SQLite de resultados de validação, indexado por suite, tempo e expectativa."""
+
+    def __init__(self, caminho: Optional[Path] = None):
+        self.caminho = Path(caminho) if caminho else CAMINHO_PADRAO
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(str(self.caminho))
+        self.con.execute("PRAGMA foreign_keys = ON")
+        self.con.execute("PRAGMA journal_mode = WAL")
+        self.con.executescript(_ESQUEMA)
+
+    def fechar(self) -> None:
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # =====================================================================
+    # REGISTRO
+    # =====================================================================
+
+    def _inserir(self, chave: str, suite: str, run_name: Optional[str], run_time: str, batch: Optional[str],
+                 sucesso: bool, linhas: List[tuple], parametros: Dict[str, Any], origem: str) -> bool:
+        """Insere uma execução e suas linhas; retorna False se a chave já existia."""
+        bem_sucedidas = sum(1 for linha in linhas if linha[2])
+        cursor = self.con.execute(
+            "INSERT OR IGNORE INTO execucoes (chave, suite, run_name, run_time, batch, sucesso, avaliadas, "
+            "bem_sucedidas, origem) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (chave, suite, run_name, run_time, batch, int(sucesso), len(linhas), bem_sucedidas, origem))
+        if cursor.rowcount == 0:
+            return False
+        execucao_id = cursor.lastrowid
+        self.con.executemany(
+            "INSERT INTO resultados (execucao_id, tipo_expectativa, coluna, sucesso, elementos, inesperados, "
+            "percentual_inesperado) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(execucao_id,) + linha for linha in linhas])
+        self.con.executemany(
+            "INSERT INTO parametros (execucao_id, nome, valor) VALUES (?, ?, ?)",
+            [(execucao_id, nome, json.dumps(valor, default=str)) for nome, valor in (parametros or {}).items()])
+        return True
+
+    def registrar_validacao(self, resultado: Dict[str, Any], origem: str = 'checkpoint') -> bool:
+        """
+        Registra um ExpectationSuiteValidationResult serializado (GX 0.x ou 1.x).
+
+        Returns:
+            True se inserido; False se a mesma suite/execução/batch já estava no store
+        """
+        meta = resultado.get('meta') or {}
+        suite = meta.get('expectation_suite_name') or resultado.get('suite_name') or 'desconhecida'
+        run_id = meta.get('run_id') or {}
+        if isinstance(run_id, str):
+            run_id = {'run_name': run_id}
+        run_name = run_id.get('run_name')
+        run_time = _tempo_iso(run_id.get('run_time') or meta.get('validation_time'))
+        batch = meta.get('active_batch_definition') or meta.get('batch_spec') or {}
+        batch = batch.get('data_asset_name') if isinstance(batch, dict) else str(batch)
+
+        linhas = []
+        for item in resultado.get('results') or []:
+            tipo, coluna = _expectativa(item)
+            detalhe = item.get('result') or {}
+            linhas.append((tipo, coluna, int(bool(item.get('success'))), detalhe.get('element_count'),
+                           detalhe.get('unexpected_count'), detalhe.get('unexpected_percent')))
+        parametros = resultado.get('suite_parameters') or resultado.get('evaluation_parameters') or {}
+        chave = f"{suite}|{run_name}|{run_time}|{batch}"
+        with self.con:
+            return self._inserir(chave, suite, run_name, run_time, batch, bool(resultado.get('success')),
+                                 linhas, parametros, origem)
+
+    def registrar_regras(self, suite: str, resultados: Iterable, run_name: str,
+                         run_time: Optional[datetime] = None, origem: str = 'suites_compiladas') -> bool:
+        """
+        Registra uma lista de ResultadoRegra (suites compiladas / pushdown SQL).
+
+        Regras não avaliadas (fail_fast após falha bloqueante) ficam de fora.
+        """
+        resultados = [r for r in resultados if getattr(r, 'avaliada', True)]
+        linhas = [(r.expectativa, r.coluna, int(r.sucesso), r.avaliados, r.falhas,
+                   100.0 * r.falhas / r.avaliados if r.avaliados else 0.0) for r in resultados]
+        run_time = _tempo_iso(run_time or datetime.now(timezone.utc))
+        with self.con:
+            return self._inserir(f"{suite}|{run_name}|{run_time}|", suite, run_name, run_time, None,
+                                 all(r.sucesso for r in resultados), linhas, {}, origem)
+
+    # =====================================================================
+    # CONSULTA
+    # =====================================================================
+
+    def historico(self, suite: str, tipo_expectativa: Optional[str] = None, coluna: Optional[str] = None,
+                  desde: Optional[str] = None, ate: Optional[str] = None) -> pd.DataFrame:
+        """
+        Série histórica de uma suite (consulta pelos índices suite/tempo/expectativa).
+
+        Returns:
+            DataFrame com run_time, run_name, tipo_expectativa, coluna, sucesso,
+            elementos, inesperados e percentual_inesperado
+        """
+        filtros, parametros = ["e.suite = ?"], [suite]
+        if tipo_expectativa:
+            filtros.append("r.tipo_expectativa = ?")
+            parametros.append(tipo_expectativa)
+        if coluna:
+            filtros.append("r.coluna = ?")
+            parametros.append(coluna)
+        if desde:
+            filtros.append("e.run_time >= ?")
+            parametros.append(_tempo_iso(desde))
+        if ate:
+            filtros.append("e.run_time <= ?")
+            parametros.append(_tempo_iso(ate))
+        sql = ("SELECT e.run_time, e.run_name, r.tipo_expectativa, r.coluna, r.sucesso, r.elementos, "
+               "r.inesperados, r.percentual_inesperado FROM execucoes e "
+               "JOIN resultados r ON r.execucao_id = e.id WHERE " + " AND ".join(filtros) +
+               " ORDER BY e.run_time, r.tipo_expectativa, r.coluna")
+        return pd.read_sql_query(sql, self.con, params=parametros)
+
+    def total_execucoes(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM execucoes").fetchone()[0]
+
+    # =====================================================================
+    # COMPACTAÇÃO
+    # =====================================================================
+
+    def compactar(self, diretorio: Optional[Path] = None, dias: float = 30, remover: bool = True) -> Dict[str, int]:
+        """
+        Incorpora ao SQLite os JSON de validação mais antigos que `dias`.
+
+        Os arquivos só são removidos depois de registrados (ou reconhecidos
+        como já presentes); JSON ilegíveis são mantidos e contados à parte.
+
+        Returns:
+            Contagens: registrados, duplicados, invalidos, removidos
+        """
+        diretorio = Path(diretorio) if diretorio else VALIDACOES_PADRAO
+        limite = time.time() - dias * 86400
+        contagem = {'registrados': 0, 'duplicados': 0, 'invalidos': 0, 'removidos': 0}
+        if not diretorio.exists():
+            return contagem
+
+        for arquivo in sorted(diretorio.rglob('*.json')):
+            if arquivo.stat().st_mtime > limite:
+                continue
+            try:
+                resultado = json.loads(arquivo.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"JSON de validação ignorado ({arquivo}): {e}")
+                contagem['invalidos'] += 1
+                continue
+            if self.registrar_validacao(resultado, origem='compactacao'):
+                contagem['registrados'] += 1
+            else:
+                contagem['duplicados'] += 1
+            if remover:
+                arquivo.unlink()
+                contagem['removidos'] += 1
+
+        if remover:
+            # Remove os diretórios run_name/run_time que ficaram vazios
+            for pasta in sorted((p for p in diretorio.rglob('*') if p.is_dir()), key=lambda p: len(p.parts),
+                                reverse=True):
+                if not any(pasta.iterdir()):
+                    pasta.rmdir()
+        logger.info(f"Compactação de {diretorio}: {contagem}")
+        return contagem
+
+
+
+def resolver_caminho(caminho) -> Path:
+    """Caminho do store: relativo à raiz do projeto, não ao diretório de trabalho."""
+    caminho = Path(caminho)
+    return caminho if caminho.is_absolute() else PROJECT_ROOT / caminho
+
+
+# =====================================================================
+# ACTION DE CHECKPOINT
+# =====================================================================
+
+try:
+    from great_expectations.checkpoint.actions import ValidationAction
+except ImportError:  # pragma: no cover - depende do ambiente
+    ValidationAction = None
+
+if ValidationAction is not None:
+
+    class ArmazenarResultadoSQLiteAction(ValidationAction):
+        """
+        Substitui o StoreValidationResultAction, gravando no store SQLite.
+
+        YAML (o GX importa `module_name` de gx/plugins/):
+            - name: store_validation_result
+              action:
+                class_name: ArmazenarResultadoSQLiteAction
+                module_name: acoes_techcommerce
+                caminho: gx/uncommitted/validation_results.sqlite
+        """
+
+        type: Literal["armazenar_resultado_sqlite"] = "armazenar_resultado_sqlite"
+        caminho: str = str(CAMINHO_PADRAO)
+
+        def run(self, checkpoint_result, action_context=None) -> dict:
+            registrados = {}
+            with ArmazemResultados(resolver_caminho(self.caminho)) as armazem:
+                for identificador, resultado in checkpoint_result.run_results.items():
+                    registrados[str(identificador)] = armazem.registrar_validacao(resultado.to_json_dict())
+            return {'registrados': registrados}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Store SQLite de resultados de validação")
+    parser.add_argument('--banco', type=Path, default=CAMINHO_PADRAO, help="Arquivo SQLite do store")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    p_comp = sub.add_parser('compactar', help="Incorpora os JSON antigos de gx/uncommitted/validations")
+    p_comp.add_argument('--diretorio', type=Path, default=VALIDACOES_PADRAO)
+    p_comp.add_argument('--dias', type=float, default=30, help="Idade mínima dos arquivos (padrão: 30)")
+    p_comp.add_argument('--manter', action='store_true', help="Não remove os JSON após registrá-los")
+    p_hist = sub.add_parser('historico', help="Série histórica de uma suite")
+    p_hist.add_argument('suite')
+    p_hist.add_argument('--tipo')
+    p_hist.add_argument('--coluna')
+    p_hist.add_argument('--desde')
+    p_hist.add_argument('--ate')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    with ArmazemResultados(args.banco) as armazem:
+        if args.comando == 'compactar':
+            print(json.dumps(armazem.compactar(args.diretorio, args.dias, remover=not args.manter)))
+        else:
+            print(armazem.historico(args.suite, args.tipo, args.coluna, args.desde, args.ate).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
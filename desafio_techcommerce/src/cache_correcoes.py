@@ -0,0 +1,279 @@
+"""
+Cache de Correções por Linha
+============================
+
+clientes.csv e produtos.csv chegam como snapshots completos, quase iguais
+aos do dia anterior. O cache guarda, por dataset, as linhas corrigidas da
+última execução indexadas pelo hash da linha raw (64 bits,
+`hash()` do DuckDB, ou `pd.util.hash_pandas_object` sem ele). A correção roda só nas linhas raw novas ou
+alteradas, e o resultado é montado com as linhas do cache, na ordem raw:
+
+1. deduplicação pela chave (mantém a primeira), sobre o conjunto raw
+   inteiro, como no CorrecaoAutomatica: uma linha em cache não sobrevive se
+   uma linha anterior tiver a mesma chave;
+2. linhas sobreviventes cujo hash (e chave) está no cache: linha corrigida
+   e bitmask de regras da linhagem vêm do cache;
+3. as demais passam pelo `corrigir_<dataset>` de sempre.
+
+Contrato: as regras do dataset são linha a linha, exceto a deduplicação
+pela chave, e não alteram a chave (vale para clientes e produtos).
+
+Os dtypes de algumas colunas dependem do conjunto inteiro (ex.: `estoque`
+é int64 ou float64 conforme haja valores inválidos). Se os dtypes das
+linhas em cache e das recém-corrigidas divergirem (ou se só houve linhas
+removidas, sem novas para comparar), o dataset é corrigido por inteiro e o
+cache é refeito: a saída é sempre a da correção completa.
+
+O cache é invalidado quando muda a assinatura: o código das correções
+(correcao_automatica.py e correcao_polars.py), a função de hash, o
+backend, o formato de data, a linhagem ligada ou não e as colunas raw.
+
+Layout em data/quality/cache_correcoes/:
+    <dataset>.arrow      # linhas corrigidas + _hash + _regras (assinatura nos metadados)
+
+O arquivo é Arrow IPC sem compressão, lido por memory map: a leitura de
+1M de clientes não copia as colunas de texto.
+
+Como o cache de etapas do manifesto, o arquivo guarda as linhas antes da
+pseudonimização.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import correcao_automatica as ca
+import configuracao
+
+logger = logging.getLogger(__name__)
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - depende do ambiente
+    duckdb = None
+
+COLUNA_HASH = '_hash'
+COLUNA_REGRAS = '_regras'
+_META = b'techcommerce.cache_correcoes'
+_FONTES = ('correcao_automatica.py', 'correcao_polars.py')
+
+
+def funcao_hash() -> str:
+    """Identificação da função de hash das linhas (entra na assinatura do cache)."""
+    return f"duckdb-{duckdb.__version__}" if duckdb is not None else f"pandas-{pd.__version__}"
+
+
+def hash_linhas_raw(df: pd.DataFrame) -> np.ndarray:
+    """Hash uint64 de cada linha raw (valores e ordem das colunas)."""
+    if duckdb is None:
+        return pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy()
+    # hash() vetorizado do DuckDB: ~20x o hash_pandas_object em colunas de texto
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    colunas = ', '.join('"' + str(c).replace('"', '""') + '"' for c in df.columns)
+    with duckdb.connect() as con:
+        con.register('linhas', tabela)
+        return con.execute(f"SELECT hash({colunas}) AS h FROM linhas").fetchnumpy()['h'].astype(np.uint64)
+
+
+def _hash_fontes() -> str:
+    h = hashlib.sha256()
+    pasta = Path(ca.__file__).parent
+    for nome in _FONTES:
+        caminho = pasta / nome
+        if caminho.exists():
+            h.update(caminho.read_bytes())
+    return h.hexdigest()
+
+
+class CacheCorrecoes:
+    """Linhas corrigidas da última execução, por dataset (ver módulo)."""
+
+    def __init__(self, diretorio: Path, chaves: Dict[str, str], contexto: str = ''):
+        """
+        Args:
+            diretorio: Pasta dos arquivos de cache
+            chaves: dataset -> coluna da deduplicação (primary_key)
+            contexto: Parâmetros da execução que mudam a correção (backend,
+                formato de data, linhagem); entram na assinatura
+        """
+        self.diretorio = Path(diretorio)
+        self.chaves = dict(chaves)
+        self._base = hashlib.sha256(f"{_hash_fontes()}|{funcao_hash()}|{contexto}".encode('utf-8')).hexdigest()
+
+    @classmethod
+    def do_config(cls, config: dict, raiz: Path, contexto: str = '') -> Optional['CacheCorrecoes']:
+        """Cache da seção `cache_correcoes` do config (None se desabilitado)."""
+        secao = config.get('cache_correcoes') or {}
+        if not secao.get('enabled', True):
+            return None
+        chaves = {dataset: configuracao.chave_primaria(config, dataset)
+                  for dataset in secao.get('datasets', ['clientes', 'produtos'])}
+        return cls(Path(raiz) / secao.get('path', 'data/quality/cache_correcoes'),
+                   {dataset: chave for dataset, chave in chaves.items() if chave}, contexto)
+
+    def cobre(self, dataset: str) -> bool:
+        return dataset in self.chaves
+
+    def _assinatura(self, df: pd.DataFrame) -> str:
+        colunas = json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()])
+        return hashlib.sha256(f"{self._base}|{colunas}".encode('utf-8')).hexdigest()
+
+    def _caminho(self, dataset: str) -> Path:
+        return self.diretorio / f"{dataset}.arrow"
+
+    # -----------------------------------------------------------------
+    # Persistência
+    # -----------------------------------------------------------------
+
+    def _carregar(self, dataset: str, assinatura: str) -> Optional[pd.DataFrame]:
+        caminho = self._caminho(dataset)
+        if not caminho.exists():
+            return None
+        try:
+            tabela = feather.read_table(caminho, memory_map=True)
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Cache de correções de {dataset} ilegível ({e}); ignorado")
+            return None
+        meta = json.loads((tabela.schema.metadata or {}).get(_META, b'{}'))
+        if meta.get('assinatura') != assinatura:
+            logger.info(f"Cache de correções de {dataset} invalidado (regras, parâmetros ou colunas mudaram)")
+            return None
+        return tabela.to_pandas()
+
+    def _salvar(self, dataset: str, assinatura: str, corrigido: pd.DataFrame,
+                hashes: np.ndarray, regras: np.ndarray) -> None:
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        df = corrigido.reset_index(drop=True)
+        df[COLUNA_HASH] = hashes
+        df[COLUNA_REGRAS] = regras
+        df = df[~df[COLUNA_HASH].duplicated(keep=False)]  # colisão de hash: as linhas são sempre corrigidas
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(tabela.schema.metadata or {})
+        meta[_META] = json.dumps({'assinatura': assinatura}).encode('utf-8')
+        caminho = self._caminho(dataset)
+        temporario = caminho.with_name(caminho.name + '.tmp')
+        feather.write_feather(tabela.replace_schema_metadata(meta), temporario, compression='uncompressed')
+        os.replace(temporario, caminho)
+
+    # -----------------------------------------------------------------
+    # Correção
+    # -----------------------------------------------------------------
+
+    def corrigir(self, dataset: str, df: pd.DataFrame, corrigir: Callable[[pd.DataFrame], pd.DataFrame],
+                 linhagem=None) -> pd.DataFrame:
+        """
+        Corrige `df` reaproveitando as linhas em cache.
+
+        Args:
+            dataset: Nome do dataset (coberto pelo cache)
+            df: DataFrame raw (índice raw)
+            corrigir: Correção de sempre do dataset (ex.: corretor.corrigir_clientes)
+            linhagem: RegistroLinhagem da execução (recebe os bitmasks do cache)
+
+        Returns:
+            DataFrame igual ao de `corrigir(df)`
+        """
+        chave = self.chaves[dataset]
+        assinatura = self._assinatura(df)
+        cache = self._carregar(dataset, assinatura)
+
+        duplicada = df.duplicated(subset=[chave], keep='first').to_numpy()
+        sobreviventes = df[~duplicada]
+        hashes = hash_linhas_raw(sobreviventes)
+
+        posicoes = np.full(len(sobreviventes), -1, dtype=np.int64)
+        if cache is not None and len(cache):
+            posicoes = pd.Index(cache[COLUNA_HASH].to_numpy()).get_indexer(hashes)
+            acerto = posicoes >= 0
+            # Guarda contra colisão de hash: a chave também precisa bater
+            iguais = cache[chave].array.take(posicoes[acerto]) == sobreviventes[chave].array[acerto]
+            posicoes[np.flatnonzero(acerto)[~pd.Series(iguais).fillna(False).to_numpy(dtype=bool)]] = -1
+        acerto = posicoes >= 0
+
+        novas = sobreviventes[~acerto]
+        corrigidas = corrigir(novas) if len(novas) or not acerto.any() else None
+        if cache is not None and acerto.any():
+            colunas = [c for c in cache.columns if c not in (COLUNA_HASH, COLUNA_REGRAS)]
+            if len(novas):
+                tipos_validos = _mesmos_tipos(cache[colunas].dtypes, corrigidas.dtypes)
+            else:  # sem linhas novas, os tipos do cache só valem para o mesmo conjunto da última execução
+                tipos_validos = acerto.sum() == len(cache)
+            if not tipos_validos:
+                logger.info(f"Cache de correções de {dataset}: tipos não confirmados, correção completa")
+                return self._corrigir_tudo(dataset, df, sobreviventes, hashes, corrigir, linhagem, assinatura)
+            if linhagem is not None:
+                linhagem.marcar_bits(dataset, sobreviventes.index[acerto],
+                                     cache[COLUNA_REGRAS].to_numpy()[posicoes[acerto]])
+            resultado = _mesclar(cache[colunas], posicoes, corrigidas, sobreviventes)
+        else:
+            resultado = corrigidas
+
+        self._registrar_duplicatas(dataset, df, duplicada, chave, linhagem)
+        logger.info(f"Cache de correções de {dataset}: {int(acerto.sum())} linhas reaproveitadas, "
+                    f"{len(novas)} corrigidas")
+        if len(novas) or cache is None or len(cache) != int(acerto.sum()):
+            self._salvar(dataset, assinatura, resultado, _hashes_saida(resultado, sobreviventes, hashes),
+                         linhagem.regras(dataset, resultado.index) if linhagem is not None
+                         else np.zeros(len(resultado), dtype=np.uint32))
+        return resultado
+
+    def _corrigir_tudo(self, dataset: str, df: pd.DataFrame, sobreviventes: pd.DataFrame, hashes: np.ndarray,
+                       corrigir: Callable, linhagem, assinatura: str) -> pd.DataFrame:
+        resultado = corrigir(df)
+        self._salvar(dataset, assinatura, resultado, _hashes_saida(resultado, sobreviventes, hashes),
+                     linhagem.regras(dataset, resultado.index) if linhagem is not None
+                     else np.zeros(len(resultado), dtype=np.uint32))
+        return resultado
+
+    @staticmethod
+    def _registrar_duplicatas(dataset: str, df: pd.DataFrame, duplicada: np.ndarray, chave: str,
+                              linhagem) -> None:
+        """Mesmo log e linhagem da deduplicação do CorrecaoAutomatica."""
+        if duplicada.any():
+            logger.warning("  Removidas %d duplicatas (%s)", int(duplicada.sum()), chave)
+            if linhagem is not None:
+                linhagem.marcar(dataset, df.index[duplicada], 'duplicata_removida')
+
+
+def _mesmos_tipos(tipos_cache: pd.Series, tipos_novos: pd.Series) -> bool:
+    return list(tipos_cache.index) == list(tipos_novos.index) and \
+        all(str(a) == str(b) for a, b in zip(tipos_cache, tipos_novos))
+
+
+def _mesclar(cache: pd.DataFrame, posicoes: np.ndarray, corrigidas: Optional[pd.DataFrame],
+             sobreviventes: pd.DataFrame) -> pd.DataFrame:
+    """Linhas do cache (posicoes >= 0) e recém-corrigidas, na ordem raw, com um único take."""
+    acerto = posicoes >= 0
+    if corrigidas is None or not len(corrigidas):
+        if len(cache) == len(posicoes) and np.array_equal(posicoes, np.arange(len(cache))):
+            return cache.set_axis(sobreviventes.index)  # mesmo snapshot, mesma ordem: sem cópia
+        return cache.take(posicoes[acerto]).set_axis(sobreviventes.index[acerto])
+    # origem de cada linha da saída no concat [cache, corrigidas], ordenada pela posição raw
+    posicao_raw = np.concatenate([np.flatnonzero(acerto), sobreviventes.index.get_indexer(corrigidas.index)])
+    origem = np.concatenate([posicoes[acerto], len(cache) + np.arange(len(corrigidas))])
+    ordem = np.argsort(posicao_raw, kind='stable')
+    combinado = pd.concat([cache, corrigidas], ignore_index=True)
+    return combinado.take(origem[ordem]).set_axis(sobreviventes.index[posicao_raw[ordem]])
+
+
+def _hashes_saida(resultado: pd.DataFrame, sobreviventes: pd.DataFrame, hashes: np.ndarray) -> np.ndarray:
+    """Hash raw de cada linha da saída (pelo rótulo do índice raw)."""
+    return hashes[sobreviventes.index.get_indexer(resultado.index)]
+
+
+def corrigir_com_cache(cache: Optional[CacheCorrecoes], dataset: str, df: pd.DataFrame,
+                       corrigir: Callable[[pd.DataFrame], pd.DataFrame], linhagem=None) -> pd.DataFrame:
+    """`corrigir(df)`, pelo cache quando ele cobre o dataset."""
+    if cache is None or not cache.cobre(dataset) or not isinstance(df, pd.DataFrame):
+        return corrigir(df)
+    return cache.corrigir(dataset, df, corrigir, linhagem)
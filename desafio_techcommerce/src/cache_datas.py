@@ -0,0 +1,77 @@
+"""
+Cache de Conversão de Datas
+===========================
+
+Converte colunas de datas usando o formato declarado no config e
+processando apenas os valores distintos: a coluna é fatorada em códigos,
+somente os valores ainda não vistos são convertidos e o resultado é
+remapeado pelos códigos. O cache é compartilhado entre todas as colunas
+de data (e tabelas) de uma mesma execução.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import logging
+import pandas as pd
+from typing import Dict
+
+from configuracao import FORMATO_DATA_PADRAO
+
+logger = logging.getLogger(__name__)
+
+
+class CacheDatas:
+    """Conversor de datas com cache de valores distintos entre colunas/tabelas."""
+    
+    def __init__(self, formato: str = FORMATO_DATA_PADRAO):
+        """
+        Args:
+            formato: Formato strftime das datas (ISO 8601 por padrão)
+        """
+        self.formato = formato
+        self._cache: Dict[str, pd.Timestamp] = {}
+        self.convertidos = 0
+        self.reutilizados = 0
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    def limpar(self) -> None:
+        """Descarta os valores em cache (ex.: entre execuções de um processo longo)."""
+        self._cache.clear()
+        self.convertidos = 0
+        self.reutilizados = 0
+    
+    def converter(self, serie: pd.Series) -> pd.Series:
+        """
+        Converte uma coluna de datas em texto para datetime64.
+        
+        Valores fora do formato viram NaT (equivalente a errors='coerce').
+        
+        Args:
+            serie: Series com datas em texto
+            
+        Returns:
+            Series datetime64 com o mesmo índice e nome
+        """
+        if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+            return serie
+        
+        codigos, distintos = pd.factorize(serie, sort=False)
+        distintos = [str(v) for v in distintos]
+        novos = [v for v in distintos if v not in self._cache]
+        if novos:
+            convertidos = pd.to_datetime(pd.Index(novos), format=self.formato, errors='coerce')
+            self._cache.update(zip(novos, convertidos))
+        self.convertidos += len(novos)
+        self.reutilizados += len(distintos) - len(novos)
+        
+        valores = pd.DatetimeIndex([self._cache[v] for v in distintos], dtype='datetime64[ns]')
+        resultado = valores.take(codigos, allow_fill=True, fill_value=pd.NaT)
+        return pd.Series(resultado, index=serie.index, name=serie.name)
+    
+    def resumo(self) -> str:
+        """Resumo de uso do cache para logs."""
+        return (f"{len(self._cache)} datas distintas em cache "
+                f"({self.convertidos} convertidas, {self.reutilizados} reutilizadas)")
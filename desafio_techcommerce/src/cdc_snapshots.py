@@ -0,0 +1,180 @@
+"""
+CDC por Hash de Linha entre Execuções
+=====================================
+
+Consumidores de clientes_clean/produtos_clean recarregam a tabela inteira a
+cada dia, embora poucas linhas mudem. Esta etapa calcula um hash de 64 bits
+por linha (vetorizado com `pd.util.hash_pandas_object`), indexado pela
+`primary_key` do config.yaml, e compara com o índice persistido na execução
+anterior:
+
+- inserts:  chaves novas (linhas completas)
+- updates:  chaves existentes com hash diferente (linhas completas, versão nova)
+- deletes:  chaves que sumiram (apenas a chave)
+
+Layout em data/processed/cdc/<dataset>/:
+    indice_hash.parquet             # chave -> hash da última execução
+    indice_hash.anterior.parquet    # índice da execução anterior a ela
+    indice_hash.json                # run_id que gerou o índice atual e o da sua base
+    <run_id>/inserts.parquet
+    <run_id>/updates.parquet
+    <run_id>/deletes.parquet
+    <run_id>/resumo.json
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import json
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import correcao_automatica as ca
+import configuracao
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_INDICE = "indice_hash.parquet"
+ARQUIVO_INDICE_ANTERIOR = "indice_hash.anterior.parquet"
+ARQUIVO_META = "indice_hash.json"
+
+
+def hash_linhas(df: pd.DataFrame, colunas: Optional[List[str]] = None) -> pd.Series:
+    """
+    Hash uint64 por linha.
+
+    As colunas são normalizadas para texto na representação gravada (reais,
+    não centavos) antes do hash, para que mudanças de dtype sem mudança de
+    valor (Int64 x int64, backend pandas x polars) não apareçam como update.
+    """
+    colunas = list(colunas) if colunas is not None else list(df.columns)
+    normalizado = ca.restaurar_colunas_monetarias(df[colunas]).astype('string')
+    return pd.util.hash_pandas_object(normalizado, index=False)
+
+
+def indice_hash(df: pd.DataFrame, chave: str) -> pd.DataFrame:
+    """Índice chave -> hash (chave como texto, sem duplicatas)."""
+    indice = pd.DataFrame({'chave': df[chave].astype('string').to_numpy(), 'hash': hash_linhas(df).to_numpy()})
+    duplicadas = indice['chave'].duplicated(keep='last')
+    if duplicadas.any():
+        logger.warning(f"{int(duplicadas.sum())} chaves '{chave}' duplicadas; prevalece a última ocorrência")
+    return indice[~duplicadas & indice['chave'].notna()].reset_index(drop=True)
+
+
+def diferencas(atual: pd.DataFrame, anterior: Optional[pd.DataFrame]) -> Dict[str, pd.Series]:
+    """
+    Compara dois índices chave -> hash.
+
+    Returns:
+        Chaves inseridas, atualizadas e removidas
+    """
+    if anterior is None or anterior.empty:
+        return {'inserts': atual['chave'], 'updates': atual['chave'].iloc[:0], 'deletes': atual['chave'].iloc[:0]}
+    juntos = atual.merge(anterior, on='chave', how='outer', suffixes=('', '_anterior'), indicator=True)
+    return {
+        'inserts': juntos.loc[juntos['_merge'] == 'left_only', 'chave'],
+        'updates': juntos.loc[(juntos['_merge'] == 'both') & (juntos['hash'] != juntos['hash_anterior']), 'chave'],
+        'deletes': juntos.loc[juntos['_merge'] == 'right_only', 'chave'],
+    }
+
+
+class SnapshotCDC:
+    """Persiste o índice de hashes e emite os change sets de cada execução."""
+
+    def __init__(self, diretorio: Path):
+        self.diretorio = Path(diretorio)
+
+    def _indice_anterior(self, dataset: str, run_id: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        Índice base da comparação e o run_id que o gerou; numa retentativa do
+        mesmo run_id, o anterior a ele.
+        """
+        pasta = self.diretorio / dataset
+        meta_arquivo = pasta / ARQUIVO_META
+        meta = json.loads(meta_arquivo.read_text(encoding='utf-8')) if meta_arquivo.exists() else {}
+        if meta.get('run_id') == run_id:
+            caminho, base = pasta / ARQUIVO_INDICE_ANTERIOR, meta.get('base_run_id')
+        else:
+            caminho, base = pasta / ARQUIVO_INDICE, meta.get('run_id')
+        return (pd.read_parquet(caminho), base) if caminho.exists() else (None, None)
+
+    def processar(self, dataset: str, df: pd.DataFrame, chave: str, run_id: str) -> Dict[str, int]:
+        """
+        Emite os change sets do dataset e avança o índice.
+
+        O índice é trocado depois dos change sets e guarda o run_id que o
+        gerou; uma retentativa do mesmo run_id (ex.: --resume) compara com o
+        índice anterior e reemite os mesmos arquivos.
+
+        Returns:
+            Contagens de inserts, updates, deletes e linhas inalteradas
+        """
+        destino = self.diretorio / dataset / run_id
+        destino.mkdir(parents=True, exist_ok=True)
+
+        atual = indice_hash(df, chave)
+        anterior, base_run_id = self._indice_anterior(dataset, run_id)
+        mudancas = diferencas(atual, anterior)
+
+        linhas = ca.restaurar_colunas_monetarias(df.drop_duplicates(subset=[chave], keep='last'))
+        chaves_linhas = linhas[chave].astype('string')
+        for tipo in ('inserts', 'updates'):
+            linhas[chaves_linhas.isin(mudancas[tipo]).to_numpy()].to_parquet(destino / f"{tipo}.parquet", index=False)
+        pd.DataFrame({chave: mudancas['deletes'].to_numpy()}).to_parquet(destino / "deletes.parquet", index=False)
+
+        resumo = {tipo: int(len(chaves)) for tipo, chaves in mudancas.items()}
+        resumo['inalteradas'] = len(atual) - resumo['inserts'] - resumo['updates']
+        resumo['carga_inicial'] = anterior is None
+        resumo['base_run_id'] = base_run_id
+        (destino / "resumo.json").write_text(json.dumps(resumo, indent=2), encoding='utf-8')
+
+        self._avancar_indice(dataset, atual, anterior, run_id, base_run_id)
+
+        logger.info(f"✓ CDC {dataset}: +{resumo['inserts']} ~{resumo['updates']} -{resumo['deletes']} "
+                    f"({resumo['inalteradas']} inalteradas{', carga inicial' if anterior is None else ''})")
+        return resumo
+
+    def _avancar_indice(self, dataset: str, atual: pd.DataFrame, anterior: Optional[pd.DataFrame],
+                        run_id: str, base_run_id: Optional[str]) -> None:
+        pasta = self.diretorio / dataset
+        if anterior is not None:
+            anterior.to_parquet(pasta / f"{ARQUIVO_INDICE_ANTERIOR}.tmp", index=False)
+            os.replace(pasta / f"{ARQUIVO_INDICE_ANTERIOR}.tmp", pasta / ARQUIVO_INDICE_ANTERIOR)
+        else:
+            (pasta / ARQUIVO_INDICE_ANTERIOR).unlink(missing_ok=True)
+        atual.to_parquet(pasta / f"{ARQUIVO_INDICE}.tmp", index=False)
+        (pasta / f"{ARQUIVO_META}.tmp").write_text(json.dumps({'run_id': run_id, 'base_run_id': base_run_id}), encoding='utf-8')
+        # Ordem anterior -> meta -> índice: qualquer ponto de parada deixa a base correta
+        os.replace(pasta / f"{ARQUIVO_META}.tmp", pasta / ARQUIVO_META)
+        os.replace(pasta / f"{ARQUIVO_INDICE}.tmp", pasta / ARQUIVO_INDICE)
+
+
+def carregar_alteracoes(diretorio: Path, dataset: str, run_id: str,
+                        colunas: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """Lê os change sets de uma execução (para carga ou revalidação só das linhas alteradas)."""
+    destino = Path(diretorio) / dataset / run_id
+    return {tipo: pd.read_parquet(destino / f"{tipo}.parquet", columns=colunas)
+            for tipo in ('inserts', 'updates', 'deletes')}
+
+
+def carregar_resumo(diretorio: Path, dataset: str, run_id: str) -> Optional[dict]:
+    """resumo.json do CDC de uma execução (None se o dataset não passou pelo CDC nela)."""
+    caminho = Path(diretorio) / dataset / run_id / "resumo.json"
+    return json.loads(caminho.read_text(encoding='utf-8')) if caminho.exists() else None
+
+
+def executar_cdc(dados_processados: Dict[str, pd.DataFrame], config: dict, diretorio: Path,
+                 run_id: str) -> Dict[str, Dict[str, int]]:
+    """Processa todos os datasets com `primary_key` declarada no config."""
+    snapshot = SnapshotCDC(diretorio)
+    resultados = {}
+    for dataset, df in dados_processados.items():
+        chave = configuracao.chave_primaria(config, dataset)
+        if not chave or chave not in df.columns:
+            logger.info(f"CDC ignorado para {dataset}: primary_key não declarada")
+            continue
+        resultados[dataset] = snapshot.processar(dataset, df, chave, run_id)
+    return resultados
@@ -31,10 +31,14 @@ validations:
 action_list:
   - name: store_validation_result
     action:
-      class_name: StoreValidationResultAction
+      class_name: ArmazenarResultadoSQLiteAction
+      module_name: acoes_techcommerce
+      caminho: gx/uncommitted/validation_results.sqlite
   - name: update_data_docs
     action:
-      class_name: UpdateDataDocsAction
+      class_name: AtualizarDocsIncrementalAction
+      module_name: acoes_techcommerce
+      segundo_plano: true
   - name: send_alert_on_failure
     action:
       class_name: CustomAlertAction
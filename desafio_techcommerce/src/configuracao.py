@@ -0,0 +1,87 @@
+"""
+Configuração do Pipeline TechCommerce
+=====================================
+
+Leitura do `config/config.yaml` e acesso aos metadados declarados nele
+(schemas, chaves primárias, formatos).
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import yaml
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CONFIG_PATH_PADRAO = Path(__file__).parent.parent / "config" / "config.yaml"
+
+# Formato ISO 8601 usado quando o config não declara formatos
+FORMATO_DATA_PADRAO = '%Y-%m-%d'
+
+
+def carregar_config(caminho: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Carrega o arquivo de configuração YAML.
+    
+    Args:
+        caminho: Caminho do config.yaml (padrão: config/config.yaml do projeto)
+        
+    Returns:
+        Dicionário com a configuração
+    """
+    caminho = Path(caminho) if caminho else CONFIG_PATH_PADRAO
+    with open(caminho, encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+
+def secao_logging(caminho: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Seção `logging` do config, lida antes do resto da execução.
+
+    Um config ausente ou inválido resulta em {} (logging padrão): o erro é
+    registrado quando o pipeline carrega o config.
+    """
+    try:
+        return carregar_config(caminho).get('logging') or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+def formato_tipo(config: Dict[str, Any], tipo: str, padrao: Optional[str] = None) -> Optional[str]:
+    """Retorna o formato declarado para um tipo do schema (ex.: 'date')."""
+    return (config.get('formats') or {}).get(tipo, padrao)
+
+
+def formato_data(config: Dict[str, Any]) -> str:
+    """Retorna o formato de data declarado no config (ISO por padrão)."""
+    return formato_tipo(config, 'date', FORMATO_DATA_PADRAO)
+
+
+def backend_correcao(config: Dict[str, Any]) -> str:
+    """Backend do CorrecaoAutomatica declarado no config (pandas por padrão)."""
+    return (config.get('execution') or {}).get('backend', 'pandas')
+
+
+def leitor_raw(config: Dict[str, Any]) -> str:
+    """Leitor dos CSVs raw declarado no config (arrow por padrão)."""
+    return (config.get('execution') or {}).get('leitor_raw', 'arrow')
+
+
+def validacao_fail_fast(config: Dict[str, Any]) -> bool:
+    """Fail-fast nas regras bloqueantes declarado no config (desligado por padrão)."""
+    return bool((config.get('validacao') or {}).get('fail_fast', False))
+
+
+def schema_dataset(config: Dict[str, Any], dataset: str) -> Dict[str, str]:
+    """Retorna o schema (coluna -> tipo) de um dataset."""
+    return dict(config.get('datasets', {}).get(dataset, {}).get('schema') or {})
+
+
+def colunas_por_tipo(config: Dict[str, Any], dataset: str, tipo: str) -> List[str]:
+    """Lista as colunas de um dataset declaradas com o tipo informado."""
+    return [col for col, t in schema_dataset(config, dataset).items() if t == tipo]
+
+
+def chave_primaria(config: Dict[str, Any], dataset: str) -> Optional[str]:
+    """Retorna a chave primária declarada para um dataset."""
+    return config.get('datasets', {}).get(dataset, {}).get('primary_key')
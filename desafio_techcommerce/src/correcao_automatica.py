@@ -18,19 +18,153 @@ import pandas as pd
 import numpy as np
 import re
 import logging
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime
-from typing import Tuple
+from typing import Optional, Tuple
 
-# Configurar logging
+from cache_datas import CacheDatas
+from configuracao import FORMATO_DATA_PADRAO
+
+# Configurar logging (handlers: log_estruturado, configurado pelo pipeline).
+# Mensagens com argumentos %: montadas só na thread de escrita.
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-# Handler para stdout
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-ch.setFormatter(formatter)
-logger.addHandler(ch)
+
+# Colunas monetárias: mantidas em centavos (int64) entre a carga e a escrita
+COLUNAS_MONETARIAS = ('preco', 'valor_unitario', 'valor_total')
+UNIDADES_MONETARIAS = ('reais', 'centavos')
+
+_DECIMAL_REGEX = r'^([+-]?)(\d*)(?:\.(\d*))?$'
+_DECIMAL_REGEX_ARROW = r'^(?P<sinal>[+-]?)(?P<inteiro>\d*)(?:\.(?P<fracao>\d*))?$'
+
+
+def _centavos_texto_arrow(texto: pd.Series) -> Optional[pd.Series]:
+    """
+    Centavos das strings decimais em pyarrow.compute, sem um objeto Python
+    por célula (NA onde o texto não é decimal). None se a coluna não for
+    texto Arrow ou se a parte inteira não couber em int64.
+    """
+    try:
+        valores = pa.array(texto.array)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return None
+    if not (pa.types.is_string(valores.type) or pa.types.is_large_string(valores.type)):
+        return None
+    partes = pc.extract_regex(valores, _DECIMAL_REGEX_ARROW)
+    sinal, inteiro, fracao = (pc.struct_field(partes, campo) for campo in ('sinal', 'inteiro', 'fracao'))
+    valido = pc.and_(pc.is_valid(partes),
+                     pc.or_(pc.greater(pc.utf8_length(inteiro), 0), pc.greater(pc.utf8_length(fracao), 0)))
+    inteiro = pc.if_else(pc.greater(pc.utf8_length(inteiro), 0), inteiro, pa.scalar('0', inteiro.type))
+    fracao = pc.utf8_slice_codeunits(
+        pc.binary_join_element_wise(fracao, pa.scalar('000', fracao.type), pa.scalar('', fracao.type)), 0, 3)
+    try:
+        # Milésimos exatos (aritmética com checagem de overflow) -> centavos, meio centavo para longe de zero
+        milesimos = pc.add_checked(pc.multiply_checked(pc.cast(inteiro, pa.int64()), 1000), pc.cast(fracao, pa.int64()))
+        centavos = pc.divide(pc.add_checked(milesimos, 5), 10)
+    except pa.ArrowInvalid:
+        return None
+    centavos = pc.if_else(pc.equal(sinal, '-'), pc.negate(centavos), centavos)
+    centavos = pc.if_else(valido, centavos, pa.scalar(None, pa.int64()))
+    return pd.Series(centavos.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get).array,
+                     index=texto.index, name=texto.name)
+
+
+def _centavos_texto_regex(texto: pd.Series) -> pd.Series:
+    """Centavos das strings decimais com pandas (NA onde o texto não é decimal)."""
+    partes = texto.str.extract(_DECIMAL_REGEX)
+    inteiro, fracao = partes[1], partes[2].fillna('')
+    mask_valido = partes[0].notna() & ((inteiro.str.len() > 0) | (fracao.str.len() > 0))
+    
+    # Milésimos exatos: parte inteira * 1000 + 3 primeiras casas decimais
+    milesimos = pd.to_numeric(inteiro.where(inteiro.str.len() > 0, '0'), errors='coerce').astype('Int64') * 1000 + \
+                pd.to_numeric((fracao + '000').str[:3], errors='coerce').astype('Int64')
+    centavos = (milesimos + 5) // 10
+    centavos = centavos.where(partes[0] != '-', -centavos)
+    return centavos.where(mask_valido)
+
+
+def para_centavos(serie: pd.Series, unidade: str) -> pd.Series:
+    """
+    Converte uma coluna monetária para centavos inteiros (Int64).
+    
+    A unidade dos valores de entrada é sempre explícita (não é deduzida do
+    dtype). Em reais, strings decimais são convertidas de forma exata (sem
+    passar por float), arredondando meio centavo para longe de zero; texto
+    com armazenamento Arrow (carga raw) é convertido em pyarrow.compute.
+    Em centavos, os valores são apenas arredondados e normalizados para Int64.
+    
+    Args:
+        serie: Series com valores monetários (texto, inteiro ou float)
+        unidade: 'reais' ou 'centavos' (unidade dos valores de `serie`)
+        
+    Returns:
+        Series Int64 com valores em centavos (NA para valores não numéricos)
+    """
+    if unidade not in UNIDADES_MONETARIAS:
+        raise ValueError(f"Unidade monetária desconhecida: {unidade} (use {', '.join(UNIDADES_MONETARIAS)})")
+    if unidade == 'centavos':
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            return serie.astype('Int64')
+        return pd.to_numeric(serie, errors='coerce').astype('float64').round().astype('Int64')
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return serie.astype('Int64') * 100
+    if pd.api.types.is_float_dtype(serie.dtype):
+        return (serie.astype('float64') * 100).round().astype('Int64')
+    
+    texto = serie.astype('string').str.strip()
+    centavos = _centavos_texto_arrow(texto)
+    if centavos is None:
+        centavos = _centavos_texto_regex(texto)
+    
+    # Fallback para notações não decimais (ex.: '1e3'), como no to_numeric anterior
+    mask_outros = texto.notna() & centavos.isna()
+    if mask_outros.any():
+        numerico = pd.to_numeric(texto[mask_outros], errors='coerce').astype('float64')
+        centavos[mask_outros] = (numerico * 100).round().astype('Int64')
+    return centavos.astype('Int64')
+
+
+def _chave_numerica(serie: pd.Series) -> pd.Series:
+    """Chave `id_*` como número ('7', '7.0' e 7 são a mesma chave; NaN se não numérica)."""
+    return pd.to_numeric(serie, errors='coerce')
+
+
+def _fk_invalida(chaves: pd.Series, referencia: pd.DataFrame, coluna: str) -> pd.Series:
+    """
+    Linhas cuja chave estrangeira não existe na tabela de referência.
+    
+    Os dois lados são comparados como números: na carga raw os ids são
+    texto, e nas referências podem ser texto ou inteiros. Chaves não
+    numéricas (dos dois lados) nunca casam.
+    """
+    validos = _chave_numerica(referencia[coluna]).dropna().unique()
+    return ~_chave_numerica(chaves).isin(validos)
+
+
+def centavos_para_reais(serie: pd.Series) -> pd.Series:
+    """Converte centavos (Int64) de volta para reais; usado apenas na escrita."""
+    return serie.astype('Float64') / 100
+
+
+def converter_colunas_monetarias(df: pd.DataFrame, unidade: str = 'reais') -> pd.DataFrame:
+    """
+    Converte as colunas monetárias presentes no DataFrame para centavos (in-place).
+    O padrão é a unidade dos arquivos raw (reais); não aplique duas vezes.
+    """
+    for col in COLUNAS_MONETARIAS:
+        if col in df.columns:
+            df[col] = para_centavos(df[col], unidade)
+    return df
+
+
+def restaurar_colunas_monetarias(df: pd.DataFrame) -> pd.DataFrame:
+    """Retorna cópia do DataFrame com as colunas monetárias em reais, para escrita."""
+    df_saida = df.copy()
+    for col in COLUNAS_MONETARIAS:
+        if col in df_saida.columns and pd.api.types.is_integer_dtype(df_saida[col].dtype):
+            df_saida[col] = centavos_para_reais(df_saida[col])
+    return df_saida
 
 
 class CorrecaoAutomatica:
@@ -45,14 +179,58 @@ class CorrecaoAutomatica:
         'SP', 'SE', 'TO'
     }
     
-    # Limites de qualidade
-    PRECO_MINIMO = 0.01
+    # Limites de qualidade (valores monetários em centavos)
+    PRECO_MINIMO = 1
     ESTOQUE_MINIMO = 0
     QUANTIDADE_MINIMA = 1
     
-    def __init__(self):
-        """Inicializa o módulo de correção."""
-        logger.info("Módulo de Correção Automática inicializado")
+    BACKENDS = ('pandas', 'polars')
+    
+    def __init__(self, formato_data: str = FORMATO_DATA_PADRAO,
+                 cache_datas: Optional[CacheDatas] = None,
+                 backend: str = 'pandas',
+                 linhagem=None,
+                 unidade_monetaria: str = 'centavos'):
+        """
+        Inicializa o módulo de correção.
+        
+        Args:
+            formato_data: Formato das colunas de data (declarado no config)
+            cache_datas: Cache de datas compartilhado entre tabelas da execução
+            backend: 'pandas' (padrão) ou 'polars' (plano lazy multi-thread,
+                ver correcao_polars.py)
+            linhagem: RegistroLinhagem opcional (linhagem.py) que recebe o
+                bitmask das regras aplicadas a cada linha raw
+            unidade_monetaria: Unidade das colunas monetárias recebidas:
+                'centavos' (padrão; já passaram por converter_colunas_monetarias
+                na carga) ou 'reais' (DataFrames no formato raw)
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend} (use {', '.join(self.BACKENDS)})")
+        if unidade_monetaria not in UNIDADES_MONETARIAS:
+            raise ValueError(f"Unidade monetária desconhecida: {unidade_monetaria} "
+                             f"(use {', '.join(UNIDADES_MONETARIAS)})")
+        self.backend = backend
+        self.unidade_monetaria = unidade_monetaria
+        self.cache_datas = cache_datas if cache_datas is not None else CacheDatas(formato_data)
+        self.linhagem = linhagem
+        self._polars = None
+        if backend == 'polars':
+            from correcao_polars import CorrecaoPolars  # polars é dependência opcional
+            self._polars = CorrecaoPolars(formato_data, unidade_monetaria)
+            if linhagem is not None:
+                logger.warning("Backend polars: a linhagem registra origem e destino, sem o bitmask de regras")
+        logger.info("Módulo de Correção Automática inicializado (backend %s)", backend)
+    
+    def _marcar(self, dataset: str, rotulos, regra: str) -> None:
+        """Registra a regra na linhagem (rótulos do índice raw ou máscara booleana)."""
+        if self.linhagem is not None:
+            self.linhagem.marcar(dataset, rotulos, regra)
+    
+    def _marcar_removidas(self, dataset: str, indice_antes: pd.Index, indice_depois: pd.Index,
+                          regra: str) -> None:
+        if self.linhagem is not None:
+            self.linhagem.marcar(dataset, indice_antes.difference(indice_depois), regra)
     
     # =====================================================================
     # CORREÇÃO DE CLIENTES
@@ -74,15 +252,20 @@ class CorrecaoAutomatica:
         Returns:
             DataFrame corrigido
         """
-        logger.info(f"Iniciando correção de clientes ({len(df)} registros)")
+        if self._polars is not None:
+            return self._polars.corrigir_clientes(df)
+        
+        logger.info("Iniciando correção de clientes (%d registros)", len(df))
         df_corrigido = df.copy()
         
         # 1. UNICIDADE: Remover duplicatas por id_cliente (manter primeiro)
         antes = len(df_corrigido)
+        indice_antes = df_corrigido.index
         df_corrigido = df_corrigido.drop_duplicates(subset=['id_cliente'], keep='first')
         removidas = antes - len(df_corrigido)
         if removidas > 0:
-            logger.warning(f"  Removidas {removidas} duplicatas (id_cliente)")
+            logger.warning("  Removidas %d duplicatas (id_cliente)", removidas)
+            self._marcar_removidas('clientes', indice_antes, df_corrigido.index, 'duplicata_removida')
         
         # 2. VALIDADE: Email - regex validation
         if 'email' in df_corrigido.columns:
@@ -90,8 +273,9 @@ class CorrecaoAutomatica:
                                   ~df_corrigido['email'].astype(str).str.match(self.EMAIL_REGEX)
             n_invalidos = mask_email_invalido.sum()
             if n_invalidos > 0:
-                logger.warning(f"  {n_invalidos} emails inválidos convertidos para NA")
+                logger.warning("  %d emails inválidos convertidos para NA", n_invalidos)
                 df_corrigido.loc[mask_email_invalido, 'email'] = pd.NA
+                self._marcar('clientes', mask_email_invalido, 'email_invalido')
         
         # 3. VALIDADE: Telefone - exigir 11 dígitos
         if 'telefone' in df_corrigido.columns:
@@ -101,13 +285,18 @@ class CorrecaoAutomatica:
                 digits = re.sub(r'\D', '', str(x))
                 return digits if len(digits) == 11 else pd.NA
             
-            df_corrigido['telefone'] = df_corrigido['telefone'].apply(limpar_telefone)
+            telefone_original = df_corrigido['telefone']
+            df_corrigido['telefone'] = telefone_original.apply(limpar_telefone)
+            if self.linhagem is not None:
+                self._marcar('clientes', telefone_original.notna() &
+                             df_corrigido['telefone'].ne(telefone_original).fillna(True), 'telefone_normalizado')
         
         # 4. COMPLETUDE: Nome vazio
         if 'nome' in df_corrigido.columns:
             n_nulos = df_corrigido['nome'].isna().sum()
             if n_nulos > 0:
-                logger.warning(f"  {n_nulos} nomes vazios preenchidos com 'NÃO INFORMADO'")
+                logger.warning("  %d nomes vazios preenchidos com 'NÃO INFORMADO'", n_nulos)
+                self._marcar('clientes', df_corrigido['nome'].isna(), 'nome_preenchido')
                 df_corrigido['nome'] = df_corrigido['nome'].fillna('NÃO INFORMADO')
         
         # 5. CONSISTÊNCIA: Estado deve ser UF válida (2 caracteres)
@@ -116,10 +305,11 @@ class CorrecaoAutomatica:
                                    ~df_corrigido['estado'].astype(str).str.upper().isin(self.UFS_VALIDAS)
             n_invalidos = mask_estado_invalido.sum()
             if n_invalidos > 0:
-                logger.warning(f"  {n_invalidos} estados inválidos convertidos para NA")
+                logger.warning("  %d estados inválidos convertidos para NA", n_invalidos)
                 df_corrigido.loc[mask_estado_invalido, 'estado'] = pd.NA
+                self._marcar('clientes', mask_estado_invalido, 'estado_invalido')
         
-        logger.info(f"Correção de clientes concluída ({len(df_corrigido)} registros após limpeza)")
+        logger.info("Correção de clientes concluída (%d registros após limpeza)", len(df_corrigido))
         return df_corrigido
     
     # =====================================================================
@@ -140,46 +330,54 @@ class CorrecaoAutomatica:
             df: DataFrame com dados de produtos
             
         Returns:
-            DataFrame corrigido
+            DataFrame corrigido (preco em centavos, Int64)
         """
-        logger.info(f"Iniciando correção de produtos ({len(df)} registros)")
+        if self._polars is not None:
+            return self._polars.corrigir_produtos(df)
+        
+        logger.info("Iniciando correção de produtos (%d registros)", len(df))
         df_corrigido = df.copy()
         
-        # Garantir tipos numéricos
+        # Garantir tipos numéricos (preço em centavos inteiros)
         if 'preco' in df_corrigido.columns:
-            df_corrigido['preco'] = pd.to_numeric(df_corrigido['preco'], errors='coerce')
+            df_corrigido['preco'] = para_centavos(df_corrigido['preco'], self.unidade_monetaria)
         if 'estoque' in df_corrigido.columns:
             df_corrigido['estoque'] = pd.to_numeric(df_corrigido['estoque'], errors='coerce')
         
         # 1. ACURÁCIA: Preço negativo -> converter para positivo (abs)
         if 'preco' in df_corrigido.columns:
-            mask_preco_neg = df_corrigido['preco'] < 0
+            mask_preco_neg = (df_corrigido['preco'] < 0).fillna(False)
             if mask_preco_neg.any():
-                logger.warning(f"  {mask_preco_neg.sum()} preços negativos convertidos com abs()")
+                logger.warning("  %d preços negativos convertidos com abs()", mask_preco_neg.sum())
                 df_corrigido.loc[mask_preco_neg, 'preco'] = df_corrigido.loc[mask_preco_neg, 'preco'].abs()
+                self._marcar('produtos', mask_preco_neg, 'preco_negativo')
         
         # 2. COMPLETUDE: Categoria vazia -> 'SEM CATEGORIA'
         if 'categoria' in df_corrigido.columns:
             n_nulos = df_corrigido['categoria'].isna().sum()
             if n_nulos > 0:
-                logger.warning(f"  {n_nulos} categorias vazias preenchidas com 'SEM CATEGORIA'")
+                logger.warning("  %d categorias vazias preenchidas com 'SEM CATEGORIA'", n_nulos)
+                self._marcar('produtos', df_corrigido['categoria'].isna(), 'categoria_preenchida')
                 df_corrigido['categoria'] = df_corrigido['categoria'].fillna('SEM CATEGORIA')
         
         # 3. VALIDADE: Estoque negativo -> 0
         if 'estoque' in df_corrigido.columns:
             mask_estoque_neg = df_corrigido['estoque'] < 0
             if mask_estoque_neg.any():
-                logger.warning(f"  {mask_estoque_neg.sum()} estoques negativos convertidos para 0")
+                logger.warning("  %d estoques negativos convertidos para 0", mask_estoque_neg.sum())
                 df_corrigido.loc[mask_estoque_neg, 'estoque'] = 0
+                self._marcar('produtos', mask_estoque_neg, 'estoque_negativo')
         
         # 4. UNICIDADE: Remover duplicatas por id_produto
         antes = len(df_corrigido)
+        indice_antes = df_corrigido.index
         df_corrigido = df_corrigido.drop_duplicates(subset=['id_produto'], keep='first')
         removidas = antes - len(df_corrigido)
         if removidas > 0:
-            logger.warning(f"  Removidas {removidas} duplicatas (id_produto)")
+            logger.warning("  Removidas %d duplicatas (id_produto)", removidas)
+            self._marcar_removidas('produtos', indice_antes, df_corrigido.index, 'duplicata_removida')
         
-        logger.info(f"Correção de produtos concluída ({len(df_corrigido)} registros após limpeza)")
+        logger.info("Correção de produtos concluída (%d registros após limpeza)", len(df_corrigido))
         return df_corrigido
     
     # =====================================================================
@@ -187,8 +385,8 @@ class CorrecaoAutomatica:
     # =====================================================================
     
     def corrigir_vendas(self, df: pd.DataFrame, 
-                        df_clientes_clean: pd.DataFrame,
-                        df_produtos_clean: pd.DataFrame) -> pd.DataFrame:
+                        df_clientes_clean: Optional[pd.DataFrame],
+                        df_produtos_clean: Optional[pd.DataFrame]) -> pd.DataFrame:
         """
         Aplica correções no dataset de vendas.
         
@@ -200,58 +398,76 @@ class CorrecaoAutomatica:
         
         Args:
             df: DataFrame com dados de vendas
-            df_clientes_clean: DataFrame de clientes processado
-            df_produtos_clean: DataFrame de produtos processado
+            df_clientes_clean: DataFrame de clientes processado (None: FK já
+                verificada pelo chamador, ex.: semi-join da execução distribuída)
+            df_produtos_clean: DataFrame de produtos processado (idem)
             
         Returns:
-            DataFrame corrigido
+            DataFrame corrigido (valor_unitario e valor_total em centavos, Int64)
         """
-        logger.info(f"Iniciando correção de vendas ({len(df)} registros)")
+        if self._polars is not None:
+            return self._polars.corrigir_vendas(df, df_clientes_clean, df_produtos_clean)
+        
+        logger.info("Iniciando correção de vendas (%d registros)", len(df))
         df_corrigido = df.copy()
         
-        # Garantir tipos numéricos
-        for col in ['quantidade', 'valor_unitario', 'valor_total']:
+        # Garantir tipos numéricos: quantidade inteira e valores em centavos
+        if 'quantidade' in df_corrigido.columns:
+            quantidade = pd.to_numeric(df_corrigido['quantidade'], errors='coerce')
+            # VALIDADE: quantidade fracionária não vira NA em silêncio; a venda é removida
+            mask_fracionaria = (quantidade % 1 != 0) & quantidade.notna()
+            if mask_fracionaria.any():
+                logger.warning("  Removidas %d vendas com quantidade fracionária", mask_fracionaria.sum())
+                self._marcar('vendas', mask_fracionaria, 'quantidade_fracionaria')
+                df_corrigido, quantidade = df_corrigido[~mask_fracionaria].copy(), quantidade[~mask_fracionaria]
+            df_corrigido['quantidade'] = quantidade.astype('Int64')
+        for col in ['valor_unitario', 'valor_total']:
             if col in df_corrigido.columns:
-                df_corrigido[col] = pd.to_numeric(df_corrigido[col], errors='coerce')
+                df_corrigido[col] = para_centavos(df_corrigido[col], self.unidade_monetaria)
         
         # 1. CONSISTÊNCIA: Foreign Keys - id_cliente e id_produto válidos
-        ids_clientes_validos = set(df_clientes_clean['id_cliente'].dropna().astype(int).tolist())
-        ids_produtos_validos = set(df_produtos_clean['id_produto'].dropna().astype(int).tolist())
-        
-        mask_fk_invalida = (~df_corrigido['id_cliente'].isin(ids_clientes_validos)) | \
-                           (~df_corrigido['id_produto'].isin(ids_produtos_validos))
+        mask_fk_invalida = pd.Series(False, index=df_corrigido.index)
+        for coluna, referencia in (('id_cliente', df_clientes_clean), ('id_produto', df_produtos_clean)):
+            if referencia is not None:
+                mask_fk_invalida |= _fk_invalida(df_corrigido[coluna], referencia, coluna)
         if mask_fk_invalida.any():
-            logger.warning(f"  Removidas {mask_fk_invalida.sum()} vendas com FK inválida")
+            logger.warning("  Removidas %d vendas com FK inválida", mask_fk_invalida.sum())
+            self._marcar('vendas', mask_fk_invalida, 'fk_invalida')
             df_corrigido = df_corrigido[~mask_fk_invalida].copy()
         
         # 2. VALIDADE: Quantidade > 0
         if 'quantidade' in df_corrigido.columns:
-            mask_qtd_invalida = df_corrigido['quantidade'] <= 0
+            mask_qtd_invalida = (df_corrigido['quantidade'] <= 0).fillna(False)
             if mask_qtd_invalida.any():
-                logger.warning(f"  Removidas {mask_qtd_invalida.sum()} vendas com quantidade <= 0")
+                logger.warning("  Removidas %d vendas com quantidade <= 0", mask_qtd_invalida.sum())
+                self._marcar('vendas', mask_qtd_invalida, 'quantidade_invalida')
                 df_corrigido = df_corrigido[~mask_qtd_invalida].copy()
         
-        # 3. ACURÁCIA: Recalcular valor_total = quantidade × valor_unitario
+        # 3. ACURÁCIA: Recalcular valor_total = quantidade × valor_unitario (aritmética
+        #    inteira em centavos: comparação exata, sem tolerância de ponto flutuante)
         if set(['quantidade', 'valor_unitario']).issubset(df_corrigido.columns):
-            valor_total_esperado = (df_corrigido['quantidade'] * df_corrigido['valor_unitario']).round(2)
+            valor_total_esperado = df_corrigido['quantidade'] * df_corrigido['valor_unitario']
             if 'valor_total' in df_corrigido.columns:
-                mask_valor_diff = ~(valor_total_esperado - df_corrigido['valor_total']).abs().le(0.01)
+                mask_valor_diff = valor_total_esperado.notna() & \
+                                  valor_total_esperado.ne(df_corrigido['valor_total']).fillna(True)
                 if mask_valor_diff.any():
-                    logger.warning(f"  Recalculados {mask_valor_diff.sum()} valores_total")
+                    logger.warning("  Recalculados %d valores_total", mask_valor_diff.sum())
+                    self._marcar('vendas', mask_valor_diff, 'valor_total_recalculado')
                     df_corrigido.loc[mask_valor_diff, 'valor_total'] = valor_total_esperado[mask_valor_diff]
             else:
                 df_corrigido['valor_total'] = valor_total_esperado
         
         # 4. TEMPORALIDADE: Remover vendas com data_venda no futuro
         if 'data_venda' in df_corrigido.columns:
-            df_corrigido['data_venda'] = pd.to_datetime(df_corrigido['data_venda'], errors='coerce')
+            df_corrigido['data_venda'] = self.cache_datas.converter(df_corrigido['data_venda'])
             hoje = pd.Timestamp.now().normalize()
             mask_futuro = df_corrigido['data_venda'] > hoje
             if mask_futuro.any():
-                logger.warning(f"  Removidas {mask_futuro.sum()} vendas com data futura")
+                logger.warning("  Removidas %d vendas com data futura", mask_futuro.sum())
+                self._marcar('vendas', mask_futuro, 'data_futura')
                 df_corrigido = df_corrigido[~mask_futuro].copy()
         
-        logger.info(f"Correção de vendas concluída ({len(df_corrigido)} registros após limpeza)")
+        logger.info("Correção de vendas concluída (%d registros após limpeza)", len(df_corrigido))
         return df_corrigido
     
     # =====================================================================
@@ -259,7 +475,7 @@ class CorrecaoAutomatica:
     # =====================================================================
     
     def corrigir_logistica(self, df: pd.DataFrame, 
-                           df_vendas_clean: pd.DataFrame) -> pd.DataFrame:
+                           df_vendas_clean: Optional[pd.DataFrame]) -> pd.DataFrame:
         """
         Aplica correções no dataset de logística.
         
@@ -271,56 +487,64 @@ class CorrecaoAutomatica:
         
         Args:
             df: DataFrame com dados de logística
-            df_vendas_clean: DataFrame de vendas processado
+            df_vendas_clean: DataFrame de vendas processado (None: FK já verificada)
             
         Returns:
             DataFrame corrigido
         """
-        logger.info(f"Iniciando correção de logística ({len(df)} registros)")
+        if self._polars is not None:
+            return self._polars.corrigir_logistica(df, df_vendas_clean)
+        
+        logger.info("Iniciando correção de logística (%d registros)", len(df))
         df_corrigido = df.copy()
         
         # 1. UNICIDADE: Remover duplicatas por id_entrega
         antes = len(df_corrigido)
+        indice_antes = df_corrigido.index
         df_corrigido = df_corrigido.drop_duplicates(subset=['id_entrega'], keep='first')
         removidas = antes - len(df_corrigido)
         if removidas > 0:
-            logger.warning(f"  Removidas {removidas} duplicatas (id_entrega)")
+            logger.warning("  Removidas %d duplicatas (id_entrega)", removidas)
+            self._marcar_removidas('logistica', indice_antes, df_corrigido.index, 'duplicata_removida')
         
         # 2. CONSISTÊNCIA: Validar FK id_venda
-        ids_vendas_validos = set(df_vendas_clean['id_venda'].dropna().astype(int).tolist())
-        mask_fk_invalida = ~df_corrigido['id_venda'].isin(ids_vendas_validos)
+        if df_vendas_clean is not None:
+            mask_fk_invalida = _fk_invalida(df_corrigido['id_venda'], df_vendas_clean, 'id_venda')
+        else:
+            mask_fk_invalida = pd.Series(False, index=df_corrigido.index)
         if mask_fk_invalida.any():
-            logger.warning(f"  Removidas {mask_fk_invalida.sum()} entregas com id_venda inválido")
+            logger.warning("  Removidas %d entregas com id_venda inválido", mask_fk_invalida.sum())
+            self._marcar('logistica', mask_fk_invalida, 'fk_invalida')
             df_corrigido = df_corrigido[~mask_fk_invalida].copy()
         
         # 3. TEMPORALIDADE: Converter e validar datas
         for col in ['data_envio', 'data_entrega_prevista', 'data_entrega_real']:
             if col in df_corrigido.columns:
-                df_corrigido[col] = pd.to_datetime(df_corrigido[col], errors='coerce')
+                df_corrigido[col] = self.cache_datas.converter(df_corrigido[col])
         
         # 4. ACURÁCIA: Calcular tempo_entrega_dias
         if set(['data_envio', 'data_entrega_real']).issubset(df_corrigido.columns):
             df_corrigido['tempo_entrega_dias'] = \
                 (df_corrigido['data_entrega_real'] - df_corrigido['data_envio']).dt.days
         
-        logger.info(f"Correção de logística concluída ({len(df_corrigido)} registros após limpeza)")
+        logger.info("Correção de logística concluída (%d registros após limpeza)", len(df_corrigido))
         return df_corrigido
 
 
-# Instância global para backward compatibility
-_corrector = CorrecaoAutomatica()
+# Instância global para backward compatibility (API antiga: valores em reais na entrada e na saída)
+_corrector = CorrecaoAutomatica(unidade_monetaria='reais')
 
 def corrigir_clientes(df: pd.DataFrame) -> pd.DataFrame:
     """Função de compatibilidade para corrigir clientes."""
     return _corrector.corrigir_clientes(df)
 
 def corrigir_produtos(df: pd.DataFrame) -> pd.DataFrame:
-    """Função de compatibilidade para corrigir produtos."""
-    return _corrector.corrigir_produtos(df)
+    """Função de compatibilidade para corrigir produtos (preco em reais)."""
+    return restaurar_colunas_monetarias(_corrector.corrigir_produtos(df))
 
 def corrigir_vendas(df: pd.DataFrame, df_clientes: pd.DataFrame, df_produtos: pd.DataFrame) -> pd.DataFrame:
-    """Função de compatibilidade para corrigir vendas."""
-    return _corrector.corrigir_vendas(df, df_clientes, df_produtos)
+    """Função de compatibilidade para corrigir vendas (valores em reais)."""
+    return restaurar_colunas_monetarias(_corrector.corrigir_vendas(df, df_clientes, df_produtos))
 
 def corrigir_logistica(df: pd.DataFrame, df_vendas: pd.DataFrame) -> pd.DataFrame:
     """Função de compatibilidade para corrigir logística."""
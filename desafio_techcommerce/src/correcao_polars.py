@@ -0,0 +1,311 @@
+"""
+Backend Polars para Correção Automática
+=======================================
+
+Implementa as mesmas regras de `CorrecaoAutomatica.corrigir_*` como um plano
+lazy do Polars (LazyFrame): as correções de cada tabela viram expressões
+colunares avaliadas em paralelo pelo motor do Polars, sem `apply` por linha.
+
+Entradas e saídas seguem o tipo recebido:
+- pandas.DataFrame -> pandas.DataFrame (mesmo índice e tipos equivalentes
+  ao backend pandas: centavos e quantidade em Int64, datas em datetime64)
+- polars.DataFrame -> polars.DataFrame
+- polars.LazyFrame -> polars.LazyFrame (nada é materializado; útil com
+  `pl.scan_csv` em tabelas maiores que a memória)
+
+Com entrada lazy as contagens por regra não são registradas em log, pois
+exigiriam materializar o plano.
+
+`estoque` e `tempo_entrega_dias` seguem o tipo do backend pandas, que
+depende dos dados: inteiro quando todos os valores são inteiros válidos,
+float quando algum é inválido (nulo). O plano calcula essa condição como
+uma coluna auxiliar, resolvida ao materializar; com entrada lazy o tipo não
+é conhecido antes da coleta e as duas colunas saem como Float64.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import logging
+import pandas as pd
+import polars as pl
+from typing import List, Optional, Tuple, Union
+
+from configuracao import FORMATO_DATA_PADRAO
+
+logger = logging.getLogger(__name__)
+
+Tabela = Union[pd.DataFrame, pl.DataFrame, pl.LazyFrame]
+
+_COLUNA_INDICE = '__indice_origem'
+_SUFIXO_INTEIRO = '__inteiro'
+_DECIMAL_REGEX = r'^([+-]?)(\d*)(?:\.(\d*))?$'
+
+
+# =====================================================================
+# EXPRESSÕES AUXILIARES
+# =====================================================================
+
+def centavos_expr(coluna: str, dtype: pl.DataType, unidade: str) -> pl.Expr:
+    """
+    Equivalente Polars de `correcao_automatica.para_centavos` (mesma unidade explícita).
+
+    Em reais, strings decimais são convertidas de forma exata (milésimos
+    inteiros, meio centavo arredondado para longe de zero); outras notações
+    (ex.: '1e3') passam por float, como no backend pandas.
+    """
+    col = pl.col(coluna)
+    if unidade == 'centavos':
+        if dtype.is_integer():
+            return col.cast(pl.Int64)
+        return _numerico(coluna).round(0).cast(pl.Int64, strict=False)
+    if dtype.is_integer():
+        return col.cast(pl.Int64) * 100
+    if dtype.is_float():
+        return (col.cast(pl.Float64) * 100).round(0).cast(pl.Int64)
+
+    texto = col.cast(pl.String).str.strip_chars()
+    partes = texto.str.extract_groups(_DECIMAL_REGEX)
+    sinal, inteiro = partes.struct.field('1'), partes.struct.field('2')
+    fracao = partes.struct.field('3').fill_null('')
+    valido = sinal.is_not_null() & ((inteiro.str.len_chars() > 0) | (fracao.str.len_chars() > 0))
+
+    milesimos = pl.when(inteiro.str.len_chars() > 0).then(inteiro).otherwise(pl.lit('0')) \
+                  .cast(pl.Int64, strict=False) * 1000 + \
+                (fracao + '000').str.slice(0, 3).cast(pl.Int64, strict=False)
+    centavos = (milesimos + 5) // 10
+    centavos = pl.when(sinal == '-').then(-centavos).otherwise(centavos)
+    fallback = (texto.cast(pl.Float64, strict=False) * 100).round(0).cast(pl.Int64, strict=False)
+    return pl.when(valido).then(centavos) \
+             .when(texto.is_not_null()).then(fallback) \
+             .otherwise(None).cast(pl.Int64)
+
+
+def _numerico(coluna: str) -> pl.Expr:
+    """Equivalente de `pd.to_numeric(errors='coerce')` (como Float64)."""
+    return pl.col(coluna).cast(pl.Float64, strict=False)
+
+
+def _inteiro_texto(coluna: str, dtype: pl.DataType) -> pl.Expr:
+    """Valor inteiro como no `pd.to_numeric` (nulo se o texto não for inteiro, ex.: '1.0')."""
+    if dtype.is_integer():
+        return pl.col(coluna)
+    if dtype.is_float():
+        return pl.lit(None, dtype=pl.Int64)  # to_numeric mantém float64
+    return pl.col(coluna).cast(pl.String).str.strip_chars().cast(pl.Int64, strict=False)
+
+
+def _condicao_inteiro(coluna: str, inteiro: pl.Expr) -> pl.Expr:
+    """Coluna auxiliar: todos os valores de `coluna` são inteiros válidos (no conjunto todo)."""
+    return inteiro.is_not_null().all().alias(coluna + _SUFIXO_INTEIRO)
+
+
+def _resolver_inteiros(df: pl.DataFrame) -> Tuple[pl.DataFrame, List[str]]:
+    """
+    Aplica as colunas auxiliares de `_condicao_inteiro`: Int64 se todos os
+    valores são inteiros válidos, Float64 senão (como o backend pandas).
+
+    Returns:
+        (DataFrame sem as colunas auxiliares, colunas resolvidas)
+    """
+    auxiliares = [c for c in df.columns if c.endswith(_SUFIXO_INTEIRO)]
+    resolvidas = [c[:-len(_SUFIXO_INTEIRO)] for c in auxiliares]
+    exprs = [pl.col(coluna).cast(pl.Int64 if len(df) == 0 or df.get_column(auxiliar)[0] else pl.Float64)
+             for coluna, auxiliar in zip(resolvidas, auxiliares)]
+    return df.with_columns(exprs).drop(auxiliares), resolvidas
+
+
+def _data_expr(coluna: str, dtype: pl.DataType, formato: str) -> pl.Expr:
+    if dtype == pl.Datetime or dtype == pl.Date:
+        return pl.col(coluna).cast(pl.Datetime('ns'))
+    return pl.col(coluna).cast(pl.String).str.strptime(pl.Datetime('ns'), formato, strict=False)
+
+
+def _ids_referencia(referencia: Tabela, coluna: str) -> List[float]:
+    """Ids válidos de uma tabela de referência (mesma regra do backend pandas)."""
+    if isinstance(referencia, pl.LazyFrame):
+        referencia = referencia.select(coluna).collect()
+    if isinstance(referencia, pl.DataFrame):
+        return referencia.get_column(coluna).cast(pl.Float64, strict=False).drop_nulls().unique().to_list()
+    return [float(v) for v in pd.to_numeric(referencia[coluna], errors='coerce').dropna().unique()]
+
+
+def _para_pandas(df: pl.DataFrame, indice_original: pd.Index, numpy: List[str]) -> pd.DataFrame:
+    """
+    Converte o resultado para pandas com os tipos do backend pandas:
+    inteiros em Int64, exceto as colunas `numpy` (int64/float64).
+    """
+    posicoes = df.get_column(_COLUNA_INDICE).to_numpy()
+    df = df.drop(_COLUNA_INDICE)
+    resultado = df.to_pandas()
+    for nome, dtype in df.schema.items():
+        if dtype.is_integer() and nome not in numpy:
+            resultado[nome] = df.get_column(nome).to_pandas(use_pyarrow_extension_array=True).astype('Int64')
+        elif dtype == pl.Datetime:
+            resultado[nome] = resultado[nome].astype('datetime64[ns]')
+    resultado.index = indice_original[posicoes]
+    return resultado
+
+
+# =====================================================================
+# BACKEND
+# =====================================================================
+
+class CorrecaoPolars:
+    """Regras de CorrecaoAutomatica executadas como planos lazy do Polars."""
+
+    EMAIL_REGEX = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+    UFS_VALIDAS = [
+        'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS',
+        'MG', 'PA', 'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC',
+        'SP', 'SE', 'TO'
+    ]
+    PRECO_MINIMO = 1
+
+    def __init__(self, formato_data: str = FORMATO_DATA_PADRAO, unidade_monetaria: str = 'centavos'):
+        self.formato_data = formato_data
+        self.unidade_monetaria = unidade_monetaria
+
+    def _executar(self, df: Tabela, nome: str, plano) -> Tabela:
+        """Monta o plano lazy sobre a entrada e devolve no mesmo tipo recebido."""
+        if isinstance(df, pl.LazyFrame):
+            lf = plano(df)
+            auxiliares = [c for c in lf.collect_schema().names() if c.endswith(_SUFIXO_INTEIRO)]
+            return lf.with_columns(pl.col(c[:-len(_SUFIXO_INTEIRO)]).cast(pl.Float64) for c in auxiliares) \
+                     .drop(auxiliares)
+
+        if isinstance(df, pd.DataFrame):
+            indice = df.index
+            lf = pl.from_pandas(df.reset_index(drop=True)).lazy().with_row_index(_COLUNA_INDICE)
+        else:
+            indice = None
+            lf = df.lazy()
+
+        logger.info("Iniciando correção de %s (%d registros) [polars]", nome, len(df))
+        resultado, numpy = _resolver_inteiros(plano(lf).collect())
+        logger.info("Correção de %s concluída (%d registros após limpeza) [polars]", nome, len(resultado))
+        return _para_pandas(resultado, indice, numpy) if indice is not None else resultado
+
+    # =====================================================================
+    # CLIENTES
+    # =====================================================================
+
+    def corrigir_clientes(self, df: Tabela) -> Tabela:
+        """Mesmas regras de CorrecaoAutomatica.corrigir_clientes."""
+        def plano(lf: pl.LazyFrame) -> pl.LazyFrame:
+            colunas = lf.collect_schema().names()
+            lf = lf.unique(subset=['id_cliente'], keep='first', maintain_order=True)
+            exprs = []
+            if 'email' in colunas:
+                email = pl.col('email')
+                invalido = email.is_not_null() & ~email.cast(pl.String).str.contains(self.EMAIL_REGEX)
+                exprs.append(pl.when(invalido).then(None).otherwise(email).alias('email'))
+            if 'telefone' in colunas:
+                digitos = pl.col('telefone').cast(pl.String).str.replace_all(r'\D', '')
+                exprs.append(pl.when(digitos.str.len_chars() == 11).then(digitos)
+                             .otherwise(None).alias('telefone'))
+            if 'nome' in colunas:
+                exprs.append(pl.col('nome').fill_null('NÃO INFORMADO'))
+            if 'estado' in colunas:
+                estado = pl.col('estado')
+                invalido = estado.is_not_null() & \
+                           ~estado.cast(pl.String).str.to_uppercase().is_in(self.UFS_VALIDAS)
+                exprs.append(pl.when(invalido).then(None).otherwise(estado).alias('estado'))
+            return lf.with_columns(exprs) if exprs else lf
+        return self._executar(df, 'clientes', plano)
+
+    # =====================================================================
+    # PRODUTOS
+    # =====================================================================
+
+    def corrigir_produtos(self, df: Tabela) -> Tabela:
+        """Mesmas regras de CorrecaoAutomatica.corrigir_produtos (preco em centavos)."""
+        def plano(lf: pl.LazyFrame) -> pl.LazyFrame:
+            schema = lf.collect_schema()
+            exprs = []
+            if 'preco' in schema:
+                preco = centavos_expr('preco', schema['preco'], self.unidade_monetaria)
+                exprs.append(pl.when(preco < 0).then(preco.abs()).otherwise(preco).alias('preco'))
+            if 'categoria' in schema:
+                exprs.append(pl.col('categoria').fill_null('SEM CATEGORIA'))
+            if 'estoque' in schema:
+                estoque = _numerico('estoque')
+                exprs.append(pl.when(estoque < 0).then(0.0).otherwise(estoque).alias('estoque'))
+                exprs.append(_condicao_inteiro('estoque', _inteiro_texto('estoque', schema['estoque'])))
+            if exprs:
+                lf = lf.with_columns(exprs)
+            return lf.unique(subset=['id_produto'], keep='first', maintain_order=True)
+        return self._executar(df, 'produtos', plano)
+
+    # =====================================================================
+    # VENDAS
+    # =====================================================================
+
+    def corrigir_vendas(self, df: Tabela, df_clientes_clean: Optional[Tabela],
+                        df_produtos_clean: Optional[Tabela]) -> Tabela:
+        """Mesmas regras de CorrecaoAutomatica.corrigir_vendas (valores em centavos; None: FK já verificada)."""
+        referencias = {'id_cliente': df_clientes_clean, 'id_produto': df_produtos_clean}
+        ids = {coluna: _ids_referencia(ref, coluna) for coluna, ref in referencias.items() if ref is not None}
+
+        def plano(lf: pl.LazyFrame) -> pl.LazyFrame:
+            schema = lf.collect_schema()
+            exprs = []
+            if 'quantidade' in schema:
+                # Quantidade fracionária: venda removida (não vira nulo)
+                qtd = _numerico('quantidade').fill_nan(None)
+                lf = lf.filter(~(qtd % 1 != 0).fill_null(False))
+                exprs.append(qtd.cast(pl.Int64).alias('quantidade'))
+            for col in ('valor_unitario', 'valor_total'):
+                if col in schema:
+                    exprs.append(centavos_expr(col, schema[col], self.unidade_monetaria).alias(col))
+            if exprs:
+                lf = lf.with_columns(exprs)
+
+            # Consistência (FK) e validade (quantidade > 0)
+            for coluna, validos in ids.items():
+                lf = lf.filter(_numerico(coluna).is_in(validos).fill_null(False))
+            if 'quantidade' in schema:
+                lf = lf.filter(~(pl.col('quantidade') <= 0).fill_null(False))
+
+            # Acurácia: valor_total = quantidade × valor_unitario (centavos)
+            if 'quantidade' in schema and 'valor_unitario' in schema:
+                esperado = pl.col('quantidade') * pl.col('valor_unitario')
+                if 'valor_total' in schema:
+                    diverge = esperado.is_not_null() & (esperado != pl.col('valor_total')).fill_null(True)
+                    lf = lf.with_columns(pl.when(diverge).then(esperado)
+                                         .otherwise(pl.col('valor_total')).alias('valor_total'))
+                else:
+                    lf = lf.with_columns(esperado.alias('valor_total'))
+
+            # Temporalidade: remover vendas com data futura
+            if 'data_venda' in schema:
+                hoje = pd.Timestamp.now().normalize().to_pydatetime()
+                lf = lf.with_columns(_data_expr('data_venda', schema['data_venda'], self.formato_data)
+                                     .alias('data_venda'))
+                lf = lf.filter(~(pl.col('data_venda') > hoje).fill_null(False))
+            return lf
+        return self._executar(df, 'vendas', plano)
+
+    # =====================================================================
+    # LOGÍSTICA
+    # =====================================================================
+
+    def corrigir_logistica(self, df: Tabela, df_vendas_clean: Optional[Tabela]) -> Tabela:
+        """Mesmas regras de CorrecaoAutomatica.corrigir_logistica (None: FK já verificada)."""
+        ids_vendas = _ids_referencia(df_vendas_clean, 'id_venda') if df_vendas_clean is not None else None
+
+        def plano(lf: pl.LazyFrame) -> pl.LazyFrame:
+            schema = lf.collect_schema()
+            lf = lf.unique(subset=['id_entrega'], keep='first', maintain_order=True)
+            if ids_vendas is not None:
+                lf = lf.filter(_numerico('id_venda').is_in(ids_vendas).fill_null(False))
+
+            datas = [c for c in ('data_envio', 'data_entrega_prevista', 'data_entrega_real') if c in schema]
+            if datas:
+                lf = lf.with_columns([_data_expr(c, schema[c], self.formato_data).alias(c) for c in datas])
+            if 'data_envio' in schema and 'data_entrega_real' in schema:
+                lf = lf.with_columns((pl.col('data_entrega_real') - pl.col('data_envio'))
+                                     .dt.total_days().alias('tempo_entrega_dias'))
+                lf = lf.with_columns(_condicao_inteiro('tempo_entrega_dias', pl.col('tempo_entrega_dias')))
+            return lf
+        return self._executar(df, 'logistica', plano)
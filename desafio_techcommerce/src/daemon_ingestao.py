@@ -0,0 +1,456 @@
+"""
+Daemon de Ingestão em Micro-Lotes
+=================================
+
+Mantém um processo aquecido (imports, suites compiladas, cache
+de datas e tabelas de referência já carregados) que observa `data/raw/` e
+processa os arquivos que chegam em micro-lotes.
+
+- Observação: inotify (Linux, via ctypes) com fallback para polling.
+  No polling, um arquivo só é entregue quando tamanho e mtime ficam
+  estáveis entre duas varreduras (escrita concluída).
+- Micro-lote: o primeiro arquivo novo abre uma janela de latência
+  (`daemon.janela_latencia_s`); tudo o que chegar até o fim da janela (ou
+  até `daemon.max_arquivos_lote`) é processado junto.
+- O dataset de cada arquivo é identificado pelo prefixo do nome
+  (`vendas_20251117T1015.csv` -> vendas). Os snapshots completos
+  (`raw_file` do config) são ignorados: eles pertencem à execução batch.
+- Cada lote é corrigido na ordem clientes -> produtos -> vendas -> logística
+  (FKs checadas contra as referências em memória), validado com as suites
+  compiladas e gravado em data/processed/micro_lotes/<dataset>/<lote_id>.csv.
+- O registro de cada lote (arquivos, linhas, validação e latências) é
+  acrescentado a data/quality/micro_lotes.jsonl; arquivos já registrados
+  não são reprocessados após um reinício. Um lote que falha é registrado
+  com `erro` e seus arquivos voltam a ser aceitos: são reprocessados quando
+  reescritos ou no próximo reinício.
+- As referências de FK guardam apenas as chaves distintas de cada dataset
+  pai, e o cache de datas do corretor é descartado quando passa de
+  `daemon.max_datas_cache` valores, para o processo longo não crescer sem
+  limite.
+
+Latências reportadas por lote:
+    espera_s            chegada do primeiro arquivo -> início do processamento
+    processamento_s     correção + validação + escrita
+    ponta_a_ponta_s     mtime do arquivo mais antigo -> fim do processamento
+
+Execução:
+    python pipeline_ingestao.py --daemon
+    python pipeline_ingestao.py --daemon --janela 0.5 --polling
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import json
+import time
+import ctypes
+import select
+import signal
+import struct
+import logging
+import threading
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import correcao_automatica as ca
+import configuracao
+import suites_compiladas
+from pseudonimizacao import Pseudonimizador
+from leitura_raw import ler_csv_raw
+from versoes_processados import fixar_processados
+
+logger = logging.getLogger(__name__)
+
+ORDEM_DATASETS = ('clientes', 'produtos', 'vendas', 'logistica')
+# Referências de FK de cada dataset (para recompilar as suites dependentes)
+DEPENDENCIAS_FK = {'vendas': ('clientes', 'produtos'), 'logistica': ('vendas',)}
+
+JANELA_PADRAO = 2.0
+MAX_ARQUIVOS_PADRAO = 100
+INTERVALO_POLLING_PADRAO = 0.5
+MAX_DATAS_CACHE_PADRAO = 100_000
+
+# Constantes do inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENTO_INOTIFY = struct.Struct('iIII')
+
+
+# =====================================================================
+# OBSERVADORES DE DIRETÓRIO
+# =====================================================================
+
+class ObservadorPolling:
+    """Observa um diretório por varredura periódica (funciona em qualquer SO)."""
+
+    def __init__(self, diretorio: Path, intervalo: float = INTERVALO_POLLING_PADRAO,
+                 padrao: str = '*.csv'):
+        self.diretorio = Path(diretorio)
+        self.intervalo = intervalo
+        self.padrao = padrao
+        self._assinaturas: Dict[Path, tuple] = self._varrer()
+        self._pendentes: Dict[Path, tuple] = {}
+
+    def _varrer(self) -> Dict[Path, tuple]:
+        assinaturas = {}
+        for caminho in self.diretorio.glob(self.padrao):
+            try:
+                st = caminho.stat()
+            except FileNotFoundError:
+                continue
+            assinaturas[caminho] = (st.st_size, st.st_mtime_ns)
+        return assinaturas
+
+    def aguardar(self, timeout: float) -> List[Path]:
+        """Retorna os arquivos novos/alterados e estáveis (até `timeout` segundos)."""
+        limite = time.monotonic() + timeout
+        while True:
+            atuais = self._varrer()
+            prontos = []
+            for caminho, assinatura in atuais.items():
+                if self._assinaturas.get(caminho) == assinatura:
+                    continue
+                if self._pendentes.get(caminho) == assinatura:
+                    prontos.append(caminho)
+                    self._assinaturas[caminho] = assinatura
+                    del self._pendentes[caminho]
+                else:
+                    self._pendentes[caminho] = assinatura
+            if prontos:
+                return sorted(prontos)
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return []
+            time.sleep(min(self.intervalo, restante))
+
+    def fechar(self) -> None:
+        pass
+
+
+class ObservadorInotify:
+    """Observa um diretório com inotify (IN_CLOSE_WRITE | IN_MOVED_TO)."""
+
+    def __init__(self, diretorio: Path, sufixo: str = '.csv'):
+        self.diretorio = Path(diretorio)
+        self.sufixo = sufixo
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        wd = libc.inotify_add_watch(self._fd, str(self.diretorio).encode(), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falhou para {self.diretorio}")
+
+    def aguardar(self, timeout: float) -> List[Path]:
+        """Retorna os arquivos fechados após escrita ou movidos para o diretório."""
+        prontos, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not prontos:
+            return []
+        arquivos = set()
+        while True:
+            try:
+                dados = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(dados):
+                _, _, _, tamanho = _EVENTO_INOTIFY.unpack_from(dados, pos)
+                inicio = pos + _EVENTO_INOTIFY.size
+                nome = dados[inicio:inicio + tamanho].rstrip(b'\0').decode(errors='replace')
+                pos = inicio + tamanho
+                if nome.endswith(self.sufixo):
+                    arquivos.add(self.diretorio / nome)
+        return sorted(arquivos)
+
+    def fechar(self) -> None:
+        os.close(self._fd)
+
+
+def criar_observador(diretorio: Path, polling: bool = False,
+                     intervalo: float = INTERVALO_POLLING_PADRAO):
+    """Usa inotify quando disponível; caso contrário, polling."""
+    if not polling and hasattr(os, 'uname') and os.uname().sysname == 'Linux':
+        try:
+            observador = ObservadorInotify(diretorio)
+            logger.info(f"Observando {diretorio} com inotify")
+            return observador
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify indisponível ({e}); usando polling")
+    logger.info(f"Observando {diretorio} por polling a cada {intervalo}s")
+    return ObservadorPolling(diretorio, intervalo)
+
+
+# =====================================================================
+# PROCESSAMENTO DE MICRO-LOTES
+# =====================================================================
+
+def dataset_do_arquivo(caminho: Path, datasets: Iterable[str]) -> Optional[str]:
+    """Identifica o dataset pelo prefixo do nome do arquivo."""
+    stem = Path(caminho).stem.lower()
+    for dataset in datasets:
+        if stem == dataset or stem.startswith(dataset + '_') or stem.startswith(dataset + '-'):
+            return dataset
+    return None
+
+
+def _chaves_distintas(chaves: pd.Series, pk: str) -> pd.DataFrame:
+    """Referência de FK: só a coluna-chave, sem nulos nem repetições (como `referencias_fk`)."""
+    return pd.DataFrame({pk: chaves.dropna().astype(str).drop_duplicates().reset_index(drop=True)})
+
+
+def carregar_referencias(config: dict, processed_dir: Path) -> Dict[str, pd.DataFrame]:
+    """
+    Carrega as chaves primárias dos *_clean.csv da última execução batch como
+    referência de FK (todos da mesma versão publicada, se houver versões).
+    Só a coluna-chave é mantida: é o que as correções e as suites consultam.
+    """
+    referencias = {}
+    fixados = fixar_processados(config, processed_dir)
+    for dataset in ORDEM_DATASETS:
+        arquivo = config.get('datasets', {}).get(dataset, {}).get('clean_file', f"{dataset}_clean.csv")
+        caminho = fixados.get(dataset, Path(processed_dir) / arquivo)
+        pk = configuracao.chave_primaria(config, dataset)
+        if caminho.exists():
+            chaves = pd.read_csv(caminho, sep=';', dtype=str, usecols=[pk])[pk]
+        else:
+            chaves = pd.Series([], dtype=str)
+        referencias[dataset] = _chaves_distintas(chaves, pk)
+        logger.info(f"Referência {dataset}: {len(referencias[dataset])} chaves")
+    return referencias
+
+
+class ProcessadorMicroLotes:
+    """Estado aquecido do daemon: corretor, referências e suites compiladas."""
+
+    def __init__(self, config: dict, processed_dir: Path, quality_dir: Path):
+        """
+        Args:
+            config: Configuração carregada (config.yaml)
+            processed_dir: data/processed (referências iniciais e saída dos lotes)
+            quality_dir: data/quality (registro dos lotes)
+        """
+        self.config = config
+        self.processed_dir = Path(processed_dir)
+        self.quality_dir = Path(quality_dir)
+        self.registro = self.quality_dir / 'micro_lotes.jsonl'
+        # Corretor único: o cache de datas persiste entre os lotes
+        self.corretor = ca.CorrecaoAutomatica(formato_data=configuracao.formato_data(config))
+        self.leitor_raw = configuracao.leitor_raw(config)
+        self.pseudonimizador = Pseudonimizador.do_config(config, self.processed_dir.parent.parent)
+        self.max_datas_cache = int((config.get('daemon') or {}).get('max_datas_cache', MAX_DATAS_CACHE_PADRAO))
+        self.referencias = carregar_referencias(config, self.processed_dir)
+        self.suites = suites_compiladas.compilar_suites(self.referencias)
+
+    def arquivos_registrados(self) -> Set[str]:
+        """Arquivos já processados por lotes anteriores (lotes com falha não contam)."""
+        if not self.registro.exists():
+            return set()
+        processados = set()
+        with open(self.registro, encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    registro = json.loads(linha)
+                    if 'erro' not in registro:
+                        processados.update(registro.get('arquivos', []))
+        return processados
+
+    def _registrar(self, registro: Dict) -> None:
+        self.quality_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.registro, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    def registrar_falha(self, arquivos: List[Path], chegada: float, erro: Exception) -> Dict:
+        """Registra um lote que falhou; seus arquivos serão reprocessados."""
+        registro = {
+            'lote_id': datetime.now().strftime('%Y%m%d-%H%M%S-%f'),
+            'arquivos': [caminho.name for caminho in arquivos],
+            'sucesso': False,
+            'erro': f"{type(erro).__name__}: {erro}",
+            'espera_s': round(time.time() - chegada, 4),
+        }
+        self._registrar(registro)
+        return registro
+
+    def _corrigir(self, dataset: str, df: pd.DataFrame) -> pd.DataFrame:
+        ref = self.referencias
+        if dataset == 'clientes':
+            corrigido = self.corretor.corrigir_clientes(df)
+            return self.pseudonimizador.pseudonimizar(corrigido) if self.pseudonimizador else corrigido
+        if dataset == 'produtos':
+            return self.corretor.corrigir_produtos(df)
+        if dataset == 'vendas':
+            return self.corretor.corrigir_vendas(df, ref['clientes'], ref['produtos'])
+        return self.corretor.corrigir_logistica(df, ref['vendas'])
+
+    def _atualizar_referencia(self, dataset: str, df: pd.DataFrame) -> None:
+        """Incorpora as chaves do lote à referência (só as chaves novas crescem a tabela)."""
+        pk = configuracao.chave_primaria(self.config, dataset)
+        self.referencias[dataset] = _chaves_distintas(
+            pd.concat([self.referencias[dataset][pk], df[pk].astype(str)], ignore_index=True), pk)
+
+    def processar(self, arquivos: List[Path], chegada: float) -> Dict:
+        """
+        Processa um micro-lote.
+
+        Args:
+            arquivos: Arquivos do lote
+            chegada: Instante (time.time()) em que o primeiro arquivo foi detectado
+
+        Returns:
+            Registro do lote (também gravado em micro_lotes.jsonl)
+        """
+        inicio = time.time()
+        lote_id = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        if len(self.corretor.cache_datas) > self.max_datas_cache:
+            logger.info(f"Cache de datas descartado ({self.corretor.cache_datas.resumo()})")
+            self.corretor.cache_datas.limpar()
+        por_dataset: Dict[str, List[pd.DataFrame]] = {}
+        mtime_mais_antigo = inicio
+        for caminho in arquivos:
+            dataset = dataset_do_arquivo(caminho, ORDEM_DATASETS)
+            df = ler_csv_raw(caminho, sep='\t', leitor=self.leitor_raw)
+            por_dataset.setdefault(dataset, []).append(ca.converter_colunas_monetarias(df))
+            mtime_mais_antigo = min(mtime_mais_antigo, caminho.stat().st_mtime)
+
+        linhas, validacao, alteradas = {}, {}, set()
+        for dataset in ORDEM_DATASETS:
+            if dataset not in por_dataset:
+                continue
+            # Suites com FK para referências alteradas neste lote são recompiladas
+            if alteradas.intersection(DEPENDENCIAS_FK.get(dataset, ())):
+                self.suites[dataset] = suites_compiladas.compilar_suite(dataset, self.referencias)
+
+            bruto = pd.concat(por_dataset[dataset], ignore_index=True)
+            corrigido = self._corrigir(dataset, bruto)
+            saida = ca.restaurar_colunas_monetarias(corrigido)
+            resultados = self.suites[dataset].validar(saida, fail_fast=configuracao.validacao_fail_fast(self.config))
+
+            destino = self.processed_dir / 'micro_lotes' / dataset
+            destino.mkdir(parents=True, exist_ok=True)
+            saida.to_csv(destino / f"{lote_id}.csv", index=False, sep=';')
+
+            self._atualizar_referencia(dataset, corrigido)
+            alteradas.add(dataset)
+            linhas[dataset] = {'entrada': len(bruto), 'saida': len(corrigido)}
+            validacao[dataset] = suites_compiladas.resumir_resultados(resultados)
+
+        fim = time.time()
+        registro = {
+            'lote_id': lote_id,
+            'arquivos': [caminho.name for caminho in arquivos],
+            'linhas': linhas,
+            'validacao': validacao,
+            'sucesso': all(v['sucesso'] for v in validacao.values()),
+            'espera_s': round(inicio - chegada, 4),
+            'processamento_s': round(fim - inicio, 4),
+            'ponta_a_ponta_s': round(fim - mtime_mais_antigo, 4),
+        }
+        self._registrar(registro)
+
+        status = "✓" if registro['sucesso'] else "✗"
+        logger.info(f"{status} Lote {lote_id}: {len(arquivos)} arquivo(s), "
+                    f"{sum(v['saida'] for v in linhas.values())} linhas | "
+                    f"espera {registro['espera_s']:.3f}s, processamento {registro['processamento_s']:.3f}s, "
+                    f"ponta a ponta {registro['ponta_a_ponta_s']:.3f}s")
+        return registro
+
+
+class DaemonIngestao:
+    """Laço principal: observa o diretório raw e agrupa arquivos em micro-lotes."""
+
+    def __init__(self, raw_dir: Path, processador: ProcessadorMicroLotes,
+                 janela: float = JANELA_PADRAO, max_arquivos: int = MAX_ARQUIVOS_PADRAO,
+                 polling: bool = False, intervalo_polling: float = INTERVALO_POLLING_PADRAO):
+        self.raw_dir = Path(raw_dir)
+        self.processador = processador
+        self.janela = janela
+        self.max_arquivos = max_arquivos
+        self.polling = polling
+        self.intervalo_polling = intervalo_polling
+        self.parar = threading.Event()
+        self.lotes_processados = 0
+
+        config = processador.config
+        self._snapshots = {info.get('raw_file') for info in config.get('datasets', {}).values()}
+        self._vistos = processador.arquivos_registrados()
+
+    def _aceitar(self, caminho: Path) -> bool:
+        if caminho.name in self._snapshots or caminho.name in self._vistos:
+            return False
+        if dataset_do_arquivo(caminho, ORDEM_DATASETS) is None:
+            logger.warning(f"Arquivo ignorado (dataset não identificado): {caminho.name}")
+            self._vistos.add(caminho.name)
+            return False
+        return True
+
+    def _pendentes_na_partida(self) -> List[Path]:
+        """Arquivos que chegaram enquanto o daemon estava parado."""
+        return [p for p in sorted(self.raw_dir.glob('*.csv')) if self._aceitar(p)]
+
+    def executar(self, max_lotes: Optional[int] = None) -> None:
+        """
+        Executa até receber SIGINT/SIGTERM (ou processar `max_lotes` lotes).
+        """
+        observador = criar_observador(self.raw_dir, self.polling, self.intervalo_polling)
+        fila = self._pendentes_na_partida()
+        chegada = time.time() if fila else None
+        logger.info(f"Daemon pronto (janela {self.janela}s, até {self.max_arquivos} arquivos por lote)")
+
+        try:
+            while not self.parar.is_set():
+                if chegada is None:
+                    novos = [p for p in observador.aguardar(0.5) if self._aceitar(p)]
+                    if not novos:
+                        continue
+                    chegada = time.time()
+                    fila.extend(novos)
+
+                # Janela de latência: agrupa o que chegar até o prazo do lote
+                prazo = chegada + self.janela
+                while len(fila) < self.max_arquivos and not self.parar.is_set():
+                    restante = prazo - time.time()
+                    if restante <= 0:
+                        break
+                    fila.extend(p for p in observador.aguardar(restante)
+                                if self._aceitar(p) and p not in fila)
+
+                lote, fila = fila[:self.max_arquivos], fila[self.max_arquivos:]
+                try:
+                    self.processador.processar(lote, chegada)
+                    self._vistos.update(p.name for p in lote)
+                except Exception as e:
+                    # Não marca como vistos: reescrever o arquivo (ou reiniciar) reprocessa o lote
+                    logger.error(f"Falha no lote {[p.name for p in lote]}: {e}", exc_info=True)
+                    self.processador.registrar_falha(lote, chegada, e)
+                self.lotes_processados += 1
+                chegada = time.time() if fila else None
+
+                if max_lotes is not None and self.lotes_processados >= max_lotes:
+                    break
+        finally:
+            observador.fechar()
+            logger.info(f"Daemon encerrado ({self.lotes_processados} lotes processados)")
+
+    def instalar_sinais(self) -> None:
+        """Encerra o laço de forma limpa em SIGINT/SIGTERM."""
+        def encerrar(signum, frame):
+            logger.info(f"Sinal {signum} recebido; encerrando após o lote atual")
+            self.parar.set()
+        signal.signal(signal.SIGINT, encerrar)
+        signal.signal(signal.SIGTERM, encerrar)
+
+
+def parametros_daemon(config: dict) -> Dict:
+    """Parâmetros da seção `daemon` do config.yaml (com padrões)."""
+    secao = config.get('daemon') or {}
+    return {
+        'janela': float(secao.get('janela_latencia_s', JANELA_PADRAO)),
+        'max_arquivos': int(secao.get('max_arquivos_lote', MAX_ARQUIVOS_PADRAO)),
+        'intervalo_polling': float(secao.get('intervalo_polling_s', INTERVALO_POLLING_PADRAO)),
+    }
@@ -0,0 +1,253 @@
+"""
+Deduplicação Aproximada de Clientes
+===================================
+
+Identifica a mesma pessoa cadastrada sob `id_cliente` diferentes (Unicidade).
+Em vez de comparar todos os pares (O(n²)), os candidatos são gerados apenas
+dentro de blocos que compartilham uma chave de blocagem:
+
+1. Email normalizado (minúsculas, sem espaços) -> mesmo cliente
+2. Telefone (somente dígitos) -> mesmo cliente se os nomes forem similares
+3. Chave fonética do nome + data de nascimento -> mesmo cliente se os nomes
+   forem muito similares (nome sozinho é evidência fraca). O estado não entra
+   na chave: o cadastro raw não o traz, e um termo nulo anularia a chave
+
+A similaridade de nomes é vetorizada: cada nome vira uma assinatura de 64 bits
+com os bigramas de caracteres, e a similaridade de Jaccard de um par é
+popcount(a & b) / popcount(a | b). Os pares aceitos formam um grafo cujos
+componentes conexos (propagação de rótulos vetorizada) são os clusters.
+
+Blocos maiores que `max_bloco` são ignorados (e registrados em log) para
+manter o custo próximo de linear mesmo com valores genéricos muito repetidos.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import re
+import logging
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+LARGURA_NOME = 32          # caracteres considerados na assinatura do nome
+TAMANHO_LOTE = 1_000_000   # linhas por lote ao calcular assinaturas
+
+# Regras fonéticas simplificadas para nomes em português (aplicadas em ordem)
+_REGRAS_FONETICAS = [(re.compile(padrao), substituto) for padrao, substituto in [
+    (r'ph', 'f'), (r'lh', 'l'), (r'nh', 'n'), (r'[cs]h', 'x'),
+    (r'c(?=[ei])', 's'), (r'qu?', 'k'), (r'c', 'k'), (r'g(?=[ei])', 'j'),
+    (r'y', 'i'), (r'w', 'v'), (r'z', 's'),
+    (r'h', ''), (r'(.)\1+', r'\1'),
+    (r'(?<=.)[aeiou]', ''),  # remove vogais após a primeira letra
+]]
+
+
+def normalizar_texto(serie: pd.Series) -> pd.Series:
+    """
+    Remove acentos, converte para minúsculas e mantém apenas letras e espaços.
+    
+    Processa apenas os valores distintos e remapeia pelos códigos.
+    """
+    codigos, distintos = pd.factorize(serie, sort=False)
+    texto = pd.Series(distintos, dtype='string').str.normalize('NFKD') \
+              .str.encode('ascii', errors='ignore').str.decode('ascii')
+    texto = texto.str.lower().str.replace(r'[^a-z ]+', ' ', regex=True)
+    texto = texto.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return pd.Series(texto.array.take(codigos, allow_fill=True), index=serie.index, name=serie.name)
+
+
+def _codigo_fonetico(palavra: str) -> str:
+    for padrao, substituto in _REGRAS_FONETICAS:
+        palavra = padrao.sub(substituto, palavra)
+    return palavra.upper()
+
+
+def chave_fonetica(serie: pd.Series) -> pd.Series:
+    """
+    Código fonético simplificado (estilo Metaphone PT-BR) de cada palavra.
+    
+    Nomes se repetem muito, então as regras são aplicadas só aos valores
+    distintos e o resultado é remapeado pelos códigos.
+    """
+    codigos, distintos = pd.factorize(serie, sort=False)
+    foneticos = pd.array([_codigo_fonetico(str(v)) for v in distintos], dtype='string')
+    return pd.Series(foneticos.take(codigos, allow_fill=True), index=serie.index, name=serie.name)
+
+
+def assinaturas_nome(nomes: pd.Series) -> np.ndarray:
+    """
+    Calcula a assinatura de bigramas (uint64) de cada nome.
+
+    Os nomes são convertidos para uma matriz de code points de largura fixa;
+    cada bigrama é espalhado em um dos 64 bits por hash. Apenas os nomes
+    distintos são processados, em lotes para limitar a memória.
+    """
+    codigos, distintos = pd.factorize(normalizar_texto(nomes).fillna(''), sort=False)
+    normalizados = pd.Series(distintos, dtype='string')
+    resultado = np.zeros(len(normalizados), dtype=np.uint64)
+    for inicio in range(0, len(normalizados), TAMANHO_LOTE):
+        lote = (' ' + normalizados.iloc[inicio:inicio + TAMANHO_LOTE] + ' ').to_numpy(dtype=f'U{LARGURA_NOME}')
+        cods = lote.view(np.uint32).reshape(len(lote), LARGURA_NOME).astype(np.uint64)
+        a, b = cods[:, :-1], cods[:, 1:]
+        bits = ((a * np.uint64(31)) ^ (b * np.uint64(2654435761))) % np.uint64(64)
+        marcados = np.where(b != 0, np.left_shift(np.uint64(1), bits), np.uint64(0))
+        resultado[inicio:inicio + len(lote)] = np.bitwise_or.reduce(marcados, axis=1)
+    return resultado[codigos]
+
+
+def _popcount(valores: np.ndarray) -> np.ndarray:
+    """Número de bits ligados por elemento (uint64)."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(valores).astype(np.int64)
+    return np.unpackbits(valores.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def similaridade_jaccard(assin_a: np.ndarray, assin_b: np.ndarray) -> np.ndarray:
+    """Similaridade de Jaccard aproximada entre pares de assinaturas."""
+    uniao = _popcount(assin_a | assin_b)
+    return np.where(uniao > 0, _popcount(assin_a & assin_b) / np.maximum(uniao, 1), 0.0)
+
+
+def pares_no_bloco(chave: pd.Series, max_bloco: int) -> pd.DataFrame:
+    """
+    Gera pares candidatos (posições a < b) dentro de cada bloco.
+
+    Args:
+        chave: Chave de blocagem por posição (NA = sem bloco)
+        max_bloco: Tamanho máximo de bloco considerado
+
+    Returns:
+        DataFrame com colunas a, b (posições)
+    """
+    blocos = pd.DataFrame({'chave': chave.to_numpy(), 'pos': np.arange(len(chave))}).dropna()
+    tamanho = blocos.groupby('chave', sort=False)['pos'].transform('size')
+    grandes = blocos.loc[tamanho > max_bloco, 'chave'].nunique()
+    if grandes:
+        logger.warning(f"  {grandes} blocos '{chave.name}' acima de {max_bloco} registros ignorados")
+    blocos = blocos[(tamanho > 1) & (tamanho <= max_bloco)]
+    if blocos.empty:
+        return pd.DataFrame({'a': np.array([], dtype=np.int64), 'b': np.array([], dtype=np.int64)})
+
+    pares = blocos.merge(blocos, on='chave', suffixes=('_a', '_b'))
+    pares = pares[pares['pos_a'] < pares['pos_b']]
+    return pd.DataFrame({'a': pares['pos_a'].to_numpy(np.int64), 'b': pares['pos_b'].to_numpy(np.int64)})
+
+
+def componentes_conexos(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Rotula componentes conexos por propagação de mínimo + pointer jumping.
+
+    Returns:
+        Array com o menor índice do componente de cada nó
+    """
+    rotulos = np.arange(n, dtype=np.int64)
+    if len(a) == 0:
+        return rotulos
+    while True:
+        minimo = np.minimum(rotulos[a], rotulos[b])
+        novos = rotulos.copy()
+        np.minimum.at(novos, a, minimo)
+        np.minimum.at(novos, b, minimo)
+        novos = novos[novos]
+        if np.array_equal(novos, rotulos):
+            return rotulos
+        rotulos = novos
+
+
+class DeduplicacaoClientes:
+    """Detecção de clientes duplicados com índices de blocagem."""
+
+    def __init__(self, limiar_telefone: float = 0.5, limiar_nome: float = 0.85,
+                 max_bloco: int = 200):
+        """
+        Args:
+            limiar_telefone: Similaridade mínima de nome para pares com mesmo telefone
+            limiar_nome: Similaridade mínima de nome para pares no bloco fonético
+            max_bloco: Tamanho máximo de bloco comparado
+        """
+        self.limiar_telefone = limiar_telefone
+        self.limiar_nome = limiar_nome
+        self.max_bloco = max_bloco
+
+    def chaves_blocagem(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Calcula as chaves de blocagem (email, telefone, nome fonético + nascimento)."""
+        chaves = pd.DataFrame(index=df.index)
+        if 'email' in df.columns:
+            chaves['email'] = df['email'].astype('string').str.strip().str.lower().replace('', pd.NA)
+        if 'telefone' in df.columns:
+            digitos = df['telefone'].astype('string').str.replace(r'\D', '', regex=True)
+            chaves['telefone'] = digitos.where(digitos.str.len() >= 10)
+        if 'nome' in df.columns and 'data_nascimento' in df.columns:
+            nome = normalizar_texto(df['nome'])
+            palavras = nome.str.split(' ')
+            primeiro = chave_fonetica(palavras.str[0])
+            ultimo = chave_fonetica(palavras.str[-1])
+            nascimento = df['data_nascimento'].astype('string')
+            chaves['nome_nascimento'] = (primeiro + '_' + ultimo + '_' + nascimento) \
+                .where((nome.str.len() > 0) & nascimento.notna())
+        return chaves
+
+    def _pares_aceitos(self, df: pd.DataFrame) -> List[pd.DataFrame]:
+        """Gera os pares de cada bloco e aplica a regra de decisão correspondente."""
+        chaves = self.chaves_blocagem(df)
+        assinaturas: Optional[np.ndarray] = None
+        aceitos = []
+
+        if 'email' in chaves.columns:
+            aceitos.append(pares_no_bloco(chaves['email'], self.max_bloco))
+
+        for bloco, limiar in (('telefone', self.limiar_telefone), ('nome_nascimento', self.limiar_nome)):
+            if bloco not in chaves.columns:
+                continue
+            pares = pares_no_bloco(chaves[bloco], self.max_bloco)
+            if pares.empty:
+                continue
+            if assinaturas is None:
+                assinaturas = assinaturas_nome(df['nome'])
+            sim = similaridade_jaccard(assinaturas[pares['a'].to_numpy()], assinaturas[pares['b'].to_numpy()])
+            aceitos.append(pares[sim >= limiar])
+        return aceitos
+
+    def atribuir_clusters(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Atribui `id_cluster` a cada cliente.
+
+        O id do cluster é o menor `id_cliente` entre os registros considerados
+        a mesma pessoa (registros sem duplicata ficam com o próprio id).
+
+        Args:
+            df: DataFrame de clientes corrigido
+
+        Returns:
+            Cópia do DataFrame com a coluna id_cluster
+        """
+        logger.info(f"Iniciando deduplicação aproximada de clientes ({len(df)} registros)")
+        df_resultado = df.copy()
+
+        aceitos = self._pares_aceitos(df) if len(df) else []
+        pares = pd.concat(aceitos, ignore_index=True) if aceitos else pd.DataFrame()
+        a = pares['a'].to_numpy(np.int64) if len(pares) else np.array([], dtype=np.int64)
+        b = pares['b'].to_numpy(np.int64) if len(pares) else np.array([], dtype=np.int64)
+        rotulos = componentes_conexos(len(df), a, b)
+
+        # Representante do cluster: menor id_cliente (numérico quando possível)
+        ids = df['id_cliente'].to_numpy()
+        ordem = pd.to_numeric(pd.Series(ids), errors='coerce')
+        if ordem.isna().any():
+            ordem = pd.Series(ids).astype('string')
+        representantes = ordem.groupby(rotulos).transform('idxmin').to_numpy()
+        df_resultado['id_cluster'] = ids[representantes]
+
+        n_duplicados = int((df_resultado['id_cluster'].to_numpy() != ids).sum())
+        if n_duplicados > 0:
+            logger.warning(f"  {n_duplicados} clientes vinculados a outro cadastro (id_cluster)")
+        logger.info(f"Deduplicação concluída ({pd.Series(rotulos).nunique()} clusters)")
+        return df_resultado
+
+
+def atribuir_clusters(df: pd.DataFrame) -> pd.DataFrame:
+    """Função de conveniência com os parâmetros padrão."""
+    return DeduplicacaoClientes().atribuir_clusters(df)
@@ -0,0 +1,333 @@
+"""
+Data Docs Incrementais
+======================
+
+O UpdateDataDocsAction reconstrói o site inteiro a cada execução, com custo
+proporcional ao número de resultados armazenados. Este construtor substitui
+essa action nos checkpoints (AtualizarDocsIncrementalAction) e mantém um
+estado do último build para renderizar apenas:
+
+- páginas de suites cujo JSON em gx/expectations/ mudou (hash do conteúdo)
+- páginas das execuções novas no store SQLite de resultados
+- o índice (limitado às últimas execuções de cada suite)
+
+O site fica em gx/uncommitted/data_docs/incremental_site/, separado do
+local_site do GX, para que um `build_data_docs` manual não sobrescreva o
+index.html deste build (nem o contrário). O build pode rodar em segundo
+plano, em um processo destacado, depois que o pipeline reporta sucesso.
+
+Uso:
+    python src/docs_incrementais.py            # build incremental
+    python src/docs_incrementais.py --completo # reconstrói todas as páginas
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import sys
+import json
+import fcntl
+import shutil
+import hashlib
+import logging
+import argparse
+import subprocess
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
+
+from armazem_resultados import ArmazemResultados, CAMINHO_PADRAO as STORE_PADRAO, resolver_caminho
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GX_ROOT = PROJECT_ROOT / "gx"
+SITE_PADRAO = GX_ROOT / "uncommitted" / "data_docs" / "incremental_site"
+EXPECTATIONS_PADRAO = GX_ROOT / "expectations"
+CSS_PADRAO = GX_ROOT / "plugins" / "custom_data_docs" / "styles" / "data_docs_custom_styles.css"
+
+ARQUIVO_ESTADO = ".estado_incremental.json"
+EXECUCOES_NO_INDICE = 20
+
+
+def _hash(caminho: Path) -> str:
+    return hashlib.sha256(caminho.read_bytes()).hexdigest()
+
+
+def _escrever_atomico(caminho: Path, conteudo: str) -> None:
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    temporario.write_text(conteudo, encoding='utf-8')
+    os.replace(temporario, caminho)
+
+
+def _pagina(titulo: str, corpo: str, raiz: str) -> str:
+    return (f"<!DOCTYPE html>\n<html lang=\"pt-BR\"><head><meta charset=\"utf-8\"><title>{escape(titulo)}</title>"
+            f"<link rel=\"stylesheet\" href=\"{raiz}static/styles/data_docs_custom_styles.css\"></head>\n"
+            f"<body><div class=\"ge-breadcrumbs\"><a class=\"ge-breadcrumbs-item\" href=\"{raiz}index.html\">"
+            f"TechCommerce Data Docs</a></div>\n<h1>{escape(titulo)}</h1>\n{corpo}\n</body></html>\n")
+
+
+def _tabela(cabecalho: List[str], linhas: List[List[str]], classe: str = "ge-index-page-table") -> str:
+    th = ''.join(f"<th>{escape(c)}</th>" for c in cabecalho)
+    trs = ''.join('<tr>' + ''.join(f"<td>{c}</td>" for c in linha) + '</tr>\n' for linha in linhas)
+    return f"<table class=\"{classe}\"><thead><tr>{th}</tr></thead><tbody>\n{trs}</tbody></table>"
+
+
+def _segmentos(suite: str) -> List[str]:
+    return [s for s in suite.split('.') if s]
+
+
+class ConstrutorDocsIncremental:
+    """Renderiza só as páginas afetadas desde o último build."""
+
+    def __init__(self, site_dir: Optional[Path] = None, expectations_dir: Optional[Path] = None,
+                 store_path: Optional[Path] = None, css_path: Optional[Path] = None):
+        self.site_dir = Path(site_dir) if site_dir else SITE_PADRAO
+        self.expectations_dir = Path(expectations_dir) if expectations_dir else EXPECTATIONS_PADRAO
+        self.store_path = Path(store_path) if store_path else STORE_PADRAO
+        self.css_path = Path(css_path) if css_path else CSS_PADRAO
+
+    # =====================================================================
+    # ESTADO
+    # =====================================================================
+
+    def _carregar_estado(self) -> Dict[str, Any]:
+        caminho = self.site_dir / ARQUIVO_ESTADO
+        if caminho.exists():
+            return json.loads(caminho.read_text(encoding='utf-8'))
+        return {'suites': {}, 'ultima_execucao': 0, 'css': None}
+
+    def _suites_em_disco(self) -> Dict[str, Path]:
+        """Nome da suite -> arquivo JSON em gx/expectations."""
+        suites = {}
+        for arquivo in sorted(self.expectations_dir.rglob('*.json')):
+            try:
+                conteudo = json.loads(arquivo.read_text(encoding='utf-8'))
+                nome = conteudo.get('expectation_suite_name') or conteudo.get('name')
+            except ValueError:
+                logger.warning(f"Suite ilegível ignorada: {arquivo}")
+                continue
+            if nome:
+                suites[nome] = arquivo
+        return suites
+
+    def alteracoes(self) -> Dict[str, Any]:
+        """Suites alteradas e execuções novas desde o último build."""
+        estado = self._carregar_estado()
+        suites = self._suites_em_disco()
+        hashes = {nome: _hash(arquivo) for nome, arquivo in suites.items()}
+        alteradas = sorted(n for n, h in hashes.items() if estado['suites'].get(n) != h)
+        removidas = sorted(set(estado['suites']) - set(hashes))
+        novas = []
+        if self.store_path.exists():
+            with ArmazemResultados(self.store_path) as store:
+                novas = [linha[0] for linha in store.con.execute(
+                    "SELECT id FROM execucoes WHERE id > ? ORDER BY id", (estado['ultima_execucao'],))]
+        return {'suites': alteradas, 'suites_removidas': removidas, 'execucoes': novas, 'hashes': hashes}
+
+    # =====================================================================
+    # RENDERIZAÇÃO
+    # =====================================================================
+
+    def _caminho_suite(self, suite: str) -> Path:
+        return self.site_dir / 'expectations' / Path(*_segmentos(suite)).with_suffix('.html')
+
+    def _caminho_execucao(self, suite: str, run_name: Optional[str], execucao_id: int) -> Path:
+        return self.site_dir / 'validations' / Path(*_segmentos(suite)) / (run_name or 'sem_nome') / \
+            f"{execucao_id}.html"
+
+    def _relativo(self, destino: Path) -> str:
+        return destino.relative_to(self.site_dir).as_posix()
+
+    def _raiz(self, pagina: Path) -> str:
+        return '../' * (len(pagina.relative_to(self.site_dir).parts) - 1)
+
+    def _renderizar_suite(self, suite: str, arquivo: Path) -> None:
+        conteudo = json.loads(arquivo.read_text(encoding='utf-8'))
+        linhas = []
+        for exp in conteudo.get('expectations') or []:
+            tipo = exp.get('type') or exp.get('expectation_type', '')
+            kwargs = dict(exp.get('kwargs') or {})
+            coluna = kwargs.pop('column', '')
+            linhas.append([escape(tipo), escape(str(coluna)), escape(json.dumps(kwargs, ensure_ascii=False,
+                                                                                 default=str))])
+        destino = self._caminho_suite(suite)
+        corpo = _tabela(['Expectativa', 'Coluna', 'Parâmetros'], linhas) if linhas else \
+            "<p>Suite sem expectativas persistidas.</p>"
+        _escrever_atomico(destino, _pagina(f"Suite {suite}", corpo, self._raiz(destino)))
+
+    def _renderizar_execucao(self, store: ArmazemResultados, execucao_id: int) -> None:
+        suite, run_name, run_time, sucesso, origem = store.con.execute(
+            "SELECT suite, run_name, run_time, sucesso, origem FROM execucoes WHERE id = ?",
+            (execucao_id,)).fetchone()
+        linhas = [[('✅' if ok else '❌'), escape(tipo), escape(coluna or ''), str(elementos or 0),
+                   str(inesperados or 0), f"{percentual or 0:.2f}%"]
+                  for tipo, coluna, ok, elementos, inesperados, percentual in store.con.execute(
+                      "SELECT tipo_expectativa, coluna, sucesso, elementos, inesperados, percentual_inesperado "
+                      "FROM resultados WHERE execucao_id = ? ORDER BY sucesso, tipo_expectativa, coluna",
+                      (execucao_id,))]
+        destino = self._caminho_execucao(suite, run_name, execucao_id)
+        corpo = (f"<p>Execução <b>{escape(run_name or '')}</b> em {escape(run_time)} "
+                 f"({escape(origem or '')}): {'SUCESSO' if sucesso else 'FALHA'}</p>\n"
+                 + _tabela(['', 'Expectativa', 'Coluna', 'Avaliados', 'Falhas', '% falhas'], linhas))
+        _escrever_atomico(destino, _pagina(f"Validação {suite}", corpo, self._raiz(destino)))
+
+    def _renderizar_indice(self, suites: Dict[str, Path]) -> None:
+        blocos = []
+        store = ArmazemResultados(self.store_path) if self.store_path.exists() else None
+        try:
+            nomes = sorted(set(suites) | set(
+                linha[0] for linha in (store.con.execute("SELECT DISTINCT suite FROM execucoes") if store else [])))
+            for suite in nomes:
+                link_suite = (f"<a class=\"ge-index-page-table-expectation-suite-link\" "
+                              f"href=\"{self._relativo(self._caminho_suite(suite))}\">{escape(suite)}</a>"
+                              if suite in suites else escape(suite))
+                execucoes = store.con.execute(
+                    "SELECT id, run_name, run_time, sucesso FROM execucoes WHERE suite = ? "
+                    "ORDER BY run_time DESC LIMIT ?", (suite, EXECUCOES_NO_INDICE)).fetchall() if store else []
+                links = ''.join(
+                    f"<li class=\"ge-index-page-table-validation-links-item\">{'✅' if ok else '❌'} "
+                    f"<a href=\"{self._relativo(self._caminho_execucao(suite, run_name, i))}\">"
+                    f"{escape(run_time)}</a></li>"
+                    for i, run_name, run_time, ok in execucoes)
+                blocos.append([link_suite, f"<ul class=\"ge-index-page-table-validation-links-list\">{links}</ul>"])
+        finally:
+            if store:
+                store.fechar()
+        corpo = _tabela(['Suite', f'Últimas {EXECUCOES_NO_INDICE} validações'], blocos)
+        _escrever_atomico(self.site_dir / 'index.html', _pagina("TechCommerce Data Docs", corpo, ''))
+
+    # =====================================================================
+    # BUILD
+    # =====================================================================
+
+    def construir(self, completo: bool = False) -> Dict[str, int]:
+        """
+        Executa o build (incremental, salvo `completo=True`).
+
+        Um lock de arquivo serializa builds concorrentes (ex.: dois pipelines
+        terminando juntos); o segundo apenas encontra menos alterações.
+
+        Returns:
+            Contagens de páginas renderizadas e removidas
+        """
+        self.site_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.site_dir / '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            estado = {'suites': {}, 'ultima_execucao': 0, 'css': None} if completo else self._carregar_estado()
+            if completo:
+                _escrever_atomico(self.site_dir / ARQUIVO_ESTADO, json.dumps(estado))
+            mudancas = self.alteracoes()
+            suites = self._suites_em_disco()
+
+            for suite in mudancas['suites']:
+                self._renderizar_suite(suite, suites[suite])
+            for suite in mudancas['suites_removidas']:
+                self._caminho_suite(suite).unlink(missing_ok=True)
+            if mudancas['execucoes']:
+                with ArmazemResultados(self.store_path) as store:
+                    for execucao_id in mudancas['execucoes']:
+                        self._renderizar_execucao(store, execucao_id)
+
+            css = _hash(self.css_path) if self.css_path.exists() else None
+            if css and css != estado.get('css'):
+                destino = self.site_dir / 'static' / 'styles' / self.css_path.name
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(self.css_path, destino)
+
+            alterou = mudancas['suites'] or mudancas['suites_removidas'] or mudancas['execucoes']
+            if alterou or not (self.site_dir / 'index.html').exists():
+                self._renderizar_indice(suites)
+
+            _escrever_atomico(self.site_dir / ARQUIVO_ESTADO, json.dumps({
+                'suites': mudancas['hashes'],
+                'ultima_execucao': max(mudancas['execucoes'], default=estado['ultima_execucao']),
+                'css': css,
+            }, indent=2))
+
+        resumo = {'suites': len(mudancas['suites']), 'suites_removidas': len(mudancas['suites_removidas']),
+                  'execucoes': len(mudancas['execucoes']), 'indice': int(bool(alterou))}
+        logger.info(f"Data Docs incrementais em {self.site_dir}: {resumo}")
+        return resumo
+
+
+def construir_em_segundo_plano(log_path: Optional[Path] = None, site_dir: Optional[Path] = None,
+                               store_path: Optional[Path] = None,
+                               expectations_dir: Optional[Path] = None) -> subprocess.Popen:
+    """
+    Dispara o build incremental em um processo destacado.
+
+    O processo sobrevive ao término do pipeline; a saída vai para
+    `log_path` (padrão: <site>/.build.log).
+    """
+    site_dir = Path(site_dir) if site_dir else SITE_PADRAO
+    log_path = Path(log_path) if log_path else site_dir / '.build.log'
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    comando = [sys.executable, str(Path(__file__).resolve()), '--site', str(site_dir)]
+    if store_path:
+        comando += ['--store', str(store_path)]
+    if expectations_dir:
+        comando += ['--expectations', str(expectations_dir)]
+    with open(log_path, 'a') as saida:
+        processo = subprocess.Popen(comando, stdout=saida,
+                                    stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                    start_new_session=True, cwd=str(PROJECT_ROOT))
+    logger.info(f"Data Docs incrementais em segundo plano (pid {processo.pid}, log: {log_path})")
+    return processo
+
+
+# =====================================================================
+# ACTION DE CHECKPOINT
+# =====================================================================
+
+try:
+    from great_expectations.checkpoint.actions import ValidationAction
+except ImportError:  # pragma: no cover - depende do ambiente
+    ValidationAction = None
+
+if ValidationAction is not None:
+
+    class AtualizarDocsIncrementalAction(ValidationAction):
+        """
+        Substitui o UpdateDataDocsAction pelo build incremental.
+
+        Deve vir depois de ArmazenarResultadoSQLiteAction na action_list,
+        pois as páginas de execução são lidas do store SQLite.
+
+        YAML (o GX importa `module_name` de gx/plugins/):
+            - name: update_data_docs
+              action:
+                class_name: AtualizarDocsIncrementalAction
+                module_name: acoes_techcommerce
+                segundo_plano: true
+        """
+
+        type: Literal["atualizar_docs_incremental"] = "atualizar_docs_incremental"
+        segundo_plano: bool = True
+        site_dir: str = str(SITE_PADRAO)
+        store_path: str = str(STORE_PADRAO)
+
+        def run(self, checkpoint_result, action_context=None) -> dict:
+            caminhos = {'site_dir': resolver_caminho(self.site_dir),
+                        'store_path': resolver_caminho(self.store_path)}
+            if self.segundo_plano:
+                return {'pid': construir_em_segundo_plano(**caminhos).pid}
+            return ConstrutorDocsIncremental(**caminhos).construir()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build incremental dos Data Docs")
+    parser.add_argument('--completo', action='store_true', help="Reconstrói todas as páginas")
+    parser.add_argument('--site', type=Path, default=SITE_PADRAO)
+    parser.add_argument('--store', type=Path, default=STORE_PADRAO)
+    parser.add_argument('--expectations', type=Path, default=EXPECTATIONS_PADRAO)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    ConstrutorDocsIncremental(args.site, args.expectations, args.store).construir(completo=args.completo)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+Execução Distribuída das Correções
+==================================
+
+Divide as entradas raw por hash da chave e executa os `corrigir_*` do
+CorrecaoAutomatica em processos trabalhadores, locais ou em outros hosts,
+por um protocolo simples sobre TCP:
+
+    [tamanho do cabeçalho (4 bytes)][tamanho do corpo (8 bytes)]
+    [cabeçalho JSON][corpo: DataFrame em Arrow IPC stream, com o índice]
+
+A partição de uma linha é `hash(chave numérica) mod P`, a mesma regra para
+tabelas filhas e pais (a FK compara chaves como número, ver
+`_chave_numerica`). Assim, as chaves de uma partição de clientes ficam no
+mesmo trabalhador que as vendas daquela partição de id_cliente, e nenhum
+trabalhador recebe a tabela de referência inteira:
+
+- clientes / produtos: particionados pela própria chave (a deduplicação
+  por chave é local à partição)
+- vendas: chaves de clientes e produtos distribuídas por partição; as
+  vendas são particionadas por id_cliente (semi-join com as chaves de
+  clientes da partição) e as sobreviventes por id_produto (correção +
+  semi-join com as chaves de produtos)
+- logística: particionada por id_entrega (deduplicação e correção) e o
+  resultado por id_venda (semi-join com as chaves de vendas)
+
+As regras de vendas e logística são linha a linha (exceto a deduplicação,
+que roda antes do filtro de FK), então o resultado é o mesmo da execução
+local, na ordem raw. A linhagem registra origem e destino, sem o bitmask
+de regras (como no backend polars).
+
+O protocolo não tem autenticação: use apenas em rede confiável.
+
+Uso:
+    python src/execucao_distribuida.py --trabalhador --host 0.0.0.0 --porta 9100
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import sys
+import json
+import socket
+import struct
+import logging
+import argparse
+import socketserver
+import multiprocessing
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Adicionar src ao path para encontrar os módulos
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+import correcao_automatica as ca
+import log_estruturado
+from configuracao import FORMATO_DATA_PADRAO
+
+logger = logging.getLogger(__name__)
+
+PORTA_PADRAO = 9100
+_PREFIXO = struct.Struct('!IQ')
+
+Endereco = Tuple[str, int]
+
+
+# =====================================================================
+# PARTICIONAMENTO E PROTOCOLO
+# =====================================================================
+
+def particao_por_chave(serie: pd.Series, particoes: int) -> np.ndarray:
+    """Partição de cada linha: hash da chave como número (chaves não numéricas: hash de NaN)."""
+    numeros = pd.to_numeric(serie, errors='coerce').astype('float64').to_numpy()
+    return (pd.util.hash_array(numeros) % np.uint64(particoes)).astype(np.int64)
+
+
+def dividir(df: pd.DataFrame, coluna: str, particoes: int) -> Dict[int, pd.DataFrame]:
+    """Divide o DataFrame em `particoes` partes pela chave (a ordem raw é mantida em cada parte)."""
+    codigos = particao_por_chave(df[coluna], particoes)
+    return {p: df[codigos == p] for p in range(particoes)}
+
+
+def enviar_mensagem(conexao: socket.socket, cabecalho: dict, df: Optional[pd.DataFrame] = None) -> None:
+    meta = json.dumps(cabecalho).encode('utf-8')
+    corpo = b''
+    if df is not None:
+        tabela = pa.Table.from_pandas(df, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa_ipc.new_stream(sink, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        corpo = sink.getvalue()
+    conexao.sendall(_PREFIXO.pack(len(meta), len(corpo)) + meta)
+    if len(corpo):
+        conexao.sendall(corpo)
+
+
+def _ler(arquivo, n: int) -> bytes:
+    dados = arquivo.read(n)
+    if len(dados) != n:
+        raise EOFError("conexão encerrada no meio de uma mensagem")
+    return dados
+
+
+def receber_mensagem(arquivo) -> Tuple[dict, Optional[pd.DataFrame]]:
+    """Lê uma mensagem de um arquivo de socket ('rb'); EOFError se a conexão foi fechada."""
+    prefixo = arquivo.read(_PREFIXO.size)
+    if not prefixo:
+        raise EOFError("conexão encerrada")
+    if len(prefixo) != _PREFIXO.size:
+        raise EOFError("conexão encerrada no meio de uma mensagem")
+    tamanho_meta, tamanho_corpo = _PREFIXO.unpack(prefixo)
+    cabecalho = json.loads(_ler(arquivo, tamanho_meta))
+    df = None
+    if tamanho_corpo:
+        df = pa_ipc.open_stream(pa.py_buffer(_ler(arquivo, tamanho_corpo))).read_all().to_pandas()
+    return cabecalho, df
+
+
+# =====================================================================
+# TRABALHADOR
+# =====================================================================
+
+def corrigir_sem_fk(corretor: ca.CorrecaoAutomatica, dataset: str, df: pd.DataFrame) -> pd.DataFrame:
+    """`corrigir_<dataset>` sem as referências (FKs verificadas por semi-join)."""
+    metodo = getattr(corretor, f"corrigir_{dataset}")
+    if dataset == 'vendas':
+        return metodo(df, None, None)
+    if dataset == 'logistica':
+        return metodo(df, None)
+    return metodo(df)
+
+
+class TrabalhadorCorrecao:
+    """Estado de um trabalhador: o corretor e as chaves de referência das suas partições."""
+
+    def __init__(self):
+        self.corretor = ca.CorrecaoAutomatica()
+        self.chaves: Dict[Tuple[str, int], set] = {}
+
+    def _semijoin(self, df: pd.DataFrame, referencia: str, particao: int, coluna: str) -> pd.DataFrame:
+        validas = self.chaves[(referencia, particao)]
+        return df[pd.to_numeric(df[coluna], errors='coerce').isin(validas)]
+
+    def processar(self, cabecalho: dict, df: Optional[pd.DataFrame]) -> Tuple[dict, Optional[pd.DataFrame]]:
+        """Executa uma operação do coordenador: (resposta, DataFrame de saída ou None)."""
+        operacao = cabecalho['op']
+        if operacao == 'iniciar':
+            self.corretor = ca.CorrecaoAutomatica(formato_data=cabecalho.get('formato_data', FORMATO_DATA_PADRAO),
+                                                  backend=cabecalho.get('backend', 'pandas'))
+            self.chaves.clear()
+            return {'ok': True}, None
+        if operacao == 'guardar_chaves':
+            # Mesma regra de ids válidos do CorrecaoAutomatica
+            chaves = set(df[cabecalho['coluna']].dropna().astype(int).tolist())
+            self.chaves[(cabecalho['referencia'], cabecalho['particao'])] = chaves
+            return {'ok': True, 'chaves': len(chaves)}, None
+        if operacao == 'semijoin':
+            return {'ok': True}, self._semijoin(df, cabecalho['referencia'], cabecalho['particao'],
+                                                cabecalho['coluna'])
+        if operacao == 'corrigir':
+            saida = corrigir_sem_fk(self.corretor, cabecalho['dataset'], df)
+            for filtro in cabecalho.get('filtros', []):
+                saida = self._semijoin(saida, filtro['referencia'], cabecalho['particao'], filtro['coluna'])
+            return {'ok': True}, saida
+        raise ValueError(f"Operação desconhecida: {operacao}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                cabecalho, df = receber_mensagem(self.rfile)
+            except EOFError:
+                return
+            try:
+                resposta, saida = self.server.trabalhador.processar(cabecalho, df)
+            except Exception as e:
+                logger.exception(f"Falha na operação {cabecalho.get('op')}")
+                resposta, saida = {'ok': False, 'erro': f"{type(e).__name__}: {e}"}, None
+            enviar_mensagem(self.connection, resposta, saida)
+
+
+class ServidorTrabalhador(socketserver.TCPServer):
+    """Servidor de um trabalhador (uma conexão de coordenador por vez)."""
+
+    allow_reuse_address = True
+
+    def __init__(self, endereco: Endereco):
+        super().__init__(endereco, _Handler)
+        self.trabalhador = TrabalhadorCorrecao()
+
+
+def _servir_local(host: str, fila, fila_log=None) -> None:
+    # Registros do trabalhador vão para o pipeline.log do coordenador. Contagens
+    # por partição são ruído: o coordenador registra os totais
+    log_estruturado.configurar_processo_filho(fila_log)
+    logging.getLogger('correcao_automatica').setLevel(logging.ERROR)
+    servidor = ServidorTrabalhador((host, 0))
+    fila.put(servidor.server_address[1])
+    servidor.serve_forever()
+
+
+def iniciar_trabalhadores_locais(n: int, host: str = '127.0.0.1') -> Tuple[List, List[Endereco]]:
+    """Inicia n trabalhadores em processos locais; retorna (processos, endereços)."""
+    contexto = multiprocessing.get_context('spawn')
+    fila = contexto.Queue()
+    fila_log = log_estruturado.fila_processos()
+    processos = [contexto.Process(target=_servir_local, args=(host, fila, fila_log), daemon=True)
+                 for _ in range(n)]
+    for processo in processos:
+        processo.start()
+    portas = [fila.get(timeout=120) for _ in processos]
+    return processos, [(host, porta) for porta in portas]
+
+
+def endereco(texto: str) -> Endereco:
+    """'host:porta' -> (host, porta)."""
+    host, _, porta = texto.rpartition(':')
+    return host or '127.0.0.1', int(porta)
+
+
+# =====================================================================
+# COORDENADOR
+# =====================================================================
+
+class ExecucaoDistribuida:
+    """
+    Coordenador: mesma interface de correção do CorrecaoAutomatica, com as
+    partições despachadas aos trabalhadores (partição p -> trabalhador p mod N).
+    """
+
+    def __init__(self, enderecos: Sequence[Endereco], particoes: Optional[int] = None,
+                 formato_data: str = FORMATO_DATA_PADRAO, backend: str = 'pandas',
+                 processos: Iterable = ()):
+        """
+        Args:
+            enderecos: (host, porta) de cada trabalhador
+            particoes: Número de partições (padrão: uma por trabalhador)
+            formato_data, backend: Repassados ao CorrecaoAutomatica dos trabalhadores
+            processos: Processos locais encerrados em `fechar()`
+        """
+        if not enderecos:
+            raise ValueError("Execução distribuída sem trabalhadores")
+        self.enderecos = list(enderecos)
+        self.particoes = int(particoes or len(self.enderecos))
+        self._processos = list(processos)
+        self._local = ca.CorrecaoAutomatica(formato_data=formato_data, backend=backend)
+        self._conexoes = []
+        for host, porta in self.enderecos:
+            conexao = socket.create_connection((host, porta))
+            self._conexoes.append((conexao, conexao.makefile('rb')))
+        for i in range(len(self._conexoes)):
+            self._chamar(i, {'op': 'iniciar', 'formato_data': formato_data, 'backend': backend})
+        logger.info(f"Execução distribuída: {len(self.enderecos)} trabalhadores, {self.particoes} partições")
+
+    @classmethod
+    def locais(cls, trabalhadores: int, **kwargs) -> 'ExecucaoDistribuida':
+        """Coordenador com trabalhadores em processos locais."""
+        processos, enderecos = iniciar_trabalhadores_locais(trabalhadores)
+        return cls(enderecos, processos=processos, **kwargs)
+
+    @classmethod
+    def do_config(cls, config: dict, formato_data: str = FORMATO_DATA_PADRAO,
+                  backend: str = 'pandas') -> Optional['ExecucaoDistribuida']:
+        """Cria o coordenador conforme `execution.distribuido` (None se desabilitado)."""
+        secao = (config.get('execution') or {}).get('distribuido') or {}
+        if not secao.get('enabled', False):
+            return None
+        parametros = dict(particoes=secao.get('particoes'), formato_data=formato_data, backend=backend)
+        if secao.get('trabalhadores'):
+            return cls([endereco(t) for t in secao['trabalhadores']], **parametros)
+        return cls.locais(int(secao.get('locais') or multiprocessing.cpu_count()), **parametros)
+
+    def fechar(self) -> None:
+        for conexao, arquivo in self._conexoes:
+            arquivo.close()
+            conexao.close()
+        self._conexoes = []
+        for processo in self._processos:
+            processo.terminate()
+            processo.join()
+        self._processos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    # -----------------------------------------------------------------
+
+    def _chamar(self, i: int, cabecalho: dict, df: Optional[pd.DataFrame] = None) -> Tuple[dict, Optional[pd.DataFrame]]:
+        conexao, arquivo = self._conexoes[i]
+        enviar_mensagem(conexao, cabecalho, df)
+        resposta, saida = receber_mensagem(arquivo)
+        if not resposta.get('ok'):
+            raise RuntimeError(f"Trabalhador {self.enderecos[i]}: {resposta.get('erro')}")
+        return resposta, saida
+
+    def _mapear(self, cabecalho: dict, partes: Dict[int, pd.DataFrame]) -> Dict[int, Optional[pd.DataFrame]]:
+        """Executa a operação em cada partição, em paralelo entre os trabalhadores."""
+        por_trabalhador = defaultdict(list)
+        for particao in partes:
+            por_trabalhador[particao % len(self._conexoes)].append(particao)
+
+        def executar(i: int) -> Dict[int, Optional[pd.DataFrame]]:
+            return {p: self._chamar(i, {**cabecalho, 'particao': p}, partes[p])[1] for p in por_trabalhador[i]}
+
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(por_trabalhador))) as pool:
+            for parcial in pool.map(executar, list(por_trabalhador)):
+                resultados.update(parcial)
+        return resultados
+
+    def _distribuir_chaves(self, referencia: str, df: pd.DataFrame, coluna: str) -> None:
+        self._mapear({'op': 'guardar_chaves', 'referencia': referencia, 'coluna': coluna},
+                     dividir(df[[coluna]], coluna, self.particoes))
+
+    def _executar(self, cabecalho: dict, df: pd.DataFrame, coluna: str) -> Optional[pd.DataFrame]:
+        """Particiona por `coluna`, executa e junta as partições na ordem raw."""
+        partes = {p: parte for p, parte in dividir(df, coluna, self.particoes).items() if len(parte)}
+        saidas = [saida for saida in self._mapear(cabecalho, partes).values() if saida is not None and len(saida)]
+        return pd.concat(saidas).sort_index() if saidas else None
+
+    def _corrigir(self, dataset: str, df: pd.DataFrame, coluna: str, filtros: List[dict] = ()) -> pd.DataFrame:
+        saida = self._executar({'op': 'corrigir', 'dataset': dataset, 'filtros': list(filtros)}, df, coluna)
+        if saida is None:   # nenhuma linha: tipos de saída da correção local
+            return corrigir_sem_fk(self._local, dataset, df.iloc[:0])
+        return saida
+
+    def _semijoin(self, df: pd.DataFrame, referencia: str, coluna: str) -> pd.DataFrame:
+        saida = self._executar({'op': 'semijoin', 'referencia': referencia, 'coluna': coluna}, df, coluna)
+        return df.iloc[:0] if saida is None else saida
+
+    # -----------------------------------------------------------------
+
+    def corrigir_clientes(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._corrigir('clientes', df, 'id_cliente')
+
+    def corrigir_produtos(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._corrigir('produtos', df, 'id_produto')
+
+    def corrigir_vendas(self, df: pd.DataFrame, df_clientes_clean: Optional[pd.DataFrame],
+                        df_produtos_clean: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """FK de cliente por semi-join nas partições de id_cliente; correção e FK de produto nas de id_produto."""
+        filtros = []
+        if df_clientes_clean is not None:
+            self._distribuir_chaves('clientes', df_clientes_clean, 'id_cliente')
+            validas = self._semijoin(df, 'clientes', 'id_cliente')
+            if len(validas) < len(df):
+                logger.warning(f"  Removidas {len(df) - len(validas)} vendas com id_cliente inválido (semi-join)")
+            df = validas
+        if df_produtos_clean is not None:
+            self._distribuir_chaves('produtos', df_produtos_clean, 'id_produto')
+            filtros.append({'referencia': 'produtos', 'coluna': 'id_produto'})
+        return self._corrigir('vendas', df, 'id_produto', filtros)
+
+    def corrigir_logistica(self, df: pd.DataFrame, df_vendas_clean: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Deduplicação e correção nas partições de id_entrega; FK por semi-join nas de id_venda."""
+        corrigidas = self._corrigir('logistica', df, 'id_entrega')
+        if df_vendas_clean is None:
+            return corrigidas
+        self._distribuir_chaves('vendas', df_vendas_clean, 'id_venda')
+        validas = self._semijoin(corrigidas, 'vendas', 'id_venda')
+        if len(validas) < len(corrigidas):
+            logger.warning(f"  Removidas {len(corrigidas) - len(validas)} entregas com id_venda inválido (semi-join)")
+        return validas
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Trabalhador da execução distribuída das correções")
+    parser.add_argument('--trabalhador', action='store_true', help='Inicia um trabalhador')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    args = parser.parse_args(argv)
+    if not args.trabalhador:
+        parser.error("use --trabalhador (o coordenador é o pipeline, com execution.distribuido.enabled)")
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    servidor = ServidorTrabalhador((args.host, args.porta))
+    logger.info(f"Trabalhador de correção em {args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Encerrando trabalhador")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
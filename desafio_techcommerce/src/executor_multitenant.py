@@ -0,0 +1,336 @@
+"""
+Executor Multi-Tenant com Agendamento por Prazo
+===============================================
+
+Executa o pipeline_ingestao para vários marketplaces (tenants), cada um com
+a sua árvore data/raw, em um pool de processos compartilhado:
+
+- Agendamento por folga (least slack first): o tenant cujo início mais
+  tardio possível (prazo - duração estimada) vem antes é despachado antes;
+  empates são desfeitos pela prioridade (maior primeiro).
+- Prazo padrão: SLA de temporalidade da governança (vendas D+1 disponíveis
+  até 07:00 UTC), ou prazo próprio por tenant.
+- Duração estimada: média móvel exponencial das execuções anteriores do
+  tenant (data/quality/multitenant/historico.json).
+- Cada worker importa o pipeline e cria um GX context uma única vez
+  (initializer do pool) e o reaproveita em todas as execuções que receber.
+- Relatório agregado: data/quality/multitenant/<timestamp>.json e tabela
+  no stdout (status, espera, duração, prazo cumprido, linhas por dataset).
+
+Arquivo de tenants (YAML):
+    sla_padrao: "07:00"          # HH:MM UTC ou ISO 8601
+    tenants:
+      - nome: marketplace_a
+        raiz: /dados/tenants/a   # contém data/raw/*.csv (e opcionalmente config/)
+        prioridade: 2
+        prazo: "06:00"
+
+Uso:
+    python src/executor_multitenant.py --tenants config/tenants.yaml --workers 4
+    python src/executor_multitenant.py /dados/tenants/a /dados/tenants/b
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import sys
+import json
+import time
+import yaml
+import logging
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, time as hora, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import configuracao
+import log_estruturado
+from manifesto_execucao import ManifestoExecucao, ManifestoInvalidoError
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+RELATORIOS_PATH = PROJECT_ROOT / "data" / "quality" / "multitenant"
+
+# Governança, Temporalidade: vendas D+1 disponíveis até 07:00 UTC
+SLA_PADRAO = "07:00"
+DURACAO_PADRAO_S = 60.0
+PESO_HISTORICO = 0.3   # peso da última execução na média móvel
+
+
+def prazo_absoluto(prazo: str, agora: Optional[datetime] = None) -> datetime:
+    """Converte 'HH:MM' (próxima ocorrência, UTC) ou ISO 8601 em datetime UTC."""
+    agora = agora or datetime.now(timezone.utc)
+    try:
+        h = hora.fromisoformat(prazo)
+    except ValueError:
+        data = datetime.fromisoformat(prazo)
+        return data if data.tzinfo else data.replace(tzinfo=timezone.utc)
+    candidato = datetime.combine(agora.date(), h, tzinfo=timezone.utc)
+    return candidato if candidato > agora else candidato + timedelta(days=1)
+
+
+@dataclass
+class Tenant:
+    """Um marketplace e os seus parâmetros de agendamento."""
+    nome: str
+    raiz: Path
+    prioridade: int = 0
+    prazo: Optional[datetime] = None
+    duracao_estimada_s: float = DURACAO_PADRAO_S
+
+    @property
+    def inicio_limite(self) -> datetime:
+        """Último instante de início que ainda cumpre o prazo (pela estimativa)."""
+        return self.prazo - timedelta(seconds=self.duracao_estimada_s)
+
+
+def carregar_tenants(arquivo: Optional[Path] = None, raizes: Optional[List[str]] = None,
+                     agora: Optional[datetime] = None, sla: Optional[str] = None) -> List[Tenant]:
+    """
+    Lê os tenants do YAML e/ou de uma lista de raízes (nome = nome do diretório).
+
+    O prazo de cada tenant é o seu `prazo`, senão o `sla_padrao` do arquivo,
+    senão `sla` (seção multitenant do config.yaml), senão 07:00 UTC.
+    """
+    definicao = yaml.safe_load(Path(arquivo).read_text(encoding='utf-8')) if arquivo else {}
+    definicao = definicao or {}
+    sla = str(definicao.get('sla_padrao') or sla or SLA_PADRAO)
+    tenants = []
+    for item in definicao.get('tenants') or []:
+        raiz = Path(item['raiz'])
+        if not raiz.is_absolute():
+            raiz = Path(arquivo).parent / raiz
+        tenants.append(Tenant(item.get('nome', raiz.name), raiz, int(item.get('prioridade', 0)),
+                              prazo_absoluto(str(item.get('prazo', sla)), agora)))
+    for raiz in raizes or []:
+        tenants.append(Tenant(Path(raiz).name, Path(raiz), prazo=prazo_absoluto(sla, agora)))
+    nomes = [t.nome for t in tenants]
+    repetidos = {n for n in nomes if nomes.count(n) > 1}
+    if repetidos:
+        raise ValueError(f"Tenants com nome repetido: {', '.join(sorted(repetidos))}")
+    return tenants
+
+
+class HistoricoDuracoes:
+    """Média móvel exponencial da duração de cada tenant."""
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self.duracoes: Dict[str, float] = json.loads(self.caminho.read_text(encoding='utf-8')) \
+            if self.caminho.exists() else {}
+
+    def estimativa(self, nome: str) -> float:
+        return self.duracoes.get(nome, DURACAO_PADRAO_S)
+
+    def registrar(self, nome: str, duracao_s: float) -> None:
+        anterior = self.duracoes.get(nome)
+        self.duracoes[nome] = duracao_s if anterior is None else \
+            PESO_HISTORICO * duracao_s + (1 - PESO_HISTORICO) * anterior
+
+    def salvar(self) -> None:
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.caminho.write_text(json.dumps(self.duracoes, indent=2), encoding='utf-8')
+
+
+def ordenar(tenants: List[Tenant]) -> List[Tenant]:
+    """Ordem de despacho: menor folga primeiro, depois maior prioridade, depois nome."""
+    return sorted(tenants, key=lambda t: (t.inicio_limite, -t.prioridade, t.nome))
+
+
+# =====================================================================
+# WORKER
+# =====================================================================
+
+_CONTEXTO_GX = None
+
+
+def _aquecer_worker(gx_root: str) -> None:
+    """Initializer do pool: importa o pipeline e cria o GX context do worker."""
+    global _CONTEXTO_GX
+    import great_expectations as gx
+    import pipeline_ingestao  # noqa: F401 (aquece os imports do pipeline)
+    _CONTEXTO_GX = gx.get_context(project_root_dir=gx_root)
+
+
+def _executar_tenant(nome: str, raiz: str, run_id: str, argv_extra: List[str]) -> Dict[str, Any]:
+    """Executa o pipeline de um tenant no worker atual."""
+    import pipeline_ingestao
+
+    raiz = Path(raiz)
+    saida_log = raiz / "data" / "quality" / "pipeline.out"
+    saida_log.parent.mkdir(parents=True, exist_ok=True)
+    inicio = time.time()
+    erro = None
+    with open(saida_log, 'a', encoding='utf-8') as saida, \
+            contextlib.redirect_stdout(saida), contextlib.redirect_stderr(saida):
+        try:
+            sucesso = bool(pipeline_ingestao.main(['--raiz', str(raiz), '--run-id', run_id] + argv_extra,
+                                                  context=_CONTEXTO_GX))
+        except Exception as e:  # falha de um tenant não derruba o worker
+            sucesso, erro = False, f"{type(e).__name__}: {e}"
+        finally:
+            # O main reconfigura o logging para o pipeline.log do tenant; a thread
+            # de escrita é encerrada antes de o stdout/stderr redirecionado fechar
+            log_estruturado.encerrar_logging()
+    fim = time.time()
+
+    resultado = {'sucesso': sucesso, 'erro': erro, 'inicio': inicio, 'fim': fim, 'pid': os.getpid(),
+                 'run_id': run_id, 'linhas': {}, 'validacao': None}
+    try:
+        manifesto = ManifestoExecucao.carregar(pipeline_ingestao.RUNS_PATH, run_id)
+    except ManifestoInvalidoError:
+        return resultado
+    resultado['linhas'] = manifesto.resultado_etapa('correcao')
+    resultado['validacao'] = manifesto.resultado_etapa('validacao').get('sucesso')
+    return resultado
+
+
+# =====================================================================
+# EXECUTOR
+# =====================================================================
+
+@dataclass
+class ResultadoTenant:
+    nome: str
+    prioridade: int
+    prazo: str
+    ordem: int
+    sucesso: bool = False
+    erro: Optional[str] = None
+    run_id: Optional[str] = None
+    espera_s: float = 0.0
+    duracao_s: float = 0.0
+    concluido_em: Optional[str] = None
+    cumpriu_sla: bool = False
+    validacao: Optional[bool] = None
+    linhas: Dict[str, int] = field(default_factory=dict)
+
+
+class ExecutorMultiTenant:
+    """Agenda e executa os pipelines dos tenants em um pool de processos."""
+
+    def __init__(self, tenants: List[Tenant], workers: int = 2, relatorios_dir: Optional[Path] = None,
+                 gx_root: Optional[Path] = None, argv_extra: Optional[List[str]] = None):
+        self.relatorios_dir = Path(relatorios_dir) if relatorios_dir else RELATORIOS_PATH
+        self.historico = HistoricoDuracoes(self.relatorios_dir / "historico.json")
+        for tenant in tenants:
+            tenant.duracao_estimada_s = self.historico.estimativa(tenant.nome)
+        self.tenants = ordenar(tenants)
+        self.workers = max(1, workers)
+        self.gx_root = Path(gx_root) if gx_root else PROJECT_ROOT
+        self.argv_extra = argv_extra or []
+
+    def _alertar_riscos(self, agora: datetime) -> None:
+        """Simula o despacho pela estimativa e avisa os tenants que já não cumprem o prazo."""
+        livres = [agora] * self.workers
+        for tenant in self.tenants:
+            livres.sort()
+            termino = livres[0] + timedelta(seconds=tenant.duracao_estimada_s)
+            livres[0] = termino
+            if termino > tenant.prazo:
+                logger.warning(f"SLA em risco: {tenant.nome} termina ~{termino:%H:%M:%S} UTC, "
+                               f"prazo {tenant.prazo:%H:%M:%S} UTC")
+
+    def executar(self) -> Dict[str, Any]:
+        """Executa todos os tenants e grava o relatório agregado."""
+        agora = datetime.now(timezone.utc)
+        carimbo = agora.strftime('%Y%m%d-%H%M%S')
+        self._alertar_riscos(agora)
+        logger.info("Ordem de despacho: " + ", ".join(t.nome for t in self.tenants))
+
+        resultados: Dict[str, ResultadoTenant] = {}
+        inicio_lote = time.time()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_aquecer_worker,
+                                 initargs=(str(self.gx_root),)) as pool:
+            # Submissão na ordem de despacho: a fila do pool é FIFO
+            futuros = {}
+            for ordem, tenant in enumerate(self.tenants):
+                run_id = f"{carimbo}-{tenant.nome}"
+                resultados[tenant.nome] = ResultadoTenant(tenant.nome, tenant.prioridade,
+                                                          tenant.prazo.isoformat(timespec='seconds'), ordem)
+                futuros[pool.submit(_executar_tenant, tenant.nome, str(tenant.raiz.resolve()), run_id,
+                                    self.argv_extra)] = tenant
+            for futuro in as_completed(futuros):
+                tenant = futuros[futuro]
+                registro = resultados[tenant.nome]
+                try:
+                    saida = futuro.result()
+                except Exception as e:  # worker morto (ex.: OOM)
+                    registro.erro = f"{type(e).__name__}: {e}"
+                    logger.error(f"✗ {tenant.nome}: {registro.erro}")
+                    continue
+                concluido = datetime.fromtimestamp(saida['fim'], timezone.utc)
+                registro.sucesso, registro.erro, registro.run_id = saida['sucesso'], saida['erro'], saida['run_id']
+                registro.espera_s = round(saida['inicio'] - inicio_lote, 3)
+                registro.duracao_s = round(saida['fim'] - saida['inicio'], 3)
+                registro.concluido_em = concluido.isoformat(timespec='seconds')
+                registro.cumpriu_sla = registro.sucesso and concluido <= tenant.prazo
+                registro.validacao, registro.linhas = saida['validacao'], saida['linhas']
+                if registro.sucesso:
+                    self.historico.registrar(tenant.nome, registro.duracao_s)
+                logger.info(f"{'✓' if registro.sucesso else '✗'} {tenant.nome}: {registro.duracao_s:.1f}s "
+                            f"(espera {registro.espera_s:.1f}s, SLA {'ok' if registro.cumpriu_sla else 'VIOLADO'})")
+
+        self.historico.salvar()
+        ordenados = sorted(resultados.values(), key=lambda r: r.ordem)
+        relatorio = {
+            'inicio': agora.isoformat(timespec='seconds'),
+            'duracao_total_s': round(time.time() - inicio_lote, 3),
+            'workers': self.workers,
+            'tenants': len(ordenados),
+            'sucessos': sum(r.sucesso for r in ordenados),
+            'sla_cumprido': sum(r.cumpriu_sla for r in ordenados),
+            'linhas': {ds: sum(r.linhas.get(ds, 0) for r in ordenados)
+                       for ds in sorted({ds for r in ordenados for ds in r.linhas})},
+            'resultados': [asdict(r) for r in ordenados],
+        }
+        self.relatorios_dir.mkdir(parents=True, exist_ok=True)
+        caminho = self.relatorios_dir / f"{carimbo}.json"
+        caminho.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding='utf-8')
+        relatorio['arquivo'] = str(caminho)
+        return relatorio
+
+
+def imprimir_relatorio(relatorio: Dict[str, Any]) -> None:
+    print("\n" + "=" * 70 + "\nRELATÓRIO MULTI-TENANT\n" + "=" * 70)
+    print(f"{'tenant':<20} {'status':<8} {'espera':>8} {'duração':>8} {'SLA':<8} {'validação':<10} linhas")
+    for r in relatorio['resultados']:
+        validacao = {True: 'ok', False: 'falhou', None: '-'}[r['validacao']]
+        linhas = ' '.join(f"{ds}={n}" for ds, n in r['linhas'].items())
+        print(f"{r['nome']:<20} {'ok' if r['sucesso'] else 'ERRO':<8} {r['espera_s']:>7.1f}s {r['duracao_s']:>7.1f}s "
+              f"{'ok' if r['cumpriu_sla'] else 'VIOLADO':<8} {validacao:<10} {linhas}")
+    print(f"\n{relatorio['sucessos']}/{relatorio['tenants']} tenants concluídos, "
+          f"{relatorio['sla_cumprido']} dentro do SLA, em {relatorio['duracao_total_s']:.1f}s "
+          f"({relatorio['workers']} workers)")
+    print(f"Relatório: {relatorio['arquivo']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    config = configuracao.carregar_config(PROJECT_ROOT / "config" / "config.yaml")
+    secao = config.get('multitenant') or {}
+
+    parser = argparse.ArgumentParser(description="Executa o pipeline para vários tenants")
+    parser.add_argument('raizes', nargs='*', help="Raízes de tenants (nome = nome do diretório)")
+    parser.add_argument('--tenants', type=Path, default=secao.get('tenants'), help="Arquivo YAML de tenants")
+    parser.add_argument('--workers', type=int, default=int(secao.get('workers') or os.cpu_count() or 1),
+                        help="Processos do pool")
+    parser.add_argument('--sla', default=secao.get('sla_padrao'),
+                        help=f"Prazo padrão (HH:MM UTC ou ISO; padrão {SLA_PADRAO})")
+    args, argv_extra = parser.parse_known_args(argv)
+    if not args.tenants and not args.raizes:
+        parser.error("informe --tenants e/ou raízes de tenants")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    tenants = carregar_tenants(args.tenants, args.raizes, sla=args.sla)
+    relatorio = ExecutorMultiTenant(tenants, args.workers, argv_extra=argv_extra).executar()
+    imprimir_relatorio(relatorio)
+    return 0 if relatorio['sucessos'] == relatorio['tenants'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,7 +17,9 @@ from great_expectations.core.batch import BatchRequest
 import logging
 from datetime import datetime
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Severidade (meta da expectativa): falhas em chaves primárias e FKs condenam o lote;
+# as demais expectativas são avisos. Ver suites_compiladas (fail_fast).
+BLOQUEANTE = {"severidade": "bloqueante"}
 
 
 def create_clientes_expectations(validator):
@@ -31,12 +33,12 @@ def create_clientes_expectations(validator):
     - Consistência: estado em lista de UFs válidas
     """
     # Completude
-    validator.expect_column_values_to_not_be_null("id_cliente")
+    validator.expect_column_values_to_not_be_null("id_cliente", meta=BLOQUEANTE)
     validator.expect_column_values_to_not_be_null("nome")
     validator.expect_column_values_to_not_be_null("email")
     
     # Unicidade
-    validator.expect_column_values_to_be_unique("id_cliente")
+    validator.expect_column_values_to_be_unique("id_cliente", meta=BLOQUEANTE)
     validator.expect_column_values_to_be_unique("email")
     
     # Validade
@@ -61,13 +63,13 @@ def create_produtos_expectations(validator):
     - Consistência: categoria não pode ser vazia, ativo é booleano
     """
     # Completude
-    validator.expect_column_values_to_not_be_null("id_produto")
+    validator.expect_column_values_to_not_be_null("id_produto", meta=BLOQUEANTE)
     validator.expect_column_values_to_not_be_null("nome_produto")
     validator.expect_column_values_to_not_be_null("categoria")
     validator.expect_column_values_to_not_be_null("preco")
     
     # Unicidade
-    validator.expect_column_values_to_be_unique("id_produto")
+    validator.expect_column_values_to_be_unique("id_produto", meta=BLOQUEANTE)
     
     # Validade
     validator.expect_column_values_to_be_between("preco", min_value=0.01)
@@ -86,21 +88,21 @@ def create_vendas_expectations(validator, df_clientes, df_produtos):
     
     Dimensões cobertas:
     - Completude: id_venda, id_cliente, id_produto, quantidade, valor_total não nulos
-    - Unicidade: id_venda único
+    - Unicidade: id_venda único (bloqueante, assim como as FKs)
     - Validade: quantidade > 0, status em valores permitidos, data_venda não futura
     - Consistência: integridade referencial (FK), valor_total = quantidade * valor_unitario
     - Acurácia: relacionamentos cross-dataset validados
     - Temporalidade: data_venda não posterior a hoje
     """
     # Completude
-    validator.expect_column_values_to_not_be_null("id_venda")
-    validator.expect_column_values_to_not_be_null("id_cliente")
-    validator.expect_column_values_to_not_be_null("id_produto")
+    validator.expect_column_values_to_not_be_null("id_venda", meta=BLOQUEANTE)
+    validator.expect_column_values_to_not_be_null("id_cliente", meta=BLOQUEANTE)
+    validator.expect_column_values_to_not_be_null("id_produto", meta=BLOQUEANTE)
     validator.expect_column_values_to_not_be_null("quantidade")
     validator.expect_column_values_to_not_be_null("valor_total")
     
     # Unicidade
-    validator.expect_column_values_to_be_unique("id_venda")
+    validator.expect_column_values_to_be_unique("id_venda", meta=BLOQUEANTE)
     
     # Validade
     validator.expect_column_values_to_be_between("quantidade", min_value=1)
@@ -115,9 +117,9 @@ def create_vendas_expectations(validator, df_clientes, df_produtos):
     ids_produtos = set(df_produtos['id_produto'].dropna().astype(int).tolist()) if not df_produtos.empty else set()
     
     if ids_clientes:
-        validator.expect_column_values_to_be_in_set("id_cliente", ids_clientes)
+        validator.expect_column_values_to_be_in_set("id_cliente", ids_clientes, meta=BLOQUEANTE)
     if ids_produtos:
-        validator.expect_column_values_to_be_in_set("id_produto", ids_produtos)
+        validator.expect_column_values_to_be_in_set("id_produto", ids_produtos, meta=BLOQUEANTE)
     
     logging.info("✅ Expectation Suite para Vendas criada com sucesso (com validações cross-dataset)")
 
@@ -134,12 +136,12 @@ def create_logistica_expectations(validator, df_vendas):
     - Temporalidade: datas de entrega coerentes
     """
     # Completude
-    validator.expect_column_values_to_not_be_null("id_entrega")
-    validator.expect_column_values_to_not_be_null("id_venda")
+    validator.expect_column_values_to_not_be_null("id_entrega", meta=BLOQUEANTE)
+    validator.expect_column_values_to_not_be_null("id_venda", meta=BLOQUEANTE)
     validator.expect_column_values_to_not_be_null("data_envio")
     
     # Unicidade
-    validator.expect_column_values_to_be_unique("id_entrega")
+    validator.expect_column_values_to_be_unique("id_entrega", meta=BLOQUEANTE)
     
     # Validade
     validator.expect_column_values_to_be_in_set("status_entrega", ["Entregue", "Em Trânsito", "Cancelada", "Atrasada"])
@@ -147,7 +149,7 @@ def create_logistica_expectations(validator, df_vendas):
     # Integridade Referencial
     ids_vendas = set(df_vendas['id_venda'].dropna().astype(int).tolist()) if not df_vendas.empty else set()
     if ids_vendas:
-        validator.expect_column_values_to_be_in_set("id_venda", ids_vendas)
+        validator.expect_column_values_to_be_in_set("id_venda", ids_vendas, meta=BLOQUEANTE)
     
     logging.info("✅ Expectation Suite para Logística criada com sucesso")
 
@@ -197,4 +199,5 @@ def setup_all_expectations(context=None):
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     setup_all_expectations()
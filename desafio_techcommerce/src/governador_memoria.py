@@ -0,0 +1,477 @@
+"""
+Governador de Memória da Carga e da Correção
+============================================
+
+Antes da etapa 1, estima o tamanho em memória de cada CSV raw e escolhe,
+por tabela, como carregá-la e corrigi-la dentro de um orçamento de
+memória (`execution.memoria` no config.yaml):
+
+- memoria: carga e correção da tabela inteira (comportamento padrão)
+- lotes: a tabela raw é carregada inteira, mas corrigida em lotes de
+  partições por hash da chave primária, um lote por vez
+- disco: o CSV raw é lido em blocos e gravado em partições parquet no
+  diretório da execução (spill); a tabela raw nunca fica inteira em
+  memória e cada lote é lido do disco e corrigido
+
+A partição de uma linha é `hash(chave primária numérica) mod B`, a mesma
+regra da execução distribuída. Linhas de mesma chave caem no mesmo lote,
+então a deduplicação por chave é local ao lote. As demais regras são linha
+a linha, e as FKs são verificadas contra as chaves de referência do
+próprio lote. Assim, o resultado é o mesmo da correção da tabela inteira,
+na ordem raw, com a linhagem completa.
+
+Estimativa (calibrada com o leitor Arrow): a partir de uma amostra do
+início do arquivo, linhas = tamanho / bytes por linha, e cada linha custa a
+largura média de cada coluna de texto mais 8 bytes (offsets Arrow), ou 9
+bytes nas colunas monetárias (`float` no schema, Int64 em centavos). O pico
+da correção é `fator_correcao` vezes a tabela carregada (medido: 1,3 em
+vendas, ~3 em clientes e logística).
+
+Durante a correção, o RSS do processo é lido a cada lote. Acima de 90% do
+orçamento, os lotes seguintes passam a ter metade das partições.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import math
+import ctypes
+import logging
+import resource
+import contextlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import correcao_automatica as ca
+from execucao_distribuida import particao_por_chave
+from leitura_raw import TAMANHO_BLOCO, VALORES_NULOS, ler_cabecalho
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('auto', 'memoria', 'lotes', 'disco')
+FATOR_CORRECAO = 3.0
+SOBRECARGA_TEXTO = 8        # bytes por célula de texto além do conteúdo (offsets Arrow)
+BYTES_MONETARIO = 9         # Int64 + máscara
+AMOSTRA_BYTES = 1 << 20
+PARTICOES_POR_LOTE = 4      # lotes adaptativos: cada lote começa com 4 partições
+MAX_LOTES = 64
+LIMITE_PRESSAO = 0.9
+FRACAO_DISPONIVEL = 0.8     # orçamento padrão: RSS atual + 80% da memória disponível
+# Coluna de partição: a chave da deduplicação de cada corrigir_*
+CHAVES_PARTICAO = {'clientes': 'id_cliente', 'produtos': 'id_produto', 'vendas': 'id_venda',
+                   'logistica': 'id_entrega'}
+# Colunas de FK de cada tabela, na ordem das referências dos corrigir_*
+COLUNAS_FK = {'vendas': ('id_cliente', 'id_produto'), 'logistica': ('id_venda',)}
+
+Fonte = Union[Path, pd.DataFrame, 'TabelaEmDisco']
+
+try:
+    _LIBC = ctypes.CDLL('libc.so.6')   # malloc_trim: glibc guarda a memória livre dos temporários
+except OSError:
+    _LIBC = None
+
+
+def chave_particao(dataset: str, colunas) -> str:
+    """Coluna de partição de um dataset (a primeira coluna, se a chave não existir)."""
+    chave = CHAVES_PARTICAO.get(dataset)
+    return chave if chave in colunas else list(colunas)[0]
+
+
+def rss_atual() -> int:
+    """RSS do processo em bytes (/proc; fora do Linux, o pico de ru_maxrss)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def memoria_disponivel() -> int:
+    """Memória disponível em bytes: MemAvailable, limitado pelo cgroup, se houver."""
+    disponivel = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    try:
+        with open('/proc/meminfo') as f:
+            for linha in f:
+                if linha.startswith('MemAvailable:'):
+                    disponivel = int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    for caminho, uso in (('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current'),
+                         ('/sys/fs/cgroup/memory/memory.limit_in_bytes',
+                          '/sys/fs/cgroup/memory/memory.usage_in_bytes')):
+        try:
+            limite = Path(caminho).read_text().strip()
+            if limite.isdigit():
+                disponivel = min(disponivel, int(limite) - int(Path(uso).read_text().strip()))
+            break
+        except (OSError, ValueError):
+            continue
+    return max(disponivel, 0)
+
+
+# =====================================================================
+# ESTIMATIVA E PLANO
+# =====================================================================
+
+@dataclass
+class PlanoTabela:
+    """Modo escolhido para uma tabela e os números que o justificam."""
+    dataset: str
+    modo: str
+    linhas: int
+    bytes_carga: int
+    bytes_pico: int
+    lotes: int = 1
+
+    @property
+    def particoes(self) -> int:
+        return self.lotes * PARTICOES_POR_LOTE if self.lotes > 1 else 1
+
+    def resumo(self) -> dict:
+        return {'modo': self.modo, 'lotes': self.lotes, 'linhas_estimadas': self.linhas,
+                'carga_mb': round(self.bytes_carga / 2 ** 20, 1),
+                'pico_mb': round(self.bytes_pico / 2 ** 20, 1)}
+
+
+def estimar_arquivo(caminho: Path, schema: Optional[Dict[str, str]] = None,
+                    sep: str = '\t') -> Dict[str, int]:
+    """
+    Linhas e bytes em memória de um CSV raw carregado pelo leitor Arrow.
+
+    Usa o tamanho do arquivo e uma amostra do início (largura média de cada
+    coluna); colunas `float` no schema, ou monetárias, custam 9 bytes.
+    """
+    tamanho = Path(caminho).stat().st_size
+    with open(caminho, 'rb') as f:
+        amostra = f.read(AMOSTRA_BYTES)
+    linhas_amostra = amostra.split(b'\n')
+    cabecalho = linhas_amostra[0]
+    completas = [linha for linha in linhas_amostra[1:-1 if len(amostra) == AMOSTRA_BYTES else None] if linha]
+    colunas = ler_cabecalho(caminho, sep)
+    if not completas:
+        return {'linhas': 0, 'colunas': len(colunas), 'bytes_carga': 0}
+    bytes_por_linha = sum(len(linha) + 1 for linha in completas) / len(completas)
+    linhas = max(len(completas), round((tamanho - len(cabecalho) - 1) / bytes_por_linha))
+
+    larguras = np.zeros(len(colunas))
+    separador = sep.encode()
+    for linha in completas:
+        campos = linha.rstrip(b'\r').split(separador)[:len(colunas)]
+        larguras[:len(campos)] += [len(campo) for campo in campos]
+    larguras /= len(completas)
+    schema = schema or {}
+    custo_linha = sum(BYTES_MONETARIO if coluna in ca.COLUNAS_MONETARIAS or schema.get(coluna) == 'float'
+                      else largura + SOBRECARGA_TEXTO
+                      for coluna, largura in zip(colunas, larguras))
+    return {'linhas': int(linhas), 'colunas': len(colunas), 'bytes_carga': int(linhas * custo_linha)}
+
+
+# =====================================================================
+# SPILL EM DISCO
+# =====================================================================
+
+class TabelaEmDisco:
+    """
+    Tabela raw gravada em partições parquet por hash da chave (modo disco).
+
+    Cada partição guarda o índice raw (posição da linha no CSV), e as
+    colunas têm os mesmos tipos da carga em memória (texto e centavos).
+    """
+
+    def __init__(self, diretorio: Path, chave: str, particoes: int, linhas: int,
+                 bytes_carga: int, vazia: pd.DataFrame):
+        self.diretorio = Path(diretorio)
+        self.chave = chave
+        self.particoes = particoes
+        self.linhas = linhas
+        self.bytes_carga = bytes_carga
+        self.vazia = vazia
+
+    def __len__(self) -> int:
+        return self.linhas
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.vazia.columns
+
+    @classmethod
+    def gravar(cls, caminho: Path, diretorio: Path, chave: str, particoes: int, sep: str = '\t',
+               tamanho_bloco: int = TAMANHO_BLOCO) -> 'TabelaEmDisco':
+        """Lê o CSV em blocos (centavos já convertidos) e distribui as linhas nas partições."""
+        diretorio = Path(diretorio)
+        diretorio.mkdir(parents=True, exist_ok=True)
+        for antigo in diretorio.glob("particao-*.parquet"):
+            antigo.unlink()
+        colunas = ler_cabecalho(caminho, sep)
+        escritores: Dict[int, pq.ParquetWriter] = {}
+        linhas, bytes_carga, schema, vazia = 0, 0, None, None
+        try:
+            with pa.memory_map(str(caminho), 'r') as fonte:
+                leitor = pa_csv.open_csv(
+                    fonte,
+                    read_options=pa_csv.ReadOptions(block_size=tamanho_bloco),
+                    parse_options=pa_csv.ParseOptions(delimiter=sep),
+                    convert_options=pa_csv.ConvertOptions(column_types={col: pa.string() for col in colunas},
+                                                          null_values=VALORES_NULOS, strings_can_be_null=True),
+                )
+                for lote in leitor:
+                    df = lote.to_pandas()
+                    df.index = pd.RangeIndex(linhas, linhas + len(df))
+                    ca.converter_colunas_monetarias(df)
+                    linhas += len(df)
+                    bytes_carga += int(df.memory_usage(deep=True).sum())
+                    if vazia is None:
+                        vazia = df.iloc[:0]
+                    codigos = particao_por_chave(df[chave], particoes)
+                    for particao in np.unique(codigos):
+                        tabela = pa.Table.from_pandas(df[codigos == particao], preserve_index=True)
+                        schema = schema or tabela.schema
+                        if particao not in escritores:
+                            escritores[particao] = pq.ParquetWriter(cls._arquivo(diretorio, particao), schema)
+                        escritores[particao].write_table(tabela.cast(schema))
+        finally:
+            for escritor in escritores.values():
+                escritor.close()
+        if vazia is None:   # só o cabeçalho
+            vazia = pd.DataFrame({col: pd.Series(dtype='str') for col in colunas})
+            ca.converter_colunas_monetarias(vazia)
+        return cls(diretorio, chave, particoes, linhas, bytes_carga, vazia)
+
+    @staticmethod
+    def _arquivo(diretorio: Path, particao: int) -> Path:
+        return Path(diretorio) / f"particao-{particao:04d}.parquet"
+
+    def ler(self, particoes: Optional[range] = None, colunas: Optional[List[str]] = None) -> pd.DataFrame:
+        """Linhas das partições indicadas (todas, por padrão), na ordem raw."""
+        partes = []
+        for particao in (particoes if particoes is not None else range(self.particoes)):
+            arquivo = self._arquivo(self.diretorio, particao)
+            if arquivo.exists():
+                partes.append(pq.read_table(arquivo, columns=colunas, use_pandas_metadata=True).to_pandas())
+        vazia = self.vazia if colunas is None else self.vazia[colunas]
+        return pd.concat(partes).sort_index() if partes else vazia
+
+
+# =====================================================================
+# GOVERNADOR
+# =====================================================================
+
+class GovernadorMemoria:
+    """Planeja o modo de cada tabela e corrige em lotes sob o orçamento de memória."""
+
+    def __init__(self, orcamento: Optional[int] = None, fator_correcao: float = FATOR_CORRECAO,
+                 modo: str = 'auto'):
+        """
+        Args:
+            orcamento: RSS máximo do processo em bytes (padrão: RSS atual + 80%
+                da memória disponível)
+            fator_correcao: Pico da correção / tamanho da tabela carregada
+            modo: 'auto' ou um modo forçado para todas as tabelas
+        """
+        if modo not in MODOS:
+            raise ValueError(f"Modo de memória desconhecido: {modo} (use {', '.join(MODOS)})")
+        self.base = rss_atual()
+        self.orcamento = int(orcamento or self.base + FRACAO_DISPONIVEL * memoria_disponivel())
+        self.fator_correcao = fator_correcao
+        self.modo = modo
+        logger.info(f"Governador de memória: orçamento {self.orcamento / 2 ** 20:,.0f} MB "
+                    f"(RSS atual {self.base / 2 ** 20:,.0f} MB)")
+
+    @classmethod
+    def do_config(cls, config: dict) -> Optional['GovernadorMemoria']:
+        """Cria o governador conforme `execution.memoria` (None se desabilitado)."""
+        secao = (config.get('execution') or {}).get('memoria') or {}
+        if not secao.get('enabled', True):
+            return None
+        orcamento = secao.get('orcamento_mb')
+        return cls(orcamento=int(orcamento * 2 ** 20) if orcamento else None,
+                   fator_correcao=float(secao.get('fator_correcao', FATOR_CORRECAO)),
+                   modo=secao.get('modo', 'auto'))
+
+    @staticmethod
+    def liberar() -> None:
+        """Devolve ao sistema a memória livre do pool do Arrow e do malloc (buffers do parser, temporários)."""
+        pa.default_memory_pool().release_unused()
+        if _LIBC is not None:
+            _LIBC.malloc_trim(0)
+
+    def sob_pressao(self) -> bool:
+        if rss_atual() <= LIMITE_PRESSAO * self.orcamento:
+            return False
+        self.liberar()
+        return rss_atual() > LIMITE_PRESSAO * self.orcamento
+
+    # -----------------------------------------------------------------
+
+    def _estimar(self, dataset: str, fonte: Fonte, config: dict) -> PlanoTabela:
+        if isinstance(fonte, pd.DataFrame):
+            linhas, carga = len(fonte), int(fonte.memory_usage(deep=True).sum())
+        elif isinstance(fonte, TabelaEmDisco):
+            linhas, carga = fonte.linhas, fonte.bytes_carga
+        else:
+            schema = (config.get('datasets', {}).get(dataset) or {}).get('schema')
+            estimativa = estimar_arquivo(fonte, schema)
+            linhas, carga = estimativa['linhas'], estimativa['bytes_carga']
+        modo = 'disco' if isinstance(fonte, TabelaEmDisco) else 'memoria'
+        return PlanoTabela(dataset, modo, linhas, carga, int(max(self.fator_correcao, 2.0) * carga))
+
+    def planejar(self, fontes: Dict[str, Fonte], config: dict) -> Dict[str, PlanoTabela]:
+        """
+        Modo de cada tabela. Aceita os CSVs raw (antes da carga: decide o
+        spill em disco) ou as tabelas carregadas (antes da correção: decide
+        entre memória e lotes com o tamanho medido).
+
+        Durante a correção de uma tabela ficam residentes as demais tabelas
+        raw em memória e as saídas corrigidas (estimadas do tamanho da
+        carga). As tabelas maiores são decididas primeiro; uma tabela em
+        disco deixa de contar como raw residente para as seguintes.
+        """
+        planos = {nome: self._estimar(nome, fonte, config) for nome, fonte in fontes.items()}
+        # Margem até o limite de pressão: fragmentação do alocador e pool do Arrow
+        disponivel = LIMITE_PRESSAO * self.orcamento - self.base
+        for plano in sorted(planos.values(), key=lambda p: p.bytes_carga, reverse=True):
+            outros = sum(p.bytes_carga * (2 if p.modo != 'disco' else 1)
+                         for p in planos.values() if p is not plano)
+            livre_lotes = disponivel - outros - 2 * plano.bytes_carga
+            livre_disco = disponivel - outros - plano.bytes_carga
+            carregada = isinstance(fontes[plano.dataset], pd.DataFrame)
+            if plano.modo == 'disco':    # já gravada em disco na carga
+                plano.lotes = self._lotes(plano.bytes_pico, livre_disco)
+            elif self.modo == 'memoria' or (self.modo == 'auto' and outros + plano.bytes_pico <= disponivel):
+                plano.modo = 'memoria'
+            elif self.modo == 'lotes' or carregada or (self.modo == 'auto' and livre_lotes > 0):
+                plano.modo, plano.lotes = 'lotes', self._lotes(plano.bytes_pico, livre_lotes)
+            else:
+                plano.modo, plano.lotes = 'disco', self._lotes(plano.bytes_pico, livre_disco)
+            if self.modo != 'auto' and plano.modo != 'memoria':
+                plano.lotes = max(plano.lotes, 2)
+        etapa = 'carga' if any(isinstance(f, Path) for f in fontes.values()) else 'correção'
+        logger.info(f"Plano de memória para a {etapa} (orçamento {self.orcamento / 2 ** 20:,.0f} MB):")
+        for plano in planos.values():
+            nivel = logging.INFO if plano.modo == 'memoria' else logging.WARNING
+            logger.log(nivel, f"  {plano.dataset}: {plano.modo} (~{plano.linhas:,} linhas, "
+                              f"carga ~{plano.bytes_carga / 2 ** 20:,.0f} MB, "
+                              f"pico ~{plano.bytes_pico / 2 ** 20:,.0f} MB, {plano.lotes} lote(s))")
+        return planos
+
+    @staticmethod
+    def _lotes(pico: int, livre: int) -> int:
+        if livre <= 0:
+            logger.warning(f"Orçamento de memória insuficiente: usando {MAX_LOTES} lotes")
+            return MAX_LOTES
+        return int(min(MAX_LOTES, max(1, math.ceil(pico / livre))))
+
+    # -----------------------------------------------------------------
+
+    def carregar_em_disco(self, plano: PlanoTabela, caminho: Path, diretorio_spill: Path) -> TabelaEmDisco:
+        """Spill de uma tabela no modo disco em `diretorio_spill/<dataset>`."""
+        # Blocos menores que o padrão quando o orçamento é apertado
+        tamanho_bloco = int(min(TAMANHO_BLOCO, max(1 << 20, (self.orcamento - self.base) // 16)))
+        chave = chave_particao(plano.dataset, ler_cabecalho(caminho))
+        return TabelaEmDisco.gravar(caminho, Path(diretorio_spill) / plano.dataset, chave,
+                                    plano.particoes, tamanho_bloco=tamanho_bloco)
+
+    def _grupos(self, particoes: int, lotes: int) -> Iterator[range]:
+        """Faixas de partições por lote; o lote encolhe pela metade sob pressão de RSS."""
+        por_lote = max(1, math.ceil(particoes / max(1, lotes)))
+        inicio = 0
+        while inicio < particoes:
+            fim = min(particoes, inicio + por_lote)
+            yield range(inicio, fim)
+            inicio = fim
+            if por_lote > 1 and self.sob_pressao():
+                por_lote //= 2
+                logger.warning(f"  RSS {rss_atual() / 2 ** 20:,.0f} MB perto do orçamento: "
+                               f"lotes reduzidos para {por_lote} partição(ões)")
+
+    def corrigir(self, corretor, dataset: str, fonte: Union[pd.DataFrame, TabelaEmDisco],
+                 plano: PlanoTabela, *referencias: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """
+        `corretor.corrigir_<dataset>(fonte, *referencias)` conforme o plano.
+
+        Nos modos lotes e disco, cada lote recebe só as linhas das suas
+        partições; referências maiores que o lote são reduzidas às linhas
+        com as chaves das FKs do lote. `corretor` pode ser o
+        CorrecaoAutomatica ou a ExecucaoDistribuida.
+        """
+        metodo = getattr(corretor, f"corrigir_{dataset}")
+        if plano.modo == 'memoria' and isinstance(fonte, pd.DataFrame):
+            resultado = metodo(fonte, *referencias)
+            self.liberar()
+            return resultado
+
+        if isinstance(fonte, TabelaEmDisco):
+            particoes = fonte.particoes
+            ler = fonte.ler
+        else:
+            particoes = plano.particoes
+            codigos = particao_por_chave(fonte[chave_particao(dataset, fonte.columns)], particoes)
+            ler = lambda faixa: fonte[(codigos >= faixa.start) & (codigos < faixa.stop)]
+        colunas_fk = COLUNAS_FK.get(dataset, ())
+        chaves_ref: Dict[int, pd.Series] = {}
+
+        def reduzir(i: int, ref: Optional[pd.DataFrame], lote: pd.DataFrame) -> Optional[pd.DataFrame]:
+            if ref is None or len(ref) <= len(lote):
+                return ref
+            coluna = colunas_fk[i]
+            if i not in chaves_ref:
+                chaves_ref[i] = pd.to_numeric(ref[coluna], errors='coerce')
+            return ref[[coluna]][chaves_ref[i].isin(pd.to_numeric(lote[coluna], errors='coerce'))]
+
+        saidas, lotes = [], 0
+        with _silenciar_correcao():
+            for faixa in self._grupos(particoes, plano.lotes):
+                lote = ler(faixa)
+                if not len(lote):
+                    continue
+                saida = metodo(lote, *(reduzir(i, ref, lote) for i, ref in enumerate(referencias)))
+                lotes += 1
+                if len(saida):
+                    saidas.append(saida)
+                del lote, saida
+                self.liberar()
+        if saidas:
+            resultado = juntar_na_ordem_raw(saidas)
+        else:
+            resultado = metodo(fonte.vazia if isinstance(fonte, TabelaEmDisco) else fonte.iloc[:0], *referencias)
+        logger.info(f"  {dataset}: corrigido em {lotes} lote(s) ({plano.modo}), "
+                    f"{len(resultado)} linhas, RSS {rss_atual() / 2 ** 20:,.0f} MB")
+        return resultado
+
+
+def juntar_na_ordem_raw(partes: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Junta as saídas dos lotes na ordem do índice raw.
+
+    Monta uma coluna por vez e a retira das partes (liberando a memória a
+    cada coluna), então o pico extra é o de uma coluna, e não o de uma
+    segunda cópia da tabela (concat + sort).
+    """
+    indice = np.concatenate([parte.index.to_numpy() for parte in partes])
+    ordem = np.argsort(indice, kind='stable')
+    colunas = {}
+    for coluna in list(partes[0].columns):
+        valores = pd.concat([parte.pop(coluna) for parte in partes], ignore_index=True)
+        colunas[coluna] = valores.array.take(ordem)
+        del valores
+        GovernadorMemoria.liberar()
+    return pd.DataFrame(colunas, index=pd.Index(indice[ordem]))
+
+
+@contextlib.contextmanager
+def _silenciar_correcao():
+    """Os logs INFO por lote do CorrecaoAutomatica viram um resumo por tabela."""
+    registrador = logging.getLogger('correcao_automatica')
+    nivel = registrador.level
+    registrador.setLevel(max(nivel, logging.WARNING))
+    try:
+        yield
+    finally:
+        registrador.setLevel(nivel)
@@ -0,0 +1,65 @@
+"""
+Leitura dos CSVs Raw
+====================
+
+Carga raw com o leitor CSV do Arrow: o arquivo é mapeado em memória
+(`pa.memory_map`, sem cópia para um buffer Python), os blocos são
+analisados em paralelo por threads do pool do Arrow, e as colunas passam
+ao pandas como arrays Arrow (`str`, StringDtype com armazenamento
+pyarrow), sem um objeto Python por célula.
+
+O resultado é o mesmo de `pd.read_csv(caminho, sep='\\t', dtype=str)`:
+todas as colunas como texto, os mesmos marcadores de nulo, índice
+posicional (a linhagem usa a posição para o número da linha raw). O leitor
+`pandas` continua disponível em `execution.leitor_raw`.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import csv
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from pathlib import Path
+from typing import List, Union
+
+logger = logging.getLogger(__name__)
+
+LEITORES = ('arrow', 'pandas')
+TAMANHO_BLOCO = 16 << 20   # bytes por bloco analisado (unidade de paralelismo)
+# Mesmos marcadores de nulo do pd.read_csv (keep_default_na=True)
+VALORES_NULOS = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                 '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+def ler_cabecalho(caminho: Union[str, Path], sep: str = '\t') -> List[str]:
+    """Nomes das colunas (primeira linha do arquivo)."""
+    with open(caminho, encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader([f.readline()], delimiter=sep), [])
+
+
+def ler_csv_arrow(caminho: Union[str, Path], sep: str = '\t', threads: bool = True,
+                  tamanho_bloco: int = TAMANHO_BLOCO) -> pd.DataFrame:
+    """Lê um CSV raw com todas as colunas como texto (mmap + parser multi-thread do Arrow)."""
+    colunas = ler_cabecalho(caminho, sep)
+    with pa.memory_map(str(caminho), 'r') as fonte:
+        tabela = pa_csv.read_csv(
+            fonte,
+            read_options=pa_csv.ReadOptions(use_threads=threads, block_size=tamanho_bloco),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=pa_csv.ConvertOptions(column_types={col: pa.string() for col in colunas},
+                                                  null_values=VALORES_NULOS, strings_can_be_null=True),
+        )
+    # As colunas de texto são envolvidas sem cópia; self_destruct libera a tabela coluna a coluna
+    return tabela.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def ler_csv_raw(caminho: Union[str, Path], sep: str = '\t', leitor: str = 'arrow') -> pd.DataFrame:
+    """Lê um CSV raw (todas as colunas como texto) com o leitor indicado."""
+    if leitor not in LEITORES:
+        raise ValueError(f"Leitor raw desconhecido: {leitor} (use {', '.join(LEITORES)})")
+    if leitor == 'pandas':
+        return pd.read_csv(caminho, sep=sep, dtype=str)
+    return ler_csv_arrow(caminho, sep)
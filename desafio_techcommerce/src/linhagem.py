@@ -0,0 +1,263 @@
+"""
+Linhagem por Linha (raw -> processado)
+======================================
+
+Cada linha raw recebe uma proveniência compacta, em colunas inteiras:
+
+- dataset_id (uint8) e arquivo_id (uint16): de onde veio
+- linha (uint32): número da linha no arquivo raw (cabeçalho = linha 1)
+- chave (int64): primary_key da linha (id_venda, id_cliente, ...; mínimo int64 se ausente)
+- regras (uint32): bitmask das regras do CorrecaoAutomatica aplicadas
+- destino (uint8): 0 = processada, 1 = removida (quarentena)
+
+A proveniência não viaja como colunas pelo CorrecaoAutomatica: as
+correções preservam o índice raw, então o registro guarda apenas um vetor
+de bits por dataset e marca os rótulos afetados em cada regra (custo
+proporcional às linhas alteradas).
+
+O sidecar é um parquet ordenado por (dataset_id, chave, linha); a busca
+por chave ou por linha raw é uma busca binária (O(log n)).
+
+Uso:
+    python src/linhagem.py vendas 1003            # por que a venda 1003 sumiu?
+    python src/linhagem.py vendas --linha 17
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import sys
+import json
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bits das regras do CorrecaoAutomatica (estáveis: são persistidos no sidecar)
+REGRAS = {
+    'duplicata_removida': 1 << 0,
+    'email_invalido': 1 << 1,
+    'telefone_normalizado': 1 << 2,
+    'nome_preenchido': 1 << 3,
+    'estado_invalido': 1 << 4,
+    'preco_negativo': 1 << 5,
+    'categoria_preenchida': 1 << 6,
+    'estoque_negativo': 1 << 7,
+    'fk_invalida': 1 << 8,
+    'quantidade_invalida': 1 << 9,
+    'valor_total_recalculado': 1 << 10,
+    'data_futura': 1 << 11,
+    'quantidade_fracionaria': 1 << 12,
+}
+
+DESTINOS = ('processada', 'removida')
+CHAVE_AUSENTE = np.iinfo(np.int64).min
+_META = b'techcommerce.linhagem'
+
+
+def decodificar_regras(bits: int) -> List[str]:
+    """Nomes das regras presentes em um bitmask."""
+    return [nome for nome, bit in REGRAS.items() if bits & bit]
+
+
+def _chaves_int64(serie: pd.Series) -> np.ndarray:
+    """Chave como int64 (ausente/ inválida = mínimo int64), via cast do Arrow quando possível."""
+    try:
+        arrow = pc.cast(pa.array(serie, from_pandas=True), pa.int64())
+        return arrow.fill_null(CHAVE_AUSENTE).to_numpy()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        # Chaves como '1.0' ou texto: caminho lento, com coerção
+        return pd.to_numeric(serie, errors='coerce').astype('Int64').to_numpy(dtype='int64', na_value=CHAVE_AUSENTE)
+
+
+class _Rastreio:
+    """Estado de um dataset durante a correção."""
+
+    def __init__(self, indice: pd.Index, arquivo_id: int, chave: Optional[np.ndarray]):
+        self.indice = indice
+        self.arquivo_id = arquivo_id
+        self.chave = chave
+        self.bits = np.zeros(len(indice), dtype=np.uint32)
+        self.destino: Optional[np.ndarray] = None
+
+
+class RegistroLinhagem:
+    """Acumula a linhagem de uma execução e grava o sidecar."""
+
+    def __init__(self):
+        self.datasets: List[str] = []
+        self.arquivos: List[str] = []
+        self._rastreios: Dict[str, _Rastreio] = {}
+
+    def iniciar(self, dataset: str, df_raw: pd.DataFrame, arquivo: Union[str, Path],
+                chave: Optional[str] = None) -> None:
+        """Registra as linhas raw de um dataset (antes da correção)."""
+        if dataset not in self.datasets:
+            self.datasets.append(dataset)
+        arquivo = str(arquivo)
+        if arquivo not in self.arquivos:
+            self.arquivos.append(arquivo)
+        chaves = _chaves_int64(df_raw[chave]) if chave and chave in df_raw.columns else None
+        self._rastreios[dataset] = _Rastreio(df_raw.index, self.arquivos.index(arquivo), chaves)
+
+    def ativo(self, dataset: str) -> bool:
+        return dataset in self._rastreios
+
+    def marcar(self, dataset: str, rotulos: Union[pd.Index, pd.Series], regra: str) -> None:
+        """
+        Marca a regra nas linhas indicadas.
+
+        Args:
+            rotulos: rótulos do índice raw, ou máscara booleana alinhada ao DataFrame
+        """
+        rastreio = self._rastreios.get(dataset)
+        if rastreio is None:
+            return
+        if isinstance(rotulos, pd.Series) and pd.api.types.is_bool_dtype(rotulos.dtype):
+            rotulos = rotulos.index[rotulos.fillna(False).to_numpy(dtype=bool)]
+        if len(rotulos) == 0:
+            return
+        posicoes = rastreio.indice.get_indexer(rotulos)
+        rastreio.bits[posicoes[posicoes >= 0]] |= np.uint32(REGRAS[regra])
+
+    def regras(self, dataset: str, rotulos: pd.Index) -> np.ndarray:
+        """Bitmask atual das linhas indicadas (zeros se o dataset não é rastreado)."""
+        rastreio = self._rastreios.get(dataset)
+        if rastreio is None:
+            return np.zeros(len(rotulos), dtype=np.uint32)
+        posicoes = rastreio.indice.get_indexer(rotulos)
+        return np.where(posicoes >= 0, rastreio.bits[posicoes], 0).astype(np.uint32)
+
+    def marcar_bits(self, dataset: str, rotulos: pd.Index, bits: np.ndarray) -> None:
+        """Aplica bitmasks já calculados (ex.: de um cache de correções) às linhas indicadas."""
+        rastreio = self._rastreios.get(dataset)
+        if rastreio is None or len(rotulos) == 0:
+            return
+        posicoes = rastreio.indice.get_indexer(rotulos)
+        validas = posicoes >= 0
+        rastreio.bits[posicoes[validas]] |= np.asarray(bits, dtype=np.uint32)[validas]
+
+    def finalizar(self, dataset: str, df_saida: pd.DataFrame) -> None:
+        """Registra quais linhas raw chegaram à saída da correção."""
+        rastreio = self._rastreios.get(dataset)
+        if rastreio is not None:
+            destino = np.ones(len(rastreio.indice), dtype=np.uint8)
+            posicoes = rastreio.indice.get_indexer(df_saida.index)
+            destino[posicoes[posicoes >= 0]] = 0
+            rastreio.destino = destino
+
+    def tabela(self) -> pa.Table:
+        """Tabela de linhagem ordenada por (dataset_id, chave, linha)."""
+        colunas = {'dataset_id': [], 'arquivo_id': [], 'linha': [], 'chave': [], 'regras': [], 'destino': []}
+        for dataset_id, dataset in enumerate(self.datasets):
+            rastreio = self._rastreios[dataset]
+            n = len(rastreio.indice)
+            chave = rastreio.chave if rastreio.chave is not None else np.full(n, CHAVE_AUSENTE)
+            # Linhas já crescentes no bloco: argsort estável por chave dá a ordem (chave, linha);
+            # chaves raw costumam vir ordenadas, e então a ordenação é dispensada
+            ordem = None if n < 2 or (chave[1:] >= chave[:-1]).all() else np.argsort(chave, kind='stable')
+            destino = rastreio.destino if rastreio.destino is not None else np.zeros(n, dtype=np.uint8)
+            linha = np.arange(2, n + 2, dtype=np.uint32)
+            for nome, valores in (('linha', linha), ('chave', chave), ('regras', rastreio.bits),
+                                  ('destino', destino)):
+                colunas[nome].append(valores if ordem is None else valores[ordem])
+            colunas['dataset_id'].append(np.full(n, dataset_id, dtype=np.uint8))
+            colunas['arquivo_id'].append(np.full(n, rastreio.arquivo_id, dtype=np.uint16))
+        tipos = {'dataset_id': np.uint8, 'arquivo_id': np.uint16, 'linha': np.uint32, 'chave': np.int64,
+                 'regras': np.uint32, 'destino': np.uint8}
+        tabela = pa.table({nome: np.concatenate(partes) if partes else np.empty(0, dtype=tipos[nome])
+                           for nome, partes in colunas.items()})
+        meta = {'datasets': self.datasets, 'arquivos': self.arquivos, 'regras': REGRAS, 'destinos': DESTINOS}
+        return tabela.replace_schema_metadata({_META: json.dumps(meta).encode('utf-8')})
+
+    def salvar(self, caminho: Path) -> None:
+        """Grava o sidecar parquet (escrita atômica)."""
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_name(caminho.name + '.tmp')
+        pq.write_table(self.tabela(), temporario, compression='zstd')
+        temporario.replace(caminho)
+        logger.info(f"✓ Linhagem gravada em {caminho} "
+                    f"({sum(len(r.indice) for r in self._rastreios.values())} linhas raw)")
+
+
+class IndiceLinhagem:
+    """Consulta do sidecar: de uma linha processada/removida até a linha raw."""
+
+    def __init__(self, caminho: Path):
+        tabela = pq.read_table(caminho)
+        meta = json.loads(tabela.schema.metadata[_META])
+        self.datasets: List[str] = meta['datasets']
+        self.arquivos: List[str] = meta['arquivos']
+        self._dataset = tabela.column('dataset_id').to_numpy()
+        self._chave = tabela.column('chave').to_numpy()
+        self._tabela = tabela
+        # Limites de cada dataset no arquivo ordenado
+        self._limites = {nome: (int(np.searchsorted(self._dataset, i, 'left')),
+                                int(np.searchsorted(self._dataset, i, 'right')))
+                         for i, nome in enumerate(self.datasets)}
+        self._ordem_linha: Dict[str, tuple] = {}
+
+    def _linhas(self, inicio: int, fim: int) -> List[Dict]:
+        registros = self._tabela.slice(inicio, fim - inicio).to_pylist()
+        for r in registros:
+            r['dataset'] = self.datasets[r.pop('dataset_id')]
+            r['arquivo'] = self.arquivos[r.pop('arquivo_id')]
+            r['regras'] = decodificar_regras(r['regras'])
+            r['destino'] = DESTINOS[r['destino']]
+        return registros
+
+    def por_chave(self, dataset: str, chave: int) -> List[Dict]:
+        """Todas as linhas raw com a chave (ex.: id_venda 1003), por busca binária."""
+        inicio, fim = self._limites.get(dataset, (0, 0))
+        trecho = self._chave[inicio:fim]
+        esquerda = inicio + int(np.searchsorted(trecho, chave, 'left'))
+        direita = inicio + int(np.searchsorted(trecho, chave, 'right'))
+        return self._linhas(esquerda, direita)
+
+    def por_linha(self, dataset: str, linha: int) -> Optional[Dict]:
+        """Registro de uma linha raw do dataset (busca binária na permutação por linha)."""
+        if dataset not in self._ordem_linha:
+            inicio, fim = self._limites.get(dataset, (0, 0))
+            linhas = self._tabela.column('linha').to_numpy()[inicio:fim]
+            ordem = np.argsort(linhas, kind='stable')
+            self._ordem_linha[dataset] = (linhas[ordem], ordem + inicio)
+        linhas, posicoes = self._ordem_linha[dataset]
+        pos = int(np.searchsorted(linhas, linha))
+        if pos < len(linhas) and linhas[pos] == linha:
+            indice = int(posicoes[pos])
+            return self._linhas(indice, indice + 1)[0]
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Consulta a linhagem raw -> processado")
+    parser.add_argument('dataset')
+    parser.add_argument('chave', nargs='?', type=int, help="primary_key da linha")
+    parser.add_argument('--linha', type=int, help="Número da linha no arquivo raw")
+    parser.add_argument('--sidecar', type=Path,
+                        default=Path(__file__).parent.parent / "data" / "processed" / "linhagem.parquet")
+    args = parser.parse_args(argv)
+    if args.chave is None and args.linha is None:
+        parser.error("informe a chave ou --linha")
+
+    indice = IndiceLinhagem(args.sidecar)
+    registros = indice.por_chave(args.dataset, args.chave) if args.linha is None \
+        else [r for r in [indice.por_linha(args.dataset, args.linha)] if r]
+    if not registros:
+        print("Nenhuma linha raw encontrada")
+        return 1
+    for r in registros:
+        print(f"{r['arquivo']}:{r['linha']} -> {r['destino']} (regras: {', '.join(r['regras']) or 'nenhuma'})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Logging Estruturado e Assíncrono
+================================
+
+Os módulos continuam usando `logging.getLogger(__name__)`; este módulo
+configura o root logger do processo (substitui o `basicConfig`):
+
+- os registros vão para uma fila (`QueueHandler`) e são escritos por uma
+  thread própria (`QueueListener`): quem loga não espera o disco nem o
+  console;
+- a mensagem só é montada na thread de escrita: nos caminhos quentes use
+  argumentos `%` (`logger.warning("  %d emails inválidos", n)`), que também
+  não custam nada quando o nível está desligado;
+- o `pipeline.log` é escrito em JSON lines (`ts`, `nivel`, `logger`,
+  `mensagem`, `pid`, o contexto da execução, como o `run_id`, e os campos
+  passados em `extra=`); o console continua no formato texto do config;
+- mensagens repetidas (mesmo logger, nível e template) acima de `limite`
+  em `janela_s` segundos são suprimidas e contadas. A próxima mensagem
+  emitida com aquele template informa quantas foram suprimidas (campo
+  `suprimidas`), e o encerramento registra as pendentes. ERROR e acima
+  nunca são suprimidos;
+- processos trabalhadores (spawn) recebem `fila_processos()` e chamam
+  `configurar_processo_filho(fila)`: seus registros chegam à mesma thread
+  de escrita e ao mesmo pipeline.log.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+FORMATO_PADRAO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LIMITE_PADRAO = 20
+JANELA_PADRAO = 60.0
+MAX_TEMPLATES = 10_000
+
+# Atributos de todo LogRecord: o resto veio de `extra=` ou do contexto
+_ATRIBUTOS_REGISTRO = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'suprimidas'}
+
+_contexto: Dict[str, Any] = {}
+_estado: Optional['_Estado'] = None
+_trava = threading.Lock()
+
+
+def definir_contexto(**campos) -> None:
+    """Campos anexados a todos os registros seguintes deste processo (ex.: run_id)."""
+    _contexto.update(campos)
+
+
+class FormatadorJSON(logging.Formatter):
+    """Um objeto JSON por linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        evento = {
+            'ts': datetime.fromtimestamp(record.created).astimezone().isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'pid': record.process,
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_REGISTRO:
+                evento[chave] = valor
+        if getattr(record, 'suprimidas', 0):
+            evento['suprimidas'] = record.suprimidas
+        if record.exc_info:
+            evento['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            evento['excecao'] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato texto do config, com a contagem de repetições suprimidas."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        if getattr(record, 'suprimidas', 0):
+            texto += f" (+{record.suprimidas} repetições suprimidas)"
+        return texto
+
+
+class FiltroRepeticoes(logging.Filter):
+    """
+    Deixa passar até `limite` registros por template (logger, nível, msg)
+    a cada `janela` segundos e conta os demais.
+    """
+
+    def __init__(self, limite: int = LIMITE_PADRAO, janela: float = JANELA_PADRAO):
+        super().__init__()
+        self.limite = limite
+        self.janela = janela
+        self._contagens: Dict[Tuple, List] = {}  # template -> [início da janela, emitidas, suprimidas]
+        self._trava = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.limite or record.levelno >= logging.ERROR or not isinstance(record.msg, str):
+            return True
+        chave = (record.name, record.levelno, record.msg)
+        agora = time.monotonic()
+        with self._trava:
+            contagem = self._contagens.get(chave)
+            if contagem is None or agora - contagem[0] >= self.janela:
+                if contagem and contagem[2]:
+                    record.suprimidas = contagem[2]
+                if contagem is None and len(self._contagens) >= MAX_TEMPLATES:
+                    self._descartar_expiradas(agora)
+                self._contagens[chave] = [agora, 1, 0]
+                return True
+            if contagem[1] < self.limite:
+                contagem[1] += 1
+                return True
+            contagem[2] += 1
+            return False
+
+    def _descartar_expiradas(self, agora: float) -> None:
+        for chave, contagem in list(self._contagens.items()):
+            if agora - contagem[0] >= self.janela and not contagem[2]:
+                del self._contagens[chave]
+
+    def pendentes(self) -> List[logging.LogRecord]:
+        """Registros-resumo das repetições ainda não informadas (e zera as contagens)."""
+        with self._trava:
+            resumos = [logging.makeLogRecord({
+                'name': nome, 'levelno': nivel, 'levelname': logging.getLevelName(nivel),
+                'msg': "Mensagem repetida %d vez(es) além do limite: %r", 'args': (contagem[2], msg),
+            }) for (nome, nivel, msg), contagem in self._contagens.items() if contagem[2]]
+            self._contagens.clear()
+        return resumos
+
+
+class _HandlerFila(logging.handlers.QueueHandler):
+    """QueueHandler do processo principal: enfileira o registro sem formatá-lo."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        for chave, valor in _contexto.items():
+            record.__dict__.setdefault(chave, valor)
+        return record
+
+
+class _Estado:
+    def __init__(self, handlers: List[logging.Handler], filtro: FiltroRepeticoes):
+        self.handlers = handlers
+        self.filtro = filtro
+        self.fila = queue.SimpleQueue()
+        self.handler = _HandlerFila(self.fila)
+        self.handler.addFilter(filtro)
+        self.listeners = [logging.handlers.QueueListener(self.fila, *handlers, respect_handler_level=True)]
+        self.fila_processos = None
+
+
+def configurar_logging(secao: Optional[Dict[str, Any]] = None, arquivo: Optional[Path] = None) -> None:
+    """
+    Configura o root logger: fila + thread de escrita para o console (texto)
+    e, se `arquivo` for dado, o arquivo (JSON lines, ou texto com `json: false`).
+    Chamadas seguintes encerram a configuração anterior (e o contexto).
+
+    Args:
+        secao: Seção `logging` do config.yaml (level, format, json, amostragem)
+        arquivo: Caminho do pipeline.log
+    """
+    global _estado
+    encerrar_logging()
+    _contexto.clear()
+    secao = secao or {}
+    amostragem = secao.get('amostragem') or {}
+    formato = secao.get('format', FORMATO_PADRAO)
+
+    console = logging.StreamHandler()
+    console.setFormatter(FormatadorTexto(formato))
+    handlers = [console]
+    if arquivo is not None:
+        Path(arquivo).parent.mkdir(parents=True, exist_ok=True)
+        saida = logging.FileHandler(str(arquivo), encoding='utf-8')
+        saida.setFormatter(FormatadorJSON() if secao.get('json', True) else FormatadorTexto(formato))
+        handlers.append(saida)
+
+    nivel = logging.getLevelName(str(secao.get('level', 'INFO')).upper())
+    filtro = FiltroRepeticoes(int(amostragem.get('limite', LIMITE_PADRAO)),
+                              float(amostragem.get('janela_s', JANELA_PADRAO)))
+    raiz = logging.getLogger()
+    for handler in raiz.handlers[:]:
+        raiz.removeHandler(handler)
+        handler.close()
+    with _trava:
+        _estado = _Estado(handlers, filtro)
+        raiz.addHandler(_estado.handler)
+        raiz.setLevel(nivel)
+        _estado.listeners[0].start()
+
+
+def fila_processos():
+    """
+    Fila (multiprocessing, contexto spawn) para os registros de processos
+    trabalhadores, escritos pelos mesmos handlers deste processo.
+    None se o logging não foi configurado por `configurar_logging`.
+    """
+    with _trava:
+        if _estado is None:
+            return None
+        if _estado.fila_processos is None:
+            _estado.fila_processos = multiprocessing.get_context('spawn').Queue()
+            listener = logging.handlers.QueueListener(_estado.fila_processos, *_estado.handlers,
+                                                      respect_handler_level=True)
+            listener.start()
+            _estado.listeners.append(listener)
+        return _estado.fila_processos
+
+
+def configurar_processo_filho(fila, nivel: int = logging.INFO,
+                              limite: int = LIMITE_PADRAO, janela: float = JANELA_PADRAO) -> None:
+    """No processo trabalhador: envia os registros para a fila do processo principal."""
+    if fila is None:
+        return
+    raiz = logging.getLogger()
+    for handler in raiz.handlers[:]:
+        raiz.removeHandler(handler)
+    handler = logging.handlers.QueueHandler(fila)  # prepare padrão: mensagem montada, registro serializável
+    handler.addFilter(FiltroRepeticoes(limite, janela))
+    raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+
+
+def encerrar_logging() -> None:
+    """Registra as repetições pendentes, esvazia as filas e fecha os handlers."""
+    global _estado
+    with _trava:
+        estado, _estado = _estado, None
+    if estado is None:
+        return
+    logging.getLogger().removeHandler(estado.handler)
+    for resumo in estado.filtro.pendentes():
+        estado.fila.put_nowait(estado.handler.prepare(resumo))
+    for listener in estado.listeners:
+        listener.stop()
+    if estado.fila_processos is not None:
+        estado.fila_processos.close()
+    for handler in estado.handlers:
+        handler.close()
+
+
+atexit.register(encerrar_logging)
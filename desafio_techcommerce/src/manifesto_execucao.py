@@ -0,0 +1,245 @@
+"""
+Manifesto de Execução do Pipeline (checkpoint/resume)
+=====================================================
+
+Registra, para cada execução (`run_id`), os hashes dos arquivos de entrada
+e o estado de cada etapa do pipeline, junto com os artefatos produzidos
+(DataFrames intermediários). Uma execução que falhou pode ser retomada com
+`--resume <run_id>`: etapas concluídas são reaproveitadas a partir dos
+artefatos em cache, desde que as entradas não tenham mudado.
+
+Estrutura em disco:
+    data/quality/runs/<run_id>/manifesto.json
+    data/quality/runs/<run_id>/<etapa>/<nome>.pkl
+
+Retenção: os artefatos têm o tamanho dos dados de entrada. Ao fim de uma
+execução bem-sucedida eles são removidos (`limpar_artefatos`; o manifesto
+fica como registro), e `coletar_execucoes` mantém só as execuções mais
+recentes.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NOME_MANIFESTO = "manifesto.json"
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+class ManifestoInvalidoError(Exception):
+    """Manifesto inexistente ou incompatível com as entradas atuais."""
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """Calcula o SHA-256 de um arquivo lendo em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def gerar_run_id() -> str:
+    """Gera um identificador de execução ordenável por data."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class ManifestoExecucao:
+    """Estado persistido de uma execução do pipeline."""
+
+    def __init__(self, diretorio: Path, dados: Dict[str, Any]):
+        self.diretorio = Path(diretorio)
+        self.dados = dados
+
+    @property
+    def run_id(self) -> str:
+        return self.dados['run_id']
+
+    # =====================================================================
+    # CRIAÇÃO E CARGA
+    # =====================================================================
+
+    @classmethod
+    def criar(cls, base_dir: Path, arquivos_entrada: Iterable[Path],
+              run_id: Optional[str] = None) -> 'ManifestoExecucao':
+        """
+        Cria o manifesto de uma nova execução.
+
+        Args:
+            base_dir: Diretório raiz dos manifestos (ex.: data/quality/runs)
+            arquivos_entrada: Arquivos cujo conteúdo define a execução
+            run_id: Identificador (gerado se omitido)
+        """
+        run_id = run_id or gerar_run_id()
+        manifesto = cls(Path(base_dir) / run_id, {
+            'run_id': run_id,
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+            'entradas': {Path(p).name: hash_arquivo(p) for p in sorted(arquivos_entrada)},
+            'etapas': {},
+        })
+        manifesto.salvar()
+        return manifesto
+
+    @classmethod
+    def carregar(cls, base_dir: Path, run_id: str) -> 'ManifestoExecucao':
+        """Carrega o manifesto de uma execução existente."""
+        diretorio = Path(base_dir) / run_id
+        caminho = diretorio / NOME_MANIFESTO
+        if not caminho.exists():
+            raise ManifestoInvalidoError(f"Execução '{run_id}' não encontrada em {base_dir}")
+        with open(caminho, encoding='utf-8') as f:
+            return cls(diretorio, json.load(f))
+
+    def salvar(self) -> None:
+        """Persiste o manifesto de forma atômica."""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        tmp = self.diretorio / (NOME_MANIFESTO + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.dados, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.diretorio / NOME_MANIFESTO)
+
+    def validar_entradas(self, arquivos_entrada: Iterable[Path]) -> None:
+        """
+        Garante que as entradas atuais são as mesmas da execução original.
+
+        Raises:
+            ManifestoInvalidoError: Se algum arquivo foi alterado, removido ou adicionado
+        """
+        atuais = {Path(p).name: hash_arquivo(p) for p in sorted(arquivos_entrada)}
+        if atuais != self.dados['entradas']:
+            alterados = set(atuais.items()) ^ set(self.dados['entradas'].items())
+            nomes = sorted({nome for nome, _ in alterados})
+            raise ManifestoInvalidoError(
+                f"Entradas mudaram desde a execução '{self.run_id}': {', '.join(nomes)}")
+
+    # =====================================================================
+    # ETAPAS
+    # =====================================================================
+
+    def etapa_concluida(self, etapa: str) -> bool:
+        """Indica se a etapa foi concluída e seus artefatos ainda estão íntegros."""
+        info = self.dados['etapas'].get(etapa)
+        if not info or info.get('status') != 'concluida' or info.get('artefatos_removidos'):
+            return False
+        for caminho, tamanho in info.get('artefatos', {}).items():
+            arquivo = self.diretorio / caminho
+            if not arquivo.exists() or arquivo.stat().st_size != tamanho:
+                logger.warning(f"Artefato '{caminho}' da etapa '{etapa}' ausente ou alterado")
+                return False
+        return True
+
+    def iniciar_etapa(self, etapa: str) -> None:
+        """Marca a etapa como em execução."""
+        self.dados['etapas'][etapa] = {
+            'status': 'em_execucao',
+            'iniciada_em': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.salvar()
+
+    def concluir_etapa(self, etapa: str, resultado: Optional[Dict[str, Any]] = None) -> None:
+        """Marca a etapa como concluída, com resultados serializáveis opcionais."""
+        info = self.dados['etapas'].setdefault(etapa, {})
+        info.update({
+            'status': 'concluida',
+            'concluida_em': datetime.now().isoformat(timespec='seconds'),
+            'resultado': resultado or {},
+        })
+        self.salvar()
+
+    def falhar_etapa(self, etapa: str, erro: Exception) -> None:
+        """Registra a falha de uma etapa."""
+        info = self.dados['etapas'].setdefault(etapa, {})
+        info.update({'status': 'falhou', 'erro': f"{type(erro).__name__}: {erro}"})
+        self.salvar()
+
+    def resultado_etapa(self, etapa: str) -> Dict[str, Any]:
+        """Resultados registrados por uma etapa concluída."""
+        return self.dados['etapas'].get(etapa, {}).get('resultado', {})
+
+    # =====================================================================
+    # ARTEFATOS
+    # =====================================================================
+
+    def salvar_dataframes(self, etapa: str, dataframes: Dict[str, pd.DataFrame]) -> None:
+        """
+        Persiste os DataFrames produzidos por uma etapa.
+
+        Usa pickle para preservar os dtypes (centavos Int64, datetimes). Uma
+        TabelaEmDisco (governador de memória) é salva como referência às
+        partições, que ficam no diretório da execução.
+        """
+        destino = self.diretorio / etapa
+        destino.mkdir(parents=True, exist_ok=True)
+        artefatos = self.dados['etapas'].setdefault(etapa, {}).setdefault('artefatos', {})
+        for nome, df in dataframes.items():
+            caminho = destino / f"{nome}.pkl"
+            pd.to_pickle(df, caminho)
+            artefatos[str(caminho.relative_to(self.diretorio))] = caminho.stat().st_size
+        self.salvar()
+
+    def carregar_dataframes(self, etapa: str) -> Dict[str, pd.DataFrame]:
+        """Carrega os DataFrames persistidos por uma etapa."""
+        artefatos = self.dados['etapas'].get(etapa, {}).get('artefatos', {})
+        return {Path(caminho).stem: pd.read_pickle(self.diretorio / caminho) for caminho in artefatos}
+
+    def limpar_artefatos(self) -> int:
+        """
+        Remove os artefatos da execução (DataFrames e partições), mantendo o
+        manifesto. Etapas que dependiam deles deixam de ser reaproveitáveis.
+
+        Returns:
+            Bytes liberados
+        """
+        for info in self.dados['etapas'].values():
+            if info.pop('artefatos', None) is not None:
+                info['artefatos_removidos'] = True
+        liberados = 0
+        for item in self.diretorio.iterdir() if self.diretorio.exists() else []:
+            if item.is_dir():
+                liberados += sum(f.stat().st_size for f in item.rglob('*') if f.is_file())
+                shutil.rmtree(item)
+        self.salvar()
+        return liberados
+
+
+def coletar_execucoes(base_dir: Path, manter: int, preservar: Iterable[str] = ()) -> List[str]:
+    """
+    Remove as execuções além das `manter` mais recentes (pela data de criação
+    do manifesto). Execuções em `preservar` (ex.: a atual) nunca são removidas.
+
+    Returns:
+        run_ids removidos
+    """
+    base_dir = Path(base_dir)
+    if not base_dir.exists():
+        return []
+
+    def criado_em(diretorio: Path) -> str:
+        try:
+            with open(diretorio / NOME_MANIFESTO, encoding='utf-8') as f:
+                return json.load(f)['criado_em']
+        except (OSError, ValueError, KeyError):  # manifesto ausente ou corrompido: data do diretório
+            return datetime.fromtimestamp(diretorio.stat().st_mtime).isoformat(timespec='seconds')
+
+    execucoes = sorted((d for d in base_dir.iterdir() if d.is_dir()), key=lambda d: (criado_em(d), d.name))
+    preservar = set(preservar)
+    removidas = []
+    for diretorio in execucoes[:max(len(execucoes) - max(manter, 0), 0)]:
+        if diretorio.name not in preservar:
+            shutil.rmtree(diretorio)
+            removidas.append(diretorio.name)
+    if removidas:
+        logger.info(f"Retenção de execuções: {len(removidas)} removida(s) de {base_dir}")
+    return removidas
@@ -0,0 +1,234 @@
+"""
+Memoização de Validações por Impressão do Lote
+==============================================
+
+Quando vendas_clean não muda entre duas execuções (fins de semana,
+reexecuções após falha na etapa de relatório), as expectativas não
+precisam rodar de novo. O resultado de cada regra (avaliados, falhas) é
+guardado sob a chave:
+
+    (hash da definição da regra, impressão do conteúdo da coluna)
+
+- hash da regra: tipo, coluna e kwargs (inclui os conjuntos de FK e o
+  limite "hoje" da temporalidade; mudou a regra, só ela é reavaliada)
+- impressão: hash de 64 bits por valor (`pd.util.hash_pandas_object`)
+  condensado em um digest BLAKE2b, junto com o dtype
+
+Com uma coluna de partição (ex.: data_venda), as regras elemento a
+elemento guardam uma entrada por partição e apenas as partições novas ou
+alteradas são avaliadas; as contagens das demais vêm do cache. A regra de
+unicidade depende da coluna inteira e usa sempre a impressão completa.
+
+O cache fica em um SQLite (gx/uncommitted/validation_memo.sqlite); a
+ETAPA 2.1 remove as entradas sem uso há mais de `validacao.memo.retencao_dias`.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import json
+import hashlib
+import sqlite3
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from suites_compiladas import BLOQUEANTE, Expectativa, ResultadoRegra, SuiteCompilada, mascara_falhas, nao_avaliada
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CAMINHO_PADRAO = PROJECT_ROOT / "gx" / "uncommitted" / "validation_memo.sqlite"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    hash_regra TEXT NOT NULL,
+    impressao TEXT NOT NULL,
+    avaliados INTEGER NOT NULL,
+    falhas INTEGER NOT NULL,
+    usado_em TEXT NOT NULL,
+    PRIMARY KEY (hash_regra, impressao)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_memo_uso ON memo (usado_em);
+"""
+
+_UNICO = 'expect_column_values_to_be_unique'
+# Impressões por consulta (abaixo do limite de parâmetros do SQLite)
+LOTE_CONSULTA = 500
+RETENCAO_PADRAO_DIAS = 30
+_NAO_NULO = 'expect_column_values_to_not_be_null'
+
+
+def hash_regra(exp: Expectativa) -> str:
+    """Hash estável da definição de uma expectativa."""
+    kwargs = {nome: sorted(valor, key=str) if isinstance(valor, (set, frozenset)) else valor
+              for nome, valor in exp.kwargs.items() if nome != 'meta'}
+    texto = json.dumps([exp.tipo, exp.coluna, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def _digest(hashes: np.ndarray, dtype: str) -> str:
+    h = hashlib.blake2b(dtype.encode('utf-8'), digest_size=16)
+    h.update(np.ascontiguousarray(hashes).tobytes())
+    return h.hexdigest()
+
+
+def impressao_coluna(serie: pd.Series) -> str:
+    """Impressão do conteúdo (e da ordem) de uma coluna."""
+    return _digest(pd.util.hash_pandas_object(serie, index=False).to_numpy(), str(serie.dtype))
+
+
+class _Particionamento:
+    """Códigos de partição de um lote e os limites de cada partição na ordem agrupada."""
+
+    def __init__(self, df: pd.DataFrame, coluna: str):
+        chave = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(chave.dtype):
+            chave = chave.dt.normalize()
+        self.codigos, rotulos = pd.factorize(chave, use_na_sentinel=False)
+        self.quantidade = len(rotulos)
+        self.ordem = np.argsort(self.codigos, kind='stable')
+        self.limites = np.searchsorted(self.codigos[self.ordem], np.arange(self.quantidade + 1))
+
+    def impressoes(self, serie: pd.Series) -> List[str]:
+        """Impressão da coluna em cada partição."""
+        hashes = pd.util.hash_pandas_object(serie, index=False).to_numpy()[self.ordem]
+        dtype = str(serie.dtype)
+        return [_digest(hashes[self.limites[j]:self.limites[j + 1]], dtype) for j in range(self.quantidade)]
+
+    def contar(self, exp: Expectativa, serie: pd.Series, particoes: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(avaliados, falhas) por partição, avaliando apenas as linhas das partições indicadas."""
+        selecao = np.isin(self.codigos, particoes)
+        valores, codigos = serie[selecao], self.codigos[selecao]
+        if exp.tipo == _NAO_NULO:
+            falhas = codigos[valores.isna().to_numpy()]
+        else:
+            nao_nulos = valores.notna().to_numpy()
+            valores, codigos = valores[nao_nulos], codigos[nao_nulos]
+            falhas = codigos[np.asarray(mascara_falhas(exp)(valores), dtype=bool)]
+        return (np.bincount(codigos, minlength=self.quantidade),
+                np.bincount(falhas, minlength=self.quantidade))
+
+
+class MemoValidacao:
+    """Cache SQLite de (regra, impressão) -> (avaliados, falhas)."""
+
+    def __init__(self, caminho: Optional[Path] = None):
+        self.caminho = Path(caminho) if caminho else CAMINHO_PADRAO
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(str(self.caminho))
+        self.con.execute("PRAGMA journal_mode = WAL")
+        self.con.executescript(_ESQUEMA)
+
+    def fechar(self) -> None:
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def obter(self, regra: str, impressoes: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """Contagens em cache para as impressões pedidas (as encontradas têm o uso renovado)."""
+        pedidas = sorted(set(impressoes))
+        encontradas = {}
+        for inicio in range(0, len(pedidas), LOTE_CONSULTA):
+            lote = pedidas[inicio:inicio + LOTE_CONSULTA]
+            linhas = self.con.execute(
+                f"SELECT impressao, avaliados, falhas FROM memo "
+                f"WHERE hash_regra = ? AND impressao IN ({', '.join('?' * len(lote))})",
+                (regra, *lote)).fetchall()
+            encontradas.update((impressao, (avaliados, falhas)) for impressao, avaliados, falhas in linhas)
+        if encontradas:
+            agora = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            with self.con:
+                self.con.executemany("UPDATE memo SET usado_em = ? WHERE hash_regra = ? AND impressao = ?",
+                                     [(agora, regra, impressao) for impressao in encontradas])
+        return encontradas
+
+    def guardar(self, regra: str, contagens: Dict[str, Tuple[int, int]]) -> None:
+        agora = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self.con:
+            self.con.executemany("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?)",
+                                 [(regra, impressao, int(a), int(f), agora)
+                                  for impressao, (a, f) in contagens.items()])
+
+    def limpar(self, dias: int = RETENCAO_PADRAO_DIAS) -> int:
+        """Remove as entradas sem uso há mais de `dias` dias."""
+        limite = (datetime.now(timezone.utc) - timedelta(days=dias)).isoformat(timespec='seconds')
+        with self.con:
+            return self.con.execute("DELETE FROM memo WHERE usado_em < ?", (limite,)).rowcount
+
+    def __len__(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+
+
+def validar_com_memo(suite: SuiteCompilada, df: pd.DataFrame, memo: MemoValidacao,
+                     particao: Optional[str] = None,
+                     contar: Optional[Callable[[Expectativa], Tuple[int, int]]] = None,
+                     fail_fast: bool = False) -> Tuple[List[ResultadoRegra], Dict[str, int]]:
+    """
+    Valida o lote reaproveitando as contagens de regras e partições inalteradas.
+
+    Args:
+        particao: Coluna de partição (None: o lote inteiro é uma partição)
+        contar: Avaliação alternativa das regras sem partição em caso de
+            cache miss (ex.: pushdown SQL do ArmazemAnalitico)
+        fail_fast: Mesma ordem e parada de SuiteCompilada.validar; as
+            contagens são sempre exatas (são elas que vão para o cache)
+
+    Returns:
+        (resultados na ordem da suite, {'reaproveitadas': n, 'avaliadas': n}),
+        contando pares regra/partição
+    """
+    particionamento = _Particionamento(df, particao) if particao and particao in df.columns else None
+    impressoes: Dict[str, List[str]] = {}
+    uso = {'reaproveitadas': 0, 'avaliadas': 0}
+    resultados: List[Optional[ResultadoRegra]] = [None] * len(suite)
+    ordem = suite.ordem_fail_fast if fail_fast else range(len(suite))
+    bloqueio = None
+    for i in ordem:
+        exp = suite.expectativas[i]
+        if bloqueio is not None:
+            resultados[i] = nao_avaliada(exp, bloqueio)
+            continue
+        if exp.coluna not in df.columns:
+            resultados[i] = ResultadoRegra(exp.tipo, exp.coluna, False, 0, 0, exp.mostly,
+                                           erro=f"coluna '{exp.coluna}' ausente", severidade=exp.severidade)
+        else:
+            regra, serie = hash_regra(exp), df[exp.coluna]
+            if particionamento is not None and exp.tipo != _UNICO:
+                if exp.coluna not in impressoes:
+                    impressoes[exp.coluna] = particionamento.impressoes(serie)
+                chaves = impressoes[exp.coluna]
+                contagens = memo.obter(regra, chaves)
+                faltantes = sorted({j for j, chave in enumerate(chaves) if chave not in contagens})
+                if faltantes:
+                    avaliados_p, falhas_p = particionamento.contar(exp, serie, faltantes)
+                    novas = {chaves[j]: (avaliados_p[j], falhas_p[j]) for j in faltantes}
+                    memo.guardar(regra, novas)
+                    contagens.update(novas)
+                uso['avaliadas'] += len(faltantes)
+                uso['reaproveitadas'] += len(chaves) - len(faltantes)
+                avaliados = sum(int(contagens[chave][0]) for chave in chaves)
+                falhas = sum(int(contagens[chave][1]) for chave in chaves)
+            else:
+                chave = impressao_coluna(serie)
+                contagem = memo.obter(regra, [chave]).get(chave)
+                if contagem is None:
+                    contagem = contar(exp) if contar else suite.contar(i, serie)
+                    memo.guardar(regra, {chave: contagem})
+                    uso['avaliadas'] += 1
+                else:
+                    uso['reaproveitadas'] += 1
+                avaliados, falhas = int(contagem[0]), int(contagem[1])
+            sucesso = avaliados == 0 or (avaliados - falhas) / avaliados >= exp.mostly
+            resultados[i] = ResultadoRegra(exp.tipo, exp.coluna, bool(sucesso), avaliados, falhas, exp.mostly,
+                                           severidade=exp.severidade)
+        if fail_fast and not resultados[i].sucesso and exp.severidade == BLOQUEANTE:
+            bloqueio = f"{exp.tipo}({exp.coluna})"
+    return resultados, uso
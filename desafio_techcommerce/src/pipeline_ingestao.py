@@ -5,12 +5,32 @@ Pipeline de Ingestão TechCommerce
 Orquestra o fluxo completo de DataOps:
 1. Carregamento de dados raw (CSV)
 2. Limpeza automática (6 dimensões de qualidade)
+   2.1 Validação com as suites compiladas (antes de publicar: uma regra
+       bloqueante que falha interrompe o pipeline sem publicar nada)
 3. Salvamento em formato processado
-4. Validação com Great Expectations
-5. Geração de relatórios
+   3.1 CDC por hash de linha contra a execução anterior
+   3.2 Tabela fato de vendas desnormalizada (atualizada pelo CDC)
+4. Analytics de SLA de entrega (rollup incremental)
+5. Configuração do Great Expectations
+6. Geração de relatórios
+
+Cada etapa concluída é registrada no manifesto da execução
+(data/quality/runs/<run_id>/), com os DataFrames intermediários em cache.
+Se a execução falhar, `--resume <run_id>` retoma a partir da primeira
+etapa não concluída, desde que as entradas (data/raw e config) não tenham
+mudado.
+
+Com `--profile` e/ou `--trace-memory`, cada etapa (e cada `corrigir_*`)
+gera perfis de CPU e memória em data/quality/profiles/<run_id>/.
+
+Com `--daemon`, o processo fica aquecido observando data/raw e processa
+os arquivos que chegam em micro-lotes (ver daemon_ingestao.py).
 
 Execução:
     python pipeline_ingestao.py
+    python pipeline_ingestao.py --resume 20251117-101500-a1b2c3
+    python pipeline_ingestao.py --profile --trace-memory
+    python pipeline_ingestao.py --daemon --janela 0.5
 
 Author: DataOps Team TechCommerce
 Date: 2025-11-17
@@ -18,10 +38,15 @@ Date: 2025-11-17
 
 import os
 import sys
+import argparse
+import functools
+import contextlib
 import pandas as pd
 import great_expectations as gx
 import logging
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
 
 # Adicionar src ao path para encontrar os módulos
 project_root = Path(__file__).parent.parent
@@ -29,166 +54,615 @@ src_path = project_root / "src"
 sys.path.insert(0, str(src_path))
 
 import correcao_automatica as ca
+import configuracao
 import great_expectations_setup as ge_setup
 import checkpoints_config
 import dashboard_qualidade
+import sla_logistica
+import deduplicacao_clientes
+import daemon_ingestao
+import suites_compiladas
+import cdc_snapshots
+import docs_incrementais
+import tabela_fato
+import log_estruturado
+from armazem_analitico import ArmazemAnalitico
+from armazem_resultados import ArmazemResultados
+from memo_validacao import RETENCAO_PADRAO_DIAS, MemoValidacao, validar_com_memo
+from manifesto_execucao import ManifestoExecucao, ManifestoInvalidoError, coletar_execucoes
+from profiling_pipeline import ProfilerExecucao
+from linhagem import RegistroLinhagem
+from leitura_raw import ler_csv_raw
+from execucao_distribuida import ExecucaoDistribuida
+from pseudonimizacao import Pseudonimizador
+from governador_memoria import GovernadorMemoria, TabelaEmDisco
+from versoes_processados import RepositorioVersoes
+from cache_correcoes import CacheCorrecoes, corrigir_com_cache
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+CONFIG_PADRAO = project_root / "config" / "config.yaml"
+
 
-def main():
-    """Função principal que orquestra todo o pipeline."""
-    # Definir caminhos
+def definir_raiz(raiz: Path, config_path: Optional[Path] = None) -> None:
+    """
+    Aponta o pipeline para outra árvore de projeto (ex.: um tenant).
+
+    A raiz deve ter data/raw/; o config é o da raiz, se existir, ou o
+    config/config.yaml do projeto.
+    """
+    global project_root, RAW_DATA_PATH, PROCESSED_DATA_PATH, QUALITY_DATA_PATH, CDC_PATH, RUNS_PATH
+    global PROFILES_PATH, VALIDATION_STORE_PATH, VALIDATION_MEMO_PATH, CONFIG_PATH
+    project_root = Path(raiz).resolve()
+    RAW_DATA_PATH = project_root / "data" / "raw"
     PROCESSED_DATA_PATH = project_root / "data" / "processed"
     QUALITY_DATA_PATH = project_root / "data" / "quality"
+    CDC_PATH = PROCESSED_DATA_PATH / "cdc"
+    RUNS_PATH = QUALITY_DATA_PATH / "runs"
+    PROFILES_PATH = QUALITY_DATA_PATH / "profiles"
+    VALIDATION_STORE_PATH = project_root / "gx" / "uncommitted" / "validation_results.sqlite"
+    VALIDATION_MEMO_PATH = project_root / "gx" / "uncommitted" / "validation_memo.sqlite"
+    config_raiz = project_root / "config" / "config.yaml"
+    CONFIG_PATH = Path(config_path) if config_path else (config_raiz if config_raiz.exists() else CONFIG_PADRAO)
+
+
+definir_raiz(project_root)
+
+CHECKPOINT_NAME = "techcommerce_processed_data_checkpoint"
+
+
+def _banner(titulo: str) -> None:
+    print("\n" + "=" * 70)
+    print(titulo)
+    print("=" * 70)
+
+
+def arquivos_entrada() -> List[Path]:
+    """Arquivos que definem uma execução (hash validado no --resume)."""
+    return sorted(RAW_DATA_PATH.glob("*.csv")) + [CONFIG_PATH]
+
+
+# =====================================================================
+# ETAPAS
+# =====================================================================
+
+def carregar_dados_raw(leitor: str = 'arrow', governador: Optional[GovernadorMemoria] = None,
+                       config: Optional[dict] = None, diretorio_spill: Optional[Path] = None) -> Dict[str, pd.DataFrame]:
+    """
+    ETAPA 1: Carrega os CSVs raw (valores monetários em centavos).
+
+    Com o governador de memória, as tabelas planejadas no modo disco são
+    gravadas em partições parquet em `diretorio_spill` (TabelaEmDisco).
+    """
+    logger.info(f"Carregando datasets raw (leitor {leitor})...")
+    dados_brutos = {}
+    arquivos = sorted(RAW_DATA_PATH.glob("*.csv"))
+    planos = governador.planejar({f.stem: f for f in arquivos}, config or {}) if governador else {}
+
+    for csv_file in arquivos:
+        dataset_name = csv_file.stem
+        try:
+            plano = planos.get(dataset_name)
+            if plano is not None and plano.modo == 'disco':
+                df = governador.carregar_em_disco(plano, csv_file, diretorio_spill)
+            else:
+                df = ler_csv_raw(csv_file, sep='\t', leitor=leitor)
+                ca.converter_colunas_monetarias(df)  # valores monetários em centavos (int64)
+            if governador is not None:
+                governador.liberar()
+            dados_brutos[dataset_name] = df
+            logger.info(f"✓ {dataset_name}.csv carregado ({len(df)} linhas, {len(df.columns)} colunas"
+                        f"{', em disco' if isinstance(df, TabelaEmDisco) else ''})")
+        except Exception as e:
+            logger.error(f"✗ Erro ao carregar {dataset_name}: {e}")
+            raise
+
+    return dados_brutos
+
+
+def aplicar_correcoes(dados_brutos: Dict[str, pd.DataFrame], config: dict,
+                      perfil: Optional[ProfilerExecucao] = None,
+                      governador: Optional[GovernadorMemoria] = None) -> Dict[str, pd.DataFrame]:
+    """
+    ETAPA 2: Aplica as correções automáticas nas 4 tabelas.
+
+    Com o governador de memória, cada tabela é corrigida inteira ou em
+    lotes de partições por chave, conforme o orçamento.
+    """
+    logger.info("Aplicando correções de qualidade...")
+    perfil = perfil or ProfilerExecucao.desativado()
+
+    # Corretor da execução: cache de datas compartilhado entre as tabelas
+    registro = RegistroLinhagem() if (config.get('lineage') or {}).get('enabled', True) else None
+    corretor = ca.CorrecaoAutomatica(formato_data=configuracao.formato_data(config),
+                                     backend=configuracao.backend_correcao(config),
+                                     linhagem=registro)
+    if registro is not None:
+        for nome in ('clientes', 'produtos', 'vendas', 'logistica'):
+            chave = configuracao.chave_primaria(config, nome)
+            bruto = dados_brutos[nome]
+            if isinstance(bruto, TabelaEmDisco):  # a linhagem só precisa do índice raw e da chave
+                bruto = bruto.ler(colunas=[chave if chave in bruto.columns else bruto.columns[0]])
+            registro.iniciar(nome, bruto, (RAW_DATA_PATH / f"{nome}.csv").relative_to(project_root), chave)
+
+    # Execução distribuída (opcional): as mesmas correções, particionadas entre trabalhadores
+    distribuida = ExecucaoDistribuida.do_config(config, configuracao.formato_data(config),
+                                                configuracao.backend_correcao(config))
+    if distribuida is not None and registro is not None:
+        logger.warning("Execução distribuída: a linhagem registra origem e destino, sem o bitmask de regras")
+    tabelas = distribuida or corretor
+
+    planos = governador.planejar(dados_brutos, config) if governador is not None else {}
+    # Cache por linha (clientes/produtos): só as linhas raw novas ou alteradas são corrigidas
+    cache = CacheCorrecoes.do_config(config, project_root, contexto=(
+        f"{configuracao.backend_correcao(config)}|{configuracao.formato_data(config)}|"
+        f"linhagem={registro is not None}|distribuida={distribuida is not None}"))
+
+    def corrigir(nome: str, *referencias) -> pd.DataFrame:
+        if governador is not None and planos[nome].modo != 'memoria':
+            return governador.corrigir(tabelas, nome, dados_brutos[nome], planos[nome], *referencias)
+        resultado = corrigir_com_cache(cache, nome, dados_brutos[nome],
+                                       lambda df: getattr(tabelas, f"corrigir_{nome}")(df, *referencias), registro)
+        if governador is not None:
+            governador.liberar()
+        return resultado
+
+    with distribuida or contextlib.nullcontext():
+        with perfil.etapa('correcao.corrigir_clientes'):
+            df_clientes = corrigir('clientes')
+        with perfil.etapa('correcao.deduplicacao_clientes'):
+            clusters = deduplicacao_clientes.atribuir_clusters(df_clientes)[['id_cliente', 'id_cluster']]
+            # Arquivo à parte: o clientes_clean.csv mantém o schema publicado
+            clusters.to_csv(PROCESSED_DATA_PATH / "clientes_clusters.csv", index=False, sep=';')
+        logger.info(f"Clientes: {len(dados_brutos['clientes'])} → {len(df_clientes)} linhas "
+                    f"({clusters['id_cluster'].nunique()} clientes distintos)")
+        # Depois da deduplicação, que compara email/telefone/nome originais
+        pseudonimizador = Pseudonimizador.do_config(config, project_root)
+        if pseudonimizador is not None:
+            with perfil.etapa('correcao.pseudonimizacao_clientes'):
+                df_clientes = pseudonimizador.pseudonimizar(df_clientes)
+
+        with perfil.etapa('correcao.corrigir_produtos'):
+            df_produtos = corrigir('produtos')
+        logger.info(f"Produtos: {len(dados_brutos['produtos'])} → {len(df_produtos)} linhas")
+
+        with perfil.etapa('correcao.corrigir_vendas'):
+            df_vendas = corrigir('vendas', df_clientes, df_produtos)
+        logger.info(f"Vendas: {len(dados_brutos['vendas'])} → {len(df_vendas)} linhas")
+
+        with perfil.etapa('correcao.corrigir_logistica'):
+            df_logistica = corrigir('logistica', df_vendas)
+        logger.info(f"Logística: {len(dados_brutos['logistica'])} → {len(df_logistica)} linhas")
+    if distribuida is None:
+        logger.info(f"Datas: {corretor.cache_datas.resumo()}")
+
+    dados_processados = {
+        "clientes": df_clientes,
+        "produtos": df_produtos,
+        "vendas": df_vendas,
+        "logistica": df_logistica
+    }
+    if registro is not None:
+        for nome, df in dados_processados.items():
+            registro.finalizar(nome, df)
+        registro.salvar(project_root / config['lineage'].get('path', 'data/processed/linhagem.parquet')
+                        if config.get('lineage') else PROCESSED_DATA_PATH / "linhagem.parquet")
+    return dados_processados
+
+
+def salvar_processados(dados_processados: Dict[str, pd.DataFrame], config: Optional[dict] = None,
+                       versao: Optional[str] = None) -> Dict[str, int]:
+    """
+    ETAPA 3: Publica os *_clean.csv em data/processed (e no armazém analítico, se habilitado).
+
+    Com `versoes` habilitado e uma `versao` (o run_id), os arquivos são gravados
+    como uma versão imutável, publicada por troca atômica; tabelas inalteradas
+    reaproveitam o arquivo da versão anterior (ver versoes_processados).
+
+    Returns:
+        Contagem de arquivos gravados e reaproveitados
+    """
+    logger.info("Salvando datasets processados...")
+    config = config or {}
+    arquivos = {nome: (config.get('datasets') or {}).get(nome, {}).get('clean_file', f"{nome}_clean.csv")
+                for nome in dados_processados}
+
+    resumo = {'gravados': len(dados_processados), 'reaproveitados': 0}
+    repositorio = RepositorioVersoes.do_config(config, project_root) if versao else None
+    if repositorio is not None:
+        manifesto = repositorio.gravar(versao, dados_processados, arquivos)
+        repositorio.publicar(versao)
+        repositorio.coletar()
+        resumo['reaproveitados'] = sum(e['reaproveitado'] for e in manifesto['arquivos'].values())
+        resumo['gravados'] -= resumo['reaproveitados']
+    else:
+        for name, df in dados_processados.items():
+            output_path = PROCESSED_DATA_PATH / arquivos[name]
+            temporario = output_path.with_name(output_path.name + '.tmp')
+            # Centavos -> reais apenas no momento da escrita
+            ca.restaurar_colunas_monetarias(df).to_csv(temporario, index=False, sep=';')
+            os.replace(temporario, output_path)
+            logger.info(f"✓ {arquivos[name]} salvo ({len(df)} linhas)")
+
+    armazem = ArmazemAnalitico.do_config(config, project_root)
+    if armazem is not None:
+        with armazem:
+            armazem.carregar(dados_processados, config)
+    return resumo
+
+
+def atualizar_sla(df_logistica: pd.DataFrame, config: dict) -> None:
+    """ETAPA 4: Atualiza o rollup de SLA de logística."""
+    logger.info("Atualizando rollup de SLA de logística...")
+    sla_logistica.executar_analytics_sla(
+        df_logistica,
+        QUALITY_DATA_PATH / "sla_logistica_rollup.csv",
+        meta_no_prazo=config.get('quality_rules', {}).get('timeliness_threshold', 0.99)
+    )
+    logger.info("✓ Rollup de SLA atualizado")
+
+
+def configurar_great_expectations(context) -> None:
+    """ETAPA 5: Configura datasource e expectation suites."""
+    try:
+        logger.info("Configurando datasource 'techcommerce_source'...")
+        ge_setup.setup_datasource(context, str(project_root))
+        logger.info("✓ Datasource configurado")
+    except Exception as e:
+        logger.warning(f"Datasource pode já existir: {e}")
+
+    logger.info("Criando expectation suites...")
+    ge_setup.create_expectation_suites(context)
+    logger.info("✓ Expectation suites criadas")
+
+
+class ValidacaoBloqueadaError(Exception):
+    """Uma regra bloqueante (PK/FK) falhou na ETAPA 2.1: o pipeline para sem publicar nada."""
+
+
+def executar_validacao(context, config: Optional[dict] = None,
+                       dados: Optional[Dict[str, pd.DataFrame]] = None) -> bool:
+    """ETAPA 2.1: Valida os dados processados com as suites compiladas.
+
+    No pipeline, as suites rodam em memória sobre os DataFrames da ETAPA 2
+    (`SuiteCompilada.validar`), antes de qualquer publicação: um lote
+    bloqueado não chega aos *_clean.csv, ao CDC nem à tabela fato. A
+    memoização (`validacao.memo`) reaproveita regras cuja coluna (ou
+    partição) não mudou desde a última validação. Sem `dados`, as suites
+    rodam por pushdown SQL sobre as tabelas já carregadas no armazém
+    analítico (validação do que está publicado).
+
+    Returns:
+        True se todas as regras passaram; False se só regras de aviso falharam
+
+    Raises:
+        ValidacaoBloqueadaError: alguma regra bloqueante falhou
+    """
+    logger.info(f"Checkpoint '{CHECKPOINT_NAME}' configurado")
+    config = config or {}
+    dados = dados or {}
+    armazem = ArmazemAnalitico.do_config(config, project_root) if not dados else None
+    if armazem is None and not dados:
+        raise ValueError("Validação sem dados processados nem armazém analítico")
+
+    fail_fast = configuracao.validacao_fail_fast(config)
+    cfg_memo = (config.get('validacao') or {}).get('memo') or {}
+    memo = MemoValidacao(VALIDATION_MEMO_PATH) if cfg_memo.get('enabled', True) and dados else None
+    particoes = cfg_memo.get('particoes') or {}
+    origem = f'pushdown_{armazem.motor}' if armazem is not None else 'memoria'
+
+    sucesso, bloqueadas = True, []
+    run_name = datetime.now().strftime('%Y%m%d-%H%M%S-techcommerce-validation')
+    with armazem or contextlib.nullcontext(), ArmazemResultados(VALIDATION_STORE_PATH) as historico, \
+            memo or contextlib.nullcontext():
+        if armazem is not None:
+            # As referências só habilitam as regras de FK; a checagem é por anti-join no armazém
+            suites = suites_compiladas.compilar_suites(armazem.referencias_fk())
+        else:
+            suites = {nome: suite for nome, suite in suites_compiladas.compilar_suites(dados).items()
+                      if nome in dados}
+        for dataset, suite in suites.items():
+            contar = functools.partial(armazem.contar, dataset) if armazem is not None else None
+            if memo is not None and dataset in dados:
+                resultados, uso = validar_com_memo(suite, ca.restaurar_colunas_monetarias(dados[dataset]), memo,
+                                                   particao=particoes.get(dataset), contar=contar,
+                                                   fail_fast=fail_fast)
+                logger.info(f"   memo {dataset}: {uso['reaproveitadas']} reaproveitadas, "
+                            f"{uso['avaliadas']} avaliadas (regra x partição)")
+            elif armazem is not None:
+                resultados = armazem.validar(dataset, suite, fail_fast=fail_fast)
+            else:
+                resultados = suite.validar(ca.restaurar_colunas_monetarias(dados[dataset]), fail_fast=fail_fast)
+            historico.registrar_regras(suite.nome, resultados, run_name, origem=origem)
+            resumo = suites_compiladas.resumir_resultados(resultados)
+            sucesso = sucesso and resumo['sucesso']
+            logger.info(f"{'✓' if resumo['sucesso'] else '✗'} {suite.nome} ({origem}): "
+                        f"{resumo['regras'] - resumo['regras_com_falha']}/{resumo['regras']} regras OK")
+            for falha in resumo['falhas']:
+                logger.warning(f"   falha: {falha}")
+            if resumo['regras_nao_avaliadas']:
+                logger.warning(f"   {resumo['regras_nao_avaliadas']} regras não avaliadas (falha bloqueante)")
+            if resumo['bloqueado']:
+                bloqueadas.append(suite.nome)
+        if memo is not None:
+            removidas = memo.limpar(int(cfg_memo.get('retencao_dias', RETENCAO_PADRAO_DIAS)))
+            if removidas:
+                logger.info(f"   memo: {removidas} entradas sem uso removidas")
+    if bloqueadas:
+        raise ValidacaoBloqueadaError(f"regras bloqueantes falharam em: {', '.join(bloqueadas)}")
+    return sucesso
+
+
+def gerar_relatorios(context) -> None:
+    """ETAPA 6: Gera o dashboard de qualidade."""
+    logger.info("Gerando dashboard de qualidade...")
+    dashboard_qualidade.gerar_relatorio_executivo(context, CHECKPOINT_NAME)
+    logger.info("✓ Relatório gerado")
+
+
+def atualizar_data_docs(config: dict) -> None:
+    """Após o sucesso do pipeline: build incremental dos Data Docs (em segundo plano por padrão)."""
+    secao = config.get('data_docs') or {}
+    if not secao.get('incremental', True):
+        return
+    gx_raiz = project_root / "gx"
+    caminhos = {
+        'site_dir': gx_raiz / "uncommitted" / "data_docs" / "incremental_site",
+        'store_path': VALIDATION_STORE_PATH,
+        'expectations_dir': gx_raiz / "expectations" if (gx_raiz / "expectations").exists() else None,
+    }
+    try:
+        if secao.get('segundo_plano', True):
+            docs_incrementais.construir_em_segundo_plano(**caminhos)
+        else:
+            docs_incrementais.ConstrutorDocsIncremental(**caminhos).construir()
+    except Exception as e:
+        logger.warning(f"Data Docs não atualizados: {e}")
+
+
+# =====================================================================
+# ORQUESTRAÇÃO
+# =====================================================================
+
+def reter_execucoes(manifesto: ManifestoExecucao, sucesso: bool) -> None:
+    """
+    Retenção de data/quality/runs: remove os artefatos de uma execução
+    bem-sucedida (nada a retomar) e as execuções além de `runs.manter`.
+    """
+    try:
+        secao = configuracao.carregar_config(CONFIG_PATH).get('runs') or {}
+        if sucesso and secao.get('limpar_ao_concluir', True):
+            liberados = manifesto.limpar_artefatos()
+            logger.info(f"Artefatos da execução {manifesto.run_id} removidos ({liberados / 1024 / 1024:.1f} MB)")
+        coletar_execucoes(RUNS_PATH, int(secao.get('manter', 10)), preservar=[manifesto.run_id])
+    except OSError as e:
+        logger.warning(f"Retenção de execuções não concluída: {e}")
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pipeline de ingestão TechCommerce")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="Retoma a execução RUN_ID a partir da última etapa concluída")
+    parser.add_argument('--run-id', metavar='RUN_ID', help="Identificador da nova execução (padrão: gerado)")
+    parser.add_argument('--raiz', type=Path, metavar='DIR',
+                        help="Raiz do projeto/tenant com data/raw (padrão: este repositório)")
+    parser.add_argument('--config', type=Path, metavar='ARQ',
+                        help="config.yaml a usar (padrão: <raiz>/config/config.yaml ou o do projeto)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Amostra a pilha de cada etapa (collapsed stacks em data/quality/profiles/<run_id>/)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Registra pico e top alocações de cada etapa com tracemalloc")
+    parser.add_argument('--profile-interval', type=float, default=10.0, metavar='MS',
+                        help="Intervalo de amostragem do --profile em milissegundos (padrão: 10)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Observa data/raw e processa arquivos novos em micro-lotes")
+    parser.add_argument('--janela', type=float, metavar='SEG',
+                        help="Janela de latência do micro-lote (padrão: daemon.janela_latencia_s)")
+    parser.add_argument('--polling', action='store_true',
+                        help="Força polling em vez de inotify no modo daemon")
+    return parser.parse_args(argv)
+
+
+def executar_daemon(args: argparse.Namespace) -> bool:
+    """Modo daemon: referências e suites compiladas carregadas uma única vez."""
+    config = configuracao.carregar_config(CONFIG_PATH)
+    parametros = daemon_ingestao.parametros_daemon(config)
+    if args.janela is not None:
+        parametros['janela'] = args.janela
+
+    processador = daemon_ingestao.ProcessadorMicroLotes(config, PROCESSED_DATA_PATH, QUALITY_DATA_PATH)
+    daemon = daemon_ingestao.DaemonIngestao(RAW_DATA_PATH, processador, polling=args.polling, **parametros)
+    daemon.instalar_sinais()
+    daemon.executar()
+    return True
+
+
+def main(argv: Optional[List[str]] = None, context=None):
+    """
+    Função principal que orquestra todo o pipeline.
+
+    Args:
+        argv: Argumentos de linha de comando (padrão: sys.argv)
+        context: GX context já inicializado (reaproveitado entre execuções
+            pelo executor multi-tenant); se omitido, é criado na etapa 5
+    """
+    args = _parse_args(argv)
+    if args.raiz or args.config:
+        definir_raiz(args.raiz or project_root, args.config)
+
     PROCESSED_DATA_PATH.mkdir(parents=True, exist_ok=True)
     QUALITY_DATA_PATH.mkdir(parents=True, exist_ok=True)
-    
-    # Configurar logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(str(QUALITY_DATA_PATH / 'pipeline.log')),
-            logging.StreamHandler()
-        ]
-    )
-    
+
+    # Configurar logging: fila + thread de escrita, pipeline.log em JSON lines
+    secao_log = configuracao.secao_logging(CONFIG_PATH)
+    log_estruturado.configurar_logging(secao_log, project_root / secao_log.get('file', 'data/quality/pipeline.log'))
+
     logger.info("=" * 70)
     logger.info("INICIANDO PIPELINE DATAOPS TECHCOMMERCE")
     logger.info("=" * 70)
-    
-    RAW_DATA_PATH = project_root / "data" / "raw"
+
     logger.info(f"Diretório Raw: {RAW_DATA_PATH}")
     logger.info(f"Diretório Processado: {PROCESSED_DATA_PATH}")
-    
+
+    if args.daemon:
+        return executar_daemon(args)
+
+    # Manifesto da execução (nova ou retomada)
     try:
-        # 2. Carregar Dados Raw
-        print("\n" + "=" * 70)
-        print("ETAPA 1: CARREGAMENTO DE DADOS RAW")
-        print("=" * 70)
-        
-        logger.info("Carregando datasets raw...")
-        dados_brutos = {}
-        
-        for csv_file in sorted(RAW_DATA_PATH.glob("*.csv")):
-            dataset_name = csv_file.stem
-            try:
-                df = pd.read_csv(csv_file, sep='\t', dtype=str)
-                dados_brutos[dataset_name] = df
-                logger.info(f"✓ {dataset_name}.csv carregado ({len(df)} linhas, {len(df.columns)} colunas)")
-            except Exception as e:
-                logger.error(f"✗ Erro ao carregar {dataset_name}: {e}")
-                raise
-        
-        if not dados_brutos:
-            logger.error("Nenhum arquivo CSV encontrado em data/raw/")
-            return False
-        
-        # 3. Aplicar Correções Automáticas
-        print("\n" + "=" * 70)
-        print("ETAPA 2: LIMPEZA E CORREÇÃO AUTOMÁTICA")
-        print("=" * 70)
-        
-        logger.info("Aplicando correções de qualidade...")
-        
-        df_clientes = ca.corrigir_clientes(dados_brutos['clientes'])
-        logger.info(f"Clientes: {len(dados_brutos['clientes'])} → {len(df_clientes)} linhas")
-        
-        df_produtos = ca.corrigir_produtos(dados_brutos['produtos'])
-        logger.info(f"Produtos: {len(dados_brutos['produtos'])} → {len(df_produtos)} linhas")
-        
-        df_vendas = ca.corrigir_vendas(dados_brutos['vendas'], df_clientes, df_produtos)
-        logger.info(f"Vendas: {len(dados_brutos['vendas'])} → {len(df_vendas)} linhas")
-        
-        df_logistica = ca.corrigir_logistica(dados_brutos['logistica'], df_vendas)
-        logger.info(f"Logística: {len(dados_brutos['logistica'])} → {len(df_logistica)} linhas")
-        
-        # 4. Salvar Dados Processados
-        print("\n" + "=" * 70)
-        print("ETAPA 3: SALVAMENTO DE DADOS PROCESSADOS")
-        print("=" * 70)
-        
-        logger.info("Salvando datasets processados...")
-        
-        dados_processados = {
-            "clientes": df_clientes,
-            "produtos": df_produtos,
-            "vendas": df_vendas,
-            "logistica": df_logistica
-        }
-        
-        for name, df in dados_processados.items():
-            output_path = PROCESSED_DATA_PATH / f"{name}_clean.csv"
-            df.to_csv(output_path, index=False, sep=';')
-            logger.info(f"✓ {name}_clean.csv salvo ({len(df)} linhas)")
-        
+        if args.resume:
+            manifesto = ManifestoExecucao.carregar(RUNS_PATH, args.resume)
+            manifesto.validar_entradas(arquivos_entrada())
+            logger.info(f"Retomando execução {manifesto.run_id}")
+        else:
+            manifesto = ManifestoExecucao.criar(RUNS_PATH, arquivos_entrada(), run_id=args.run_id)
+            logger.info(f"Execução {manifesto.run_id}")
+        log_estruturado.definir_contexto(run_id=manifesto.run_id)
+    except ManifestoInvalidoError as e:
+        logger.error(f"Não é possível retomar: {e}")
+        return False
+
+    perfil = ProfilerExecucao(PROFILES_PATH / manifesto.run_id, cpu=args.profile,
+                              memoria=args.trace_memory, intervalo=args.profile_interval / 1000)
+
+    etapa_atual = None
+
+    def reutilizar(etapa: str) -> bool:
+        nonlocal etapa_atual
+        etapa_atual = etapa
+        if manifesto.etapa_concluida(etapa):
+            logger.info(f"↺ Etapa '{etapa}' reaproveitada da execução {manifesto.run_id}")
+            return True
+        manifesto.iniciar_etapa(etapa)
+        return False
+
+    try:
+        config = configuracao.carregar_config(CONFIG_PATH)
+        governador = GovernadorMemoria.do_config(config)
+
+        # 1. Carregar Dados Raw / 2. Aplicar Correções Automáticas
+        # (a carga só é necessária se a correção não estiver em cache)
+        _banner("ETAPA 1: CARREGAMENTO DE DADOS RAW")
+        with perfil.etapa('carga'):
+            if manifesto.etapa_concluida('correcao'):
+                logger.info("↺ Etapa 'carga' dispensada (correção em cache)")
+            elif not reutilizar('carga'):
+                dados_brutos = carregar_dados_raw(configuracao.leitor_raw(config), governador, config,
+                                                  manifesto.diretorio / 'carga' / 'spill')
+                if not dados_brutos:
+                    logger.error("Nenhum arquivo CSV encontrado em data/raw/")
+                    return False
+                manifesto.salvar_dataframes('carga', dados_brutos)
+                manifesto.concluir_etapa('carga')
+            else:
+                dados_brutos = manifesto.carregar_dataframes('carga')
+
+        _banner("ETAPA 2: LIMPEZA E CORREÇÃO AUTOMÁTICA")
+        with perfil.etapa('correcao'):
+            if not reutilizar('correcao'):
+                dados_processados = aplicar_correcoes(dados_brutos, config, perfil, governador)
+                manifesto.salvar_dataframes('correcao', dados_processados)
+                manifesto.concluir_etapa('correcao', {n: len(df) for n, df in dados_processados.items()})
+            else:
+                dados_processados = manifesto.carregar_dataframes('correcao')
+
+        # 2.1 Validação antes da publicação: um lote bloqueado não altera versões, CDC nem fato
+        _banner("ETAPA 2.1: VALIDAÇÃO ANTES DA PUBLICAÇÃO")
+        with perfil.etapa('validacao'):
+            if not reutilizar('validacao'):
+                validation_success = executar_validacao(context, config, dados_processados)
+                manifesto.concluir_etapa('validacao', {'sucesso': validation_success})
+        validation_success = manifesto.resultado_etapa('validacao').get('sucesso', False)
+
+        # 3. Salvar Dados Processados
+        _banner("ETAPA 3: SALVAMENTO DE DADOS PROCESSADOS")
+        with perfil.etapa('salvamento'):
+            if not reutilizar('salvamento'):
+                resumo_salvamento = salvar_processados(dados_processados, config, manifesto.run_id)
+                manifesto.concluir_etapa('salvamento', resumo_salvamento)
+
+        # 3.1 CDC entre execuções
+        if (config.get('cdc') or {}).get('enabled', True):
+            _banner("ETAPA 3.1: CDC POR HASH DE LINHA")
+            with perfil.etapa('cdc'):
+                if not reutilizar('cdc'):
+                    resumo_cdc = cdc_snapshots.executar_cdc(dados_processados, config, CDC_PATH, manifesto.run_id)
+                    manifesto.concluir_etapa('cdc', resumo_cdc)
+
+        # 3.2 Tabela fato desnormalizada (vendas ⋈ clientes ⋈ produtos ⋈ logística)
+        secao_fato = config.get('fato_vendas') or {}
+        if secao_fato.get('enabled', True):
+            _banner("ETAPA 3.2: TABELA FATO DE VENDAS")
+            with perfil.etapa('fato'):
+                if not reutilizar('fato'):
+                    cdc_dir = CDC_PATH if (config.get('cdc') or {}).get('enabled', True) else None
+                    resumo_fato = tabela_fato.executar_fato(
+                        dados_processados, config,
+                        project_root / secao_fato.get('path', 'data/processed/fato_vendas.parquet'),
+                        manifesto.run_id, cdc_dir)
+                    manifesto.concluir_etapa('fato', resumo_fato)
+
+        # 4. Analytics de SLA de Entrega
+        _banner("ETAPA 4: ANALYTICS DE SLA DE ENTREGA")
+        with perfil.etapa('sla'):
+            if not reutilizar('sla'):
+                atualizar_sla(dados_processados['logistica'], config)
+                manifesto.concluir_etapa('sla')
+
         # 5. Configurar Great Expectations
-        print("\n" + "=" * 70)
-        print("ETAPA 4: CONFIGURAÇÃO GREAT EXPECTATIONS")
-        print("=" * 70)
-        
-        logger.info("Inicializando Great Expectations context...")
-        context = gx.get_context(project_root_dir=str(project_root))
-        logger.info("GX context inicializado")
-        
-        try:
-            logger.info("Configurando datasource 'techcommerce_source'...")
-            ge_setup.setup_datasource(context, str(project_root))
-            logger.info("✓ Datasource configurado")
-        except Exception as e:
-            logger.warning(f"Datasource pode já existir: {e}")
-        
-        logger.info("Criando expectation suites...")
-        ge_setup.create_expectation_suites(context)
-        logger.info("✓ Expectation suites criadas")
-        
-        # 6. Executar Validação
-        print("\n" + "=" * 70)
-        print("ETAPA 5: VALIDAÇÃO COM GREAT EXPECTATIONS")
-        print("=" * 70)
-        
-        checkpoint_name = "techcommerce_processed_data_checkpoint"
-        logger.info(f"Checkpoint '{checkpoint_name}' configurado")
-        validation_success = True
-        
-        # 7. Gerar Relatórios
-        print("\n" + "=" * 70)
-        print("ETAPA 6: GERAÇÃO DE RELATÓRIOS")
-        print("=" * 70)
-        
-        logger.info("Gerando dashboard de qualidade...")
-        dashboard_qualidade.gerar_relatorio_executivo(context, checkpoint_name)
-        logger.info("✓ Relatório gerado")
-        
-        # 8. Resumo Final
-        print("\n" + "=" * 70)
-        print("RESUMO FINAL")
-        print("=" * 70)
-        
-        summary = {
-            "clientes": len(df_clientes),
-            "produtos": len(df_produtos),
-            "vendas": len(df_vendas),
-            "logistica": len(df_logistica),
-            "validacao": "✓ SUCESSO" if validation_success else "✗ FALHOU"
-        }
-        
+        _banner("ETAPA 5: CONFIGURAÇÃO GREAT EXPECTATIONS")
+        with perfil.etapa('configuracao_gx'):
+            if context is None:
+                logger.info("Inicializando Great Expectations context...")
+                context = gx.get_context(project_root_dir=str(project_root))
+                logger.info("GX context inicializado")
+            else:
+                logger.info("GX context reaproveitado")
+            if not reutilizar('configuracao_gx'):
+                configurar_great_expectations(context)
+                manifesto.concluir_etapa('configuracao_gx')
+
+        # 6. Gerar Relatórios
+        _banner("ETAPA 6: GERAÇÃO DE RELATÓRIOS")
+        with perfil.etapa('relatorio'):
+            if not reutilizar('relatorio'):
+                gerar_relatorios(context)
+                manifesto.concluir_etapa('relatorio')
+        etapa_atual = None
+
+        # 7. Resumo Final
+        _banner("RESUMO FINAL")
+
+        summary = {name: len(df) for name, df in dados_processados.items()}
+        summary["validacao"] = "✓ SUCESSO" if validation_success else "✗ FALHOU"
+        summary["run_id"] = manifesto.run_id
+
         for key, value in summary.items():
             print(f"{key.ljust(20)}: {value}")
-        
+
         logger.info("=" * 70)
-        logger.info("PIPELINE CONCLUÍDO COM SUCESSO")
+        if validation_success:
+            logger.info("PIPELINE CONCLUÍDO COM SUCESSO")
+        else:
+            logger.warning("PIPELINE CONCLUÍDO COM FALHAS DE QUALIDADE (regras de aviso; ver etapa 2.1)")
         logger.info("=" * 70)
-        
+
+        atualizar_data_docs(config)
+        reter_execucoes(manifesto, sucesso=True)
         return True
-        
+
     except Exception as e:
+        if etapa_atual:
+            manifesto.falhar_etapa(etapa_atual, e)
         logger.error(f"ERRO CRÍTICO: {e}", exc_info=True)
         print(f"\n❌ Pipeline falhou: {e}")
+        print(f"   Para retomar: python src/pipeline_ingestao.py --resume {manifesto.run_id}")
+        reter_execucoes(manifesto, sucesso=False)
         return False
 
+    finally:
+        perfil.finalizar()
+
 
 if __name__ == "__main__":
     success = main()
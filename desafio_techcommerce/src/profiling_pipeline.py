@@ -0,0 +1,190 @@
+"""
+Profiling do Pipeline (CPU por amostragem + memória)
+====================================================
+
+Instrumenta as etapas do `pipeline_ingestao` (e cada chamada `corrigir_*`)
+quando o pipeline é executado com `--profile` e/ou `--trace-memory`.
+
+- `--profile`: uma thread amostra a pilha da thread principal em intervalo
+  fixo (100 Hz por padrão) e agrega as pilhas no formato "collapsed stacks"
+  (uma linha `frame;frame;frame contagem`), compatível com flamegraph.pl,
+  speedscope e inferno. O custo é proporcional à taxa de amostragem, não ao
+  volume de chamadas, o que permite deixá-lo ligado em uma amostra de produção.
+- `--trace-memory`: usa `tracemalloc` (1 frame por alocação, por padrão) para
+  registrar o pico de memória de cada etapa. As linhas que mais alocaram vêm
+  de snapshots, tirados só nas etapas de topo: cada snapshot copia todos os
+  traces vivos, e tirá-los em cada sub-etapa custaria mais que a etapa.
+
+Saída em data/quality/profiles/<run_id>/:
+    <etapa>.collapsed      pilhas amostradas (inclui sub-etapas)
+    <etapa>.memoria.txt    top alocações e pico da etapa (só etapas de topo)
+    resumo.json            duração, amostras e pico por etapa
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_PADRAO = 0.01   # 100 Hz
+TOP_ALOCACOES = 25
+
+
+def _rotulo_frame(frame) -> str:
+    codigo = frame.f_code
+    modulo = os.path.splitext(os.path.basename(codigo.co_filename))[0]
+    nome = getattr(codigo, 'co_qualname', codigo.co_name)
+    return f"{modulo}:{nome}"
+
+
+class AmostradorPilha:
+    """Amostrador de pilha de uma thread, executado em uma thread daemon."""
+
+    def __init__(self, intervalo: float = INTERVALO_PADRAO, thread_id: Optional[int] = None):
+        self.intervalo = intervalo
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.etapas_ativas: List[str] = []
+        self.contagens: Dict[str, Counter] = defaultdict(Counter)
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._thread = threading.Thread(target=self._executar, name='amostrador-pilha', daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            etapas = tuple(self.etapas_ativas)
+            if not etapas:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while frame is not None:
+                pilha.append(_rotulo_frame(frame))
+                frame = frame.f_back
+            chave = ';'.join(reversed(pilha))
+            for etapa in etapas:
+                self.contagens[etapa][chave] += 1
+
+    def escrever(self, etapa: str, caminho: Path) -> int:
+        """Escreve as pilhas da etapa em formato collapsed; retorna o total de amostras."""
+        contagens = self.contagens.get(etapa, Counter())
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, n in contagens.most_common():
+                f.write(f"{pilha} {n}\n")
+        return sum(contagens.values())
+
+
+class ProfilerExecucao:
+    """Coleta perfis de CPU e memória por etapa de uma execução."""
+
+    def __init__(self, diretorio: Path, cpu: bool = False, memoria: bool = False,
+                 intervalo: float = INTERVALO_PADRAO, frames_memoria: int = 1):
+        """
+        Args:
+            diretorio: Destino dos perfis (data/quality/profiles/<run_id>)
+            cpu: Ativa o amostrador de pilha
+            memoria: Ativa tracemalloc
+            intervalo: Intervalo de amostragem em segundos
+            frames_memoria: Frames guardados por alocação no tracemalloc
+        """
+        self.diretorio = Path(diretorio)
+        self.cpu = cpu
+        self.memoria = memoria
+        self.ativo = cpu or memoria
+        self.resumo: Dict[str, dict] = {}
+        self._amostrador: Optional[AmostradorPilha] = None
+        self._picos: Dict[str, int] = {}
+        self._ativas: List[str] = []
+
+        if cpu:
+            self._amostrador = AmostradorPilha(intervalo)
+            self._amostrador.iniciar()
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start(frames_memoria)
+
+    @classmethod
+    def desativado(cls) -> 'ProfilerExecucao':
+        """Profiler sem coleta (etapa() não tem custo)."""
+        return cls(Path('.'), cpu=False, memoria=False)
+
+    def _registrar_pico(self) -> None:
+        pico = tracemalloc.get_traced_memory()[1]
+        for etapa in self._ativas:
+            self._picos[etapa] = max(self._picos.get(etapa, 0), pico)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """Mede o bloco como uma etapa (pode ser aninhada; sub-etapas registram só o pico)."""
+        if not self.ativo:
+            yield
+            return
+
+        snapshot_inicio = None
+        if self.memoria:
+            self._registrar_pico()
+            if not self._ativas:
+                snapshot_inicio = tracemalloc.take_snapshot()
+        self._ativas.append(nome)
+        if self._amostrador is not None:
+            self._amostrador.etapas_ativas.append(nome)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            if self._amostrador is not None:
+                self._amostrador.etapas_ativas.remove(nome)
+            info = {'duracao_s': round(duracao, 4)}
+            if self.memoria:
+                self._registrar_pico()
+                info['pico_memoria_bytes'] = self._picos.get(nome, 0)
+                if snapshot_inicio is not None:
+                    self._escrever_memoria(nome, snapshot_inicio, tracemalloc.take_snapshot(),
+                                           info['pico_memoria_bytes'])
+            self._ativas.remove(nome)
+            self.resumo[nome] = info
+
+    def _escrever_memoria(self, nome: str, inicio, fim, pico: int) -> None:
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        filtros = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diferencas = fim.filter_traces(filtros).compare_to(inicio.filter_traces(filtros), 'lineno')
+        with open(self.diretorio / f"{nome}.memoria.txt", 'w', encoding='utf-8') as f:
+            f.write(f"Etapa: {nome}\n")
+            f.write(f"Pico de memória rastreada: {pico / 1024 / 1024:.1f} MiB\n\n")
+            f.write(f"Top {TOP_ALOCACOES} linhas por memória alocada na etapa:\n")
+            for estat in diferencas[:TOP_ALOCACOES]:
+                f.write(f"{estat}\n")
+
+    def finalizar(self) -> None:
+        """Para a coleta e escreve os arquivos collapsed e o resumo."""
+        if not self.ativo:
+            return
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        if self._amostrador is not None:
+            self._amostrador.parar()
+            for nome, info in self.resumo.items():
+                info['amostras'] = self._amostrador.escrever(nome, self.diretorio / f"{nome}.collapsed")
+        if self.memoria:
+            tracemalloc.stop()
+        with open(self.diretorio / "resumo.json", 'w', encoding='utf-8') as f:
+            json.dump(self.resumo, f, indent=2, ensure_ascii=False)
+        logger.info(f"Perfis de execução salvos em {self.diretorio}")
@@ -0,0 +1,168 @@
+"""
+Pseudonimização de PII de Clientes
+==================================
+
+Etapa aplicada após `corrigir_clientes` (e a deduplicação, que precisa dos
+valores originais): `email`, `telefone` e `nome` deixam de sair em claro
+em clientes_clean.csv, mas continuam determinísticos (a mesma entrada gera
+sempre o mesmo pseudônimo com a mesma chave) e no formato validado pelas
+suites:
+
+- email:    normalizado (minúsculas, sem espaços, regra de governança) e
+            trocado por `<hash hex de 16 dígitos>@<domínio original>`
+- telefone: DDD preservado + 9 dígitos derivados do hash (11 dígitos)
+- nome:     `Cliente <hash hex de 12 dígitos>` ('NÃO INFORMADO' é mantido)
+
+O hash é o SipHash-2-4 com chave secreta de `pd.util.hash_array`
+(vetorizado em C), com uma subchave por campo para que o mesmo valor em
+campos diferentes não possa ser correlacionado. Valores repetidos são
+resolvidos uma única vez (`pd.factorize`); os valores distintos são
+processados em lotes distribuídos entre threads.
+
+Chave: variável de ambiente TECHCOMMERCE_PII_KEY, ou `techcommerce_pii_key`
+em gx/uncommitted/config_variables.yml; sem nenhuma das duas, uma chave
+local é gerada em gx/uncommitted/chave_pii (fora do controle de versão).
+Trocar a chave muda todos os pseudônimos.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import yaml
+import base64
+import hashlib
+import logging
+import secrets
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+VARIAVEL_CHAVE = "TECHCOMMERCE_PII_KEY"
+NOME_PREENCHIDO = 'NÃO INFORMADO'
+CAMPOS = ('email', 'telefone', 'nome')
+
+_TEXTO = 'string[pyarrow]'   # operações de texto vetorizadas (pyarrow.compute)
+_HEX = np.array([f'{i:02x}'.encode() for i in range(256)], dtype='S2')
+
+
+def carregar_chave(raiz: Optional[Path] = None, variavel: str = VARIAVEL_CHAVE) -> bytes:
+    """Chave secreta da pseudonimização (ambiente > config_variables.yml > chave local)."""
+    if os.environ.get(variavel):
+        return os.environ[variavel].encode('utf-8')
+    uncommitted = Path(raiz or PROJECT_ROOT) / "gx" / "uncommitted"
+    variaveis = uncommitted / "config_variables.yml"
+    if variaveis.exists():
+        valor = (yaml.safe_load(variaveis.read_text(encoding='utf-8')) or {}).get(variavel.lower())
+        if valor:
+            return str(valor).encode('utf-8')
+    arquivo = uncommitted / "chave_pii"
+    if not arquivo.exists():
+        logger.warning(f"{variavel} não definida: gerando chave local em {arquivo}")
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        descritor = os.open(arquivo, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descritor, 'w') as f:
+            f.write(secrets.token_hex(32))
+    return arquivo.read_text().strip().encode('utf-8')
+
+
+def _hex(hashes: np.ndarray) -> np.ndarray:
+    """uint64 -> texto hexadecimal de 16 dígitos (vetorizado)."""
+    octetos = hashes.astype('>u8').view(np.uint8).reshape(-1, 8)
+    return _HEX[octetos].view('S16').ravel().astype('U16')
+
+
+class Pseudonimizador:
+    """Pseudonimização determinística com chave, em lotes e com cache de valores repetidos."""
+
+    def __init__(self, chave: bytes, campos: Iterable[str] = CAMPOS, workers: int = 1,
+                 tamanho_lote: int = 1_000_000):
+        self.campos = [campo for campo in campos if campo in CAMPOS]
+        self.workers = max(1, workers)
+        self.tamanho_lote = max(1, tamanho_lote)
+        # hash_array aceita 16 caracteres como chave: 96 bits em base64, um por campo
+        self._subchaves = {campo: base64.urlsafe_b64encode(
+            hashlib.blake2b(chave, person=campo.encode('utf-8'), digest_size=12).digest()).decode('ascii')
+            for campo in CAMPOS}
+
+    @classmethod
+    def do_config(cls, config: dict, project_root: Path) -> Optional['Pseudonimizador']:
+        """Cria o pseudonimizador conforme a seção `pii` do config (None se desabilitado)."""
+        secao = config.get('pii') or {}
+        if not secao.get('enabled', True):
+            return None
+        return cls(carregar_chave(project_root, secao.get('chave_env', VARIAVEL_CHAVE)),
+                   campos=secao.get('campos') or CAMPOS,
+                   workers=int(secao.get('workers') or os.cpu_count() or 1),
+                   tamanho_lote=int(secao.get('tamanho_lote', 1_000_000)))
+
+    def _hash(self, valores: pd.Series, campo: str) -> np.ndarray:
+        return pd.util.hash_array(valores.to_numpy(dtype=object), hash_key=self._subchaves[campo],
+                                  categorize=False)
+
+    def _aplicar(self, serie: pd.Series, campo: str,
+                 formatar: Callable[[pd.Series, np.ndarray], pd.Series]) -> pd.Series:
+        """Aplica `formatar(valores_distintos, hashes)` uma vez por valor distinto, em lotes paralelos."""
+        codigos, distintos = pd.factorize(serie)
+        distintos = pd.Series(distintos, dtype=_TEXTO)
+        lotes = [distintos.iloc[i:i + self.tamanho_lote] for i in range(0, len(distintos), self.tamanho_lote)]
+
+        def processar(lote: pd.Series) -> pd.Series:
+            return formatar(lote.reset_index(drop=True), self._hash(lote, campo))
+
+        if self.workers > 1 and len(lotes) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                partes = list(pool.map(processar, lotes))
+        else:
+            partes = [processar(lote) for lote in lotes]
+        pseudonimos = pd.concat(partes, ignore_index=True).astype(_TEXTO) if partes \
+            else pd.Series([], dtype=_TEXTO)
+        saida = pseudonimos.take(np.where(codigos < 0, 0, codigos)) if len(pseudonimos) \
+            else pd.Series(pd.NA, index=range(len(serie)), dtype=_TEXTO)
+        saida = saida.reset_index(drop=True).mask(pd.Series(codigos < 0))
+        saida.index = serie.index
+        return saida
+
+    # =====================================================================
+    # CAMPOS
+    # =====================================================================
+
+    @staticmethod
+    def normalizar_email(serie: pd.Series) -> pd.Series:
+        """Regra de governança: e-mails em minúsculas e sem espaços."""
+        return serie.astype(_TEXTO).str.strip().str.lower()
+
+    def email(self, serie: pd.Series) -> pd.Series:
+        def formatar(valores, hashes):
+            dominio = valores.str.replace(r'^[^@]*@', '', regex=True).where(valores.str.contains('@'), 'invalido.local')
+            return pd.Series(_hex(hashes), dtype=_TEXTO) + '@' + dominio
+        return self._aplicar(self.normalizar_email(serie), 'email', formatar)
+
+    def telefone(self, serie: pd.Series) -> pd.Series:
+        def formatar(valores, hashes):
+            # 10^9 + (h mod 10^9) tem sempre 10 dígitos: o corte tira o '1' e mantém os zeros à esquerda
+            numero = pd.Series(10 ** 9 + (hashes % np.uint64(10 ** 9)).astype(np.int64)).astype(_TEXTO)
+            return valores.str.slice(0, 2) + numero.str.slice(1)
+        return self._aplicar(serie.astype(_TEXTO).str.strip(), 'telefone', formatar)
+
+    def nome(self, serie: pd.Series) -> pd.Series:
+        def formatar(valores, hashes):
+            pseudonimo = 'Cliente ' + pd.Series(np.char.upper(_hex(hashes).astype('U12')), dtype=_TEXTO)
+            return pseudonimo.mask(valores == NOME_PREENCHIDO, NOME_PREENCHIDO)
+        return self._aplicar(serie, 'nome', formatar)
+
+    def pseudonimizar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Retorna cópia do DataFrame de clientes com os campos de PII pseudonimizados."""
+        saida = df.copy()
+        for campo in self.campos:
+            if campo in saida.columns:
+                saida[campo] = getattr(self, campo)(saida[campo])
+        logger.info(f"✓ PII pseudonimizada ({', '.join(c for c in self.campos if c in df.columns)}, "
+                    f"{len(df)} linhas)")
+        return saida
+
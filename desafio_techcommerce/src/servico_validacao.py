@@ -0,0 +1,368 @@
+"""
+Serviço HTTP de Validação de Lotes
+==================================
+
+Permite que produtores validem um lote antes de depositá-lo em `data/raw/`,
+sem executar o pipeline completo. O processo mantém as suites compiladas
+(`suites_compiladas`) e as referências de FK (últimos *_clean.csv) em
+memória e atende requisições concorrentes com um pool de threads.
+
+Endpoints:
+    GET  /saude                      status e número de expectativas por suite
+    GET  /suites                     expectativas compiladas de cada suite
+    POST /validar/<dataset>          valida o lote enviado no corpo
+         ?corrigir=1                 + dry-run do CorrecaoAutomatica (valida
+                                       também o resultado corrigido)
+         ?sep=%09                    separador do CSV (padrão: tab, como em data/raw)
+         ?fail_fast=1                para na primeira falha bloqueante (padrão:
+                                       validacao.fail_fast do config)
+    POST /recarregar                 relê as referências e recompila as suites
+
+Formatos do corpo (Content-Type):
+    text/csv                              CSV (padrão)
+    application/vnd.apache.arrow.stream   Arrow IPC stream
+
+O corpo (Content-Length ou Transfer-Encoding: chunked) é entregue ao parser
+Arrow em blocos, sem cópia intermediária dos bytes, mas o lote é
+materializado inteiro como DataFrame para a validação; por isso o tamanho
+do corpo é limitado (`servico_validacao.max_corpo_mb`, acima disso: 413).
+Conexões keep-alive ociosas são encerradas após
+`servico_validacao.timeout_conexao_s` para não prenderem os workers do pool.
+A resposta traz, por regra, avaliados, falhas e sucesso, além do tempo
+gasto em milissegundos.
+
+Execução:
+    python servico_validacao.py --porta 8765 --workers 4
+
+    curl --data-binary @vendas_lote.csv http://127.0.0.1:8765/validar/vendas?corrigir=1
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+# Adicionar src ao path para encontrar os módulos
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+import correcao_automatica as ca
+import configuracao
+import suites_compiladas
+from daemon_ingestao import ORDEM_DATASETS, carregar_referencias
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_DATA_PATH = project_root / "data" / "processed"
+CONFIG_PATH = project_root / "config" / "config.yaml"
+
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+TAMANHO_BLOCO_CSV = 1 << 20   # bytes por record batch no parser CSV
+TIMEOUT_CONEXAO_S = 30.0      # conexão keep-alive ociosa é encerrada após esse tempo
+MAX_CORPO_MB = 256            # o lote inteiro vira um DataFrame em memória
+
+
+class CorpoExcedidoError(Exception):
+    """Corpo da requisição maior que o limite configurado."""
+
+
+class CorpoRequisicao:
+    """Leitor file-like do corpo HTTP (Content-Length ou chunked), sem bufferizar tudo."""
+
+    def __init__(self, rfile, tamanho: Optional[int], chunked: bool, limite: Optional[int] = None):
+        self._rfile = rfile
+        self._limite = limite
+        self._restante = tamanho if not chunked else 0
+        self._chunked = chunked
+        self._fim = not chunked and not tamanho
+        self.closed = False
+        self.bytes_lidos = 0
+
+    def _proximo_chunk(self) -> None:
+        linha = self._rfile.readline()
+        self._restante = int(linha.split(b';')[0].strip() or b'0', 16)
+        if self._restante == 0:
+            while self._rfile.readline() not in (b'\r\n', b'\n', b''):
+                pass   # trailers
+            self._fim = True
+
+    def read(self, n: int = -1) -> bytes:
+        partes = []
+        while not self._fim and (n < 0 or n > 0):
+            if self._restante == 0:
+                if not self._chunked:
+                    self._fim = True
+                    break
+                self._proximo_chunk()
+                continue
+            pedido = self._restante if n < 0 else min(n, self._restante)
+            dados = self._rfile.read(pedido)
+            if not dados:
+                self._fim = True
+                break
+            partes.append(dados)
+            self._restante -= len(dados)
+            self.bytes_lidos += len(dados)
+            if self._limite is not None and self.bytes_lidos > self._limite:
+                raise CorpoExcedidoError(f"corpo maior que {self._limite} bytes")
+            if n > 0:
+                n -= len(dados)
+            if self._chunked and self._restante == 0:
+                self._rfile.readline()   # CRLF após o chunk
+        return b''.join(partes)
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def ler_lote(corpo, formato: str, schema: Dict[str, str], sep: str = '\t') -> pd.DataFrame:
+    """
+    Converte o corpo da requisição em DataFrame (colunas do schema como texto,
+    como na carga raw do pipeline). O corpo é consumido em blocos, mas o lote
+    inteiro fica em memória: limite o tamanho em `CorpoRequisicao`.
+    """
+    if formato == TIPO_ARROW:
+        tabela = pa_ipc.open_stream(corpo).read_all()
+    else:
+        leitor = pa_csv.open_csv(
+            corpo,
+            read_options=pa_csv.ReadOptions(block_size=TAMANHO_BLOCO_CSV),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=pa_csv.ConvertOptions(column_types={col: pa.string() for col in schema},
+                                                  strings_can_be_null=True),
+        )
+        tabela = pa.Table.from_batches(list(leitor), schema=leitor.schema)
+    return tabela.to_pandas()
+
+
+class ServicoValidacao:
+    """Estado aquecido do serviço: suites compiladas e referências de FK."""
+
+    def __init__(self, config: dict, processed_dir: Path = PROCESSED_DATA_PATH):
+        self.config = config
+        self.processed_dir = Path(processed_dir)
+        self._lock = threading.Lock()
+        self.recarregar()
+
+    def recarregar(self) -> None:
+        """Relê as referências e recompila as suites (troca atômica)."""
+        referencias = carregar_referencias(self.config, self.processed_dir)
+        suites = suites_compiladas.compilar_suites(referencias)
+        with self._lock:
+            self.referencias, self.suites = referencias, suites
+
+    def _corrigir(self, dataset: str, df: pd.DataFrame, referencias: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        # Corretor por requisição: o cache de datas não é compartilhado entre threads
+        corretor = ca.CorrecaoAutomatica(formato_data=configuracao.formato_data(self.config))
+        if dataset == 'clientes':
+            return corretor.corrigir_clientes(df)
+        if dataset == 'produtos':
+            return corretor.corrigir_produtos(df)
+        if dataset == 'vendas':
+            return corretor.corrigir_vendas(df, referencias['clientes'], referencias['produtos'])
+        return corretor.corrigir_logistica(df, referencias['vendas'])
+
+    def validar(self, dataset: str, df: pd.DataFrame, corrigir: bool = False,
+                fail_fast: Optional[bool] = None) -> Dict:
+        """
+        Valida um lote com a suite compilada do dataset.
+
+        Args:
+            dataset: clientes, produtos, vendas ou logistica
+            df: Lote no formato raw (texto)
+            corrigir: Executa também o dry-run das correções
+            fail_fast: Para na primeira falha bloqueante (None: config)
+
+        Returns:
+            Resposta com o resultado por regra
+        """
+        with self._lock:
+            suite, referencias = self.suites[dataset], self.referencias
+
+        if fail_fast is None:
+            fail_fast = configuracao.validacao_fail_fast(self.config)
+        inicio = time.perf_counter()
+        resultados = suite.validar(df, fail_fast=fail_fast)
+        resposta = {
+            'dataset': dataset,
+            'suite': suite.nome,
+            'linhas': len(df),
+            **suites_compiladas.resumir_resultados(resultados),
+            'regras_detalhe': [r.como_dict() for r in resultados],
+        }
+        if corrigir:
+            corrigido = self._corrigir(dataset, ca.converter_colunas_monetarias(df.copy()), referencias)
+            apos = suite.validar(ca.restaurar_colunas_monetarias(corrigido), fail_fast=fail_fast)
+            resposta['correcao'] = {
+                'linhas_entrada': len(df),
+                'linhas_saida': len(corrigido),
+                **suites_compiladas.resumir_resultados(apos),
+                'regras_detalhe': [r.como_dict() for r in apos],
+            }
+        resposta['duracao_ms'] = round((time.perf_counter() - inicio) * 1000, 2)
+        return resposta
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = TIMEOUT_CONEXAO_S
+
+    def setup(self):
+        # Sem timeout, N clientes keep-alive ociosos ocupariam os N workers do pool
+        self.timeout = self.server.timeout_conexao or None
+        super().setup()
+
+    @property
+    def servico(self) -> ServicoValidacao:
+        return self.server.servico
+
+    def log_message(self, formato, *args):
+        logger.debug("%s - " + formato, self.address_string(), *args)
+
+    def _responder(self, status: int, corpo: Dict) -> None:
+        dados = json.dumps(corpo, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        caminho = urlparse(self.path).path.rstrip('/')
+        if caminho == '/saude':
+            self._responder(200, {'status': 'ok',
+                                  'suites': {d: len(s) for d, s in self.servico.suites.items()}})
+        elif caminho == '/suites':
+            self._responder(200, {d: {'nome': s.nome,
+                                      'expectativas': [{'tipo': e.tipo, 'coluna': e.coluna,
+                                                        'mostly': e.mostly} for e in s.expectativas]}
+                                  for d, s in self.servico.suites.items()})
+        else:
+            self._responder(404, {'erro': f"rota desconhecida: {caminho}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        partes = url.path.strip('/').split('/')
+        if partes == ['recarregar']:
+            self.servico.recarregar()
+            self._responder(200, {'status': 'recarregado'})
+            return
+        if len(partes) != 2 or partes[0] != 'validar' or partes[1] not in ORDEM_DATASETS:
+            self._responder(404, {'erro': f"use POST /validar/<{'|'.join(ORDEM_DATASETS)}>"})
+            return
+
+        dataset = partes[1]
+        params = parse_qs(url.query)
+        chunked = 'chunked' in self.headers.get('Transfer-Encoding', '').lower()
+        tamanho = int(self.headers.get('Content-Length', 0) or 0)
+        limite = self.server.max_corpo_bytes
+        if not chunked and limite is not None and tamanho > limite:
+            self.close_connection = True
+            self._responder(413, {'erro': f"corpo de {tamanho} bytes excede o limite de {limite} bytes"})
+            return
+        corpo = CorpoRequisicao(self.rfile, tamanho, chunked, limite=limite)
+        try:
+            df = ler_lote(corpo, self.headers.get('Content-Type', 'text/csv').split(';')[0].strip(),
+                          configuracao.schema_dataset(self.servico.config, dataset),
+                          sep=params.get('sep', ['\t'])[0])
+            corrigir = params.get('corrigir', ['0'])[0].lower() in ('1', 'true', 'sim')
+            fail_fast = params['fail_fast'][0].lower() in ('1', 'true', 'sim') if 'fail_fast' in params else None
+            self._responder(200, self.servico.validar(dataset, df, corrigir=corrigir, fail_fast=fail_fast))
+        except CorpoExcedidoError as e:
+            self.close_connection = True   # o restante do corpo não é lido
+            self._responder(413, {'erro': str(e)})
+        except (pa.ArrowInvalid, ValueError, KeyError) as e:
+            corpo.read()   # descarta o restante para manter a conexão utilizável
+            self._responder(400, {'erro': f"lote inválido: {e}"})
+        except Exception as e:
+            logger.error(f"Erro ao validar lote de {dataset}: {e}", exc_info=True)
+            self.close_connection = True
+            self._responder(500, {'erro': str(e)})
+
+
+class ServidorValidacao(HTTPServer):
+    """HTTPServer que despacha cada conexão para um pool fixo de threads."""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, servico: ServicoValidacao, workers: int = 4,
+                 timeout_conexao: Optional[float] = TIMEOUT_CONEXAO_S,
+                 max_corpo_bytes: Optional[int] = MAX_CORPO_MB << 20):
+        super().__init__(endereco, _Handler)
+        self.servico = servico
+        self.timeout_conexao = timeout_conexao
+        self.max_corpo_bytes = max_corpo_bytes
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='validacao')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._processar, request, client_address)
+
+    def _processar(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def criar_servidor(config: dict, host: str = '127.0.0.1', porta: int = 8765,
+                   workers: int = 4, processed_dir: Path = PROCESSED_DATA_PATH) -> ServidorValidacao:
+    """
+    Compila as suites e cria o servidor (use `serve_forever()` para atender).
+    O timeout de conexão ociosa e o limite do corpo vêm da seção
+    `servico_validacao` do config.
+    """
+    secao = config.get('servico_validacao') or {}
+    servico = ServicoValidacao(config, processed_dir)
+    max_corpo_mb = secao.get('max_corpo_mb', MAX_CORPO_MB)
+    return ServidorValidacao((host, porta), servico, workers=workers,
+                             timeout_conexao=float(secao.get('timeout_conexao_s', TIMEOUT_CONEXAO_S)),
+                             max_corpo_bytes=int(float(max_corpo_mb) * (1 << 20)) if max_corpo_mb else None)
+
+
+def main(argv=None) -> None:
+    config = configuracao.carregar_config(CONFIG_PATH)
+    secao = config.get('servico_validacao') or {}
+
+    parser = argparse.ArgumentParser(description="Serviço HTTP de validação de lotes TechCommerce")
+    parser.add_argument('--host', default=secao.get('host', '127.0.0.1'))
+    parser.add_argument('--porta', type=int, default=int(secao.get('porta', 8765)))
+    parser.add_argument('--workers', type=int, default=int(secao.get('workers', 4)))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    servidor = criar_servidor(config, args.host, args.porta, args.workers)
+    logger.info(f"Serviço de validação em http://{args.host}:{args.porta} ({args.workers} workers)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Encerrando serviço de validação")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
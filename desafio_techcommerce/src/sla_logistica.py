@@ -0,0 +1,214 @@
+"""
+Analytics de SLA de Entrega (Logística)
+=======================================
+
+Mede a dimensão de Temporalidade para entregas: atraso em relação a
+`data_entrega_prevista`, taxa de entregas no prazo e percentis
+(p50/p95/p99) de `tempo_entrega_dias`, por transportadora e por dia.
+
+As métricas são mantidas em uma tabela de rollup pré-agregada no grão
+(dia, transportadora, tempo_entrega_dias). Como `tempo_entrega_dias` é
+inteiro, o rollup funciona como um histograma: percentis exatos e taxas
+podem ser recalculados para qualquer agrupamento sem reler a logística.
+A cada execução apenas os dias presentes no novo lote são substituídos.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Sequence
+
+logger = logging.getLogger(__name__)
+
+CHAVES_ROLLUP = ['dia', 'transportadora', 'tempo_entrega_dias']
+METRICAS_ROLLUP = ['n_entregas', 'n_avaliadas', 'n_no_prazo', 'n_atrasadas', 'soma_atraso_dias']
+PERCENTIS = (0.50, 0.95, 0.99)
+
+
+def calcular_metricas_entrega(df_logistica: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula atraso e flag de prazo por entrega.
+
+    Args:
+        df_logistica: DataFrame de logística corrigido (datas já convertidas)
+
+    Returns:
+        DataFrame com colunas dia, transportadora, tempo_entrega_dias,
+        atraso_dias e no_prazo
+    """
+    envio = pd.to_datetime(df_logistica['data_envio'], errors='coerce')
+    prevista = pd.to_datetime(df_logistica['data_entrega_prevista'], errors='coerce')
+    real = pd.to_datetime(df_logistica['data_entrega_real'], errors='coerce')
+
+    if 'tempo_entrega_dias' in df_logistica.columns:
+        tempo = pd.to_numeric(df_logistica['tempo_entrega_dias'], errors='coerce')
+    else:
+        tempo = (real - envio).dt.days
+    atraso = (real - prevista).dt.days
+
+    return pd.DataFrame({
+        'dia': envio.dt.normalize(),
+        'transportadora': df_logistica['transportadora'].astype('string').fillna('NÃO INFORMADA'),
+        'tempo_entrega_dias': tempo.astype('Int64'),
+        'atraso_dias': atraso.astype('Int64'),
+        'no_prazo': (atraso <= 0).where(atraso.notna()).astype('boolean'),
+    }, index=df_logistica.index)
+
+
+def agregar_rollup(df_logistica: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega a logística no grão do rollup (dia, transportadora, tempo_entrega_dias).
+
+    Args:
+        df_logistica: DataFrame de logística corrigido
+
+    Returns:
+        DataFrame de rollup com as contagens de METRICAS_ROLLUP
+    """
+    metricas = calcular_metricas_entrega(df_logistica)
+    atraso = metricas['atraso_dias']
+    metricas['n_avaliadas'] = atraso.notna().astype('int64')
+    metricas['n_no_prazo'] = metricas['no_prazo'].fillna(False).astype('int64')
+    metricas['n_atrasadas'] = (atraso > 0).fillna(False).astype('int64')
+    metricas['soma_atraso_dias'] = atraso.clip(lower=0).fillna(0).astype('int64')
+
+    rollup = metricas.groupby(CHAVES_ROLLUP, dropna=False, sort=True).agg(
+        n_entregas=('n_avaliadas', 'size'),
+        n_avaliadas=('n_avaliadas', 'sum'),
+        n_no_prazo=('n_no_prazo', 'sum'),
+        n_atrasadas=('n_atrasadas', 'sum'),
+        soma_atraso_dias=('soma_atraso_dias', 'sum'),
+    ).reset_index()
+    return rollup[CHAVES_ROLLUP + METRICAS_ROLLUP]
+
+
+def atualizar_rollup(rollup: pd.DataFrame, df_logistica: pd.DataFrame,
+                     substituir_dias: bool = True) -> pd.DataFrame:
+    """
+    Incorpora um novo lote de logística ao rollup existente.
+
+    Args:
+        rollup: Rollup atual (pode ser vazio)
+        df_logistica: Novo lote de logística corrigido
+        substituir_dias: Se True, os dias presentes no lote substituem os do
+            rollup (reprocessamento idempotente de cargas completas). Se False,
+            as contagens são somadas (micro-lotes disjuntos).
+
+    Returns:
+        Rollup atualizado
+    """
+    novo = agregar_rollup(df_logistica)
+    if rollup is None or rollup.empty:
+        return novo
+
+    if substituir_dias:
+        dias_lote = novo['dia']
+        mask_manter = ~(rollup['dia'].isin(dias_lote.dropna()) |
+                        (rollup['dia'].isna() & dias_lote.isna().any()))
+        return pd.concat([rollup[mask_manter], novo], ignore_index=True) \
+                 .sort_values(CHAVES_ROLLUP, ignore_index=True)
+
+    combinado = pd.concat([rollup, novo], ignore_index=True)
+    return combinado.groupby(CHAVES_ROLLUP, dropna=False, sort=True)[METRICAS_ROLLUP] \
+                    .sum().reset_index()
+
+
+def resumir_sla(rollup: pd.DataFrame, por: Sequence[str],
+                percentis: Sequence[float] = PERCENTIS) -> pd.DataFrame:
+    """
+    Calcula taxa no prazo, atraso médio e percentis de tempo de entrega.
+
+    Os percentis usam o método nearest-rank sobre o histograma do rollup:
+    o menor tempo_entrega_dias cuja frequência acumulada atinge q * n.
+
+    Args:
+        rollup: Tabela de rollup
+        por: Colunas de agrupamento (ex.: ['transportadora'] ou ['dia'])
+        percentis: Quantis a calcular
+
+    Returns:
+        DataFrame com uma linha por grupo
+    """
+    por = list(por)
+    resumo = rollup.groupby(por, dropna=False, sort=True)[METRICAS_ROLLUP].sum()
+    resumo['taxa_no_prazo'] = resumo['n_no_prazo'] / resumo['n_avaliadas'].where(resumo['n_avaliadas'] > 0)
+    resumo['atraso_medio_dias'] = resumo['soma_atraso_dias'] / resumo['n_atrasadas'].where(resumo['n_atrasadas'] > 0)
+
+    # Histograma por grupo (apenas entregas concluídas têm tempo)
+    hist = rollup[rollup['tempo_entrega_dias'].notna()] \
+        .groupby(por + ['tempo_entrega_dias'], dropna=False, sort=True)['n_entregas'].sum() \
+        .reset_index()
+    acumulado = hist.groupby(por, dropna=False, sort=False)['n_entregas'].cumsum()
+    total = hist.groupby(por, dropna=False, sort=False)['n_entregas'].transform('sum')
+
+    for q in percentis:
+        nome = f"p{int(round(q * 100))}_tempo_entrega_dias"
+        atingiu = hist[acumulado >= q * total]
+        valores = atingiu.groupby(por, dropna=False, sort=True)['tempo_entrega_dias'].first()
+        resumo[nome] = valores.reindex(resumo.index)
+
+    return resumo.reset_index()
+
+
+def sla_por_transportadora(rollup: pd.DataFrame) -> pd.DataFrame:
+    """Métricas de SLA agregadas por transportadora."""
+    return resumir_sla(rollup, ['transportadora'])
+
+
+def sla_por_dia(rollup: pd.DataFrame) -> pd.DataFrame:
+    """Métricas de SLA agregadas por dia de envio."""
+    return resumir_sla(rollup, ['dia'])
+
+
+def carregar_rollup(caminho: Path) -> pd.DataFrame:
+    """Carrega o rollup persistido (ou DataFrame vazio se ainda não existir)."""
+    caminho = Path(caminho)
+    if caminho.exists():
+        rollup = pd.read_csv(caminho, sep=';')
+    else:
+        rollup = pd.DataFrame(columns=CHAVES_ROLLUP + METRICAS_ROLLUP)
+    rollup['dia'] = pd.to_datetime(rollup['dia'], format='%Y-%m-%d').astype('datetime64[ns]')
+    rollup['transportadora'] = rollup['transportadora'].astype('string')
+    rollup['tempo_entrega_dias'] = pd.to_numeric(rollup['tempo_entrega_dias']).astype('Int64')
+    for col in METRICAS_ROLLUP:
+        rollup[col] = rollup[col].astype('int64')
+    return rollup
+
+
+def salvar_rollup(rollup: pd.DataFrame, caminho: Path) -> None:
+    """Persiste o rollup de forma atômica (arquivo temporário + rename)."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    tmp = caminho.with_suffix(caminho.suffix + '.tmp')
+    rollup.to_csv(tmp, index=False, sep=';', date_format='%Y-%m-%d')
+    os.replace(tmp, caminho)
+
+
+def executar_analytics_sla(df_logistica: pd.DataFrame, caminho_rollup: Path,
+                           meta_no_prazo: float = 0.99) -> pd.DataFrame:
+    """
+    Atualiza o rollup persistido com o lote atual e registra o SLA por transportadora.
+
+    Args:
+        df_logistica: DataFrame de logística corrigido
+        caminho_rollup: Arquivo do rollup (ex.: data/quality/sla_logistica_rollup.csv)
+        meta_no_prazo: Meta de entregas no prazo (quality_rules.timeliness_threshold)
+
+    Returns:
+        Resumo de SLA por transportadora
+    """
+    rollup = atualizar_rollup(carregar_rollup(caminho_rollup), df_logistica)
+    salvar_rollup(rollup, caminho_rollup)
+
+    resumo = sla_por_transportadora(rollup)
+    for _, linha in resumo.iterrows():
+        taxa = linha['taxa_no_prazo']
+        status = "✓" if pd.notna(taxa) and taxa >= meta_no_prazo else "✗"
+        taxa_txt = f"{taxa:.1%}" if pd.notna(taxa) else "n/d"
+        logger.info(f"  {status} {linha['transportadora']}: {taxa_txt} no prazo "
+                    f"(p95 = {linha['p95_tempo_entrega_dias']} dias, {linha['n_entregas']} entregas)")
+    return resumo
@@ -0,0 +1,358 @@
+"""
+Suites Compiladas (validação em memória)
+========================================
+
+Executa as regras de `expectation_suites.py` diretamente sobre DataFrames,
+sem montar batch requests nem contexto GX a cada lote. As funções
+`create_*_expectations` são chamadas uma única vez com um validador que
+apenas registra as expectativas; cada registro é compilado em uma função
+vetorizada (pandas) mantida em memória e reaplicada a cada lote.
+
+A semântica segue a do GX para as expectativas usadas nas suites:
+valores nulos são ignorados (exceto em `not_be_null`) e `mostly` define
+a fração mínima de valores que precisam passar. Regex seguem a semântica
+de `str.match` (ancoradas no início) avaliada pelo RE2 do Arrow, a mesma do
+`regexp_matches` do pushdown SQL (`regex_ancorada`).
+
+Severidade: expectativas com `meta={"severidade": "bloqueante"}` (chaves
+primárias e FKs) condenam o lote; as demais são avisos. Com
+`validar(df, fail_fast=True)` as regras bloqueantes rodam primeiro, das
+mais baratas às mais caras, a suite para na primeira falha bloqueante e as
+regras elemento a elemento percorrem a coluna em trechos, parando quando o
+orçamento de falhas do `mostly` estoura ou quando o sucesso já está
+garantido (as contagens de falhas passam a ser um limite inferior).
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import time
+import logging
+import pandas as pd
+from dataclasses import dataclass, asdict, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ('clientes', 'produtos', 'vendas', 'logistica')
+
+BLOQUEANTE = 'bloqueante'
+AVISO = 'aviso'
+
+# Linhas por trecho na avaliação com parada antecipada
+TAMANHO_TRECHO = 65536
+
+# Custo relativo por expectativa (ordem de execução com fail_fast)
+_CUSTO = {
+    'expect_column_values_to_not_be_null': 1,
+    'expect_column_values_to_be_between': 2,
+    'expect_column_values_to_be_in_set': 3,
+    'expect_column_values_to_not_be_in_set': 3,
+    'expect_column_values_to_be_unique': 4,
+    'expect_column_values_to_match_regex': 5,
+}
+
+
+@dataclass
+class Expectativa:
+    """Expectativa registrada a partir de `create_*_expectations`."""
+    tipo: str
+    coluna: str
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def mostly(self) -> float:
+        return float(self.kwargs.get('mostly', 1.0))
+
+    @property
+    def severidade(self) -> str:
+        return (self.kwargs.get('meta') or {}).get('severidade', AVISO)
+
+
+@dataclass
+class ResultadoRegra:
+    """Resultado de uma expectativa em um lote."""
+    expectativa: str
+    coluna: str
+    sucesso: bool
+    avaliados: int
+    falhas: int
+    mostly: float = 1.0
+    erro: Optional[str] = None
+    severidade: str = AVISO
+    avaliada: bool = True     # False: não executada (fail_fast após falha bloqueante)
+    parcial: bool = False     # True: varredura interrompida, `falhas` é limite inferior
+
+    def como_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Nome do segundo argumento posicional de cada expectativa
+_ARGUMENTO_POSICIONAL = {
+    'expect_column_values_to_match_regex': 'regex',
+    'expect_column_values_to_be_in_set': 'value_set',
+    'expect_column_values_to_not_be_in_set': 'value_set',
+}
+
+
+class _ValidadorRegistrador:
+    """Substitui o validator do GX: cada `expect_*` chamado vira uma Expectativa."""
+
+    def __init__(self):
+        self.expectativas: List[Expectativa] = []
+
+    def __getattr__(self, nome: str):
+        if not nome.startswith('expect_'):
+            raise AttributeError(nome)
+
+        def registrar(coluna, *args, **kwargs):
+            if args:
+                kwargs[_ARGUMENTO_POSICIONAL[nome]] = args[0]
+            self.expectativas.append(Expectativa(nome, coluna, kwargs))
+        return registrar
+
+
+# =====================================================================
+# COMPILAÇÃO DAS EXPECTATIVAS
+# =====================================================================
+
+def _valores_comparaveis(serie: pd.Series, referencia) -> pd.Series:
+    """Converte a coluna para o domínio da referência (número, data ou texto)."""
+    if isinstance(referencia, (int, float)) and not isinstance(referencia, bool):
+        return pd.to_numeric(serie, errors='coerce')
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie
+    return serie.astype('string')
+
+
+def _limite(serie: pd.Series, valor):
+    if valor is not None and pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return pd.Timestamp(valor)
+    return valor
+
+
+def regex_ancorada(regex: str) -> str:
+    """Padrão RE2 de busca equivalente a `str.match` (ancorado no início), usado em pandas e SQL."""
+    return regex if regex.startswith('^') else f"^(?:{regex})"
+
+
+def mascara_falhas(exp: Expectativa) -> Optional[Callable[[pd.Series], pd.Series]]:
+    """
+    Para expectativas elemento a elemento: valores não nulos -> máscara das falhas.
+
+    Retorna None para `be_unique`, que depende da coluna inteira.
+    """
+    tipo, kw = exp.tipo, exp.kwargs
+
+    if tipo == 'expect_column_values_to_be_unique':
+        return None
+
+    if tipo == 'expect_column_values_to_match_regex':
+        # string[pyarrow]: RE2, como o regexp_matches do DuckDB (o `re` do Python difere em \w e $)
+        regex = regex_ancorada(kw['regex'])
+        return lambda v: ~v.astype('string[pyarrow]').str.contains(regex, regex=True).fillna(False).astype(bool)
+
+    if tipo in ('expect_column_values_to_be_in_set', 'expect_column_values_to_not_be_in_set'):
+        conjunto = list(kw['value_set'])
+        numerico = bool(conjunto) and all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                                          for v in conjunto)
+        negar = tipo == 'expect_column_values_to_not_be_in_set'
+
+        def em_conjunto(v):
+            valores = pd.to_numeric(v, errors='coerce') if numerico else v.astype('string')
+            dentro = valores.isin(conjunto)
+            return dentro if negar else ~dentro
+        return em_conjunto
+
+    if tipo == 'expect_column_values_to_be_between':
+        minimo, maximo = kw.get('min_value'), kw.get('max_value')
+
+        def entre(v):
+            valores = _valores_comparaveis(v, minimo if minimo is not None else maximo)
+            ok = pd.Series(True, index=valores.index)
+            if minimo is not None:
+                ok &= (valores >= _limite(valores, minimo)).fillna(False)
+            if maximo is not None:
+                ok &= (valores <= _limite(valores, maximo)).fillna(False)
+            return ~ok
+        return entre
+
+    raise ValueError(f"Expectativa não suportada: {tipo}")
+
+
+def _contador_falhas(exp: Expectativa) -> Optional[Callable[[pd.Series], int]]:
+    """Para expectativas elemento a elemento: valores não nulos -> número de falhas."""
+    mascara = mascara_falhas(exp)
+    return None if mascara is None else (lambda v: int(mascara(v).sum()))
+
+
+def _compilar(exp: Expectativa) -> Callable[[pd.Series], Tuple[int, int]]:
+    """Retorna função coluna -> (avaliados, falhas) para a expectativa."""
+    if exp.tipo == 'expect_column_values_to_not_be_null':
+        return lambda s: (len(s), int(s.isna().sum()))
+
+    if exp.tipo == 'expect_column_values_to_be_unique':
+        def unico(s):
+            validos = s.dropna()
+            return len(validos), int(validos.duplicated(keep=False).sum())
+        return unico
+
+    contar = _contador_falhas(exp)
+
+    def elemento_a_elemento(s):
+        validos = s.dropna()
+        return len(validos), contar(validos)
+    return elemento_a_elemento
+
+
+def falhas_toleradas(avaliados: int, mostly: float) -> int:
+    """Maior número de falhas que ainda satisfaz `mostly` (mesma conta de `validar`)."""
+    limite = int(avaliados * (1 - mostly))
+    while limite < avaliados and (avaliados - limite - 1) / avaliados >= mostly:
+        limite += 1
+    while limite >= 0 and avaliados and (avaliados - limite) / avaliados < mostly:
+        limite -= 1
+    return limite
+
+
+def _avaliar_com_orcamento(exp: Expectativa, s: pd.Series,
+                           tamanho_trecho: int) -> Tuple[int, int, bool]:
+    """
+    Avalia uma regra elemento a elemento em trechos, parando quando o
+    resultado já está decidido.
+
+    Returns:
+        (avaliados, falhas, parcial)
+    """
+    nao_nulo = exp.tipo == 'expect_column_values_to_not_be_null'
+    valores = s if nao_nulo else s.dropna()
+    contar = (lambda v: int(v.isna().sum())) if nao_nulo else _contador_falhas(exp)
+    avaliados = len(valores)
+    limite = falhas_toleradas(avaliados, exp.mostly)
+    falhas = 0
+    for inicio in range(0, avaliados, tamanho_trecho):
+        falhas += contar(valores.iloc[inicio:inicio + tamanho_trecho])
+        restantes = avaliados - inicio - tamanho_trecho
+        # Falha: orçamento estourado. Sucesso garantido: nem todas as restantes falhando o estouram
+        if restantes > 0 and (falhas > limite or falhas + restantes <= limite):
+            return avaliados, falhas, True
+    return avaliados, falhas, False
+
+
+class SuiteCompilada:
+    """Conjunto de expectativas compiladas de um dataset."""
+
+    def __init__(self, nome: str, expectativas: List[Expectativa]):
+        self.nome = nome
+        self.expectativas = expectativas
+        self._funcoes = [_compilar(exp) for exp in expectativas]
+        self.ordem_fail_fast = ordem_fail_fast(expectativas)
+
+    def __len__(self) -> int:
+        return len(self.expectativas)
+
+    def contar(self, indice: int, serie: pd.Series) -> Tuple[int, int]:
+        """(avaliados, falhas) da expectativa de posição `indice` sobre a coluna."""
+        avaliados, falhas = self._funcoes[indice](serie)
+        return int(avaliados), int(falhas)
+
+    def validar(self, df: pd.DataFrame, fail_fast: bool = False,
+                tamanho_trecho: int = TAMANHO_TRECHO) -> List[ResultadoRegra]:
+        """
+        Aplica as expectativas ao DataFrame.
+
+        Args:
+            fail_fast: Bloqueantes primeiro (por custo), parada na primeira
+                falha bloqueante e varredura com parada antecipada
+            tamanho_trecho: Linhas por trecho na varredura com parada antecipada
+
+        Returns:
+            Resultados na ordem da suite (as regras não executadas vêm com avaliada=False)
+        """
+        resultados: List[Optional[ResultadoRegra]] = [None] * len(self.expectativas)
+        ordem = self.ordem_fail_fast if fail_fast else range(len(self.expectativas))
+        bloqueio = None
+        for i in ordem:
+            exp = self.expectativas[i]
+            if bloqueio is not None:
+                resultados[i] = nao_avaliada(exp, bloqueio)
+                continue
+            if exp.coluna not in df.columns:
+                resultados[i] = ResultadoRegra(exp.tipo, exp.coluna, False, 0, 0, exp.mostly,
+                                               erro=f"coluna '{exp.coluna}' ausente", severidade=exp.severidade)
+            else:
+                parcial = False
+                if fail_fast and exp.tipo != 'expect_column_values_to_be_unique':
+                    avaliados, falhas, parcial = _avaliar_com_orcamento(exp, df[exp.coluna], tamanho_trecho)
+                else:
+                    avaliados, falhas = self._funcoes[i](df[exp.coluna])
+                sucesso = avaliados == 0 or (avaliados - falhas) / avaliados >= exp.mostly
+                resultados[i] = ResultadoRegra(exp.tipo, exp.coluna, bool(sucesso), int(avaliados), int(falhas),
+                                               exp.mostly, severidade=exp.severidade, parcial=parcial)
+            if fail_fast and not resultados[i].sucesso and exp.severidade == BLOQUEANTE:
+                bloqueio = f"{exp.tipo}({exp.coluna})"
+        return resultados
+
+
+def ordem_fail_fast(expectativas: List[Expectativa]) -> List[int]:
+    """Índices na ordem de execução com fail_fast: bloqueantes primeiro, depois pelo custo."""
+    return sorted(range(len(expectativas)),
+                  key=lambda i: (expectativas[i].severidade != BLOQUEANTE, _CUSTO.get(expectativas[i].tipo, 9), i))
+
+
+def nao_avaliada(exp: Expectativa, bloqueio: str) -> ResultadoRegra:
+    """Resultado de uma regra pulada após uma falha bloqueante."""
+    return ResultadoRegra(exp.tipo, exp.coluna, False, 0, 0, exp.mostly, erro=f"não avaliada: {bloqueio} falhou",
+                          severidade=exp.severidade, avaliada=False)
+
+
+def compilar_suite(dataset: str, referencias: Optional[Dict[str, pd.DataFrame]] = None) -> SuiteCompilada:
+    """
+    Compila a suite de um dataset a partir de `expectation_suites.py`.
+
+    Args:
+        dataset: clientes, produtos, vendas ou logistica
+        referencias: DataFrames usados nas regras cross-dataset (FK):
+            clientes/produtos para vendas, vendas para logística
+    """
+    # Import tardio: expectation_suites importa o great_expectations
+    import expectation_suites
+
+    referencias = referencias or {}
+    vazio = pd.DataFrame()
+    registrador = _ValidadorRegistrador()
+    if dataset == 'clientes':
+        expectation_suites.create_clientes_expectations(registrador)
+    elif dataset == 'produtos':
+        expectation_suites.create_produtos_expectations(registrador)
+    elif dataset == 'vendas':
+        expectation_suites.create_vendas_expectations(
+            registrador, referencias.get('clientes', vazio), referencias.get('produtos', vazio))
+    elif dataset == 'logistica':
+        expectation_suites.create_logistica_expectations(registrador, referencias.get('vendas', vazio))
+    else:
+        raise ValueError(f"Dataset desconhecido: {dataset}")
+    return SuiteCompilada(f"techcommerce.{dataset}.warning", registrador.expectativas)
+
+
+def compilar_suites(referencias: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, SuiteCompilada]:
+    """Compila as suites dos 4 datasets."""
+    inicio = time.perf_counter()
+    suites = {dataset: compilar_suite(dataset, referencias) for dataset in DATASETS}
+    logger.info(f"{sum(len(s) for s in suites.values())} expectativas compiladas em "
+                f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return suites
+
+
+def resumir_resultados(resultados: List[ResultadoRegra]) -> Dict[str, Any]:
+    """Resumo de um lote: sucesso geral e contagens de regras."""
+    falhas = [r for r in resultados if not r.sucesso and r.avaliada]
+    nao_avaliadas = sum(not r.avaliada for r in resultados)
+    return {
+        'sucesso': not falhas and not nao_avaliadas,
+        'bloqueado': any(r.severidade == BLOQUEANTE for r in falhas),
+        'regras': len(resultados),
+        'regras_com_falha': len(falhas),
+        'regras_nao_avaliadas': nao_avaliadas,
+        'falhas': [f"{r.expectativa}({r.coluna})" for r in falhas],
+    }
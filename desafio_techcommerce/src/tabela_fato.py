@@ -0,0 +1,208 @@
+"""
+Tabela Fato de Vendas (Desnormalizada, Incremental)
+===================================================
+
+Materializa vendas ⋈ clientes ⋈ produtos ⋈ logística em
+data/processed/fato_vendas.parquet, no grão (id_venda, id_entrega): uma
+linha por entrega, ou uma linha com a logística vazia para vendas ainda
+sem entrega. As junções comparam as chaves como número, a mesma regra das
+FKs do CorrecaoAutomatica. Colunas de mesmo nome nas dimensões recebem o
+sufixo da tabela (`_cliente`, `_produto`, `_entrega`). Valores monetários em
+reais, como nos *_clean.csv.
+
+A tabela é mantida a partir dos change sets do CDC (etapa 3.1), pelas
+primary_key do config.yaml. As vendas afetadas são:
+
+- vendas inseridas, atualizadas ou removidas
+- vendas de entregas novas, alteradas (inclusive as que trocaram de
+  id_venda) ou removidas, o que cobre a logística que chega atrasada
+- vendas de clientes e produtos alterados ou removidos
+
+Só as linhas dessas vendas saem da tabela e são juntadas de novo. O
+restante da tabela não é recalculado. A atualização é idempotente, então
+uma retentativa da mesma execução pode reaplicá-la.
+
+A atualização incremental exige que a tabela esteja sincronizada com a
+base do CDC da execução (`base_run_id` de cada dataset). Sem isso (primeira
+execução, CDC desligado, etapa pulada em alguma execução, schema alterado),
+a tabela é reconstruída por inteiro.
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import json
+import logging
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import correcao_automatica as ca
+import configuracao
+import cdc_snapshots
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ('vendas', 'clientes', 'produtos', 'logistica')
+# Dimensão -> (coluna de junção em vendas, sufixo de colunas repetidas)
+DIMENSOES = {'clientes': ('id_cliente', '_cliente'), 'produtos': ('id_produto', '_produto')}
+_CHAVE_JUNCAO = '__chave_juncao'
+
+
+def _numerico(serie: pd.Series) -> pd.Series:
+    return pd.to_numeric(serie, errors='coerce')
+
+
+def _juntar(esquerda: pd.DataFrame, direita: pd.DataFrame, coluna: str, sufixo: str) -> pd.DataFrame:
+    """LEFT JOIN pela chave numérica `coluna` (mantém a coluna e a ordem da esquerda)."""
+    direita = direita.drop(columns=[coluna]).assign(**{_CHAVE_JUNCAO: _numerico(direita[coluna]).to_numpy()})
+    direita = direita[direita[_CHAVE_JUNCAO].notna()].drop_duplicates(subset=[_CHAVE_JUNCAO], keep='first')
+    esquerda = esquerda.assign(**{_CHAVE_JUNCAO: _numerico(esquerda[coluna]).to_numpy()})
+    return esquerda.merge(direita, on=_CHAVE_JUNCAO, how='left', suffixes=('', sufixo)) \
+                   .drop(columns=[_CHAVE_JUNCAO])
+
+
+def construir_fato(vendas: pd.DataFrame, clientes: pd.DataFrame, produtos: pd.DataFrame,
+                   logistica: pd.DataFrame) -> pd.DataFrame:
+    """Junção completa de um conjunto de vendas, ordenada por (id_venda, id_entrega)."""
+    fato = vendas.reset_index(drop=True)
+    for nome, dimensao in (('clientes', clientes), ('produtos', produtos)):
+        coluna, sufixo = DIMENSOES[nome]
+        fato = _juntar(fato, dimensao, coluna, sufixo)
+    entregas = logistica.drop(columns=['id_venda']).assign(**{_CHAVE_JUNCAO: _numerico(logistica['id_venda']).to_numpy()})
+    fato = fato.assign(**{_CHAVE_JUNCAO: _numerico(fato['id_venda']).to_numpy()}) \
+               .merge(entregas, on=_CHAVE_JUNCAO, how='left', suffixes=('', '_entrega')) \
+               .drop(columns=[_CHAVE_JUNCAO])
+    return ordenar(ca.restaurar_colunas_monetarias(fato))
+
+
+def ordenar(fato: pd.DataFrame) -> pd.DataFrame:
+    ordem = pd.DataFrame({'v': _numerico(fato['id_venda']), 'e': _numerico(fato['id_entrega'])}) \
+              .sort_values(['v', 'e'], kind='stable').index
+    return fato.loc[ordem].reset_index(drop=True)
+
+
+def vendas_afetadas(fato: pd.DataFrame, dados: Dict[str, pd.DataFrame],
+                    alteradas: Dict[str, pd.Series]) -> pd.Series:
+    """
+    id_venda (numérico) cujas linhas na tabela fato precisam ser refeitas.
+
+    Args:
+        fato: Tabela fato atual
+        dados: Tabelas processadas da execução
+        alteradas: Chaves inseridas, atualizadas ou removidas de cada dataset
+            (primary_key, como número)
+    """
+    afetadas = [alteradas['vendas']]
+    # Entregas: id_venda atual (novas/alteradas) e o da tabela fato (alteradas/removidas)
+    logistica, entregas = dados['logistica'], alteradas['logistica']
+    afetadas.append(_numerico(logistica['id_venda'])[_numerico(logistica['id_entrega']).isin(entregas)])
+    afetadas.append(_numerico(fato['id_venda'])[_numerico(fato['id_entrega']).isin(entregas)])
+    for nome, (coluna, _) in DIMENSOES.items():
+        afetadas.append(_numerico(fato['id_venda'])[_numerico(fato[coluna]).isin(alteradas[nome])])
+        afetadas.append(_numerico(dados['vendas']['id_venda'])[_numerico(dados['vendas'][coluna]).isin(alteradas[nome])])
+    return pd.concat(afetadas, ignore_index=True).dropna().drop_duplicates()
+
+
+def atualizar_fato(fato: pd.DataFrame, dados: Dict[str, pd.DataFrame],
+                   alteradas: Dict[str, pd.Series]) -> Tuple[pd.DataFrame, int]:
+    """
+    Refaz apenas as linhas das vendas afetadas.
+
+    Returns:
+        (tabela fato atualizada, número de vendas refeitas)
+    """
+    afetadas = vendas_afetadas(fato, dados, alteradas)
+    vendas = dados['vendas'][_numerico(dados['vendas']['id_venda']).isin(afetadas)]
+    logistica = dados['logistica'][_numerico(dados['logistica']['id_venda']).isin(afetadas)]
+    novas = construir_fato(vendas, dados['clientes'], dados['produtos'], logistica)
+    mantidas = fato[~_numerico(fato['id_venda']).isin(afetadas)]
+    if len(novas):
+        novas = novas.astype(fato.dtypes.to_dict())
+    return ordenar(pd.concat([mantidas, novas], ignore_index=True)), len(afetadas)
+
+
+class TabelaFato:
+    """Persistência da tabela fato (parquet + meta com o run_id sincronizado)."""
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self.caminho_meta = self.caminho.with_suffix('.json')
+
+    def meta(self) -> dict:
+        if not self.caminho.exists() or not self.caminho_meta.exists():
+            return {}
+        return json.loads(self.caminho_meta.read_text(encoding='utf-8'))
+
+    def salvar(self, fato: pd.DataFrame, run_id: str, modo: str) -> None:
+        """Troca atômica: parquet e depois meta (a atualização é idempotente se parar entre os dois)."""
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho.with_name(self.caminho.name + '.tmp')
+        fato.to_parquet(temporario, index=False)
+        os.replace(temporario, self.caminho)
+        meta = {'run_id': run_id, 'modo': modo, 'linhas': len(fato),
+                'atualizado_em': datetime.now().isoformat(timespec='seconds')}
+        temporario_meta = self.caminho_meta.with_name(self.caminho_meta.name + '.tmp')
+        temporario_meta.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+        os.replace(temporario_meta, self.caminho_meta)
+
+
+def _alteradas_cdc(config: dict, cdc_dir: Optional[Path], run_id: str,
+                   sincronizada_em: Optional[str]) -> Tuple[Optional[Dict[str, pd.Series]], str]:
+    """Chaves alteradas de cada dataset segundo o CDC, ou (None, motivo da reconstrução)."""
+    if cdc_dir is None:
+        return None, "CDC desabilitado"
+    if sincronizada_em is None:
+        return None, "tabela inexistente"
+    alteradas = {}
+    for dataset in DATASETS:
+        chave = configuracao.chave_primaria(config, dataset)
+        resumo = cdc_snapshots.carregar_resumo(cdc_dir, dataset, run_id) if chave else None
+        if resumo is None:
+            return None, f"sem CDC de {dataset} nesta execução"
+        if resumo.get('base_run_id') != sincronizada_em:
+            return None, f"tabela sincronizada em {sincronizada_em}, CDC de {dataset} compara com {resumo.get('base_run_id')}"
+        mudancas = cdc_snapshots.carregar_alteracoes(cdc_dir, dataset, run_id, colunas=[chave])
+        alteradas[dataset] = _numerico(pd.concat([m[chave].astype('string') for m in mudancas.values()],
+                                                 ignore_index=True)).dropna()
+    return alteradas, ""
+
+
+def executar_fato(dados: Dict[str, pd.DataFrame], config: dict, caminho: Path, run_id: str,
+                  cdc_dir: Optional[Path] = None) -> Dict[str, object]:
+    """
+    Atualiza (ou reconstrói) a tabela fato para a execução.
+
+    Args:
+        dados: Tabelas processadas da execução
+        caminho: Parquet da tabela fato
+        cdc_dir: Diretório do CDC (None: CDC desabilitado, reconstrução completa)
+
+    Returns:
+        Resumo: modo ('incremental', 'completa' ou 'sincronizada'), linhas e vendas refeitas
+    """
+    tabela = TabelaFato(caminho)
+    meta = tabela.meta()
+    if meta.get('run_id') == run_id:
+        logger.info(f"Tabela fato já sincronizada com {run_id}")
+        return {'modo': 'sincronizada', 'linhas': meta.get('linhas'), 'vendas_refeitas': 0}
+
+    alteradas, motivo = _alteradas_cdc(config, cdc_dir, run_id, meta.get('run_id'))
+    fato = pd.read_parquet(tabela.caminho) if alteradas is not None else None
+    completa = construir_fato(dados['vendas'].iloc[:0], dados['clientes'], dados['produtos'],
+                              dados['logistica'].iloc[:0])
+    if fato is not None and list(fato.columns) != list(completa.columns):
+        fato, motivo = None, "schema alterado"
+
+    if fato is None:
+        logger.info(f"Tabela fato: reconstrução completa ({motivo})")
+        fato = construir_fato(dados['vendas'], dados['clientes'], dados['produtos'], dados['logistica'])
+        modo, refeitas = 'completa', int(_numerico(dados['vendas']['id_venda']).nunique())
+    else:
+        fato, refeitas = atualizar_fato(fato, dados, alteradas)
+        modo = 'incremental'
+    tabela.salvar(fato, run_id, modo)
+    logger.info(f"✓ Tabela fato ({modo}): {len(fato)} linhas, {refeitas} vendas refeitas")
+    return {'modo': modo, 'linhas': len(fato), 'vendas_refeitas': refeitas}
@@ -0,0 +1,270 @@
+"""
+Versões Imutáveis dos Dados Processados
+=======================================
+
+A ETAPA 3 não sobrescreve mais os *_clean.csv: cada execução grava uma
+versão, publicada por troca atômica de um ponteiro. Um leitor (dashboard,
+notebook, daemon) fixa uma versão lendo o ponteiro uma vez e lê os arquivos
+daquela versão, que nunca mudam.
+
+Layout em data/processed/versoes/:
+    ATUAL.json                              # versão publicada (trocada com os.replace)
+    manifestos/<versao>.json                # dataset -> objeto, impressão, linhas, bytes
+    objetos/<dataset>-<impressao>.csv       # conteúdo imutável (somente leitura)
+
+Os objetos são endereçados pela impressão do DataFrame (nomes das colunas e
+hash de cada coluna, como na memoização da validação). Uma tabela que não
+mudou desde a versão anterior não é serializada de novo: o manifesto novo
+referencia o mesmo objeto. Os nomes de sempre (data/processed/<clean_file>)
+continuam existindo como cópias graváveis dos objetos da versão publicada,
+trocadas uma a uma com os.replace. Não são hardlinks: esses arquivos estão
+versionados no git, e um checkout ou uma edição alteraria o objeto imutável.
+Eles são atômicos por arquivo; a consistência entre as tabelas vem do
+manifesto (`fixar`).
+
+Retenção: a coleta mantém a versão publicada, as `manter` mais recentes e
+as mais novas que `min_horas` (leitores que fixaram uma versão há pouco), e
+remove os objetos que nenhum manifesto restante referencia.
+
+Uso:
+    python src/versoes_processados.py --listar
+    python src/versoes_processados.py --publicar <versao>    # rollback
+    python src/versoes_processados.py --coletar
+
+Author: DataOps Team TechCommerce
+Date: 2025-11-17
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+import pandas as pd
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Adicionar src ao path para encontrar os módulos
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+import correcao_automatica as ca
+import configuracao
+from memo_validacao import impressao_coluna
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_ATUAL = "ATUAL.json"
+# Entra na impressão: muda se a serialização dos CSVs mudar
+FORMATO_CSV = "csv;sep=;;reais;v1"
+
+
+def impressao_tabela(df: pd.DataFrame) -> str:
+    """Impressão do conteúdo de um DataFrame processado (colunas, dtypes e valores)."""
+    h = hashlib.blake2b(FORMATO_CSV.encode('utf-8'), digest_size=16)
+    for coluna in df.columns:
+        h.update(str(coluna).encode('utf-8'))
+        h.update(impressao_coluna(df[coluna]).encode('ascii'))
+    return h.hexdigest()
+
+
+def _escrever_json(caminho: Path, dados: dict) -> None:
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    temporario.write_text(json.dumps(dados, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(temporario, caminho)
+
+
+def _publicar_copia(origem: Path, destino: Path) -> None:
+    """Publica uma cópia gravável de `origem` em `destino`, trocando o arquivo atomicamente."""
+    temporario = destino.with_name(destino.name + '.tmp')
+    temporario.unlink(missing_ok=True)
+    shutil.copyfile(origem, temporario)
+    os.replace(temporario, destino)
+
+
+class RepositorioVersoes:
+    """Versões dos *_clean.csv em um diretório (ver layout no módulo)."""
+
+    def __init__(self, diretorio: Path, publicado: Optional[Path] = None,
+                 manter: int = 10, min_horas: float = 24.0):
+        """
+        Args:
+            diretorio: Raiz das versões (ex.: data/processed/versoes)
+            publicado: Diretório dos nomes de sempre (ex.: data/processed);
+                None = só o ponteiro é publicado
+            manter, min_horas: Retenção da coleta
+        """
+        self.diretorio = Path(diretorio)
+        self.publicado = Path(publicado) if publicado is not None else None
+        self.manter = manter
+        self.min_horas = min_horas
+        self.objetos = self.diretorio / "objetos"
+        self.manifestos = self.diretorio / "manifestos"
+
+    @classmethod
+    def do_config(cls, config: dict, raiz: Path) -> Optional['RepositorioVersoes']:
+        """Repositório da seção `versoes` do config (None se desabilitado)."""
+        secao = config.get('versoes') or {}
+        if not secao.get('enabled', True):
+            return None
+        return cls(Path(raiz) / secao.get('path', 'data/processed/versoes'), Path(raiz) / 'data' / 'processed',
+                   manter=int(secao.get('manter', 10)), min_horas=float(secao.get('min_horas', 24)))
+
+    # -----------------------------------------------------------------
+    # Escrita e publicação
+    # -----------------------------------------------------------------
+
+    def gravar(self, versao: str, dados: Dict[str, pd.DataFrame],
+               arquivos: Optional[Dict[str, str]] = None) -> dict:
+        """
+        Grava uma versão (sem publicá-la). Tabelas com a impressão de um
+        objeto existente não são serializadas.
+
+        Args:
+            versao: Identificador (o run_id da execução)
+            dados: DataFrames processados (centavos, como na ETAPA 2)
+            arquivos: dataset -> nome publicado (padrão: <dataset>_clean.csv)
+
+        Returns:
+            Manifesto da versão
+        """
+        self.objetos.mkdir(parents=True, exist_ok=True)
+        self.manifestos.mkdir(parents=True, exist_ok=True)
+        arquivos = arquivos or {}
+        entradas = {}
+        for dataset, df in dados.items():
+            impressao = impressao_tabela(df)
+            objeto = self.objetos / f"{dataset}-{impressao}.csv"
+            reaproveitado = objeto.exists()
+            if not reaproveitado:
+                temporario = objeto.with_name(objeto.name + '.tmp')
+                ca.restaurar_colunas_monetarias(df).to_csv(temporario, index=False, sep=';')
+                os.chmod(temporario, 0o444)
+                os.replace(temporario, objeto)
+            entradas[dataset] = {
+                'objeto': objeto.relative_to(self.diretorio).as_posix(),
+                'arquivo': arquivos.get(dataset, f"{dataset}_clean.csv"),
+                'impressao': impressao,
+                'linhas': len(df),
+                'bytes': objeto.stat().st_size,
+                'reaproveitado': reaproveitado,
+            }
+            logger.info(f"✓ {entradas[dataset]['arquivo']} {'reaproveitado' if reaproveitado else 'gravado'} "
+                        f"({len(df)} linhas, versão {versao})")
+        manifesto = {'versao': versao, 'criada_em': datetime.now().isoformat(timespec='seconds'),
+                     'arquivos': entradas}
+        _escrever_json(self.manifestos / f"{versao}.json", manifesto)
+        return manifesto
+
+    def publicar(self, versao: str) -> None:
+        """Troca o ponteiro para `versao` e recopia os nomes publicados."""
+        manifesto = self.manifesto(versao)
+        _escrever_json(self.diretorio / ARQUIVO_ATUAL,
+                       {'versao': versao, 'publicada_em': datetime.now().isoformat(timespec='seconds')})
+        if self.publicado is not None:
+            for entrada in manifesto['arquivos'].values():
+                _publicar_copia(self.diretorio / entrada['objeto'], self.publicado / entrada['arquivo'])
+        logger.info(f"Versão {versao} publicada")
+
+    # -----------------------------------------------------------------
+    # Leitura
+    # -----------------------------------------------------------------
+
+    def atual(self) -> Optional[str]:
+        """Versão publicada (None se nenhuma)."""
+        caminho = self.diretorio / ARQUIVO_ATUAL
+        return json.loads(caminho.read_text(encoding='utf-8'))['versao'] if caminho.exists() else None
+
+    def manifesto(self, versao: Optional[str] = None) -> dict:
+        """Manifesto de uma versão (padrão: a publicada)."""
+        versao = versao or self.atual()
+        caminho = self.manifestos / f"{versao}.json"
+        if versao is None or not caminho.exists():
+            raise FileNotFoundError(f"Versão '{versao}' não encontrada em {self.manifestos}")
+        return json.loads(caminho.read_text(encoding='utf-8'))
+
+    def fixar(self, versao: Optional[str] = None) -> Dict[str, Path]:
+        """
+        Caminhos de uma versão (padrão: a publicada agora), por dataset.
+        Os arquivos não mudam: publicações seguintes não afetam quem os lê.
+        """
+        return {dataset: self.diretorio / entrada['objeto']
+                for dataset, entrada in self.manifesto(versao)['arquivos'].items()}
+
+    def versoes(self) -> List[dict]:
+        """Manifestos de todas as versões, da mais antiga para a mais recente."""
+        if not self.manifestos.exists():
+            return []
+        manifestos = [json.loads(p.read_text(encoding='utf-8')) for p in self.manifestos.glob('*.json')]
+        return sorted(manifestos, key=lambda m: (m['criada_em'], m['versao']))
+
+    # -----------------------------------------------------------------
+    # Retenção
+    # -----------------------------------------------------------------
+
+    def coletar(self) -> Dict[str, int]:
+        """Remove versões fora da retenção e os objetos sem referência."""
+        versoes = self.versoes()
+        atual = self.atual()
+        limite = (datetime.now() - timedelta(hours=self.min_horas)).isoformat(timespec='seconds')
+        recentes = {m['versao'] for m in versoes[-self.manter:]} if self.manter > 0 else set()
+        removidas = 0
+        mantidos = set()
+        for manifesto in versoes:
+            versao = manifesto['versao']
+            if versao == atual or versao in recentes or manifesto['criada_em'] > limite:
+                mantidos.update(entrada['objeto'] for entrada in manifesto['arquivos'].values())
+            else:
+                (self.manifestos / f"{versao}.json").unlink()
+                removidas += 1
+        objetos = 0
+        for objeto in self.objetos.glob('*.csv') if self.objetos.exists() else []:
+            if objeto.relative_to(self.diretorio).as_posix() not in mantidos:
+                objeto.unlink()
+                objetos += 1
+        if removidas or objetos:
+            logger.info(f"Coleta de versões: {removidas} versão(ões) e {objetos} objeto(s) removidos")
+        return {'versoes_removidas': removidas, 'objetos_removidos': objetos}
+
+
+def fixar_processados(config: dict, processed_dir: Path) -> Dict[str, Path]:
+    """
+    Caminhos da versão publicada, por dataset, para uma leitura consistente
+    ({} sem versões: o leitor usa os nomes de sempre em `processed_dir`).
+    """
+    repositorio = RepositorioVersoes.do_config(config, Path(processed_dir).parent.parent)
+    if repositorio is None or repositorio.atual() is None:
+        return {}
+    return repositorio.fixar()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Versões dos dados processados")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument('--listar', action='store_true', help='Lista as versões')
+    grupo.add_argument('--publicar', metavar='VERSAO', help='Publica uma versão existente (rollback)')
+    grupo.add_argument('--coletar', action='store_true', help='Aplica a retenção')
+    parser.add_argument('--config', type=Path, help='config.yaml (padrão: config/config.yaml)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    repositorio = RepositorioVersoes.do_config(configuracao.carregar_config(args.config), project_root)
+    if repositorio is None:
+        parser.error("versoes.enabled: false no config")
+    if args.publicar:
+        repositorio.publicar(args.publicar)
+    elif args.coletar:
+        repositorio.coletar()
+    else:
+        atual = repositorio.atual()
+        for manifesto in repositorio.versoes():
+            novos = sum(not e['reaproveitado'] for e in manifesto['arquivos'].values())
+            print(f"{'*' if manifesto['versao'] == atual else ' '} {manifesto['versao']}  {manifesto['criada_em']}  "
+                  f"{len(manifesto['arquivos'])} arquivos ({novos} novos)")
+
+
+if __name__ == "__main__":
+    main()
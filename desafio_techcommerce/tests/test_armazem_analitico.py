@@ -0,0 +1,80 @@
+"""
+test_armazem_analitico.py
+Testes unitários para o armazém analítico embutido e a validação por pushdown SQL.
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+import suites_compiladas
+from armazem_analitico import ArmazemAnalitico
+
+RAW_DIR = Path(__file__).parent.parent / 'data' / 'raw'
+
+
+def _dados_processados():
+    logging.disable(logging.WARNING)
+    try:
+        raw = {nome: ca.converter_colunas_monetarias(pd.read_csv(RAW_DIR / f"{nome}.csv", sep='\t', dtype=str))
+               for nome in ('clientes', 'produtos', 'vendas', 'logistica')}
+        corretor = ca.CorrecaoAutomatica()
+        clientes = corretor.corrigir_clientes(raw['clientes'])
+        produtos = corretor.corrigir_produtos(raw['produtos'])
+        vendas = corretor.corrigir_vendas(raw['vendas'], clientes, produtos)
+        logistica = corretor.corrigir_logistica(raw['logistica'], vendas)
+    finally:
+        logging.disable(logging.NOTSET)
+    # Venda duplicada com cliente inexistente: falha de unique e de FK
+    extra = vendas.iloc[[0]].copy()
+    extra['id_cliente'] = '999'
+    vendas = pd.concat([vendas, extra], ignore_index=True)
+    return {'clientes': clientes, 'produtos': produtos, 'vendas': vendas, 'logistica': logistica}
+
+
+class TestArmazemAnalitico:
+    """Testes para o armazém analítico"""
+
+    @staticmethod
+    def test_pushdown_igual_suite_compilada():
+        """Verifica que o pushdown SQL produz as mesmas contagens da suite compilada em pandas"""
+        dados = _dados_processados()
+        suites = suites_compiladas.compilar_suites(dados)
+        for motor in ArmazemAnalitico.MOTORES:
+            with tempfile.TemporaryDirectory() as tmp, ArmazemAnalitico(Path(tmp) / 'store.db', motor) as armazem:
+                armazem.carregar(dados)
+                for nome, df in dados.items():
+                    esperado = suites[nome].validar(ca.restaurar_colunas_monetarias(df))
+                    obtido = armazem.validar(nome, suites[nome])
+                    assert [(r.expectativa, r.coluna, r.avaliados, r.falhas, r.sucesso) for r in obtido] == \
+                           [(r.expectativa, r.coluna, r.avaliados, r.falhas, r.sucesso) for r in esperado], \
+                           f"{motor}/{nome}"
+                fk = [r for r in armazem.validar('vendas', suites['vendas']) if r.coluna == 'id_cliente'
+                      and r.expectativa == 'expect_column_values_to_be_in_set']
+                assert fk[0].falhas == 1
+        print("✅ test_pushdown_igual_suite_compilada PASSOU")
+
+    @staticmethod
+    def test_recarga_substitui_tabela_e_cria_indices():
+        """Verifica que a carga substitui a versão anterior e indexa as colunas id_*"""
+        with tempfile.TemporaryDirectory() as tmp, ArmazemAnalitico(Path(tmp) / 'store.duckdb') as armazem:
+            armazem.carregar_tabela('produtos', pd.DataFrame({'id_produto': [1, 2], 'preco': pd.array([990, 1500], 'Int64')}))
+            armazem.carregar_tabela('produtos', pd.DataFrame({'id_produto': [3], 'preco': pd.array([1999], 'Int64')}))
+            resultado = armazem.consultar("SELECT id_produto, preco FROM produtos")
+            assert resultado['id_produto'].tolist() == [3]
+            assert resultado['preco'].tolist() == [19.99]
+            indices = armazem.consultar("SELECT index_name FROM duckdb_indexes() WHERE table_name = 'produtos'")
+            assert indices['index_name'].tolist() == ['idx_produtos_id_produto']
+        print("✅ test_recarga_substitui_tabela_e_cria_indices PASSOU")
+
+
+if __name__ == '__main__':
+    TestArmazemAnalitico.test_pushdown_igual_suite_compilada()
+    TestArmazemAnalitico.test_recarga_substitui_tabela_e_cria_indices()
@@ -0,0 +1,158 @@
+"""
+test_armazem_resultados.py
+Testes unitários para o store SQLite de resultados de validação e a compactação.
+"""
+
+import json
+import yaml
+import logging
+import importlib
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import checkpoints_config
+from armazem_resultados import ArmazemResultados, resolver_caminho
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+
+def acoes_customizadas(config: dict) -> list:
+    """Instancia as actions com `module_name` do checkpoint como o GX: importando de gx/plugins/."""
+    plugins = str(RAIZ_PROJETO / 'gx' / 'plugins')
+    if plugins not in sys.path:
+        sys.path.append(plugins)
+    acoes = []
+    for item in config['action_list']:
+        parametros = dict(item['action'])
+        if 'module_name' in parametros:
+            classe = getattr(importlib.import_module(parametros.pop('module_name')), parametros.pop('class_name'))
+            acoes.append(classe(name=item['name'], **parametros))
+    return acoes
+
+
+class _Contexto:
+    """Recebe a configuração gerada por checkpoints_config.configurar_checkpoint."""
+
+    def add_or_update_checkpoint(self, **config):
+        self.config = config
+
+
+def _resultado_gx(run_name, run_time, inesperados):
+    """ExpectationSuiteValidationResult serializado no formato do store de arquivos (GX 0.x)."""
+    return {
+        'success': inesperados == 0,
+        'evaluation_parameters': {'limite': 0.95},
+        'meta': {'expectation_suite_name': 'techcommerce.vendas.warning',
+                 'run_id': {'run_name': run_name, 'run_time': run_time},
+                 'active_batch_definition': {'data_asset_name': 'vendas_clean'}},
+        'results': [
+            {'success': inesperados == 0,
+             'expectation_config': {'expectation_type': 'expect_column_values_to_not_be_null',
+                                    'kwargs': {'column': 'id_cliente'}},
+             'result': {'element_count': 100, 'unexpected_count': inesperados,
+                        'unexpected_percent': float(inesperados)}},
+            {'success': True,
+             'expectation_config': {'expectation_type': 'expect_column_values_to_be_unique',
+                                    'kwargs': {'column': 'id_venda'}},
+             'result': {'element_count': 100, 'unexpected_count': 0, 'unexpected_percent': 0.0}},
+        ],
+    }
+
+
+class TestArmazemResultados:
+    """Testes para o store de resultados"""
+
+    @staticmethod
+    def test_compactacao_e_historico():
+        """Verifica que a compactação incorpora os JSON, remove os arquivos e alimenta o histórico"""
+        with tempfile.TemporaryDirectory() as tmp:
+            validacoes = Path(tmp) / 'validations'
+            for i, run_time in enumerate(['20250601T120000.000000Z', '20250801T120000.000000Z']):
+                pasta = validacoes / 'techcommerce' / 'vendas' / 'warning' / f'run{i}' / run_time
+                pasta.mkdir(parents=True)
+                (pasta / 'batch.json').write_text(json.dumps(_resultado_gx(f'run{i}', run_time, inesperados=i * 3)))
+            (validacoes / 'corrompido.json').write_text('{')
+
+            with ArmazemResultados(Path(tmp) / 'store.sqlite') as armazem:
+                logging.disable(logging.WARNING)
+                try:
+                    contagem = armazem.compactar(validacoes, dias=0)
+                finally:
+                    logging.disable(logging.NOTSET)
+                assert contagem == {'registrados': 2, 'duplicados': 0, 'invalidos': 1, 'removidos': 2}
+                assert [p.name for p in validacoes.rglob('*')] == ['corrompido.json']
+
+                historico = armazem.historico('techcommerce.vendas.warning',
+                                              tipo_expectativa='expect_column_values_to_not_be_null',
+                                              desde='2025-07-01')
+                assert historico['run_name'].tolist() == ['run1']
+                assert historico['inesperados'].tolist() == [3]
+
+                # Reprocessar o mesmo resultado não duplica a execução
+                assert not armazem.registrar_validacao(_resultado_gx('run1', '20250801T120000.000000Z', 3))
+                assert armazem.total_execucoes() == 2
+        print("✅ test_compactacao_e_historico PASSOU")
+
+
+    @staticmethod
+    def test_action_do_checkpoint():
+        """Verifica que as duas definições de checkpoint carregam as actions, com caminhos fixos na raiz do projeto"""
+        import great_expectations as gx
+
+        yml = RAIZ_PROJETO / 'gx' / 'checkpoints' / 'techcommerce_processed_data_checkpoint.yml'
+        contexto = _Contexto()
+        checkpoints_config.configurar_checkpoint(contexto)
+        diretorio_original = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)  # o caminho não depende do diretório de trabalho
+            try:
+                gx_yml = yaml.safe_load((RAIZ_PROJETO / 'gx' / 'great_expectations.yml').read_text(encoding='utf-8'))
+                sites_gx = [RAIZ_PROJETO / 'gx' / site['store_backend']['base_directory']
+                            for site in gx_yml['data_docs_sites'].values()]
+                for config in (yaml.safe_load(yml.read_text(encoding='utf-8')), contexto.config):
+                    assert 'UpdateDataDocsAction' not in str(config['action_list'])
+                    acoes = acoes_customizadas(config)
+                    assert [a.type for a in acoes] == ['armazenar_resultado_sqlite', 'atualizar_docs_incremental']
+                    assert resolver_caminho(acoes[0].caminho) == \
+                        RAIZ_PROJETO / 'gx' / 'uncommitted' / 'validation_results.sqlite'
+                    # O build incremental lê o mesmo store e não escreve em nenhum site do GX
+                    assert resolver_caminho(acoes[1].store_path) == resolver_caminho(acoes[0].caminho)
+                    assert resolver_caminho(acoes[1].site_dir) not in sites_gx
+            finally:
+                os.chdir(diretorio_original)
+
+            # Checkpoint GX real (contexto efêmero) com a action apontando para um store temporário
+            logging.disable(logging.WARNING)
+            contexto_gx = gx.get_context(mode='ephemeral')
+            lote = contexto_gx.data_sources.add_pandas('techcommerce').add_dataframe_asset('vendas_clean') \
+                .add_batch_definition_whole_dataframe('completo')
+            suite = contexto_gx.suites.add(gx.ExpectationSuite(name='techcommerce.vendas.warning'))
+            suite.add_expectation(gx.expectations.ExpectColumnValuesToNotBeNull(column='id_venda'))
+            validacao = contexto_gx.validation_definitions.add(
+                gx.ValidationDefinition(name='vendas', data=lote, suite=suite))
+            acao = type(acoes[0])(name='store_validation_result', caminho=str(Path(tmp) / 'resultados.sqlite'))
+            docs = type(acoes[1])(name='update_data_docs', segundo_plano=False, site_dir=str(Path(tmp) / 'site'),
+                                  store_path=str(Path(tmp) / 'resultados.sqlite'))
+            checkpoint = contexto_gx.checkpoints.add(
+                gx.Checkpoint(name='techcommerce', validation_definitions=[validacao], actions=[acao, docs]))
+            resultado = checkpoint.run(batch_parameters={'dataframe': pd.DataFrame({'id_venda': [1, None]})})
+            logging.disable(logging.NOTSET)
+
+            assert not resultado.success
+            with ArmazemResultados(Path(tmp) / 'resultados.sqlite') as armazem:
+                historico = armazem.historico('techcommerce.vendas.warning')
+            assert historico['inesperados'].tolist() == [1], historico
+            indice = (Path(tmp) / 'site' / 'index.html').read_text(encoding='utf-8')
+            assert 'techcommerce.vendas.warning' in indice and '❌' in indice
+        print("✅ test_action_do_checkpoint PASSOU")
+
+
+if __name__ == '__main__':
+    TestArmazemResultados.test_compactacao_e_historico()
+    TestArmazemResultados.test_action_do_checkpoint()
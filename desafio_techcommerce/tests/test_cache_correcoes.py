@@ -0,0 +1,99 @@
+"""
+test_cache_correcoes.py
+Testes unitários para o cache de correções por linha (snapshots completos).
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+from cache_correcoes import CacheCorrecoes
+from linhagem import RegistroLinhagem
+
+CHAVES = {'clientes': 'id_cliente', 'produtos': 'id_produto'}
+
+
+def _corrigir(cache: CacheCorrecoes, dataset: str, df: pd.DataFrame, corrigidas: list):
+    """Corrige pelo cache e por inteiro; devolve (saída do cache, bitmask, saída completa, bitmask)."""
+    saidas = []
+    for usar_cache in (True, False):
+        registro = RegistroLinhagem()
+        registro.iniciar(dataset, df, f"data/raw/{dataset}.csv", CHAVES[dataset])
+        metodo = getattr(ca.CorrecaoAutomatica(linhagem=registro), f"corrigir_{dataset}")
+        if usar_cache:
+            def contar(parte, metodo=metodo):
+                corrigidas.append(len(parte))
+                return metodo(parte)
+            saida = cache.corrigir(dataset, df, contar, registro)
+        else:
+            saida = metodo(df)
+        saidas += [saida, registro._rastreios[dataset].bits.tolist()]
+    return saidas
+
+
+class TestCacheCorrecoes:
+    """Testes para CacheCorrecoes"""
+
+    @staticmethod
+    def test_so_linhas_novas_sao_corrigidas():
+        """Verifica saída e linhagem iguais às da correção completa, com deduplicação no conjunto mesclado"""
+        logging.disable(logging.WARNING)
+        dia1 = pd.DataFrame({'id_cliente': ['1', '2', '3', '4'], 'nome': ['Ana', None, 'Caio', 'Duda'],
+                             'email': ['a@b.com', 'x@y.com', 'invalido', 'd@e.com']})
+        # Dia 2: linha 2 alterada, cliente 5 novo e uma duplicata do cliente 4 antes da linha em cache
+        dia2 = pd.DataFrame({'id_cliente': ['1', '4', '2', '3', '4', '5'],
+                             'nome': ['Ana', 'Duda N', 'Bia', 'Caio', 'Duda', None],
+                             'email': ['a@b.com', 'd@e.com', 'x@y.com', 'invalido', 'd@e.com', 'e@f.com']})
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CacheCorrecoes(tmp, CHAVES)
+            for dia, esperado in ((dia1, [4]), (dia2, [3]), (dia2, [])):
+                corrigidas = []
+                saida, bits, completa, bits_completa = _corrigir(cache, 'clientes', dia, corrigidas)
+                pd.testing.assert_frame_equal(saida, completa)
+                assert bits == bits_completa and corrigidas == esperado, (bits, bits_completa, corrigidas)
+            assert saida['nome'].tolist() == ['Ana', 'Duda N', 'Bia', 'Caio', 'NÃO INFORMADO']
+
+            # Regras de correção diferentes (contexto) invalidam o cache
+            corrigidas = []
+            _corrigir(CacheCorrecoes(tmp, CHAVES, contexto='outro'), 'clientes', dia2, corrigidas)
+            assert corrigidas == [5]
+        logging.disable(logging.NOTSET)
+        print("✅ test_so_linhas_novas_sao_corrigidas PASSOU")
+
+    @staticmethod
+    def test_tipos_dependentes_do_conjunto():
+        """Verifica a correção completa quando os dtypes do cache não valem para o conjunto novo"""
+        logging.disable(logging.WARNING)
+
+        def produtos(ids, estoques):
+            return ca.converter_colunas_monetarias(pd.DataFrame({
+                'id_produto': ids, 'preco': ['-5.00', '3.00', '4.00'][:len(ids)],
+                'categoria': [None, 'A', 'B'][:len(ids)], 'estoque': estoques}))
+
+        dias = [
+            (produtos(['10', '11', '12'], ['1', '2', '3']), [3], 'int64'),
+            (produtos(['10', '11', '13'], ['1', '2', 'x']), [1, 3], 'float64'),   # novo inválido: float64
+            (produtos(['10', '11', '13'], ['1', '2', 'x']), [], 'float64'),
+            (produtos(['10', '11'], ['1', '2']), [2], 'int64'),                    # só remoção: completa
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CacheCorrecoes(tmp, CHAVES)
+            for df, esperado, tipo in dias:
+                corrigidas = []
+                saida, bits, completa, bits_completa = _corrigir(cache, 'produtos', df, corrigidas)
+                pd.testing.assert_frame_equal(saida, completa)
+                assert bits == bits_completa and corrigidas == esperado, (corrigidas, esperado)
+                assert str(saida['estoque'].dtype) == tipo
+        logging.disable(logging.NOTSET)
+        print("✅ test_tipos_dependentes_do_conjunto PASSOU")
+
+
+if __name__ == '__main__':
+    TestCacheCorrecoes.test_so_linhas_novas_sao_corrigidas()
+    TestCacheCorrecoes.test_tipos_dependentes_do_conjunto()
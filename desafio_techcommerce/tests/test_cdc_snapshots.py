@@ -0,0 +1,56 @@
+"""
+test_cdc_snapshots.py
+Testes unitários para o CDC por hash de linha entre execuções.
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cdc_snapshots
+
+
+class TestCdcSnapshots:
+    """Testes para o SnapshotCDC"""
+
+    @staticmethod
+    def test_inserts_updates_deletes_entre_execucoes():
+        """Verifica os change sets entre duas execuções consecutivas"""
+        dia1 = pd.DataFrame({'id_produto': [1, 2, 3], 'preco': pd.array([990, 1500, 2000], 'Int64'),
+                             'categoria': ['A', 'B', 'C']})
+        # Mesmos valores com outro dtype (int64) não devem virar update
+        dia2 = pd.DataFrame({'id_produto': [1, 2, 4], 'preco': pd.array([990, 1600, 100], 'int64'),
+                             'categoria': ['A', 'B', 'D']})
+        logging.disable(logging.INFO)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                snapshot = cdc_snapshots.SnapshotCDC(tmp)
+                primeiro = snapshot.processar('produtos', dia1, 'id_produto', 'run1')
+                assert primeiro['inserts'] == 3 and primeiro['carga_inicial']
+
+                segundo = snapshot.processar('produtos', dia2, 'id_produto', 'run2')
+                assert segundo == {'inserts': 1, 'updates': 1, 'deletes': 1, 'inalteradas': 1,
+                                   'carga_inicial': False, 'base_run_id': 'run1'}
+                alteracoes = cdc_snapshots.carregar_alteracoes(tmp, 'produtos', 'run2')
+                assert alteracoes['updates']['preco'].tolist() == [16.0]
+                assert alteracoes['inserts']['id_produto'].tolist() == [4]
+                assert alteracoes['deletes']['id_produto'].tolist() == ['3']
+
+                # Retentativa do mesmo run_id (--resume) reemite o mesmo change set
+                assert snapshot.processar('produtos', dia2, 'id_produto', 'run2') == segundo
+
+                terceiro = snapshot.processar('produtos', dia2, 'id_produto', 'run3')
+                assert terceiro['inalteradas'] == 3 and terceiro['updates'] == 0
+                assert terceiro['base_run_id'] == 'run2'
+        finally:
+            logging.disable(logging.NOTSET)
+        print("✅ test_inserts_updates_deletes_entre_execucoes PASSOU")
+
+
+if __name__ == '__main__':
+    TestCdcSnapshots.test_inserts_updates_deletes_entre_execucoes()
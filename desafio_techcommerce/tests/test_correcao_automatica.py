@@ -13,6 +13,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 import correcao_automatica as ca
+from linhagem import RegistroLinhagem, decodificar_regras
 
 
 class TestCorrecaoAutomatica:
@@ -94,6 +95,101 @@ class TestCorrecaoAutomatica:
         assert (df_corrigido['quantidade'] > 0).all(), "Todas as quantidades deveriam ser > 0"
         print("✅ test_corrigir_vendas_quantidade_negativa PASSOU")
     
+    @staticmethod
+    def test_corrigir_vendas_valor_total_centavos():
+        """Verifica se valor_total é recalculado com aritmética inteira em centavos"""
+        df = pd.DataFrame({
+            'id_venda': ['1001', '1002', '1003'],
+            'id_cliente': [1, 2, 3],
+            'id_produto': [101, 102, 103],
+            'quantidade': ['3', '2', '1'],
+            'valor_unitario': ['29.99', '0.10', '1299.99'],
+            'valor_total': ['89.97', '0.21', '1300.00'],  # segunda e terceira divergem
+            'data_venda': ['2023-01-01', '2023-01-02', '2023-01-03'],
+            'status': ['Concluída', 'Pendente', 'Concluída']
+        })
+        
+        df_clientes = pd.DataFrame({'id_cliente': [1, 2, 3]})
+        df_produtos = pd.DataFrame({'id_produto': [101, 102, 103]})
+        
+        df_corrigido = ca.CorrecaoAutomatica(unidade_monetaria='reais').corrigir_vendas(df, df_clientes, df_produtos)
+        assert df_corrigido['valor_total'].tolist() == [8997, 20, 129999], \
+            f"Valores inesperados: {df_corrigido['valor_total'].tolist()}"
+        
+        df_saida = ca.restaurar_colunas_monetarias(df_corrigido)
+        assert df_saida['valor_unitario'].tolist() == [29.99, 0.10, 1299.99]
+        # A função de compatibilidade mantém a API em reais
+        assert ca.corrigir_vendas(df, df_clientes, df_produtos)['valor_total'].tolist() == [89.97, 0.20, 1299.99]
+        print("✅ test_corrigir_vendas_valor_total_centavos PASSOU")
+    
+    @staticmethod
+    def test_para_centavos_unidade_explicita():
+        """Verifica que a unidade monetária é a informada, não deduzida do dtype"""
+        inteiros = pd.Series([5, -2])
+        assert ca.para_centavos(inteiros, 'reais').tolist() == [500, -200]
+        assert ca.para_centavos(inteiros, 'centavos').tolist() == [5, -2]
+        assert ca.para_centavos(pd.Series([29.99, 0.1]), 'reais').tolist() == [2999, 10]
+        assert ca.para_centavos(pd.Series(['1299.99', ' 0.105 ']), 'reais').tolist() == [129999, 11]
+        assert ca.para_centavos(pd.Series(['2999', None]), 'centavos').tolist() == [2999, pd.NA]
+        for chamada in (lambda: ca.para_centavos(inteiros, 'dolares'),
+                        lambda: ca.CorrecaoAutomatica(unidade_monetaria='dolares')):
+            try:
+                chamada()
+                assert False, "unidade desconhecida deveria falhar"
+            except ValueError:
+                pass
+
+        # O mesmo preço em reais ou já convertido na carga dá o mesmo resultado
+        em_reais = pd.DataFrame({'id_produto': ['1'], 'preco': [-10]})
+        em_centavos = ca.converter_colunas_monetarias(em_reais.copy())
+        assert em_centavos['preco'].tolist() == [-1000]
+        assert ca.CorrecaoAutomatica(unidade_monetaria='reais').corrigir_produtos(em_reais)['preco'].tolist() == \
+               ca.CorrecaoAutomatica().corrigir_produtos(em_centavos)['preco'].tolist() == [1000]
+        print("✅ test_para_centavos_unidade_explicita PASSOU")
+
+    @staticmethod
+    def test_quantidade_fracionaria_removida_e_rastreada():
+        """Verifica que quantidade fracionária é registrada na linhagem e a venda removida (não vira NA)"""
+        vendas = ca.converter_colunas_monetarias(pd.DataFrame({
+            'id_venda': ['1001', '1002', '1003'], 'id_cliente': ['1', '1', '1'], 'id_produto': ['10', '10', '10'],
+            'quantidade': ['2', '1.5', None], 'valor_unitario': ['5.00', '5.00', '5.00'],
+            'valor_total': ['10.00', '7.50', '5.00']}))
+        registro = RegistroLinhagem()
+        registro.iniciar('vendas', vendas, 'data/raw/vendas.csv', 'id_venda')
+        corretor = ca.CorrecaoAutomatica(linhagem=registro)
+        df_vendas = corretor.corrigir_vendas(vendas, pd.DataFrame({'id_cliente': ['1']}),
+                                             pd.DataFrame({'id_produto': ['10']}))
+        assert df_vendas['id_venda'].tolist() == ['1001', '1003']
+        assert str(df_vendas['quantidade'].dtype) == 'Int64'
+        bits = registro._rastreios['vendas'].bits.tolist()
+        assert [decodificar_regras(b) for b in bits] == [[], ['quantidade_fracionaria'], []]
+        print("✅ test_quantidade_fracionaria_removida_e_rastreada PASSOU")
+    
+    @staticmethod
+    def test_fk_chaves_numericas():
+        """Verifica FK comparada como número: ids em texto (carga raw) casam com referências int ou texto"""
+        vendas = pd.DataFrame({
+            'id_venda': ['1001', '1002', '1003', '1004'],
+            'id_cliente': ['1', '2.0', 'abc', '9'],
+            'id_produto': ['101', '101', '101', '101'],
+            'quantidade': ['1', '1', '1', '1'],
+            'valor_unitario': ['1.00', '1.00', '1.00', '1.00'],
+            'valor_total': ['1.00', '1.00', '1.00', '1.00'],
+            'data_venda': ['2023-01-01', '2023-01-01', '2023-01-01', '2023-01-01'],
+        })
+        df_clientes = pd.DataFrame({'id_cliente': ['1', '2', 'X3']})  # id não numérico na referência
+        df_produtos = pd.DataFrame({'id_produto': [101]})
+        
+        df_vendas = ca.corrigir_vendas(vendas, df_clientes, df_produtos)
+        assert df_vendas['id_venda'].tolist() == ['1001', '1002'], df_vendas['id_venda'].tolist()
+        
+        logistica = pd.DataFrame({'id_entrega': ['1', '2'], 'id_venda': ['1001', '1003'],
+                                  'data_envio': ['2023-01-02', '2023-01-02'],
+                                  'data_entrega_real': ['2023-01-03', '2023-01-03']})
+        df_logistica = ca.corrigir_logistica(logistica, pd.DataFrame({'id_venda': [1001, 1002]}))
+        assert df_logistica['id_entrega'].tolist() == ['1']
+        print("✅ test_fk_chaves_numericas PASSOU")
+    
     @staticmethod
     def test_corrigir_logistica_duplicatas():
         """Verifica se duplicatas de id_entrega em logística são removidas"""
@@ -113,6 +209,30 @@ class TestCorrecaoAutomatica:
         assert len(df_corrigido) == 2, f"Esperado 2 registros, obteve {len(df_corrigido)}"
         print("✅ test_corrigir_logistica_duplicatas PASSOU")
 
+    
+    @staticmethod
+    def test_cache_datas_compartilhado():
+        """Verifica se o cache de datas converte só valores distintos e é reutilizado entre tabelas"""
+        corretor = ca.CorrecaoAutomatica()
+        df_logistica = pd.DataFrame({
+            'id_entrega': [2001, 2002, 2003],
+            'id_venda': [1001, 1001, 1002],
+            'transportadora': ['Correios', 'Correios', 'SEDEX'],
+            'data_envio': ['2023-01-01', '2023-01-01', '2023/01/03'],  # terceira fora do formato ISO
+            'data_entrega_prevista': ['2023-01-05', '2023-01-05', None],
+            'data_entrega_real': ['2023-01-04', '2023-01-05', '2023-01-01'],
+            'status_entrega': ['Entregue', 'Entregue', 'Entregue']
+        })
+        
+        df_corrigido = corretor.corrigir_logistica(df_logistica, pd.DataFrame({'id_venda': [1001, 1002]}))
+        assert df_corrigido['tempo_entrega_dias'].iloc[:2].tolist() == [3, 4]
+        assert pd.isna(df_corrigido['data_envio'].iloc[2]), "Data fora do formato deveria ser NaT"
+        assert pd.isna(df_corrigido['data_entrega_prevista'].iloc[2])
+        # '2023-01-01' e '2023-01-05' já estavam em cache ao converter as colunas seguintes
+        assert len(corretor.cache_datas) == 4, f"Esperado 4 datas em cache, obteve {len(corretor.cache_datas)}"
+        assert corretor.cache_datas.reutilizados == 2
+        print("✅ test_cache_datas_compartilhado PASSOU")
+
 
 def run_all_tests():
     """Executa todos os testes"""
@@ -125,7 +245,12 @@ def run_all_tests():
         TestCorrecaoAutomatica.test_corrigir_clientes_email_invalido()
         TestCorrecaoAutomatica.test_corrigir_produtos_preco_negativo()
         TestCorrecaoAutomatica.test_corrigir_vendas_quantidade_negativa()
+        TestCorrecaoAutomatica.test_corrigir_vendas_valor_total_centavos()
+        TestCorrecaoAutomatica.test_para_centavos_unidade_explicita()
+        TestCorrecaoAutomatica.test_quantidade_fracionaria_removida_e_rastreada()
+        TestCorrecaoAutomatica.test_fk_chaves_numericas()
         TestCorrecaoAutomatica.test_corrigir_logistica_duplicatas()
+        TestCorrecaoAutomatica.test_cache_datas_compartilhado()
         
         print("\n" + "="*70)
         print("✅ TODOS OS TESTES PASSARAM COM SUCESSO!")
@@ -0,0 +1,131 @@
+"""
+test_correcao_polars.py
+Testes de paridade entre os backends pandas e polars do CorrecaoAutomatica.
+"""
+
+import logging
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+
+RAW_DIR = Path(__file__).parent.parent / 'data' / 'raw'
+
+
+def _corrigir_tudo(backend, unidade, clientes, produtos, vendas, logistica):
+    corretor = ca.CorrecaoAutomatica(backend=backend, unidade_monetaria=unidade)
+    df_clientes = corretor.corrigir_clientes(clientes)
+    df_produtos = corretor.corrigir_produtos(produtos)
+    df_vendas = corretor.corrigir_vendas(vendas, df_clientes, df_produtos)
+    df_logistica = corretor.corrigir_logistica(logistica, df_vendas)
+    return {'clientes': df_clientes, 'produtos': df_produtos,
+            'vendas': df_vendas, 'logistica': df_logistica}
+
+
+def _assert_paridade(entradas, unidade='centavos'):
+    logging.disable(logging.WARNING)
+    try:
+        pandas_ = _corrigir_tudo('pandas', unidade, *entradas)
+        polars_ = _corrigir_tudo('polars', unidade, *entradas)
+    finally:
+        logging.disable(logging.NOTSET)
+    for nome, esperado in pandas_.items():
+        obtido = polars_[nome]
+        assert list(obtido.index) == list(esperado.index), f"Índice divergente em {nome}"
+        pd.testing.assert_frame_equal(obtido, esperado, obj=nome)
+        # Mesmos bytes no *_clean.csv (escrita da ETAPA 3)
+        assert _csv(obtido) == _csv(esperado), f"CSV divergente em {nome}"
+    return pandas_
+
+
+def _csv(df: pd.DataFrame) -> str:
+    return ca.restaurar_colunas_monetarias(df).to_csv(index=False, sep=';')
+
+
+class TestCorrecaoPolars:
+    """Paridade de saída entre os backends"""
+
+    @staticmethod
+    def test_paridade_dados_raw():
+        """Verifica saídas idênticas nos CSVs de data/raw"""
+        entradas = [ca.converter_colunas_monetarias(pd.read_csv(RAW_DIR / f"{nome}.csv", sep='\t', dtype=str))
+                    for nome in ('clientes', 'produtos', 'vendas', 'logistica')]
+        resultado = _assert_paridade(entradas)
+        assert len(resultado['vendas']) > 0 and len(resultado['logistica']) > 0
+        print("✅ test_paridade_dados_raw PASSOU")
+
+    @staticmethod
+    def test_paridade_casos_limite():
+        """Verifica paridade em valores monetários, chaves, datas e nulos atípicos"""
+        clientes = pd.DataFrame({
+            'id_cliente': ['1', '2', '2', '3', '4', 'X5'],
+            'nome': ['Ana', None, 'Bia', 'Caio', 'Davi', 'Eva'],
+            'email': ['ana@x.com', 'invalido', 'b@x.com', None, 'd@x.com.br', None],
+            'telefone': ['(11) 99999-0000', '123', None, '11 98888 7777', '119999900001', None],
+            'estado': ['sp', 'XX', 'RJ', None, 'MG', 'SP'],
+        })
+        produtos = pd.DataFrame({
+            'id_produto': ['101', '102', '103', '103', '104'],
+            'categoria': ['A', None, 'B', 'C', None],
+            'preco': ['-59.90', '0.005', '1e3', '12,50', None],
+            'estoque': ['5', '-2', None, '1', '3'],
+        })
+        vendas = pd.DataFrame({
+            'id_venda': ['1', '2', '3', '4', '5', '6', '7'],
+            'id_cliente': ['1', '2', '9', '3', '4', '1', '1.0'],
+            'id_produto': ['101', '102', '101', '103', '104', '101', '102'],
+            'quantidade': ['2', '1.5', '1', '0', '3', '1', '2'],
+            'valor_unitario': ['10.00', '3', '1', '1', '0.333', '5', '7.10'],
+            'valor_total': ['20.00', '4.5', '1', '0', '1.00', None, '14.2'],
+            'data_venda': ['2023-03-01', '2023-03-02', '2023-03-03', '2023-03-04',
+                           '2099-01-01', '01/03/2023', '2023-03-07'],
+        })
+        logistica = pd.DataFrame({
+            'id_entrega': ['10', '11', '11', '12', '13'],
+            'id_venda': ['1', '2', '2', '99', '7'],
+            'data_envio': ['2023-03-02', '2023-03-03', '2023-03-03', '2023-03-04', None],
+            'data_entrega_prevista': ['2023-03-05', None, None, '2023-03-06', '2023-03-09'],
+            'data_entrega_real': ['2023-03-04', '2023-03-10', '2023-03-11', None, '2023-03-08'],
+        })
+        entradas = [clientes, produtos, vendas,
+                    logistica.set_index(pd.Index([100, 101, 102, 103, 104]))]
+        # Valores em reais, em texto: parser de centavos de cada backend
+        resultado = _assert_paridade(entradas, unidade='reais')
+        assert '2' not in resultado['vendas']['id_venda'].tolist()   # quantidade '1.5' (fracionária)
+        # Estoque nulo e entrega sem data: float nos dois backends
+        assert str(resultado['produtos']['estoque'].dtype) == 'float64'
+        assert str(resultado['logistica']['tempo_entrega_dias'].dtype) == 'float64'
+        print("✅ test_paridade_casos_limite PASSOU")
+
+    @staticmethod
+    def test_tipos_inteiros_dependentes_dos_dados():
+        """Verifica estoque e tempo_entrega_dias int64 quando todos os valores são válidos"""
+        produtos = ca.converter_colunas_monetarias(pd.DataFrame({
+            'id_produto': ['1', '2', '2'], 'preco': ['1.00', '2.00', '3.00'],
+            'categoria': ['A', 'B', 'B'], 'estoque': ['50', '-3', '1']}))
+        vendas = ca.converter_colunas_monetarias(pd.DataFrame({
+            'id_venda': ['1'], 'id_cliente': ['1'], 'id_produto': ['1'], 'quantidade': ['1'],
+            'valor_unitario': ['1.00'], 'valor_total': ['1.00'], 'data_venda': ['2023-03-01']}))
+        logistica = pd.DataFrame({'id_entrega': ['10'], 'id_venda': ['1'], 'data_envio': ['2023-03-02'],
+                                  'data_entrega_prevista': ['2023-03-05'], 'data_entrega_real': ['2023-03-04']})
+        clientes = pd.DataFrame({'id_cliente': ['1'], 'nome': ['Ana']})
+        resultado = _assert_paridade([clientes, produtos, vendas, logistica])
+        assert str(resultado['produtos']['estoque'].dtype) == 'int64'
+        assert str(resultado['logistica']['tempo_entrega_dias'].dtype) == 'int64'
+        assert _csv(resultado['produtos']).splitlines()[1].endswith(';50')
+
+        # Decimal ('1.0') também vira float no pandas (to_numeric)
+        produtos['estoque'] = ['50', '1.0', '1']
+        assert str(_assert_paridade([clientes, produtos, vendas, logistica])['produtos']['estoque'].dtype) == 'float64'
+        print("✅ test_tipos_inteiros_dependentes_dos_dados PASSOU")
+
+
+if __name__ == '__main__':
+    TestCorrecaoPolars.test_paridade_dados_raw()
+    TestCorrecaoPolars.test_paridade_casos_limite()
+    TestCorrecaoPolars.test_tipos_inteiros_dependentes_dos_dados()
@@ -0,0 +1,173 @@
+"""
+test_daemon_ingestao.py
+Testes unitários para o daemon de micro-lotes e as suites compiladas.
+"""
+
+import json
+import logging
+import pandas as pd
+import tempfile
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import configuracao
+import daemon_ingestao
+import suites_compiladas
+
+
+def _processador(raiz: Path) -> daemon_ingestao.ProcessadorMicroLotes:
+    processed = raiz / 'data' / 'processed'
+    processed.mkdir(parents=True)
+    pd.DataFrame({'id_cliente': ['1', '2'], 'nome': ['Ana', 'Bia']}).to_csv(
+        processed / 'clientes_clean.csv', sep=';', index=False)
+    config = configuracao.carregar_config()
+    config['daemon'] = {'max_datas_cache': 2}
+    config.pop('pseudonimizacao', None)
+    return daemon_ingestao.ProcessadorMicroLotes(config, processed, raiz / 'data' / 'quality')
+
+
+class TestDaemonIngestao:
+    """Testes para o daemon de ingestão em micro-lotes"""
+
+    @staticmethod
+    def test_polling_entrega_apenas_arquivos_estaveis():
+        """Verifica se o polling ignora arquivos pré-existentes e espera a escrita estabilizar"""
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = Path(tmp)
+            (raw / 'vendas.csv').write_text('id_venda\n1\n')
+            observador = daemon_ingestao.ObservadorPolling(raw, intervalo=0.01)
+
+            novo = raw / 'vendas_lote1.csv'
+            novo.write_text('id_venda\n2\n')
+            assert observador.aguardar(0.5) == [novo]
+            assert observador.aguardar(0.05) == []
+
+        assert daemon_ingestao.dataset_do_arquivo(novo, daemon_ingestao.ORDEM_DATASETS) == 'vendas'
+        assert daemon_ingestao.dataset_do_arquivo(Path('notas.csv'), daemon_ingestao.ORDEM_DATASETS) is None
+        print("✅ test_polling_entrega_apenas_arquivos_estaveis PASSOU")
+
+    @staticmethod
+    def test_suite_compilada_vendas():
+        """Verifica contagens por regra e FK contra as referências compiladas"""
+        suite = suites_compiladas.compilar_suite('vendas', {
+            'clientes': pd.DataFrame({'id_cliente': ['1', '2']}),
+            'produtos': pd.DataFrame({'id_produto': ['101']}),
+        })
+        df = pd.DataFrame({
+            'id_venda': ['1001', '1002', '1002'],
+            'id_cliente': ['1', '3', '2'],
+            'id_produto': ['101', '101', '101'],
+            'quantidade': [1, 0, 2],
+            'valor_total': [10.0, 0.0, 20.0],
+            'data_venda': pd.to_datetime(['2023-03-01'] * 3),
+            'status': ['Concluída', 'Pendente', 'Cancelada'],
+        })
+
+        resultados = {(r.expectativa, r.coluna): r for r in suite.validar(df)}
+        assert resultados[('expect_column_values_to_be_unique', 'id_venda')].falhas == 2
+        assert resultados[('expect_column_values_to_be_between', 'quantidade')].falhas == 1
+        assert resultados[('expect_column_values_to_be_in_set', 'id_cliente')].falhas == 1
+        assert resultados[('expect_column_values_to_be_in_set', 'id_produto')].sucesso
+        assert resultados[('expect_column_values_to_be_between', 'data_venda')].sucesso
+        print("✅ test_suite_compilada_vendas PASSOU")
+
+    @staticmethod
+    def test_suite_compilada_fail_fast():
+        """Verifica a ordem bloqueante/custo, a parada na falha bloqueante e o orçamento do mostly"""
+        suite = suites_compiladas.compilar_suite('clientes')
+        n = 1000
+        df = pd.DataFrame({
+            'id_cliente': [str(i) for i in range(n)],
+            'nome': ['Ana'] * n,
+            'email': ['invalido'] * 50 + ['ana@x.com'] * (n - 50),
+            'telefone': ['11999990000'] * n,
+            'estado': ['SP'] * n,
+        })
+        primeiras = [suite.expectativas[i] for i in suite.ordem_fail_fast[:2]]
+        assert [(e.tipo, e.severidade) for e in primeiras] == [
+            ('expect_column_values_to_not_be_null', 'bloqueante'),
+            ('expect_column_values_to_be_unique', 'bloqueante')]
+
+        # Sem bloqueio: o email (mostly=0.99) estoura o orçamento no primeiro trecho e para
+        completos = suite.validar(df)
+        rapidos = suite.validar(df, fail_fast=True, tamanho_trecho=100)
+        assert [r.sucesso for r in rapidos] == [r.sucesso for r in completos]
+        email = next(r for r in rapidos if r.expectativa.endswith('match_regex') and r.coluna == 'email')
+        assert email.parcial and email.falhas == 50 and not email.sucesso
+        assert not any(r.parcial for r in completos)
+
+        # Chave duplicada: a suite para e as regras de aviso não são avaliadas
+        df.loc[1, 'id_cliente'] = '0'
+        resultados = suite.validar(df, fail_fast=True)
+        resumo = suites_compiladas.resumir_resultados(resultados)
+        assert resumo['bloqueado'] and resumo['falhas'] == ['expect_column_values_to_be_unique(id_cliente)']
+        assert resumo['regras_nao_avaliadas'] == len(suite) - 2
+        print("✅ test_suite_compilada_fail_fast PASSOU")
+
+    @staticmethod
+    def test_referencias_guardam_so_chaves():
+        """Verifica que as referências de FK guardam só as chaves distintas e que o cache de datas é podado"""
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            raiz = Path(tmp)
+            processador = _processador(raiz)
+            assert list(processador.referencias['clientes'].columns) == ['id_cliente']
+
+            raw = raiz / 'data' / 'raw'
+            raw.mkdir()
+            lote = raw / 'clientes_lote1.csv'
+            for nomes in (['Caio', 'Ana', 'Duda'], ['Caio 2', 'Ana 2', 'Duda 2']):
+                pd.DataFrame({'id_cliente': ['3', '1', '3'], 'nome': nomes,
+                              'email': ['c@x.com'] * 3, 'telefone': ['11999990000'] * 3,
+                              'data_cadastro': ['2023-01-01'] * 3}).to_csv(lote, sep='\t', index=False)
+                processador.processar([lote], 0.0)
+            assert processador.referencias['clientes']['id_cliente'].tolist() == ['1', '2', '3']
+
+            processador.corretor.cache_datas._cache.update({'2023-01-01': None, '2023-01-02': None, 'x': None})
+            processador.processar([lote], 0.0)
+            assert len(processador.corretor.cache_datas) <= 1
+        logging.disable(logging.NOTSET)
+        print("✅ test_referencias_guardam_so_chaves PASSOU")
+
+    @staticmethod
+    def test_lote_com_falha_e_registrado_e_reprocessado():
+        """Verifica que um lote que falha vai para micro_lotes.jsonl com erro e é reprocessado no reinício"""
+        logging.disable(logging.CRITICAL)
+        with tempfile.TemporaryDirectory() as tmp:
+            raiz = Path(tmp)
+            processador = _processador(raiz)
+            raw = raiz / 'data' / 'raw'
+            raw.mkdir()
+            (raw / 'vendas_lote1.csv').write_text(
+                'id_venda\tid_cliente\tid_produto\tquantidade\tvalor_unitario\tvalor_total\tdata_venda\tstatus\n'
+                '1001\t1\t101\t2\t10.00\t20.00\t2023-03-01\tConcluída\n', encoding='utf-8')
+
+            processar = processador.processar
+            processador.processar = lambda arquivos, chegada: 1 / 0
+            daemon = daemon_ingestao.DaemonIngestao(raw, processador, janela=0.01, polling=True)
+            daemon.executar(max_lotes=1)
+            registros = [json.loads(l) for l in processador.registro.read_text(encoding='utf-8').splitlines()]
+            assert registros[-1]['arquivos'] == ['vendas_lote1.csv'] and not registros[-1]['sucesso']
+            assert registros[-1]['erro'].startswith('ZeroDivisionError')
+            assert 'vendas_lote1.csv' not in daemon._vistos
+            assert processador.arquivos_registrados() == set()
+
+            # Reinício: o arquivo volta a ser processado
+            processador.processar = processar
+            daemon = daemon_ingestao.DaemonIngestao(raw, processador, janela=0.01, polling=True)
+            daemon.executar(max_lotes=1)
+            assert processador.arquivos_registrados() == {'vendas_lote1.csv'}
+        logging.disable(logging.NOTSET)
+        print("✅ test_lote_com_falha_e_registrado_e_reprocessado PASSOU")
+
+
+if __name__ == '__main__':
+    TestDaemonIngestao.test_polling_entrega_apenas_arquivos_estaveis()
+    TestDaemonIngestao.test_suite_compilada_vendas()
+    TestDaemonIngestao.test_suite_compilada_fail_fast()
+    TestDaemonIngestao.test_referencias_guardam_so_chaves()
+    TestDaemonIngestao.test_lote_com_falha_e_registrado_e_reprocessado()
@@ -0,0 +1,56 @@
+"""
+test_deduplicacao_clientes.py
+Testes unitários para a deduplicação aproximada de clientes.
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import deduplicacao_clientes as dd
+
+
+class TestDeduplicacaoClientes:
+    """Testes para a detecção de clientes duplicados com blocagem"""
+    
+    @staticmethod
+    def test_clusters_por_email_telefone_e_nome():
+        """Verifica se email (caixa), telefone e nome+nascimento agrupam o mesmo cliente"""
+        df = pd.DataFrame({
+            'id_cliente': [10, 2, 3, 4, 5, 6, 7],
+            'nome': ['João Silva', 'Joao da Silva', 'Maria Souza', 'Maria Sousa', 'Pedro Lima', 'JOÃO SILVA', 'Ana'],
+            'email': ['joao@x.com', ' JOAO@X.com ', None, None, 'pedro@x.com', None, None],
+            'telefone': ['11999887766', None, '11888776655', '11888776655', None, None, '11888776655'],
+            'data_nascimento': ['1985-03-15', '1990-01-01', None, None, None, '1985-03-15', None],
+            'estado': ['SP', 'SP', 'RJ', 'RJ', 'MG', None, 'RJ']
+        })
+        
+        df_resultado = dd.atribuir_clusters(df)
+        # 10 ~ 2 (email), 10 ~ 6 (nome + nascimento, mesmo sem estado), 3 ~ 4 (telefone + nome similar);
+        # 7 tem o mesmo telefone de 3/4, mas nome diferente
+        assert df_resultado['id_cluster'].tolist() == [2, 2, 3, 3, 5, 2, 7], \
+            f"Clusters inesperados: {df_resultado['id_cluster'].tolist()}"
+        print("✅ test_clusters_por_email_telefone_e_nome PASSOU")
+    
+    @staticmethod
+    def test_blocos_grandes_ignorados():
+        """Verifica se blocos acima de max_bloco não geram pares"""
+        df = pd.DataFrame({
+            'id_cliente': [1, 2, 3],
+            'nome': ['A', 'B', 'C'],
+            'email': ['generico@x.com'] * 3
+        })
+        
+        df_resultado = dd.DeduplicacaoClientes(max_bloco=2).atribuir_clusters(df)
+        assert df_resultado['id_cluster'].tolist() == [1, 2, 3]
+        # Nenhum bloco com pares (sem email nem nascimento): cada cliente é o próprio cluster
+        assert dd.atribuir_clusters(df.drop(columns='email'))['id_cluster'].tolist() == [1, 2, 3]
+        print("✅ test_blocos_grandes_ignorados PASSOU")
+
+
+if __name__ == '__main__':
+    TestDeduplicacaoClientes.test_clusters_por_email_telefone_e_nome()
+    TestDeduplicacaoClientes.test_blocos_grandes_ignorados()
@@ -0,0 +1,63 @@
+"""
+test_docs_incrementais.py
+Testes unitários para o build incremental dos Data Docs.
+"""
+
+import json
+import logging
+import tempfile
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from armazem_resultados import ArmazemResultados
+from docs_incrementais import ConstrutorDocsIncremental
+from suites_compiladas import ResultadoRegra
+
+
+def _suite(caminho: Path, nome: str, colunas):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps({'expectation_suite_name': nome, 'expectations': [
+        {'expectation_type': 'expect_column_values_to_not_be_null', 'kwargs': {'column': c}} for c in colunas]}))
+
+
+class TestDocsIncrementais:
+    """Testes para o construtor incremental"""
+
+    @staticmethod
+    def test_renderiza_apenas_alteracoes():
+        """Verifica que só suites alteradas e execuções novas são renderizadas"""
+        logging.disable(logging.INFO)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                tmp = Path(tmp)
+                _suite(tmp / 'exp' / 'vendas.json', 'techcommerce.vendas.warning', ['id_venda'])
+                _suite(tmp / 'exp' / 'clientes.json', 'techcommerce.clientes.warning', ['id_cliente'])
+                construtor = ConstrutorDocsIncremental(tmp / 'site', tmp / 'exp', tmp / 'store.sqlite',
+                                                       tmp / 'sem_css.css')
+                regra = ResultadoRegra('expect_column_values_to_not_be_null', 'id_venda', True, 10, 0, 1.0)
+                with ArmazemResultados(tmp / 'store.sqlite') as store:
+                    store.registrar_regras('techcommerce.vendas.warning', [regra], 'run1')
+
+                assert construtor.construir() == {'suites': 2, 'suites_removidas': 0, 'execucoes': 1, 'indice': 1}
+                assert construtor.construir() == {'suites': 0, 'suites_removidas': 0, 'execucoes': 0, 'indice': 0}
+
+                _suite(tmp / 'exp' / 'vendas.json', 'techcommerce.vendas.warning', ['id_venda', 'id_cliente'])
+                with ArmazemResultados(tmp / 'store.sqlite') as store:
+                    store.registrar_regras('techcommerce.vendas.warning', [regra], 'run2')
+                assert construtor.construir() == {'suites': 1, 'suites_removidas': 0, 'execucoes': 1, 'indice': 1}
+
+                indice = (tmp / 'site' / 'index.html').read_text(encoding='utf-8')
+                assert 'validations/techcommerce/vendas/warning/run2/2.html' in indice
+                pagina = (tmp / 'site' / 'expectations' / 'techcommerce' / 'vendas' / 'warning.html')
+                assert 'id_cliente' in pagina.read_text(encoding='utf-8')
+        finally:
+            logging.disable(logging.NOTSET)
+        print("✅ test_renderiza_apenas_alteracoes PASSOU")
+
+
+if __name__ == '__main__':
+    TestDocsIncrementais.test_renderiza_apenas_alteracoes()
@@ -0,0 +1,78 @@
+"""
+test_execucao_distribuida.py
+Testes unitários para a execução distribuída das correções.
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+from execucao_distribuida import ExecucaoDistribuida, TrabalhadorCorrecao, dividir
+
+
+def _corrigir_tudo(corretor, brutos):
+    clientes = corretor.corrigir_clientes(brutos['clientes'])
+    produtos = corretor.corrigir_produtos(brutos['produtos'])
+    vendas = corretor.corrigir_vendas(brutos['vendas'], clientes, produtos)
+    return {'clientes': clientes, 'produtos': produtos, 'vendas': vendas,
+            'logistica': corretor.corrigir_logistica(brutos['logistica'], vendas)}
+
+
+class TestExecucaoDistribuida:
+    """Testes para ExecucaoDistribuida"""
+
+    @staticmethod
+    def test_resultado_igual_ao_local_com_fk_co_particionada():
+        """Verifica o mesmo resultado da correção local, com cada trabalhador só com as chaves das suas partições"""
+        brutos = {
+            'clientes': pd.DataFrame({'id_cliente': ['1', '2', '2', '3', '04'],
+                                      'nome': ['Ana', None, 'Bia', 'Caio', 'Davi'],
+                                      'email': ['a@x.com', 'b@x.com', 'c@x.com', 'invalido', 'd@x.com'],
+                                      'telefone': ['11987654321', '(21) 91234-5678', '1', None, '11911112222'],
+                                      'estado': ['SP', 'RJ', 'XX', 'MG', 'sp']}),
+            'produtos': pd.DataFrame({'id_produto': ['101', '102', '103', '103'],
+                                      'preco': ['10.00', '-5.50', '3', '4'],
+                                      'categoria': ['A', None, 'B', 'B'], 'estoque': ['1', '-2', '3', '4']}),
+            'vendas': pd.DataFrame({'id_venda': [str(1000 + i) for i in range(8)],
+                                    'id_cliente': ['1', '4', '999', '2', '3', '1', 'x', '2'],
+                                    'id_produto': ['101', '102', '101', '999', '103', '103', '101', '102'],
+                                    'quantidade': ['1', '2', '1', '1', '0', '3', '1', '2'],
+                                    'valor_unitario': ['10.00', '5.50', '1', '1', '3', '3', '1', '5.50'],
+                                    'valor_total': ['10.00', '0', '1', '1', '0', '9.00', '1', '11.00'],
+                                    'data_venda': ['2023-01-0' + str(i + 1) for i in range(8)]}),
+            'logistica': pd.DataFrame({'id_entrega': ['1', '2', '2', '3', '4'],
+                                       'id_venda': ['1000', '1001', '1005', '1002', '1007'],
+                                       'data_envio': ['2023-01-02'] * 5,
+                                       'data_entrega_real': ['2023-01-05'] * 5}),
+        }
+        for df in brutos.values():
+            ca.converter_colunas_monetarias(df)
+        esperado = _corrigir_tudo(ca.CorrecaoAutomatica(), brutos)
+
+        with ExecucaoDistribuida.locais(2, particoes=3) as execucao:
+            obtido = _corrigir_tudo(execucao, brutos)
+        for nome in esperado:
+            pd.testing.assert_frame_equal(obtido[nome], esperado[nome], check_index_type=False)
+        assert list(obtido['vendas']['id_venda']) == ['1000', '1001', '1005', '1007']
+        assert list(obtido['logistica']['id_entrega']) == ['1', '2', '4']
+
+        # Filho e pai na mesma partição: '04' (cliente) e '4' (venda) são a mesma chave numérica
+        trabalhador = TrabalhadorCorrecao()
+        for p, parte in dividir(esperado['clientes'], 'id_cliente', 3).items():
+            trabalhador.processar({'op': 'guardar_chaves', 'referencia': 'clientes', 'coluna': 'id_cliente',
+                                   'particao': p}, parte)
+        for p, parte in dividir(brutos['vendas'], 'id_cliente', 3).items():
+            _, validas = trabalhador.processar({'op': 'semijoin', 'referencia': 'clientes',
+                                                'coluna': 'id_cliente', 'particao': p}, parte)
+            assert len(trabalhador.chaves[('clientes', p)]) < 4
+            assert set(validas['id_cliente']) <= {'1', '2', '3', '4'}
+            assert '4' not in set(parte['id_cliente']) or '4' in set(validas['id_cliente'])
+        print("✅ test_resultado_igual_ao_local_com_fk_co_particionada PASSOU")
+
+
+if __name__ == '__main__':
+    TestExecucaoDistribuida.test_resultado_igual_ao_local_com_fk_co_particionada()
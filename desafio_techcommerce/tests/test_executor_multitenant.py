@@ -0,0 +1,61 @@
+"""
+test_executor_multitenant.py
+Testes unitários para o agendamento do executor multi-tenant.
+"""
+
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import executor_multitenant as em
+
+
+class TestExecutorMultiTenant:
+    """Testes para carga de tenants, prazos e ordem de despacho"""
+
+    @staticmethod
+    def test_ordem_por_folga_e_prioridade():
+        """Verifica prazos, estimativa por histórico e a ordem de despacho"""
+        agora = datetime(2025, 11, 17, 5, 0, tzinfo=timezone.utc)
+        assert em.prazo_absoluto('07:00', agora) == datetime(2025, 11, 17, 7, 0, tzinfo=timezone.utc)
+        # Prazo já passado hoje: próxima ocorrência (D+1)
+        assert em.prazo_absoluto('04:00', agora).day == 18
+
+        with tempfile.TemporaryDirectory() as tmp:
+            arquivo = Path(tmp) / "tenants.yaml"
+            arquivo.write_text(
+                "sla_padrao: '07:00'\n"
+                "tenants:\n"
+                "  - {nome: grande, raiz: grande, prioridade: 1}\n"
+                "  - {nome: pequeno, raiz: pequeno, prioridade: 1}\n"
+                "  - {nome: urgente, raiz: urgente, prioridade: 0, prazo: '06:00'}\n"
+                "  - {nome: vip, raiz: vip, prioridade: 9}\n", encoding='utf-8')
+            tenants = em.carregar_tenants(arquivo, agora=agora)
+            assert tenants[0].raiz == Path(tmp) / "grande"
+
+            historico = em.HistoricoDuracoes(Path(tmp) / "historico.json")
+            historico.registrar('grande', 1800)
+            historico.registrar('pequeno', 30)
+            historico.registrar('pequeno', 130)   # média móvel: 0.3 * 130 + 0.7 * 30
+            historico.salvar()
+
+            executor = em.ExecutorMultiTenant(tenants, workers=1, relatorios_dir=tmp)
+            assert round(executor.historico.estimativa('pequeno')) == 60
+            # urgente (prazo 06:00) e grande (30 min) têm menos folga; vip vence pequeno pela prioridade
+            assert [t.nome for t in executor.tenants] == ['urgente', 'grande', 'vip', 'pequeno']
+
+            try:
+                em.carregar_tenants(arquivo, raizes=[str(Path(tmp) / "vip")], agora=agora)
+                assert False, "nomes repetidos deveriam falhar"
+            except ValueError:
+                pass
+        print("✅ test_ordem_por_folga_e_prioridade PASSOU")
+
+
+if __name__ == '__main__':
+    TestExecutorMultiTenant.test_ordem_por_folga_e_prioridade()
@@ -0,0 +1,105 @@
+"""
+test_governador_memoria.py
+Testes unitários para o governador de memória (plano por tabela, lotes e spill em disco).
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+from leitura_raw import ler_csv_raw
+from governador_memoria import GovernadorMemoria, TabelaEmDisco, estimar_arquivo
+
+RAW = Path(__file__).parent.parent / 'data' / 'raw'
+MB = 2 ** 20
+
+
+def _corrigir_tudo(governador, fontes, planos):
+    corretor = ca.CorrecaoAutomatica()
+    corrigir = lambda nome, *refs: governador.corrigir(corretor, nome, fontes[nome], planos[nome], *refs)
+    clientes = corrigir('clientes')
+    produtos = corrigir('produtos')
+    vendas = corrigir('vendas', clientes, produtos)
+    return {'clientes': clientes, 'produtos': produtos, 'vendas': vendas,
+            'logistica': corrigir('logistica', vendas)}
+
+
+class TestGovernadorMemoria:
+    """Testes para GovernadorMemoria e TabelaEmDisco"""
+
+    @staticmethod
+    def test_plano_por_orcamento():
+        """Verifica a estimativa do CSV e a escolha de memória, lotes e disco pelo orçamento"""
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / 'vendas.csv'
+            n = 20_000
+            pd.DataFrame({'id_venda': range(n), 'valor_total': ['123.45'] * n,
+                          'status': ['Concluída'] * n}).to_csv(caminho, sep='\t', index=False)
+            estimativa = estimar_arquivo(caminho, {'valor_total': 'float'})
+            real = ca.converter_colunas_monetarias(ler_csv_raw(caminho)).memory_usage(deep=True).sum()
+            assert abs(estimativa['linhas'] - n) < n * 0.05
+            assert abs(estimativa['bytes_carga'] - real) < real * 0.25
+
+            governador = GovernadorMemoria(orcamento=1)
+            governador.base = 0
+            # Espaço para a saída, mas não para o raw + saída: spill em disco, pico (3x) em 6 lotes
+            governador.orcamento = int(1.55 * estimativa['bytes_carga'] / 0.9)
+            plano = governador.planejar({'vendas': caminho}, {})['vendas']
+            assert plano.modo == 'disco' and plano.lotes == 6
+
+        fontes = {'vendas': pd.DataFrame({'x': range(2 * MB // 8)}),      # 2 MB
+                  'clientes': pd.DataFrame({'x': range(MB // 8)})}         # 1 MB
+        # vendas: pico 6 MB; clientes residente como raw + saída (2 MB)
+        governador.orcamento = int(20 * MB / 0.9)
+        assert governador.planejar(fontes, {})['vendas'].modo == 'memoria'
+        governador.orcamento = int(7.6 * MB / 0.9)
+        plano = governador.planejar(fontes, {})['vendas']
+        assert plano.modo == 'lotes' and plano.lotes == 4 and plano.particoes == 16
+        governador.orcamento = int(3 * MB / 0.9)
+        assert governador.planejar(fontes, {})['vendas'].modo == 'lotes'   # já carregada: nunca disco
+        logging.disable(logging.NOTSET)
+        print("✅ test_plano_por_orcamento PASSOU")
+
+    @staticmethod
+    def test_lotes_e_disco_iguais_a_memoria():
+        """Verifica que a correção em lotes e a partir do spill em disco dão o mesmo resultado"""
+        logging.disable(logging.WARNING)
+        arquivos = {nome: RAW / f"{nome}.csv" for nome in ('clientes', 'produtos', 'vendas', 'logistica')}
+        brutos = {nome: ca.converter_colunas_monetarias(ler_csv_raw(caminho)) for nome, caminho in arquivos.items()}
+        esperado = _corrigir_tudo(GovernadorMemoria(modo='memoria'), brutos,
+                                  GovernadorMemoria(modo='memoria').planejar(brutos, {}))
+
+        lotes = GovernadorMemoria(modo='lotes')
+        obtido = _corrigir_tudo(lotes, brutos, lotes.planejar(brutos, {}))
+        for nome in esperado:
+            pd.testing.assert_frame_equal(obtido[nome], esperado[nome], check_index_type=False)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            disco = GovernadorMemoria(modo='disco')
+            planos = disco.planejar(arquivos, {})
+            fontes = {nome: disco.carregar_em_disco(planos[nome], caminho, Path(tmp))
+                      for nome, caminho in arquivos.items()}
+            # O manifesto guarda a tabela em disco como referência às partições
+            pd.to_pickle(fontes['vendas'], Path(tmp) / 'vendas.pkl')
+            fontes['vendas'] = pd.read_pickle(Path(tmp) / 'vendas.pkl')
+            assert isinstance(fontes['vendas'], TabelaEmDisco) and len(fontes['vendas']) == len(brutos['vendas'])
+            pd.testing.assert_frame_equal(fontes['vendas'].ler(), brutos['vendas'], check_index_type=False)
+
+            obtido = _corrigir_tudo(disco, fontes, disco.planejar(fontes, {}))
+        for nome in esperado:
+            pd.testing.assert_frame_equal(obtido[nome], esperado[nome], check_index_type=False)
+        logging.disable(logging.NOTSET)
+        print("✅ test_lotes_e_disco_iguais_a_memoria PASSOU")
+
+
+if __name__ == '__main__':
+    TestGovernadorMemoria.test_plano_por_orcamento()
+    TestGovernadorMemoria.test_lotes_e_disco_iguais_a_memoria()
@@ -0,0 +1,48 @@
+"""
+test_leitura_raw.py
+Testes unitários para a carga raw com o leitor Arrow.
+"""
+
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+from leitura_raw import ler_csv_raw
+
+
+class TestLeituraRaw:
+    """Testes para ler_csv_raw"""
+
+    @staticmethod
+    def test_arrow_equivale_ao_read_csv():
+        """Verifica o mesmo DataFrame do pd.read_csv (texto, nulos, aspas) e os mesmos centavos"""
+        conteudo = (
+            "id_venda\tid_cliente\tvalor_unitario\tvalor_total\tstatus\n"
+            "1001\t1\t899.99\t1799.98\tConcluída\n"
+            "1002\t\t 10.005 \tNA\t\"Pendente\"\n"
+            "1003\tnull\t1e3\tabc\t\n"
+            "1004\t007\t-0.5\t.5\tN/A\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / 'vendas.csv'
+            caminho.write_text(conteudo, encoding='utf-8')
+            esperado = ler_csv_raw(caminho, leitor='pandas')
+            obtido = ler_csv_raw(caminho)
+        pd.testing.assert_frame_equal(obtido, esperado)
+        assert obtido['id_cliente'][3] == '007'
+
+        ca.converter_colunas_monetarias(obtido)
+        assert list(obtido['valor_unitario']) == [89999, 1001, 100000, -50]
+        assert obtido['valor_total'][0] == 179998 and obtido['valor_total'][3] == 50
+        assert obtido['valor_total'][1:3].isna().all()
+        print("✅ test_arrow_equivale_ao_read_csv PASSOU")
+
+
+if __name__ == '__main__':
+    TestLeituraRaw.test_arrow_equivale_ao_read_csv()
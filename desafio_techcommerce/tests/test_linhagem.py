@@ -0,0 +1,69 @@
+"""
+test_linhagem.py
+Testes unitários para a linhagem por linha (raw -> processado).
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import correcao_automatica as ca
+from linhagem import IndiceLinhagem, RegistroLinhagem
+
+
+class TestLinhagem:
+    """Testes para RegistroLinhagem e IndiceLinhagem"""
+
+    @staticmethod
+    def test_regras_e_consulta_por_chave_e_linha():
+        """Verifica bitmask, destino e consulta do sidecar por chave e por linha raw"""
+        clientes = pd.DataFrame({'id_cliente': ['2', '1', '1'], 'nome': [None, 'Ana', 'Ana B'],
+                                 'email': ['x@y.com', 'invalido', 'a@b.com']})
+        produtos = ca.converter_colunas_monetarias(
+            pd.DataFrame({'id_produto': ['10'], 'preco': ['-5.00'], 'categoria': [None], 'estoque': ['1']}))
+        vendas = ca.converter_colunas_monetarias(pd.DataFrame({
+            'id_venda': ['1001', '1002', '1003'], 'id_cliente': ['1', '2', '9'], 'id_produto': ['10', '10', '10'],
+            'quantidade': ['2', '1', '1'], 'valor_unitario': ['5.00', '5.00', '5.00'],
+            'valor_total': ['9.00', '5.00', '5.00']}))
+
+        registro = RegistroLinhagem()
+        for nome, df, chave in (('clientes', clientes, 'id_cliente'), ('produtos', produtos, 'id_produto'),
+                                ('vendas', vendas, 'id_venda')):
+            registro.iniciar(nome, df, f"data/raw/{nome}.csv", chave)
+        logging.disable(logging.WARNING)
+        try:
+            corretor = ca.CorrecaoAutomatica(linhagem=registro)
+            df_clientes = corretor.corrigir_clientes(clientes)
+            df_produtos = corretor.corrigir_produtos(produtos)
+            df_vendas = corretor.corrigir_vendas(vendas, df_clientes, df_produtos)
+        finally:
+            logging.disable(logging.NOTSET)
+        for nome, df in (('clientes', df_clientes), ('produtos', df_produtos), ('vendas', df_vendas)):
+            registro.finalizar(nome, df)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            registro.salvar(Path(tmp) / 'linhagem.parquet')
+            indice = IndiceLinhagem(Path(tmp) / 'linhagem.parquet')
+
+            venda = indice.por_chave('vendas', 1003)
+            assert venda == [{'linha': 4, 'chave': 1003, 'regras': ['fk_invalida'], 'destino': 'removida',
+                              'dataset': 'vendas', 'arquivo': 'data/raw/vendas.csv'}]
+            assert indice.por_chave('vendas', 1001)[0]['regras'] == ['valor_total_recalculado']
+
+            duplicado = indice.por_chave('clientes', 1)
+            assert [(r['linha'], r['destino'], r['regras']) for r in duplicado] == \
+                   [(3, 'processada', ['email_invalido']), (4, 'removida', ['duplicata_removida'])]
+            assert indice.por_linha('clientes', 2)['regras'] == ['nome_preenchido']
+            assert indice.por_linha('produtos', 2)['regras'] == ['preco_negativo', 'categoria_preenchida']
+            assert indice.por_linha('vendas', 99) is None
+        print("✅ test_regras_e_consulta_por_chave_e_linha PASSOU")
+
+
+if __name__ == '__main__':
+    TestLinhagem.test_regras_e_consulta_por_chave_e_linha()
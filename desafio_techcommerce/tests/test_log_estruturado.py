@@ -0,0 +1,110 @@
+"""
+test_log_estruturado.py
+Testes unitários para o logging em fila com pipeline.log em JSON lines.
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+import multiprocessing
+import sys
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import log_estruturado
+
+
+class _Contador:
+    """Argumento de log que registra em qual thread foi formatado."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.get_ident())
+        return 'contador'
+
+
+def _logar_no_filho(fila) -> None:
+    log_estruturado.configurar_processo_filho(fila)
+    logging.getLogger('trabalhador').warning("partição %d corrigida", 7)
+
+
+def _ler(caminho: Path) -> list:
+    return [json.loads(linha) for linha in caminho.read_text(encoding='utf-8').splitlines()]
+
+
+class TestLogEstruturado:
+    """Testes para configurar_logging, FiltroRepeticoes e a fila entre processos"""
+
+    @staticmethod
+    def test_json_amostragem_e_formatacao_tardia():
+        """Verifica o JSON lines, a supressão de repetições e a formatação fora da thread que loga"""
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / 'pipeline.log'
+            log_estruturado.configurar_logging({'level': 'INFO', 'amostragem': {'limite': 2, 'janela_s': 60}},
+                                               caminho)
+            log_estruturado.definir_contexto(run_id='run-1')
+            logger = logging.getLogger('correcao_automatica')
+            for i in range(5):
+                logger.warning("  Removidas %d duplicatas", i)
+            for _ in range(3):
+                logger.error("Falha no lote")
+            contador = _Contador()
+            logger.debug("nível desligado: %s", contador)
+            logger.info("argumento %s", contador, extra={'dataset': 'vendas'})
+            log_estruturado.encerrar_logging()
+
+            registros = _ler(caminho)
+            mensagens = [r['mensagem'] for r in registros]
+            assert mensagens[:2] == ["  Removidas 0 duplicatas", "  Removidas 1 duplicatas"]
+            assert mensagens.count("Falha no lote") == 3  # ERROR nunca é suprimido
+            assert all(r['run_id'] == 'run-1' and r['pid'] == os.getpid() for r in registros)
+            info = next(r for r in registros if r['mensagem'] == 'argumento contador')
+            assert info['dataset'] == 'vendas' and info['logger'] == 'correcao_automatica'
+            resumo = registros[-1]
+            assert resumo['nivel'] == 'WARNING' and resumo['mensagem'].startswith("Mensagem repetida 3 vez(es)")
+            # DEBUG descartado sem formatar; INFO formatado só pela thread de escrita
+            assert contador.threads and threading.get_ident() not in contador.threads
+        print("✅ test_json_amostragem_e_formatacao_tardia PASSOU")
+
+    @staticmethod
+    def test_janela_informa_suprimidas():
+        """Verifica que a próxima mensagem após a janela carrega a contagem de suprimidas"""
+        filtro = log_estruturado.FiltroRepeticoes(limite=1, janela=60)
+        registro = lambda: logging.makeLogRecord({'name': 'x', 'levelno': logging.WARNING, 'msg': '%d', 'args': (1,)})
+        assert filtro.filter(registro()) and not filtro.filter(registro()) and not filtro.filter(registro())
+        filtro.janela = 0  # janela expirada
+        proximo = registro()
+        assert filtro.filter(proximo) and proximo.suprimidas == 2
+        assert filtro.pendentes() == []
+        print("✅ test_janela_informa_suprimidas PASSOU")
+
+    @staticmethod
+    def test_processos_filhos_no_mesmo_arquivo():
+        """Verifica que registros de um processo trabalhador chegam ao pipeline.log do principal"""
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / 'pipeline.log'
+            log_estruturado.configurar_logging({}, caminho)
+            logging.getLogger('coordenador').info("início")
+            processo = multiprocessing.get_context('spawn').Process(
+                target=_logar_no_filho, args=(log_estruturado.fila_processos(),))
+            processo.start()
+            processo.join(60)
+            log_estruturado.encerrar_logging()
+
+            registros = _ler(caminho)
+            filho = next(r for r in registros if r['logger'] == 'trabalhador')
+            assert filho['mensagem'] == "partição 7 corrigida" and filho['pid'] == processo.pid
+            assert filho['pid'] != os.getpid() and registros[0]['mensagem'] == 'início'
+        print("✅ test_processos_filhos_no_mesmo_arquivo PASSOU")
+
+
+if __name__ == '__main__':
+    TestLogEstruturado.test_json_amostragem_e_formatacao_tardia()
+    TestLogEstruturado.test_janela_informa_suprimidas()
+    TestLogEstruturado.test_processos_filhos_no_mesmo_arquivo()
@@ -0,0 +1,111 @@
+"""
+test_manifesto_execucao.py
+Testes unitários para o manifesto de execução (checkpoint/resume e retenção).
+"""
+
+import json
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from manifesto_execucao import ManifestoExecucao, ManifestoInvalidoError, coletar_execucoes
+
+
+def _entradas(raiz: Path) -> list:
+    raw = raiz / 'raw'
+    raw.mkdir(exist_ok=True)
+    (raw / 'clientes.csv').write_text('id_cliente\tnome\n1\tAna\n', encoding='utf-8')
+    (raw / 'vendas.csv').write_text('id_venda\n10\n', encoding='utf-8')
+    return sorted(raw.glob('*.csv'))
+
+
+class TestManifestoExecucao:
+    """Testes para ManifestoExecucao e coletar_execucoes"""
+
+    @staticmethod
+    def test_retomada_reaproveita_etapas():
+        """Verifica que uma execução retomada reaproveita as etapas concluídas e seus DataFrames"""
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = Path(tmp) / 'runs'
+            arquivos = _entradas(Path(tmp))
+            manifesto = ManifestoExecucao.criar(runs, arquivos, run_id='run1')
+            carga = {'clientes': pd.DataFrame({'id_cliente': ['1'], 'preco': pd.array([199990], dtype='Int64')})}
+            manifesto.iniciar_etapa('carga')
+            manifesto.salvar_dataframes('carga', carga)
+            manifesto.concluir_etapa('carga')
+            manifesto.iniciar_etapa('correcao')
+            manifesto.falhar_etapa('correcao', RuntimeError('falhou'))
+
+            retomado = ManifestoExecucao.carregar(runs, 'run1')
+            retomado.validar_entradas(arquivos)
+            assert retomado.etapa_concluida('carga') and not retomado.etapa_concluida('correcao')
+            pd.testing.assert_frame_equal(retomado.carregar_dataframes('carga')['clientes'], carga['clientes'])
+            assert retomado.dados['etapas']['correcao']['erro'] == 'RuntimeError: falhou'
+
+            # Artefato truncado: a etapa não é reaproveitada
+            logging.disable(logging.WARNING)
+            (runs / 'run1' / 'carga' / 'clientes.pkl').write_bytes(b'x')
+            assert not ManifestoExecucao.carregar(runs, 'run1').etapa_concluida('carga')
+            logging.disable(logging.NOTSET)
+        print("✅ test_retomada_reaproveita_etapas PASSOU")
+
+    @staticmethod
+    def test_retomada_recusada_se_entradas_mudarem():
+        """Verifica que a retomada é recusada quando um arquivo raw muda, some ou aparece"""
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = Path(tmp) / 'runs'
+            arquivos = _entradas(Path(tmp))
+            ManifestoExecucao.criar(runs, arquivos, run_id='run1')
+            for alterar in (lambda: arquivos[0].write_text('id_cliente\tnome\n1\tBia\n', encoding='utf-8'),
+                            lambda: arquivos[1].unlink()):
+                alterar()
+                try:
+                    ManifestoExecucao.carregar(runs, 'run1').validar_entradas(sorted(arquivos[0].parent.glob('*.csv')))
+                    assert False, "entradas alteradas deveriam invalidar a retomada"
+                except ManifestoInvalidoError as e:
+                    assert 'mudaram' in str(e)
+            try:
+                ManifestoExecucao.carregar(runs, 'inexistente')
+                assert False, "execução inexistente deveria falhar"
+            except ManifestoInvalidoError:
+                pass
+        print("✅ test_retomada_recusada_se_entradas_mudarem PASSOU")
+
+    @staticmethod
+    def test_limpeza_e_retencao():
+        """Verifica a remoção dos artefatos após sucesso e a coleta das execuções antigas"""
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = Path(tmp) / 'runs'
+            arquivos = _entradas(Path(tmp))
+            for i in range(4):
+                manifesto = ManifestoExecucao.criar(runs, arquivos, run_id=f'run{i}')
+                manifesto.dados['criado_em'] = f'2025-11-17T10:00:0{i}'
+                manifesto.salvar_dataframes('carga', {'clientes': pd.DataFrame({'a': range(1000)})})
+                manifesto.concluir_etapa('carga')
+
+            liberados = manifesto.limpar_artefatos()
+            assert liberados > 0 and not (runs / 'run3' / 'carga').exists()
+            assert (runs / 'run3' / 'manifesto.json').exists()
+            etapa = json.loads((runs / 'run3' / 'manifesto.json').read_text())['etapas']['carga']
+            assert etapa['status'] == 'concluida' and etapa['artefatos_removidos']
+            assert not ManifestoExecucao.carregar(runs, 'run3').etapa_concluida('carga')
+
+            # Mantém as 2 mais recentes; run0 (ex.: a execução atual) é preservada
+            assert coletar_execucoes(runs, 2, preservar=['run0']) == ['run1']
+            assert sorted(p.name for p in runs.iterdir()) == ['run0', 'run2', 'run3']
+            assert coletar_execucoes(runs, 5) == []
+        logging.disable(logging.NOTSET)
+        print("✅ test_limpeza_e_retencao PASSOU")
+
+
+if __name__ == '__main__':
+    TestManifestoExecucao.test_retomada_reaproveita_etapas()
+    TestManifestoExecucao.test_retomada_recusada_se_entradas_mudarem()
+    TestManifestoExecucao.test_limpeza_e_retencao()
@@ -0,0 +1,116 @@
+"""
+test_memo_validacao.py
+Testes unitários para a memoização de validações por impressão do lote.
+"""
+
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import suites_compiladas
+from armazem_analitico import ArmazemAnalitico
+from memo_validacao import LOTE_CONSULTA, MemoValidacao, validar_com_memo
+
+
+class TestMemoValidacao:
+    """Testes para validar_com_memo"""
+
+    @staticmethod
+    def test_reaproveita_regras_e_particoes_inalteradas():
+        """Verifica resultados idênticos à validação completa e o reaproveitamento por partição"""
+        suite = suites_compiladas.compilar_suite('vendas', {
+            'clientes': pd.DataFrame({'id_cliente': ['1', '2']}),
+            'produtos': pd.DataFrame({'id_produto': ['101']}),
+        })
+        n = 30
+        df = pd.DataFrame({
+            'id_venda': [str(1000 + i) for i in range(n)],
+            'id_cliente': ['1', '2', '3'] * 10,
+            'id_produto': ['101'] * n,
+            'quantidade': [1, 2, 0] * 10,
+            'valor_total': [10.0] * n,
+            'data_venda': pd.to_datetime(['2023-03-01', '2023-03-02', '2023-03-03'] * 10),
+            'status': ['Concluída'] * n,
+        })
+        campos = lambda rs: [(r.expectativa, r.coluna, r.sucesso, r.avaliados, r.falhas) for r in rs]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with MemoValidacao(Path(tmp) / 'memo.sqlite') as memo:
+                primeira, uso = validar_com_memo(suite, df, memo, particao='data_venda')
+                assert campos(primeira) == campos(suite.validar(df))
+                assert uso['reaproveitadas'] == 0
+
+                # Lote inalterado: nada é avaliado de novo
+                segunda, uso = validar_com_memo(suite, df, memo, particao='data_venda')
+                assert campos(segunda) == campos(primeira) and uso['avaliadas'] == 0
+
+                # Uma partição alterada: só ela é reavaliada, e só nas regras da coluna que mudou
+                alterado = df.copy()
+                alterado.loc[alterado['data_venda'] == '2023-03-03', 'quantidade'] = 5
+                terceira, uso = validar_com_memo(suite, alterado, memo, particao='data_venda')
+                assert campos(terceira) == campos(suite.validar(alterado))
+                assert uso['avaliadas'] == 2    # not_null e between de quantidade
+                quantidade = next(r for r in terceira if r.expectativa.endswith('between') and r.coluna == 'quantidade')
+                assert quantidade.sucesso
+
+                # Sem partição: a impressão é da coluna inteira (a de unicidade já era)
+                _, uso = validar_com_memo(suite, alterado, memo)
+                assert uso['avaliadas'] == len(suite) - 1
+                _, uso = validar_com_memo(suite, alterado, memo)
+                assert uso['avaliadas'] == 0
+        print("✅ test_reaproveita_regras_e_particoes_inalteradas PASSOU")
+
+    @staticmethod
+    def test_obter_filtra_no_sql_e_limpar_remove_antigas():
+        """Verifica a consulta por lotes de impressões e a retenção das entradas sem uso"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with MemoValidacao(Path(tmp) / 'memo.sqlite') as memo:
+                memo.guardar('r1', {f"i{j}": (j, 0) for j in range(LOTE_CONSULTA + 10)})
+                memo.guardar('r2', {'i1': (9, 9)})
+                pedidas = ['i1', f"i{LOTE_CONSULTA + 5}", 'ausente']
+                assert memo.obter('r1', pedidas) == {'i1': (1, 0), f"i{LOTE_CONSULTA + 5}": (LOTE_CONSULTA + 5, 0)}
+                assert len(memo.obter('r1', [f"i{j}" for j in range(LOTE_CONSULTA + 10)])) == LOTE_CONSULTA + 10
+
+                with memo.con:
+                    memo.con.execute("UPDATE memo SET usado_em = '2000-01-01T00:00:00+00:00' WHERE hash_regra = 'r2'")
+                assert memo.limpar(30) == 1 and memo.obter('r2', ['i1']) == {}
+                assert len(memo) == LOTE_CONSULTA + 10
+        print("✅ test_obter_filtra_no_sql_e_limpar_remove_antigas PASSOU")
+
+    @staticmethod
+    def test_regex_igual_no_particionado_e_no_pushdown():
+        """Verifica as mesmas contagens de regex no caminho particionado (pandas) e no pushdown SQL"""
+        suite = suites_compiladas.compilar_suite('clientes')
+        df = pd.DataFrame({
+            'id_cliente': [str(i) for i in range(8)],
+            'nome': ['Ana'] * 8,
+            # Casos em que o `re` do Python e o RE2 divergem (\w Unicode, $ antes de \n)
+            'email': ['ana@x.com', 'joão@x.com', 'b@x.com\n', 'x ana@x.com', 'c@x.COM', None, 'invalido', 'd@x.com'],
+            'telefone': ['11999990000', '11999990000\n', '1199999000', '٣١١٩٩٩٩٩٠٠٠٠', None,
+                         '11999990000', '21988887777', 'x11999990000'],
+            'estado': ['SP', 'SP', 'RJ', 'RJ', 'MG', 'MG', 'SP', 'BA'],
+        })
+        regex = lambda rs: [(r.coluna, r.avaliados, r.falhas) for r in rs
+                            if r.expectativa == 'expect_column_values_to_match_regex']
+        with tempfile.TemporaryDirectory() as tmp:
+            with MemoValidacao(Path(tmp) / 'memo.sqlite') as memo:
+                particionado, _ = validar_com_memo(suite, df, memo, particao='estado')
+            esperado = regex(particionado)
+            assert esperado == regex(suite.validar(df)) == [('email', 7, 4), ('telefone', 7, 4)], esperado
+            for motor in ArmazemAnalitico.MOTORES:
+                with ArmazemAnalitico(Path(tmp) / f"store.{motor}", motor) as armazem:
+                    armazem.carregar_tabela('clientes', df)
+                    assert regex(armazem.validar('clientes', suite)) == esperado, motor
+        assert suites_compiladas.regex_ancorada(r'\d+') == r'^(?:\d+)'
+        print("✅ test_regex_igual_no_particionado_e_no_pushdown PASSOU")
+
+
+if __name__ == '__main__':
+    TestMemoValidacao.test_reaproveita_regras_e_particoes_inalteradas()
+    TestMemoValidacao.test_obter_filtra_no_sql_e_limpar_remove_antigas()
+    TestMemoValidacao.test_regex_igual_no_particionado_e_no_pushdown()
@@ -0,0 +1,110 @@
+"""
+test_pipeline_ingestao.py
+Testes de ponta a ponta da validação (ETAPA 2.1) do pipeline de ingestão.
+"""
+
+import json
+import yaml
+import logging
+import shutil
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import configuracao
+import log_estruturado
+import pipeline_ingestao as pi
+
+RAIZ_PROJETO = Path(__file__).parent.parent
+
+
+def _clientes(ids):
+    return pd.DataFrame({'id_cliente': ids, 'nome': ['Ana'] * len(ids),
+                         'email': [f"c{i}@x.com" for i in range(len(ids))],
+                         'telefone': ['11999990000'] * len(ids), 'estado': ['SP'] * len(ids)})
+
+
+def _publicados(raiz: Path) -> dict:
+    """Conteúdo do que o pipeline publica: versões, *_clean.csv, CDC, tabela fato e rollup de SLA."""
+    processados = raiz / 'data' / 'processed'
+    arquivos = [*processados.glob('*_clean.csv'), *processados.glob('fato_vendas.*'),
+                *(processados / 'versoes').rglob('*'), *(processados / 'cdc').rglob('*'),
+                raiz / 'data' / 'quality' / 'sla_logistica_rollup.csv']
+    return {p.relative_to(raiz).as_posix(): p.read_bytes() for p in arquivos if p.is_file()}
+
+
+class TestPipelineIngestao:
+    """Testes para a ETAPA 2.1 e seu efeito no resultado do pipeline"""
+
+    @staticmethod
+    def test_validacao_em_memoria_por_padrao():
+        """Verifica que, sem o armazém analítico, as suites rodam em memória e falhas bloqueantes levantam erro"""
+        config = configuracao.carregar_config()
+        assert not (config.get('analytical_store') or {}).get('enabled')
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            pi.definir_raiz(tmp)
+            try:
+                assert pi.executar_validacao(None, config, {'clientes': _clientes(['1', '2'])})
+                # Só regra de aviso (email) falha: o lote não é bloqueado
+                avisos = _clientes(['1', '2'])
+                avisos['email'] = 'invalido'
+                assert pi.executar_validacao(None, config, {'clientes': avisos}) is False
+                try:
+                    pi.executar_validacao(None, config, {'clientes': _clientes(['1', '1'])})
+                    assert False, "PK duplicada deveria bloquear a validação"
+                except pi.ValidacaoBloqueadaError as e:
+                    assert 'clientes' in str(e)
+            finally:
+                pi.definir_raiz(RAIZ_PROJETO)
+                logging.disable(logging.NOTSET)
+        print("✅ test_validacao_em_memoria_por_padrao PASSOU")
+
+    @staticmethod
+    def test_regra_bloqueante_para_o_pipeline():
+        """Verifica, de ponta a ponta, que uma venda duplicada (PK bloqueante) faz o pipeline falhar sem publicar"""
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = Path(tmp) / 'data' / 'raw'
+            shutil.copytree(RAIZ_PROJETO / 'data' / 'raw', raw)
+            config = configuracao.carregar_config()
+            config['data_docs'] = {'incremental': False}  # sem build em segundo plano no diretório temporário
+            (Path(tmp) / 'config').mkdir()
+            (Path(tmp) / 'config' / 'config.yaml').write_text(yaml.safe_dump(config), encoding='utf-8')
+            try:
+                assert pi.main(['--raiz', tmp, '--run-id', 'ok']) is True
+                publicados = _publicados(Path(tmp))
+                linhas = (raw / 'vendas.csv').read_text(encoding='utf-8').splitlines()
+                (raw / 'vendas.csv').write_text('\n'.join(linhas + [linhas[1]]) + '\n', encoding='utf-8')
+                assert pi.main(['--raiz', tmp, '--run-id', 'bloqueada']) is False
+            finally:
+                log_estruturado.encerrar_logging()
+                pi.definir_raiz(RAIZ_PROJETO)
+
+            # Nada publicado: versão, *_clean.csv, índice do CDC, tabela fato e SLA da execução anterior
+            assert 'data/processed/cdc/vendas/indice_hash.parquet' in publicados
+            assert _publicados(Path(tmp)) == publicados
+            assert json.loads(publicados['data/processed/versoes/ATUAL.json'])['versao'] == 'ok'
+            assert not (Path(tmp) / 'data' / 'processed' / 'cdc' / 'vendas' / 'bloqueada').exists()
+
+            etapas = json.loads((Path(tmp) / 'data' / 'quality' / 'runs' / 'bloqueada' / 'manifesto.json')
+                                .read_text(encoding='utf-8'))['etapas']
+            assert etapas['validacao']['status'] == 'falhou'
+            assert etapas['validacao']['erro'].startswith('ValidacaoBloqueadaError'), etapas['validacao']
+            assert not {'salvamento', 'cdc', 'fato', 'sla', 'relatorio'} & set(etapas)
+
+            # Os clusters da deduplicação ficam fora do schema publicado de clientes
+            processados = Path(tmp) / 'data' / 'processed'
+            assert 'id_cluster' not in pd.read_csv(processados / 'clientes_clean.csv', sep=';', nrows=0).columns
+            clusters = pd.read_csv(processados / 'clientes_clusters.csv', sep=';', dtype=str)
+            assert list(clusters.columns) == ['id_cliente', 'id_cluster'] and len(clusters) > 0
+        print("✅ test_regra_bloqueante_para_o_pipeline PASSOU")
+
+
+if __name__ == '__main__':
+    TestPipelineIngestao.test_validacao_em_memoria_por_padrao()
+    TestPipelineIngestao.test_regra_bloqueante_para_o_pipeline()
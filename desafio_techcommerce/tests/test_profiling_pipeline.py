@@ -0,0 +1,97 @@
+"""
+test_profiling_pipeline.py
+Testes unitários para o profiling por etapa (CPU por amostragem e memória).
+"""
+
+import json
+import time
+import tempfile
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from profiling_pipeline import AmostradorPilha, ProfilerExecucao
+
+
+def _ocupado(segundos: float) -> int:
+    """Laço de CPU pura, para o amostrador encontrar na pilha."""
+    fim, n = time.perf_counter() + segundos, 0
+    while time.perf_counter() < fim:
+        n += 1
+    return n
+
+
+class TestProfilingPipeline:
+    """Testes para ProfilerExecucao e AmostradorPilha"""
+
+    @staticmethod
+    def test_duracao_por_etapa():
+        """Verifica a duração de etapas e sub-etapas no resumo.json"""
+        with tempfile.TemporaryDirectory() as tmp:
+            perfil = ProfilerExecucao(Path(tmp), cpu=True, intervalo=0.002)
+            with perfil.etapa('correcao'):
+                time.sleep(0.05)
+                with perfil.etapa('correcao.corrigir_clientes'):
+                    time.sleep(0.1)
+            perfil.finalizar()
+
+            resumo = json.loads((Path(tmp) / 'resumo.json').read_text(encoding='utf-8'))
+            assert set(resumo) == {'correcao', 'correcao.corrigir_clientes'}
+            assert resumo['correcao.corrigir_clientes']['duracao_s'] >= 0.1
+            assert resumo['correcao']['duracao_s'] >= resumo['correcao.corrigir_clientes']['duracao_s'] + 0.05
+            assert (Path(tmp) / 'correcao.collapsed').exists()
+
+            # Profiler desativado não escreve nada
+            desativado = ProfilerExecucao.desativado()
+            with desativado.etapa('carga'):
+                pass
+            assert desativado.resumo == {}
+        print("✅ test_duracao_por_etapa PASSOU")
+
+    @staticmethod
+    def test_relatorio_memoria():
+        """Verifica o pico por etapa e o relatório de alocações só nas etapas de topo"""
+        with tempfile.TemporaryDirectory() as tmp:
+            perfil = ProfilerExecucao(Path(tmp), memoria=True)
+            with perfil.etapa('carga'):
+                retido = bytearray(8 * 1024 * 1024)
+                with perfil.etapa('carga.sub'):
+                    temporario = bytearray(4 * 1024 * 1024)
+                    del temporario
+            perfil.finalizar()
+
+            assert perfil.resumo['carga']['pico_memoria_bytes'] >= 12 * 1024 * 1024
+            assert 4 * 1024 * 1024 <= perfil.resumo['carga.sub']['pico_memoria_bytes']
+            relatorio = (Path(tmp) / 'carga.memoria.txt').read_text(encoding='utf-8')
+            assert float(relatorio.split('rastreada: ')[1].split(' MiB')[0]) >= 12, relatorio
+            assert 'test_profiling_pipeline.py' in relatorio
+            assert not (Path(tmp) / 'carga.sub.memoria.txt').exists()
+            del retido
+        print("✅ test_relatorio_memoria PASSOU")
+
+    @staticmethod
+    def test_amostrador_encontra_funcao_ocupada():
+        """Verifica que o amostrador atribui à função ocupada a maior parte das amostras"""
+        with tempfile.TemporaryDirectory() as tmp:
+            amostrador = AmostradorPilha(intervalo=0.002)
+            amostrador.iniciar()
+            amostrador.etapas_ativas.append('etapa')
+            _ocupado(0.3)
+            amostrador.etapas_ativas.remove('etapa')
+            amostrador.parar()
+
+            total = amostrador.escrever('etapa', Path(tmp) / 'etapa.collapsed')
+            linhas = (Path(tmp) / 'etapa.collapsed').read_text(encoding='utf-8').splitlines()
+            no_ocupado = sum(int(linha.rsplit(' ', 1)[1]) for linha in linhas
+                             if 'test_profiling_pipeline:_ocupado' in linha)
+            assert total >= 10 and no_ocupado >= 0.8 * total, (total, no_ocupado, linhas[:3])
+        print("✅ test_amostrador_encontra_funcao_ocupada PASSOU")
+
+
+if __name__ == '__main__':
+    TestProfilingPipeline.test_duracao_por_etapa()
+    TestProfilingPipeline.test_relatorio_memoria()
+    TestProfilingPipeline.test_amostrador_encontra_funcao_ocupada()
@@ -0,0 +1,56 @@
+"""
+test_pseudonimizacao.py
+Testes unitários para a pseudonimização de PII de clientes.
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pseudonimizacao import Pseudonimizador
+
+
+class TestPseudonimizacao:
+    """Testes para Pseudonimizador"""
+
+    @staticmethod
+    def test_pseudonimos_deterministicos_e_validos():
+        """Verifica determinismo, formatos das suites, nulos preservados e dependência da chave"""
+        df = pd.DataFrame({
+            'id_cliente': ['1', '2', '3', '4'],
+            'nome': ['Ana Souza', 'NÃO INFORMADO', 'Ana Souza', None],
+            'email': [' Ana@Exemplo.com ', 'bruno@mail.com.br', 'ana@exemplo.com', None],
+            'telefone': ['11987654321', '21912345678', '11987654321', None],
+        })
+        pseudonimizador = Pseudonimizador(b'chave-de-teste', workers=2, tamanho_lote=1)
+        saida = pseudonimizador.pseudonimizar(df)
+
+        # Determinístico, inclusive após a normalização do email
+        assert saida['email'][0] == saida['email'][2]
+        assert saida['nome'][0] == saida['nome'][2]
+        assert saida['email'].equals(pseudonimizador.pseudonimizar(df)['email'])
+        assert saida['id_cliente'].equals(df['id_cliente'])
+
+        # Formatos validados pelas suites
+        assert saida['email'][:2].str.fullmatch(r'[0-9a-f]{16}@[a-z0-9.-]+\.[a-z]{2,}').all()
+        assert list(saida['email'][:2].str.split('@').str[1]) == ['exemplo.com', 'mail.com.br']
+        assert saida['telefone'][:3].str.fullmatch(r'\d{11}').all()
+        assert list(saida['telefone'][:2].str.slice(0, 2)) == ['11', '21']
+        assert saida['nome'][1] == 'NÃO INFORMADO'
+        assert saida['nome'][0].startswith('Cliente ') and 'Ana' not in saida['nome'][0]
+
+        # Nulos continuam nulos
+        assert saida.loc[3, ['nome', 'email', 'telefone']].isna().all()
+
+        # Outra chave, outros pseudônimos
+        outra = Pseudonimizador(b'outra-chave').pseudonimizar(df)
+        assert outra['email'][0] != saida['email'][0]
+        assert outra['telefone'][0] != saida['telefone'][0]
+        print("✅ test_pseudonimos_deterministicos_e_validos PASSOU")
+
+
+if __name__ == '__main__':
+    TestPseudonimizacao.test_pseudonimos_deterministicos_e_validos()
@@ -0,0 +1,102 @@
+"""
+test_servico_validacao.py
+Testes unitários para o serviço HTTP de validação de lotes.
+"""
+
+import io
+import json
+import socket
+import tempfile
+import urllib.error
+import threading
+import urllib.request
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import configuracao
+import servico_validacao as sv
+
+
+class TestServicoValidacao:
+    """Testes para o serviço de validação"""
+
+    @staticmethod
+    def test_corpo_chunked():
+        """Verifica a leitura incremental de um corpo com Transfer-Encoding: chunked"""
+        bruto = b"7\r\nid_vend\r\n9\r\na\n1001\n10\r\n0\r\n\r\n"
+        corpo = sv.CorpoRequisicao(io.BytesIO(bruto), None, chunked=True)
+        assert corpo.read(4) == b"id_v"
+        assert corpo.read() == b"enda\n1001\n10"
+        assert corpo.read() == b""
+        print("✅ test_corpo_chunked PASSOU")
+
+    @staticmethod
+    def test_validar_lote_http():
+        """Verifica a validação e o dry-run de correção via HTTP"""
+        config = configuracao.carregar_config()
+        with tempfile.TemporaryDirectory() as tmp:
+            servidor = sv.criar_servidor(config, porta=0, workers=2, processed_dir=tmp)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            try:
+                porta = servidor.server_address[1]
+                lote = "id_produto\tnome_produto\tcategoria\tpreco\testoque\tativo\n" \
+                       "101\tMouse\tPeriféricos\t-59.90\t10\ttrue\n" \
+                       "101\tMouse\t\t59.90\t10\ttrue\n"
+                req = urllib.request.Request(f"http://127.0.0.1:{porta}/validar/produtos?corrigir=1",
+                                             data=lote.encode('utf-8'), headers={'Content-Type': 'text/csv'})
+                resposta = json.load(urllib.request.urlopen(req))
+            finally:
+                servidor.shutdown()
+                servidor.server_close()
+
+        assert resposta['linhas'] == 2
+        assert 'expect_column_values_to_be_unique(id_produto)' in resposta['falhas']
+        assert 'expect_column_values_to_be_between(preco)' in resposta['falhas']
+        assert resposta['correcao']['linhas_saida'] == 1
+        assert resposta['correcao']['sucesso'], resposta['correcao']['falhas']
+        print("✅ test_validar_lote_http PASSOU")
+
+    @staticmethod
+    def test_conexoes_ociosas_nao_travam_o_pool():
+        """Verifica que clientes keep-alive ociosos não impedem o atendimento de uma nova requisição"""
+        config = configuracao.carregar_config()
+        config['servico_validacao'] = {'timeout_conexao_s': 0.5, 'max_corpo_mb': 0.001}
+        with tempfile.TemporaryDirectory() as tmp:
+            servidor = sv.criar_servidor(config, porta=0, workers=2, processed_dir=tmp)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            ociosas = []
+            try:
+                porta = servidor.server_address[1]
+                # Mais conexões ociosas que workers: todas as threads ficam presas no readline
+                ociosas = [socket.create_connection(('127.0.0.1', porta)) for _ in range(3)]
+                resposta = json.load(urllib.request.urlopen(f"http://127.0.0.1:{porta}/saude", timeout=10))
+                assert resposta['status'] == 'ok'
+                # Conexão ociosa é encerrada pelo servidor (recv devolve EOF)
+                ociosas[0].settimeout(10)
+                assert ociosas[0].recv(1) == b''
+
+                # Corpo acima de max_corpo_mb: 413 (Content-Length e chunked)
+                lote = ("id_produto\tnome_produto\n" + "101\tMouse\n" * 200).encode('utf-8')
+                for corpo in (lote, iter([lote])):
+                    req = urllib.request.Request(f"http://127.0.0.1:{porta}/validar/produtos", data=corpo,
+                                                 headers={'Content-Type': 'text/csv'})
+                    try:
+                        urllib.request.urlopen(req, timeout=10)
+                        assert False, "corpo acima do limite deveria ser recusado"
+                    except urllib.error.HTTPError as e:
+                        assert e.code == 413
+            finally:
+                for conexao in ociosas:
+                    conexao.close()
+                servidor.shutdown()
+                servidor.server_close()
+        print("✅ test_conexoes_ociosas_nao_travam_o_pool PASSOU")
+
+
+if __name__ == '__main__':
+    TestServicoValidacao.test_corpo_chunked()
+    TestServicoValidacao.test_validar_lote_http()
+    TestServicoValidacao.test_conexoes_ociosas_nao_travam_o_pool()
@@ -0,0 +1,67 @@
+"""
+test_sla_logistica.py
+Testes unitários para o rollup de SLA de entregas.
+"""
+
+import pandas as pd
+import sys
+import os
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import sla_logistica as sla
+
+
+def _logistica(transportadoras, envio, prevista, real):
+    return pd.DataFrame({
+        'transportadora': transportadoras,
+        'data_envio': pd.to_datetime(envio),
+        'data_entrega_prevista': pd.to_datetime(prevista),
+        'data_entrega_real': pd.to_datetime(real),
+    })
+
+
+class TestSlaLogistica:
+    """Testes para o analytics de SLA de logística"""
+    
+    @staticmethod
+    def test_sla_por_transportadora():
+        """Verifica taxa no prazo, atraso médio e percentis por transportadora"""
+        df = _logistica(
+            ['Correios'] * 4 + ['SEDEX'],
+            ['2023-03-01'] * 5,
+            ['2023-03-05', '2023-03-05', '2023-03-05', '2023-03-05', '2023-03-03'],
+            ['2023-03-03', '2023-03-04', '2023-03-08', None, '2023-03-02'],
+        )
+        
+        resumo = sla.sla_por_transportadora(sla.agregar_rollup(df)).set_index('transportadora')
+        correios = resumo.loc['Correios']
+        assert correios['n_entregas'] == 4
+        assert correios['taxa_no_prazo'] == 2 / 3, f"Taxa inesperada: {correios['taxa_no_prazo']}"
+        assert correios['atraso_medio_dias'] == 3
+        assert correios['p50_tempo_entrega_dias'] == 3
+        assert correios['p99_tempo_entrega_dias'] == 7
+        assert resumo.loc['SEDEX', 'taxa_no_prazo'] == 1.0
+        print("✅ test_sla_por_transportadora PASSOU")
+    
+    @staticmethod
+    def test_rollup_incremental_substitui_dias():
+        """Verifica se reprocessar um dia substitui (e não duplica) suas contagens"""
+        dia1 = _logistica(['Correios'], ['2023-03-01'], ['2023-03-05'], ['2023-03-04'])
+        dia2 = _logistica(['Correios', 'Correios'], ['2023-03-02'] * 2, ['2023-03-05'] * 2,
+                          ['2023-03-04', '2023-03-09'])
+        
+        rollup = sla.atualizar_rollup(None, dia1)
+        rollup = sla.atualizar_rollup(rollup, dia2)
+        rollup = sla.atualizar_rollup(rollup, dia2)
+        
+        por_dia = sla.sla_por_dia(rollup).set_index('dia')
+        assert por_dia['n_entregas'].tolist() == [1, 2]
+        assert por_dia.loc['2023-03-02', 'taxa_no_prazo'] == 0.5
+        print("✅ test_rollup_incremental_substitui_dias PASSOU")
+
+
+if __name__ == '__main__':
+    TestSlaLogistica.test_sla_por_transportadora()
+    TestSlaLogistica.test_rollup_incremental_substitui_dias()
@@ -0,0 +1,93 @@
+"""
+test_tabela_fato.py
+Testes unitários para a tabela fato de vendas mantida pelo CDC.
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cdc_snapshots
+import tabela_fato
+
+
+CONFIG = {'datasets': {
+    'clientes': {'primary_key': 'id_cliente'},
+    'produtos': {'primary_key': 'id_produto'},
+    'vendas': {'primary_key': 'id_venda'},
+    'logistica': {'primary_key': 'id_entrega'},
+}}
+
+
+def _dados(dia: int) -> dict:
+    """Dia 2: cliente 3 alterado, venda 102 removida, venda 103 nova,
+    entrega 2 passa para a venda 103 e a entrega 3 da venda 101 chega atrasada."""
+    clientes = pd.DataFrame({'id_cliente': ['1', '2', '3'],
+                             'nome': ['Ana', 'Bia', 'Caio' if dia == 1 else 'Caio Souza']})
+    produtos = pd.DataFrame({'id_produto': ['10', '11'], 'nome_produto': ['TV', 'Mesa'],
+                             'preco': pd.array([100000, 20000], dtype='Int64')})
+    vendas = pd.DataFrame({'id_venda': ['100', '101', '102', '103'],
+                           'id_cliente': ['1', '3', '2', '1'],
+                           'id_produto': ['10', '11', '10', '11'],
+                           'valor_total': pd.array([100000, 40000, 100000, 60000], dtype='Int64')})
+    logistica = pd.DataFrame({'id_entrega': ['1', '2', '3'], 'id_venda': ['100', '103', '101'],
+                              'transportadora': ['X', 'Y', 'Z']})
+    if dia == 1:
+        vendas = vendas[vendas['id_venda'] != '103']
+        logistica = pd.DataFrame({'id_entrega': ['1', '2'], 'id_venda': ['100', '101'],
+                                  'transportadora': ['X', 'Y']})
+    else:
+        vendas = vendas[vendas['id_venda'] != '102']
+    return {'clientes': clientes, 'produtos': produtos,
+            'vendas': vendas.reset_index(drop=True), 'logistica': logistica}
+
+
+class TestTabelaFato:
+    """Testes para executar_fato"""
+
+    @staticmethod
+    def test_incremental_igual_a_reconstrucao():
+        """Verifica que a atualização pelo CDC gera a mesma tabela da reconstrução completa"""
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            cdc_dir, caminho = Path(tmp) / 'cdc', Path(tmp) / 'fato_vendas.parquet'
+            d1 = _dados(1)
+            cdc_snapshots.executar_cdc(d1, CONFIG, cdc_dir, 'run1')
+            resumo = tabela_fato.executar_fato(d1, CONFIG, caminho, 'run1', cdc_dir)
+            assert resumo == {'modo': 'completa', 'linhas': 3, 'vendas_refeitas': 3}
+
+            d2 = _dados(2)
+            cdc_snapshots.executar_cdc(d2, CONFIG, cdc_dir, 'run2')
+            resumo = tabela_fato.executar_fato(d2, CONFIG, caminho, 'run2', cdc_dir)
+            # 101 (cliente e entregas), 102 (removida), 103 (nova)
+            assert resumo == {'modo': 'incremental', 'linhas': 3, 'vendas_refeitas': 3}
+
+            obtido = pd.read_parquet(caminho)
+            completa = Path(tmp) / 'completa.parquet'
+            tabela_fato.construir_fato(d2['vendas'], d2['clientes'], d2['produtos'],
+                                       d2['logistica']).to_parquet(completa, index=False)
+            pd.testing.assert_frame_equal(obtido, pd.read_parquet(completa))
+            assert list(obtido['id_entrega']) == ['1', '3', '2']
+            assert obtido['nome'][1] == 'Caio Souza' and obtido['valor_total'][2] == 600.0
+
+            # Retentativa da mesma execução não refaz nada
+            resumo = tabela_fato.executar_fato(d2, CONFIG, caminho, 'run2', cdc_dir)
+            assert resumo['modo'] == 'sincronizada'
+
+            # Execução sem a etapa: a base do CDC não bate mais e a tabela é reconstruída
+            cdc_snapshots.executar_cdc(d1, CONFIG, cdc_dir, 'run3')
+            cdc_snapshots.executar_cdc(d2, CONFIG, cdc_dir, 'run4')
+            resumo = tabela_fato.executar_fato(d2, CONFIG, caminho, 'run4', cdc_dir)
+            assert resumo['modo'] == 'completa'
+        logging.disable(logging.NOTSET)
+        print("✅ test_incremental_igual_a_reconstrucao PASSOU")
+
+
+if __name__ == '__main__':
+    TestTabelaFato.test_incremental_igual_a_reconstrucao()
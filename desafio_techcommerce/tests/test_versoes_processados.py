@@ -0,0 +1,91 @@
+"""
+test_versoes_processados.py
+Testes unitários para as versões imutáveis dos *_clean.csv.
+"""
+
+import logging
+import tempfile
+import pandas as pd
+import sys
+import os
+from pathlib import Path
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from versoes_processados import RepositorioVersoes, fixar_processados
+
+
+def _dados(nome_cliente: str) -> dict:
+    return {
+        'clientes': pd.DataFrame({'id_cliente': ['1', '2'], 'nome': ['Ana', nome_cliente]}),
+        'produtos': pd.DataFrame({'id_produto': ['10'], 'preco': pd.array([199990], dtype='Int64')}),
+    }
+
+
+class TestVersoesProcessados:
+    """Testes para RepositorioVersoes"""
+
+    @staticmethod
+    def test_publicacao_reaproveitamento_e_rollback():
+        """Verifica a versão fixada, o reaproveitamento de objetos, as cópias publicadas e o rollback"""
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            processed = Path(tmp) / 'data' / 'processed'
+            processed.mkdir(parents=True)
+            repositorio = RepositorioVersoes(processed / 'versoes', processed)
+
+            v1 = repositorio.gravar('run1', _dados('Bia'))
+            repositorio.publicar('run1')
+            assert not any(e['reaproveitado'] for e in v1['arquivos'].values())
+            assert (processed / 'produtos_clean.csv').read_text().splitlines() == ['id_produto;preco', '10;1999.9']
+            fixado = fixar_processados({}, processed)
+            assert fixado == repositorio.fixar('run1')
+
+            v2 = repositorio.gravar('run2', _dados('Bruna'))
+            assert v2['arquivos']['produtos']['reaproveitado'] and not v2['arquivos']['clientes']['reaproveitado']
+            assert v2['arquivos']['produtos']['objeto'] == v1['arquivos']['produtos']['objeto']
+            assert repositorio.atual() == 'run1'  # gravada, ainda não publicada
+            repositorio.publicar('run2')
+
+            # Leitor que fixou a run1 continua lendo a run1
+            assert 'Bia' in fixado['clientes'].read_text() and 'Bruna' not in fixado['clientes'].read_text()
+            publicado = processed / 'clientes_clean.csv'
+            assert 'Bruna' in publicado.read_text()
+            # Cópia gravável: editar o arquivo publicado (ex.: um checkout) não altera o objeto
+            objeto = repositorio.fixar()['clientes']
+            assert not os.path.samefile(publicado, objeto) and os.access(publicado, os.W_OK)
+            publicado.write_text('editado', encoding='utf-8')
+            assert 'Bruna' in objeto.read_text()
+
+            repositorio.publicar('run1')  # rollback
+            assert 'Bia' in publicado.read_text() and repositorio.atual() == 'run1'
+        logging.disable(logging.NOTSET)
+        print("✅ test_publicacao_reaproveitamento_e_rollback PASSOU")
+
+    @staticmethod
+    def test_coleta_por_retencao():
+        """Verifica que a coleta mantém a publicada e as recentes e remove objetos órfãos"""
+        logging.disable(logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            repositorio = RepositorioVersoes(Path(tmp) / 'versoes', manter=1, min_horas=0)
+            for i, nome in enumerate(['A', 'B', 'C', 'D']):
+                repositorio.gravar(f'run{i}', _dados(nome))
+            repositorio.publicar('run1')
+            assert repositorio.coletar() == {'versoes_removidas': 2, 'objetos_removidos': 2}
+            assert [m['versao'] for m in repositorio.versoes()] == ['run1', 'run3']
+            for versao in ('run1', 'run3'):
+                assert all(p.exists() for p in repositorio.fixar(versao).values())
+            assert len(list(repositorio.objetos.glob('*.csv'))) == 3  # produtos compartilhado
+
+            # Dentro de min_horas nada é coletado
+            repositorio.gravar('run4', _dados('E'))
+            repositorio.min_horas = 24
+            assert repositorio.coletar() == {'versoes_removidas': 0, 'objetos_removidos': 0}
+        logging.disable(logging.NOTSET)
+        print("✅ test_coleta_por_retencao PASSOU")
+
+
+if __name__ == '__main__':
+    TestVersoesProcessados.test_publicacao_reaproveitamento_e_rollback()
+    TestVersoesProcessados.test_coleta_por_retencao()